@@ -7,8 +7,6 @@ from typing import Optional, Dict, Any
 from fastapi import APIRouter, Request, Response, HTTPException, status, Depends, BackgroundTasks
 from fastapi.security import HTTPBearer
 import logging
-from collections import OrderedDict
-from threading import Lock
 
 from .models import RegisterRequest, LoginRequest, TokenResponse, UserResponse, RefreshTokenRequest
 from .service import auth_service
@@ -22,53 +20,6 @@ import asyncio
 
 logger = logging.getLogger("health_assistant")
 
-# In-memory cache fallback when Redis is not available
-# LRU cache with max 1000 entries, 5 minute TTL
-_ip_cache: OrderedDict = OrderedDict()
-_ip_cache_lock = Lock()
-_ip_cache_ttl = 300  # 5 minutes
-_max_cache_size = 1000
-
-
-def _get_from_memory_cache(cache_key: str) -> Optional[Dict[str, Any]]:
-    """Get from in-memory cache (fallback when Redis unavailable)"""
-    with _ip_cache_lock:
-        if cache_key in _ip_cache:
-            entry = _ip_cache[cache_key]
-            # Use the entry's own TTL (not global TTL)
-            entry_ttl = entry.get("ttl", _ip_cache_ttl)
-            elapsed = time.time() - entry["timestamp"]
-            if elapsed < entry_ttl:
-                # Move to end (LRU)
-                _ip_cache.move_to_end(cache_key)
-                logger.debug(f"Memory cache HIT for {cache_key} (age: {elapsed:.2f}s, ttl: {entry_ttl}s)")
-                return entry["data"]
-            else:
-                # Expired, remove it
-                logger.debug(f"Memory cache EXPIRED for {cache_key} (age: {elapsed:.2f}s, ttl: {entry_ttl}s)")
-                del _ip_cache[cache_key]
-    return None
-
-
-def _set_to_memory_cache(cache_key: str, data: dict, ttl: int = 300):
-    """Set to in-memory cache (fallback when Redis unavailable) - FAST PATH"""
-    try:
-        with _ip_cache_lock:
-            _ip_cache[cache_key] = {
-                "data": data,
-                "timestamp": time.time(),
-                "ttl": ttl
-            }
-            # Move to end (LRU) - O(1) operation
-            _ip_cache.move_to_end(cache_key)
-            
-            # Remove oldest if cache is full (O(1) for OrderedDict)
-            if len(_ip_cache) > _max_cache_size:
-                _ip_cache.popitem(last=False)  # Remove oldest
-    except Exception:
-        # Fail silently - cache write failure is acceptable
-        pass
-
 # Check if we're in production for secure cookie settings
 IS_PRODUCTION = os.getenv("ENVIRONMENT", "development").lower() == "production"
 # For cross-origin requests (Vercel frontend to Render backend), we need samesite="none" with secure=True
@@ -304,22 +255,18 @@ async def get_current_user_info(
     Get current user information
     
     Requires authentication
-    Cached in Redis for 5 minutes
+    Cached (L1 memory + Redis) for 5 minutes
     """
     from ..services.cache import cache_service
     
     user_id = user["user_id"]
     cache_key = f"user_info:{user_id}"
     
-    # Try to get from Redis cache first
-    if cache_service.is_available():
-        cached_user = await cache_service.get(cache_key)
-        if cached_user is not None:
-            logger.debug(f"Cache hit for user info: {user_id}")
-            return UserResponse(**cached_user)
-    
     try:
-        user_data = await auth_service.get_user_by_id(user_id)
+        # L1/Redis first; concurrent misses share one database lookup (cached for 5 minutes)
+        user_data = await cache_service.get_or_load(
+            cache_key, lambda: auth_service.get_user_by_id(user_id), ttl=300
+        )
         
         if not user_data:
             raise HTTPException(
@@ -327,10 +274,6 @@ async def get_current_user_info(
                 detail="User not found"
             )
         
-        # Cache in Redis for 5 minutes (300 seconds)
-        if cache_service.is_available():
-            await cache_service.set(cache_key, user_data, ttl=300)
-        
         return UserResponse(**user_data)
     
     except HTTPException:
@@ -486,47 +429,26 @@ async def check_ip(request: Request, background_tasks: BackgroundTasks):
             "ip_address": None
         }
     
-    # Try Redis cache first (fastest - should be <10ms)
-    # Make this SUPER fast - cache should respond in <5ms
+    # Cache first: L1 (process memory) answers without a network hop,
+    # then Redis - make this SUPER fast - cache should respond in <5ms
     cache_key = f"ip_check:{client_ip}"
-    
-    # Check cache availability first (fast check)
-    # Try Redis first, then fallback to in-memory cache
-    cache_available = cache_service.is_available()
-    cached_result = None
-    
-    # Try Redis cache first (if available)
-    if cache_available:
-        try:
-            # Use FAST PATH for IP checks - no retries, no error handling overhead
-            # This should respond in <5ms if Redis is working
-            cache_start = time.time()
-            cached_result = await asyncio.wait_for(
-                cache_service.get_from_cache(cache_key, retry_count=0, fast_path=True),
-                timeout=0.03  # 30ms timeout - Redis should respond in <5ms
-            )
-            cache_elapsed = (time.time() - cache_start) * 1000
-            if cached_result:
-                logger.info(f"✅ Redis cache HIT for {client_ip} ({cache_elapsed:.2f}ms)")
-                # Schedule async update in background (don't wait)
-                background_tasks.add_task(_update_ip_tracking, client_ip)
-                return cached_result
-        except asyncio.TimeoutError:
-            logger.debug(f"Redis cache timeout for IP {client_ip}, trying memory cache")
-        except Exception as e:
-            logger.debug(f"Redis cache error: {e}, trying memory cache")
-    
-    # Fallback to in-memory cache (fast, no network)
-    memory_cache_start = time.time()
-    cached_result = _get_from_memory_cache(cache_key)
-    memory_cache_elapsed = (time.time() - memory_cache_start) * 1000
-    if cached_result:
-        logger.info(f"✅ Memory cache HIT for {client_ip} ({memory_cache_elapsed:.2f}ms)")
-        # Schedule async update in background (don't wait)
-        background_tasks.add_task(_update_ip_tracking, client_ip)
-        return cached_result
-    else:
-        logger.debug(f"Memory cache MISS for {client_ip} (check took {memory_cache_elapsed:.2f}ms)")
+    try:
+        # Use FAST PATH for IP checks - no retries, no error handling overhead
+        cache_start = time.time()
+        cached_result = await asyncio.wait_for(
+            cache_service.get_from_cache(cache_key, retry_count=0, fast_path=True),
+            timeout=0.03  # 30ms timeout - Redis should respond in <5ms
+        )
+        cache_elapsed = (time.time() - cache_start) * 1000
+        if cached_result:
+            logger.info(f"✅ Cache HIT for {client_ip} ({cache_elapsed:.2f}ms)")
+            # Schedule async update in background (don't wait)
+            background_tasks.add_task(_update_ip_tracking, client_ip)
+            return cached_result
+    except asyncio.TimeoutError:
+        logger.debug(f"Redis cache timeout for IP {client_ip}")
+    except Exception as e:
+        logger.debug(f"Redis cache error: {e}")
     
     logger.debug(f"Cache miss for {client_ip} - querying database")
     
@@ -540,7 +462,7 @@ async def check_ip(request: Request, background_tasks: BackgroundTasks):
             "ip_address": client_ip
         }
         # Cache the result anyway (short TTL)
-        _set_to_memory_cache(cache_key, result, ttl=30)
+        cache_service.set_local(cache_key, result, ttl=30)
         return result
     
     # Ensure database connection is ready (should be instant if pre-warmed)
@@ -556,7 +478,7 @@ async def check_ip(request: Request, background_tasks: BackgroundTasks):
                 "has_authenticated": False,
                 "ip_address": client_ip
             }
-            _set_to_memory_cache(cache_key, result, ttl=30)
+            cache_service.set_local(cache_key, result, ttl=30)
             return result
     db_ready_elapsed = (time.time() - db_ready_start) * 1000
     if db_ready_elapsed > 10:
@@ -595,15 +517,15 @@ async def check_ip(request: Request, background_tasks: BackgroundTasks):
             }
             
             # Cache result for 5 minutes (non-blocking write)
-            # Try Redis first, then fallback to memory cache
+            # Redis in the background, L1 right away
             if cache_service.is_available():
                 # Write to Redis in background (don't block response)
                 background_tasks.add_task(
                     _cache_ip_result, cache_key, result, 300
                 )
-            # Also cache in memory (fast fallback) - SYNC write for immediate availability
-            _set_to_memory_cache(cache_key, result, ttl=300)
-            logger.debug(f"Cached IP result in memory: {cache_key}")
+            # Also cache in L1 - SYNC write for immediate availability
+            cache_service.set_local(cache_key, result, ttl=300)
+            logger.debug(f"Cached IP result in L1: {cache_key}")
             
             # Schedule async update in background (don't wait)
             background_tasks.add_task(_update_ip_tracking, client_ip)
@@ -621,15 +543,15 @@ async def check_ip(request: Request, background_tasks: BackgroundTasks):
             }
             
             # Cache result for 1 minute (new IPs might be created soon)
-            # Try Redis first, then fallback to memory cache
+            # Redis in the background, L1 right away
             if cache_service.is_available():
                 # Write to Redis in background (don't block response)
                 background_tasks.add_task(
                     _cache_ip_result, cache_key, result, 60
                 )
-            # Also cache in memory (fast fallback) - SYNC write for immediate availability
-            _set_to_memory_cache(cache_key, result, ttl=60)
-            logger.debug(f"Cached new IP result in memory: {cache_key}")
+            # Also cache in L1 - SYNC write for immediate availability
+            cache_service.set_local(cache_key, result, ttl=60)
+            logger.debug(f"Cached new IP result in L1: {cache_key}")
             
             logger.debug(f"IP check: New IP {client_ip}")
             return result
@@ -644,7 +566,7 @@ async def check_ip(request: Request, background_tasks: BackgroundTasks):
             "ip_address": client_ip
         }
         # Cache timeout results with short TTL (30s) to avoid repeated timeouts
-        _set_to_memory_cache(cache_key, result, ttl=30)
+        cache_service.set_local(cache_key, result, ttl=30)
         return result
     except Exception as e:
         total_elapsed = (time.time() - request_start) * 1000
@@ -655,7 +577,7 @@ async def check_ip(request: Request, background_tasks: BackgroundTasks):
             "has_authenticated": False,
             "ip_address": client_ip
         }
-        _set_to_memory_cache(cache_key, result, ttl=30)
+        cache_service.set_local(cache_key, result, ttl=30)
         return result
 
 
@@ -0,0 +1,104 @@
+from neo4j import AsyncGraphDatabase
+import os
+import logging
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+
+from .client import POOL_SETTINGS, resolve_uri
+
+load_dotenv()
+
+logger = logging.getLogger("health_assistant")
+
+
+class AsyncNeo4jClient:
+    """
+    Async counterpart of Neo4jClient for request handlers.
+
+    Uses a pooled AsyncGraphDatabase driver and runs every query inside a
+    managed read transaction, so transient errors (leader switches, dropped
+    pooled connections) are retried by the driver without blocking the event loop.
+    """
+
+    def __init__(self):
+        self.uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
+        self.user = os.getenv("NEO4J_USER", "neo4j")
+        self.password = os.getenv("NEO4J_PASSWORD", "testpass")
+        self.database = os.getenv("NEO4J_DATABASE")
+        self.trust_all = os.getenv("NEO4J_TRUST_ALL_CERTS", "false").lower() in {"1", "true", "yes"}
+        self.driver = None
+        self._is_connected = False
+
+    def _session_args(self) -> Dict[str, Any]:
+        return {"database": self.database} if self.database else {}
+
+    async def connect(self) -> bool:
+        """Create the async connection pool and verify it with a health check"""
+        if self.driver and self._is_connected:
+            return True
+        try:
+            self.driver = AsyncGraphDatabase.driver(
+                resolve_uri(self.uri, self.trust_all),
+                auth=(self.user, self.password),
+                **POOL_SETTINGS,
+            )
+            await self.driver.verify_connectivity()
+            self._is_connected = True
+            logger.info("Neo4j async connection pool initialized successfully")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Failed to connect async Neo4j driver: {e}")
+            self._is_connected = False
+            await self.close()
+            return False
+
+    def is_connected(self) -> bool:
+        """Check if the async driver is connected"""
+        return self._is_connected and self.driver is not None
+
+    async def close(self):
+        """Close the async connection pool"""
+        if self.driver:
+            try:
+                await self.driver.close()
+                logger.info("Neo4j async connection pool closed")
+            except Exception as e:
+                logger.warning(f"Error closing async Neo4j connection: {e}")
+            finally:
+                self.driver = None
+                self._is_connected = False
+
+    async def run_read(self, query: str, params: Optional[dict] = None) -> List[Dict[str, Any]]:
+        """
+        Execute a read query in a managed read transaction
+
+        Args:
+            query: Cypher query string
+            params: Query parameters
+
+        Returns:
+            List of records
+        """
+        if not self.is_connected():
+            if not await self.connect():
+                raise Exception("Not connected to Neo4j and connection attempt failed.")
+
+        async def work(tx):
+            result = await tx.run(query, params or {})
+            return await result.data()
+
+        try:
+            async with self.driver.session(**self._session_args()) as session:
+                return await session.execute_read(work)
+        except Exception as e:
+            # The driver already retried transient errors; rebuild the pool once
+            logger.warning(f"Neo4j async query failed, attempting reconnect: {e}")
+            await self.close()
+            if await self.connect():
+                async with self.driver.session(**self._session_args()) as session:
+                    return await session.execute_read(work)
+            raise
+
+
+# Global async client instance
+async_neo4j_client = AsyncNeo4jClient()
@@ -7,6 +7,24 @@ load_dotenv()
 
 logger = logging.getLogger("health_assistant")
 
+# Connection pool settings shared by the sync and async drivers
+POOL_SETTINGS = {
+    "max_connection_lifetime": 3600,  # 1 hour
+    "max_connection_pool_size": 50,   # Pool size
+    "connection_acquisition_timeout": 30,  # 30 seconds timeout
+}
+
+
+def resolve_uri(uri: str, trust_all: bool) -> str:
+    """Switch secure schemes to their self-signed variants when all certificates are trusted"""
+    if not trust_all:
+        return uri
+    return (
+        uri.replace("neo4j+s://", "neo4j+ssc://", 1)
+        .replace("bolt+s://", "bolt+ssc://", 1)
+    )
+
+
 class Neo4jClient:
     def __init__(self):
         self.uri = os.getenv("NEO4J_URI", "bolt://localhost:7687")
@@ -49,12 +67,8 @@ class Neo4jClient:
                 logger.info(f"Attempting to connect to Neo4j at {self.uri[:50]}..." if len(self.uri) > 50 else f"Attempting to connect to Neo4j at {self.uri}")
                 logger.debug(f"Neo4j connection settings: user={self.user}, database={self.database or 'default'}, trust_all={self.trust_all}")
                 
-                uri = self.uri
+                uri = resolve_uri(self.uri, self.trust_all)
                 if self.trust_all:
-                    uri = (
-                        uri.replace("neo4j+s://", "neo4j+ssc://", 1)
-                        .replace("bolt+s://", "bolt+ssc://", 1)
-                    )
                     logger.debug("Neo4j trust_all_certs enabled - using self-signed certificate mode")
 
                 # Create driver with connection pool (persistent connection)
@@ -64,9 +78,7 @@ class Neo4jClient:
                     uri,
                     auth=(self.user, self.password),
                     # Connection pool settings for better performance
-                    max_connection_lifetime=3600,  # 1 hour
-                    max_connection_pool_size=50,   # Pool size
-                    connection_acquisition_timeout=30,  # 30 seconds timeout
+                    **POOL_SETTINGS,
                 )
                 
                 # Test connection
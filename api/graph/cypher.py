@@ -1,5 +1,162 @@
 from .client import neo4j_client, run_cypher
-from typing import List, Dict
+from .async_client import async_neo4j_client
+from typing import Any, Dict, List, Optional, Tuple
+
+# Each graph fact is a MATCH body that ends in a WITH projecting its columns.
+# A body is either returned as rows (single query) or collected into one list
+# inside a CALL subquery, so all facts for a request share one round-trip.
+RED_FLAGS_MATCH = """
+    MATCH (s:Symptom)-[:IS_RED_FLAG_FOR]->(c:Condition)
+    WHERE toLower(s.name) IN $symptoms
+    WITH s.name AS symptom, collect(DISTINCT c.name) AS conditions
+"""
+
+CONTRAINDICATIONS_MATCH = """
+    MATCH (a:Action)-[:AVOID_IN]->(c:Condition)
+    WHERE c.name IN $userConditions
+    WITH a.name AS avoid, collect(DISTINCT c.name) AS because
+"""
+
+SAFE_ACTIONS_MATCH = """
+    MATCH (a:Action)
+    WHERE NOT (a)-[:AVOID_IN]->(:Condition {name:"Diabetes"})
+      AND NOT (a)-[:AVOID_IN]->(:Condition {name:"Hypertension"})
+    WITH DISTINCT a.name AS safeAction
+"""
+
+PROVIDERS_MATCH = """
+    MATCH (p:Provider)-[:LOCATED_IN]->(l:Location {city: $city})
+    OPTIONAL MATCH (p)-[:HAS_MODE]->(s:Service)
+    OPTIONAL MATCH (p)-[:HAS_PHONE]->(c:Contact)
+    WITH p.name AS provider, s.name AS mode, coalesce(c.phone, c.name) AS phone
+"""
+
+# Red-flag, associated and mixed links in a single pattern (replaces one query per combination)
+RELATED_SYMPTOMS_MATCH = """
+    MATCH (s1:Symptom)-[:IS_RED_FLAG_FOR|IS_ASSOCIATED_WITH]->(c:Condition)
+          <-[:IS_RED_FLAG_FOR|IS_ASSOCIATED_WITH]-(s2:Symptom)
+    WHERE toLower(s1.name) IN $relatedSymptoms
+      AND toLower(s2.name) <> toLower(s1.name)
+    WITH s1.name AS original_symptom, s2.name AS related_symptom, collect(DISTINCT c.name) AS shared_conditions
+"""
+
+GRAPH_FACTS = {
+    "red_flags": (RED_FLAGS_MATCH, ("symptom", "conditions")),
+    "contraindications": (CONTRAINDICATIONS_MATCH, ("avoid", "because")),
+    "safe_actions": (SAFE_ACTIONS_MATCH, ("safeAction",)),
+    "providers": (PROVIDERS_MATCH, ("provider", "mode", "phone")),
+    "related_symptoms": (RELATED_SYMPTOMS_MATCH, ("original_symptom", "related_symptom", "shared_conditions")),
+}
+
+RELATED_SYMPTOMS_LIMIT = 20
+
+
+def _rows_query(name: str) -> str:
+    """Single-fact query returning one row per result"""
+    body, columns = GRAPH_FACTS[name]
+    return f"{body}    RETURN {', '.join(columns)}\n"
+
+
+def build_graph_facts_query(
+    symptoms: Optional[List[str]] = None,
+    user_conditions: Optional[List[str]] = None,
+    city: Optional[str] = None,
+    related_symptoms: Optional[List[str]] = None,
+) -> Tuple[Optional[str], Dict[str, Any]]:
+    """
+    Combine every requested graph fact into one query returning a single row
+
+    Facts whose inputs are empty are left out. Each fact runs in its own CALL
+    subquery that always yields exactly one row (an aggregate over zero rows
+    is an empty list), so one missing fact never empties the others.
+
+    Returns:
+        (query, params), or (None, {}) when nothing needs to be fetched
+    """
+    params: Dict[str, Any] = {}
+    names: List[str] = []
+    if symptoms:
+        params["symptoms"] = [s.lower() for s in symptoms]
+        names.append("red_flags")
+    if user_conditions:
+        params["userConditions"] = list(user_conditions)
+        names.extend(["contraindications", "safe_actions"])
+    if city:
+        params["city"] = city
+        names.append("providers")
+    if related_symptoms:
+        params["relatedSymptoms"] = [s.lower() for s in related_symptoms]
+        names.append("related_symptoms")
+    if not names:
+        return None, {}
+
+    parts = []
+    for name in names:
+        body, columns = GRAPH_FACTS[name]
+        row = ", ".join(f"{column}: {column}" for column in columns)
+        parts.append(f"CALL {{{body}    RETURN collect({{{row}}}) AS {name}\n}}")
+    return "\n".join(parts) + f"\nRETURN {', '.join(names)}", params
+
+
+def merge_related_symptoms(rows: List[Dict]) -> List[Dict]:
+    """
+    Merge relationship rows by case-insensitive symptom pair and keep the
+    pairs sharing the most conditions
+    """
+    merged = {}
+    for result in rows:
+        original = result.get("original_symptom", "")
+        related = result.get("related_symptom", "")
+        conditions = result.get("shared_conditions", [])
+        key = (original.lower(), related.lower())
+
+        if key not in merged:
+            merged[key] = {
+                "original_symptom": original,
+                "related_symptom": related,
+                "shared_conditions": set(conditions)
+            }
+        else:
+            merged[key]["shared_conditions"].update(conditions)
+
+    # Convert sets back to lists and sort by number of shared conditions
+    final_results = []
+    for key, value in merged.items():
+        final_results.append({
+            "original_symptom": value["original_symptom"],
+            "related_symptom": value["related_symptom"],
+            "shared_conditions": sorted(list(value["shared_conditions"]))
+        })
+
+    # Sort by number of shared conditions (descending)
+    final_results.sort(key=lambda x: len(x.get("shared_conditions", [])), reverse=True)
+
+    return final_results[:RELATED_SYMPTOMS_LIMIT]
+
+
+async def fetch_graph_facts(
+    symptoms: Optional[List[str]] = None,
+    user_conditions: Optional[List[str]] = None,
+    city: Optional[str] = None,
+    related_symptoms: Optional[List[str]] = None,
+) -> Dict[str, List[Dict]]:
+    """
+    Fetch all graph facts for a request in a single round-trip on the async driver
+
+    Unlike the sync helpers, errors are raised so the caller can fall back.
+
+    Returns:
+        Dict keyed by fact name ("red_flags", "contraindications", "safe_actions",
+        "providers", "related_symptoms") containing only the requested facts
+    """
+    query, params = build_graph_facts_query(symptoms, user_conditions, city, related_symptoms)
+    if query is None:
+        return {}
+    rows = await async_neo4j_client.run_read(query, params)
+    facts = dict(rows[0]) if rows else {}
+    if "related_symptoms" in facts:
+        facts["related_symptoms"] = merge_related_symptoms(facts["related_symptoms"])
+    return facts
 
 
 def get_red_flags(symptoms: List[str]) -> List[Dict]:
@@ -12,12 +169,6 @@ def get_red_flags(symptoms: List[str]) -> List[Dict]:
     Returns:
         List of dicts with symptom and associated conditions
     """
-    query = """
-    MATCH (s:Symptom)-[:IS_RED_FLAG_FOR]->(c:Condition)
-    WHERE toLower(s.name) IN $symptoms
-    RETURN s.name AS symptom, collect(DISTINCT c.name) AS conditions
-    """
-    
     # Lowercase all symptoms for case-insensitive matching
     symptoms_lower = [s.lower() for s in symptoms]
     
@@ -25,7 +176,7 @@ def get_red_flags(symptoms: List[str]) -> List[Dict]:
         # Ensure connection is available (will use persistent connection pool)
         if not neo4j_client.is_connected():
             neo4j_client.connect()
-        results = run_cypher(query, {"symptoms": symptoms_lower})
+        results = run_cypher(_rows_query("red_flags"), {"symptoms": symptoms_lower})
         return results
     except Exception as e:
         print(f"Error in get_red_flags: {e}")
@@ -42,14 +193,8 @@ def get_contraindications(user_conditions: List[str]) -> List[Dict]:
     Returns:
         List of dicts with actions to avoid and reasons
     """
-    query = """
-    MATCH (a:Action)-[:AVOID_IN]->(c:Condition)
-    WHERE c.name IN $userConditions
-    RETURN DISTINCT a.name AS avoid, collect(DISTINCT c.name) AS because
-    """
-    
     try:
-        results = run_cypher(query, {"userConditions": user_conditions})
+        results = run_cypher(_rows_query("contraindications"), {"userConditions": user_conditions})
         return results
     except Exception as e:
         print(f"Error in get_contraindications: {e}")
@@ -60,15 +205,8 @@ def get_safe_actions_for_metabolic_conditions() -> List[Dict]:
     """
     Query 3: Get actions considered safe for diabetes and hypertension profiles
     """
-    query = """
-    MATCH (a:Action)
-    WHERE NOT (a)-[:AVOID_IN]->(:Condition {name:"Diabetes"})
-      AND NOT (a)-[:AVOID_IN]->(:Condition {name:"Hypertension"})
-    RETURN DISTINCT a.name AS safeAction
-    """
-    
     try:
-        results = run_cypher(query)
+        results = run_cypher(_rows_query("safe_actions"))
         return results
     except Exception as e:
         print(f"Error in get_safe_actions_for_metabolic_conditions: {e}")
@@ -85,17 +223,8 @@ def get_providers_in_city(city: str) -> List[Dict]:
     Returns:
         List of dicts with provider info
     """
-    query = """
-    MATCH (p:Provider)-[:LOCATED_IN]->(l:Location {city: $city})
-    OPTIONAL MATCH (p)-[:HAS_MODE]->(s:Service)
-    OPTIONAL MATCH (p)-[:HAS_PHONE]->(c:Contact)
-    RETURN p.name AS provider, 
-           s.name AS mode, 
-           c.phone AS phone
-    """
-    
     try:
-        results = run_cypher(query, {"city": city})
+        results = run_cypher(_rows_query("providers"), {"city": city})
         return results
     except Exception as e:
         print(f"Error in get_providers_in_city: {e}")
@@ -107,7 +236,8 @@ def get_related_symptoms(symptoms: List[str]) -> List[Dict]:
     Query: Find symptoms that are related to the given symptoms through shared conditions
     This helps identify symptom clusters (e.g., chest pain and left arm pain both related to heart attack)
     
-    Checks both IS_RED_FLAG_FOR and IS_ASSOCIATED_WITH relationships to find all possible connections.
+    Checks both IS_RED_FLAG_FOR and IS_ASSOCIATED_WITH relationships (in any combination)
+    with a single query.
     
     Args:
         symptoms: List of symptom names (will be lowercased)
@@ -116,96 +246,16 @@ def get_related_symptoms(symptoms: List[str]) -> List[Dict]:
         List of dicts with related symptoms and shared conditions
         Format: [{"related_symptom": "left arm pain", "shared_conditions": ["Heart attack", "Angina"], "original_symptom": "chest pain"}]
     """
-    # Query for IS_RED_FLAG_FOR relationships
-    query_red_flag = """
-    MATCH (s1:Symptom)-[:IS_RED_FLAG_FOR]->(c:Condition)<-[:IS_RED_FLAG_FOR]-(s2:Symptom)
-    WHERE toLower(s1.name) IN $symptoms 
-      AND toLower(s2.name) <> toLower(s1.name)
-    RETURN s1.name AS original_symptom, 
-           s2.name AS related_symptom, 
-           collect(DISTINCT c.name) AS shared_conditions,
-           'IS_RED_FLAG_FOR' AS relationship_type
-    """
-    
-    # Query for IS_ASSOCIATED_WITH relationships
-    query_associated = """
-    MATCH (s1:Symptom)-[:IS_ASSOCIATED_WITH]->(c:Condition)<-[:IS_ASSOCIATED_WITH]-(s2:Symptom)
-    WHERE toLower(s1.name) IN $symptoms 
-      AND toLower(s2.name) <> toLower(s1.name)
-    RETURN s1.name AS original_symptom, 
-           s2.name AS related_symptom, 
-           collect(DISTINCT c.name) AS shared_conditions,
-           'IS_ASSOCIATED_WITH' AS relationship_type
-    """
-    
-    # Query for mixed relationships (one symptom uses IS_RED_FLAG_FOR, other uses IS_ASSOCIATED_WITH)
-    query_mixed = """
-    MATCH (s1:Symptom)-[:IS_RED_FLAG_FOR]->(c:Condition)<-[:IS_ASSOCIATED_WITH]-(s2:Symptom)
-    WHERE toLower(s1.name) IN $symptoms 
-      AND toLower(s2.name) <> toLower(s1.name)
-    RETURN s1.name AS original_symptom, 
-           s2.name AS related_symptom, 
-           collect(DISTINCT c.name) AS shared_conditions,
-           'MIXED' AS relationship_type
-    UNION
-    MATCH (s1:Symptom)-[:IS_ASSOCIATED_WITH]->(c:Condition)<-[:IS_RED_FLAG_FOR]-(s2:Symptom)
-    WHERE toLower(s1.name) IN $symptoms 
-      AND toLower(s2.name) <> toLower(s1.name)
-    RETURN s1.name AS original_symptom, 
-           s2.name AS related_symptom, 
-           collect(DISTINCT c.name) AS shared_conditions,
-           'MIXED' AS relationship_type
-    """
-    
     # Lowercase all symptoms for case-insensitive matching
     symptoms_lower = [s.lower() for s in symptoms]
     
-    all_results = []
-    
     try:
         # Ensure connection is available (will use persistent connection pool)
         if not neo4j_client.is_connected():
             neo4j_client.connect()
         
-        # Execute all three queries and combine results
-        results_red_flag = run_cypher(query_red_flag, {"symptoms": symptoms_lower})
-        results_associated = run_cypher(query_associated, {"symptoms": symptoms_lower})
-        results_mixed = run_cypher(query_mixed, {"symptoms": symptoms_lower})
-        
-        all_results.extend(results_red_flag or [])
-        all_results.extend(results_associated or [])
-        all_results.extend(results_mixed or [])
-        
-        # Merge results by symptom pairs and combine shared conditions
-        merged = {}
-        for result in all_results:
-            original = result.get("original_symptom", "")
-            related = result.get("related_symptom", "")
-            conditions = result.get("shared_conditions", [])
-            key = (original.lower(), related.lower())
-            
-            if key not in merged:
-                merged[key] = {
-                    "original_symptom": original,
-                    "related_symptom": related,
-                    "shared_conditions": set(conditions)
-                }
-            else:
-                merged[key]["shared_conditions"].update(conditions)
-        
-        # Convert sets back to lists and sort by number of shared conditions
-        final_results = []
-        for key, value in merged.items():
-            final_results.append({
-                "original_symptom": value["original_symptom"],
-                "related_symptom": value["related_symptom"],
-                "shared_conditions": sorted(list(value["shared_conditions"]))
-            })
-        
-        # Sort by number of shared conditions (descending)
-        final_results.sort(key=lambda x: len(x.get("shared_conditions", [])), reverse=True)
-        
-        return final_results[:20]  # Limit to top 20
+        results = run_cypher(_rows_query("related_symptoms"), {"relatedSymptoms": symptoms_lower})
+        return merge_related_symptoms(results or [])
         
     except Exception as e:
         print(f"Error in get_related_symptoms: {e}")
@@ -88,8 +88,15 @@ def ingest_triples():
     symptom_csv = script_dir / "symptom_relationships.csv"
     count2 = ingest_triples_from_csv(symptom_csv, "symptom_relationships.csv")
     
-    total = count1 + count2
-    print(f"\n[COMPLETE] Total triples ingested: {total} (seed.csv: {count1}, symptom_relationships.csv: {count2})")
+    # Ingest from providers.csv (provider service mode and phone numbers)
+    providers_csv = script_dir / "providers.csv"
+    count3 = ingest_triples_from_csv(providers_csv, "providers.csv")
+    
+    total = count1 + count2 + count3
+    print(
+        f"\n[COMPLETE] Total triples ingested: {total} "
+        f"(seed.csv: {count1}, symptom_relationships.csv: {count2}, providers.csv: {count3})"
+    )
 
 
 def verify_ingestion():
@@ -0,0 +1,284 @@
+"""
+In-process snapshot of the knowledge graph.
+
+The graph is small and static (the triples in seed.csv,
+symptom_relationships.csv and providers.csv), so instead of a Cypher round-trip per chat the
+triples are compiled once into indexed adjacency maps:
+
+    symptom -> red-flag conditions
+    symptom -> related conditions (IS_RED_FLAG_FOR | IS_ASSOCIATED_WITH)
+    condition -> symptoms, condition -> avoided actions
+    symptom -> co-occurring symptoms with their shared conditions
+    city -> providers, with their service mode and phone number
+
+Every query in cypher.py is answered from these maps with the same result
+shape. Snapshots are immutable and carry a content version; reloading builds
+a new snapshot and swaps it in atomically.
+"""
+
+import csv
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .cypher import merge_related_symptoms
+
+logger = logging.getLogger("health_assistant")
+
+GRAPH_DIR = Path(__file__).parent
+DEFAULT_SNAPSHOT_FILES = (
+    GRAPH_DIR / "seed.csv",
+    GRAPH_DIR / "symptom_relationships.csv",
+    GRAPH_DIR / "providers.csv",
+)
+# "csv" compiles the seed files; "neo4j" exports the triples from the live database once
+GRAPH_SNAPSHOT_SOURCE = os.getenv("GRAPH_SNAPSHOT_SOURCE", "csv").lower()
+GRAPH_SNAPSHOT_FILES = [
+    Path(path) for path in os.getenv("GRAPH_SNAPSHOT_FILES", "").split(",") if path.strip()
+] or list(DEFAULT_SNAPSHOT_FILES)
+
+# Spellings returned by router.extract_city -> Location names used in the graph
+CITY_ALIASES = {
+    "delhi": "new delhi",
+    "bangalore": "bengaluru",
+    "gurgaon": "gurugram",
+}
+
+RELATED_PREDICATES = {"IS_RED_FLAG_FOR", "IS_ASSOCIATED_WITH"}
+SAFE_PREDICATES = {"SAFE_FOR", "RECOMMENDED_FOR"}
+METABOLIC_CONDITIONS = ("Diabetes", "Hypertension")
+
+NEO4J_EXPORT_QUERY = """
+MATCH (s)-[r]->(o)
+RETURN coalesce(s.name, s.city) AS subject, type(r) AS predicate, coalesce(o.name, o.city, o.phone) AS object,
+       labels(s)[0] AS type_s, labels(o)[0] AS type_o
+"""
+
+Triple = Tuple[str, str, str, str, str]
+
+
+def _add(index: Dict[str, "OrderedDict[str, None]"], key: str, value: str) -> None:
+    index.setdefault(key, OrderedDict())[value] = None
+
+
+class GraphSnapshot:
+    """Immutable, indexed view of the graph triples"""
+
+    def __init__(self, triples: Iterable[Triple], source: str = "csv") -> None:
+        # Nodes are identified by label + name, exactly as ingest.py MERGEs them
+        self.triples: List[Triple] = list(dict.fromkeys(triples))
+        self.source = source
+        self.loaded_at = time.time()
+        digest = hashlib.sha256()
+        for triple in sorted(self.triples):
+            digest.update("\x1f".join(triple).encode("utf-8"))
+            digest.update(b"\n")
+        self.version = digest.hexdigest()[:12]
+
+        self._symptom_names: Dict[str, str] = {}
+        self._red_flags: Dict[str, "OrderedDict[str, None]"] = {}
+        self._symptom_conditions: Dict[str, "OrderedDict[str, None]"] = {}
+        self._condition_symptoms: Dict[str, "OrderedDict[str, None]"] = {}
+        self._avoid_in: Dict[str, "OrderedDict[str, None]"] = {}
+        self._safe_for: Dict[str, "OrderedDict[str, None]"] = {}
+        self._actions: "OrderedDict[str, None]" = OrderedDict()
+        self._providers: Dict[str, "OrderedDict[str, None]"] = {}
+        # provider -> {"mode": ..., "phone": ...} (HAS_MODE / HAS_PHONE)
+        self._provider_details: Dict[str, Dict[str, str]] = {}
+        self._build_indexes()
+        self._co_occurrence = self._build_co_occurrence()
+
+    def _build_indexes(self) -> None:
+        for subject, predicate, obj, type_s, type_o in self.triples:
+            for name, label in ((subject, type_s), (obj, type_o)):
+                if label == "Action":
+                    self._actions[name] = None
+            if type_s == "Symptom" and type_o == "Condition":
+                key = subject.lower()
+                self._symptom_names.setdefault(key, subject)
+                if predicate == "IS_RED_FLAG_FOR":
+                    _add(self._red_flags, key, obj)
+                if predicate in RELATED_PREDICATES:
+                    _add(self._symptom_conditions, key, obj)
+                    _add(self._condition_symptoms, obj, subject)
+            elif predicate == "AVOID_IN" and type_s == "Action" and type_o == "Condition":
+                _add(self._avoid_in, obj, subject)
+            elif predicate in SAFE_PREDICATES:
+                # The seed data links these in both directions
+                if type_s == "Action" and type_o == "Condition":
+                    _add(self._safe_for, obj, subject)
+                elif type_s == "Condition" and type_o == "Action":
+                    _add(self._safe_for, subject, obj)
+            elif predicate == "LOCATED_IN" and type_s == "Provider":
+                _add(self._providers, obj.lower(), subject)
+            elif predicate == "HAS_MODE" and type_s == "Provider":
+                self._provider_details.setdefault(subject, {}).setdefault("mode", obj)
+            elif predicate == "HAS_PHONE" and type_s == "Provider":
+                self._provider_details.setdefault(subject, {}).setdefault("phone", obj)
+
+    def _build_co_occurrence(self) -> Dict[str, Dict[str, Tuple[str, str, "OrderedDict[str, None]"]]]:
+        """symptom -> related symptom -> (symptom name, related name, shared conditions)"""
+        co_occurrence: Dict[str, Dict[str, Tuple[str, str, "OrderedDict[str, None]"]]] = {}
+        for key, conditions in self._symptom_conditions.items():
+            original = self._symptom_names[key]
+            related_map = co_occurrence.setdefault(key, {})
+            for condition in conditions:
+                for related in self._condition_symptoms.get(condition, ()):
+                    related_key = related.lower()
+                    if related_key == key:
+                        continue
+                    entry = related_map.setdefault(related_key, (original, related, OrderedDict()))
+                    entry[2][condition] = None
+        return co_occurrence
+
+    def get_red_flags(self, symptoms: Sequence[str]) -> List[Dict[str, Any]]:
+        results = []
+        for key in dict.fromkeys(s.lower() for s in symptoms):
+            conditions = self._red_flags.get(key)
+            if conditions:
+                results.append({"symptom": self._symptom_names[key], "conditions": list(conditions)})
+        return results
+
+    def count_red_flags(self, symptoms: Sequence[str]) -> int:
+        return len(self.get_red_flags(symptoms))
+
+    def get_contraindications(self, user_conditions: Sequence[str]) -> List[Dict[str, Any]]:
+        avoid: "OrderedDict[str, OrderedDict[str, None]]" = OrderedDict()
+        for condition in dict.fromkeys(user_conditions):
+            for action in self._avoid_in.get(condition, ()):
+                avoid.setdefault(action, OrderedDict())[condition] = None
+        return [{"avoid": action, "because": list(because)} for action, because in avoid.items()]
+
+    def get_safe_actions_for_metabolic_conditions(self) -> List[Dict[str, Any]]:
+        """Every action not avoided in diabetes or hypertension (matches the Cypher query)"""
+        avoided = {action for condition in METABOLIC_CONDITIONS for action in self._avoid_in.get(condition, ())}
+        return [{"safeAction": action} for action in self._actions if action not in avoided]
+
+    def get_safe_actions(self, user_conditions: Sequence[str]) -> List[Dict[str, Any]]:
+        """Actions marked safe or recommended for all of the user's conditions and avoided in none"""
+        action_sets = [set(self._safe_for[c]) for c in user_conditions if c in self._safe_for]
+        if not action_sets:
+            return []
+        safe = set.intersection(*action_sets)
+        safe -= {action for condition in user_conditions for action in self._avoid_in.get(condition, ())}
+        return [{"safeAction": action} for action in sorted(safe)]
+
+    def get_providers_in_city(self, city: Optional[str]) -> List[Dict[str, Any]]:
+        if not city:
+            return []
+        key = city.strip().lower()
+        providers = self._providers.get(key) or self._providers.get(CITY_ALIASES.get(key, ""), ())
+        rows = []
+        for provider in providers:
+            details = self._provider_details.get(provider, {})
+            rows.append({"provider": provider, "mode": details.get("mode"), "phone": details.get("phone")})
+        return rows
+
+    def get_related_symptoms(self, symptoms: Sequence[str]) -> List[Dict[str, Any]]:
+        rows = []
+        for key in dict.fromkeys(s.lower() for s in symptoms):
+            for original, related, conditions in self._co_occurrence.get(key, {}).values():
+                rows.append({
+                    "original_symptom": original,
+                    "related_symptom": related,
+                    "shared_conditions": list(conditions),
+                })
+        return merge_related_symptoms(rows)
+
+    def facts(
+        self,
+        symptoms: Optional[Sequence[str]] = None,
+        user_conditions: Optional[Sequence[str]] = None,
+        city: Optional[str] = None,
+        related_symptoms: Optional[Sequence[str]] = None,
+    ) -> Dict[str, Any]:
+        """All graph facts for a request, in the shape returned by main.graph_get_facts"""
+        user_conditions = list(user_conditions or [])
+        return {
+            "red_flags": self.get_red_flags(symptoms) if symptoms else [],
+            "contraindications": self.get_contraindications(user_conditions),
+            "safe_actions": {condition: self.get_safe_actions([condition]) for condition in user_conditions},
+            "providers": self.get_providers_in_city(city),
+            "related_symptoms": self.get_related_symptoms(related_symptoms) if related_symptoms else [],
+        }
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "source": self.source,
+            "triples": len(self.triples),
+            "symptoms": len(self._symptom_names),
+            "loaded_at": self.loaded_at,
+        }
+
+
+def read_csv_triples(paths: Sequence[Path]) -> List[Triple]:
+    """Read (subject, predicate, object, type_s, type_o) triples from ingest-format CSV files"""
+    triples: List[Triple] = []
+    for path in paths:
+        if not path.exists():
+            logger.warning(f"Graph snapshot file not found: {path}")
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                triples.append((row["subject"], row["predicate"], row["object"], row["type_s"], row["type_o"]))
+    return triples
+
+
+def read_neo4j_triples() -> List[Triple]:
+    """Export every relationship from Neo4j as a triple (one query)"""
+    from .client import run_cypher
+
+    return [
+        (r["subject"], r["predicate"], r["object"], r["type_s"], r["type_o"])
+        for r in run_cypher(NEO4J_EXPORT_QUERY)
+        if r.get("subject") and r.get("object")
+    ]
+
+
+def load_snapshot(source: Optional[str] = None, paths: Optional[Sequence[Path]] = None) -> GraphSnapshot:
+    """Compile a new snapshot from the CSV files or a Neo4j export"""
+    source = (source or GRAPH_SNAPSHOT_SOURCE).lower()
+    if source == "neo4j":
+        return GraphSnapshot(read_neo4j_triples(), source="neo4j")
+    return GraphSnapshot(read_csv_triples(paths or GRAPH_SNAPSHOT_FILES), source="csv")
+
+
+_snapshot: Optional[GraphSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_snapshot() -> GraphSnapshot:
+    """Current snapshot, compiled on first use"""
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is None:
+        with _snapshot_lock:
+            if _snapshot is None:
+                _snapshot = load_snapshot()
+                logger.info(f"Graph snapshot loaded: {_snapshot.info()}")
+            snapshot = _snapshot
+    return snapshot
+
+
+def reload_snapshot(source: Optional[str] = None) -> Tuple[GraphSnapshot, Optional[str]]:
+    """
+    Build a new snapshot and swap it in; requests in flight keep the old one
+
+    Returns:
+        (new snapshot, previous version or None)
+    """
+    global _snapshot
+    snapshot = load_snapshot(source)
+    if not snapshot.triples:
+        raise ValueError("Graph snapshot source returned no triples")
+    with _snapshot_lock:
+        previous = _snapshot.version if _snapshot is not None else None
+        _snapshot = snapshot
+    logger.info(f"Graph snapshot reloaded: {previous} -> {snapshot.version}")
+    return snapshot, previous
@@ -0,0 +1,216 @@
+"""
+Offline language identification for the supported languages (en, hi, ta, te, kn, ml).
+
+Native-script input is settled instantly from Unicode script blocks. Romanized
+input (Hinglish, Tanglish, ...) and English are classified with a compact
+character n-gram naive Bayes model trained in-process from train.tsv, so no
+network call is needed for the common case. The remote LLM detector is only
+consulted when the returned confidence is low.
+"""
+
+import logging
+import math
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger("health_assistant")
+
+DATA_DIR = Path(__file__).resolve().parent
+TRAIN_PATH = DATA_DIR / "train.tsv"
+EVAL_PATH = DATA_DIR / "eval.tsv"
+
+SUPPORTED_LANGUAGES = ("en", "hi", "ta", "te", "kn", "ml")
+DEFAULT_LANGUAGE = "en"
+
+# Unicode blocks for the native scripts of the supported Indic languages
+SCRIPT_RANGES: Dict[str, Tuple[int, int]] = {
+    "hi": (0x0900, 0x097F),  # Devanagari
+    "ta": (0x0B80, 0x0BFF),  # Tamil
+    "te": (0x0C00, 0x0C7F),  # Telugu
+    "kn": (0x0C80, 0x0CFF),  # Kannada
+    "ml": (0x0D00, 0x0D7F),  # Malayalam
+}
+
+NGRAM_ORDERS = (1, 2, 3, 4)
+# Scales the per-feature log-likelihood margin into a posterior; tuned on eval.tsv
+CONFIDENCE_SCALE = 6.0
+# Share of known Indic words that turns an "English" prediction into code-mixed Indic
+CODE_MIX_SHARE = 0.25
+# Romanized inputs shorter than this many words ("hi", "pet dard") are ambiguous
+# across languages: their confidence is capped so the remote detector decides
+SHORT_TEXT_TOKENS = 3
+SHORT_TEXT_MAX_CONFIDENCE = 0.6
+
+_TOKEN_RE = re.compile(r"[a-z']+")
+
+
+def load_samples(path: Path) -> List[Tuple[str, str]]:
+    """Load (label, text) pairs from a tab-separated file, skipping comments"""
+    samples: List[Tuple[str, str]] = []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            label, _, text = line.partition("\t")
+            if label in SUPPORTED_LANGUAGES and text:
+                samples.append((label, text))
+    return samples
+
+
+def detect_script(text: str) -> Optional[Tuple[str, float]]:
+    """
+    Identify the language from native-script characters.
+
+    Returns:
+        (language, share of letters in that script) or None if no Indic script is present
+    """
+    counts: Dict[str, int] = defaultdict(int)
+    letters = 0
+    for ch in text:
+        if not ch.isalpha():
+            # Indic vowel signs are combining marks, not alpha - still count them
+            code_point = ord(ch)
+            if code_point < 0x0900 or code_point > 0x0D7F:
+                continue
+        letters += 1
+        code_point = ord(ch)
+        for lang, (start, end) in SCRIPT_RANGES.items():
+            if start <= code_point <= end:
+                counts[lang] += 1
+                break
+    if not counts:
+        return None
+    lang, count = max(counts.items(), key=lambda item: item[1])
+    return lang, count / max(letters, 1)
+
+
+def extract_features(text: str) -> List[str]:
+    """Character n-grams (word-boundary padded) plus whole-word features"""
+    features: List[str] = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        features.append(f"w:{token}")
+        padded = f" {token} "
+        for order in NGRAM_ORDERS:
+            if order == 1:
+                features.extend(token)
+                continue
+            for i in range(len(padded) - order + 1):
+                features.append(padded[i:i + order])
+    return features
+
+
+class LanguageIdentifier:
+    """Multinomial naive Bayes over character n-grams with Unicode script short-circuit"""
+
+    def __init__(self, samples: Iterable[Tuple[str, str]], alpha: float = 0.1) -> None:
+        self.alpha = alpha
+        counts: Dict[str, Counter] = {lang: Counter() for lang in SUPPORTED_LANGUAGES}
+        docs: Counter = Counter()
+        for label, text in samples:
+            counts[label].update(extract_features(text))
+            docs[label] += 1
+
+        vocabulary = set()
+        for counter in counts.values():
+            vocabulary.update(counter)
+        vocab_size = max(len(vocabulary), 1)
+        total_docs = max(sum(docs.values()), 1)
+
+        # Store log-probabilities only (compact, and scoring is a dict lookup per feature)
+        self._log_prob: Dict[str, Dict[str, float]] = {}
+        self._log_unseen: Dict[str, float] = {}
+        self._log_prior: Dict[str, float] = {}
+        for lang in SUPPORTED_LANGUAGES:
+            total = sum(counts[lang].values())
+            denominator = total + alpha * vocab_size
+            self._log_prob[lang] = {
+                feature: math.log((count + alpha) / denominator)
+                for feature, count in counts[lang].items()
+            }
+            self._log_unseen[lang] = math.log(alpha / denominator)
+            self._log_prior[lang] = math.log((docs[lang] + 1) / (total_docs + len(SUPPORTED_LANGUAGES)))
+
+    @classmethod
+    def from_file(cls, path: Path = TRAIN_PATH) -> "LanguageIdentifier":
+        return cls(load_samples(path))
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Posterior probability per language for romanized/Latin text"""
+        features = extract_features(text)
+        if not features:
+            return {lang: (1.0 if lang == DEFAULT_LANGUAGE else 0.0) for lang in SUPPORTED_LANGUAGES}
+
+        log_likelihood: Dict[str, float] = {}
+        for lang in SUPPORTED_LANGUAGES:
+            table = self._log_prob[lang]
+            unseen = self._log_unseen[lang]
+            log_likelihood[lang] = self._log_prior[lang] + sum(table.get(f, unseen) for f in features)
+
+        # Naive Bayes posteriors are wildly over-confident on long inputs; normalise by
+        # feature count so confidence reflects the per-feature margin instead
+        n = len(features)
+        best = max(log_likelihood.values())
+        exp_scores = {
+            lang: math.exp(CONFIDENCE_SCALE * (value - best) / n)
+            for lang, value in log_likelihood.items()
+        }
+        total = sum(exp_scores.values())
+        return {lang: value / total for lang, value in exp_scores.items()}
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """
+        Identify the language of text.
+
+        Returns:
+            (language code, confidence between 0 and 1)
+        """
+        if not text or not text.strip():
+            return DEFAULT_LANGUAGE, 0.0
+
+        script = detect_script(text)
+        if script is not None:
+            lang, share = script
+            # Native script is unambiguous; mixed script text is still mostly settled
+            return lang, max(share, 0.9) if share >= 0.5 else share
+
+        posterior = self.scores(text)
+        lang = max(posterior, key=posterior.get)
+        tokens = _TOKEN_RE.findall(text.lower())
+        max_confidence = SHORT_TEXT_MAX_CONFIDENCE if len(tokens) < SHORT_TEXT_TOKENS else 1.0
+        if lang == "en":
+            # Code-mixed text ("mujhe fever hai") is dominated by English medical words;
+            # if a meaningful share of the words are known Indic words, answer in that language
+            english_words = self._log_prob["en"]
+            indic_hits: Counter = Counter()
+            for token in tokens:
+                feature = f"w:{token}"
+                if feature in english_words:
+                    continue
+                for candidate in SUPPORTED_LANGUAGES[1:]:
+                    if feature in self._log_prob[candidate]:
+                        indic_hits[candidate] += 1
+            if indic_hits and sum(indic_hits.values()) >= max(1, CODE_MIX_SHARE * len(tokens)):
+                indic_posterior = {code: posterior[code] for code in SUPPORTED_LANGUAGES[1:]}
+                for code, hits in indic_hits.items():
+                    indic_posterior[code] *= 1 + hits
+                total = sum(indic_posterior.values()) or 1.0
+                lang = max(indic_posterior, key=indic_posterior.get)
+                return lang, min(0.9, max_confidence, indic_posterior[lang] / total)
+        return lang, min(max_confidence, posterior[lang])
+
+
+@lru_cache(maxsize=1)
+def get_identifier() -> LanguageIdentifier:
+    """Build the shared identifier once (training takes a few milliseconds)"""
+    identifier = LanguageIdentifier.from_file()
+    logger.debug("Local language identifier trained")
+    return identifier
+
+
+def identify_language(text: str) -> Tuple[str, float]:
+    """Identify the language of text with the shared identifier"""
+    return get_identifier().predict(text)
@@ -8,6 +8,7 @@ import re
 import tempfile
 import time
 from collections import defaultdict, deque
+from functools import partial
 from io import BytesIO
 from pathlib import Path
 from typing import Any, Deque, Dict, List, Optional, Tuple
@@ -18,8 +19,8 @@ from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, StreamingResponse
-from langdetect import LangDetectException, detect  # type: ignore
-from openai import OpenAI
+from langdetect import DetectorFactory, LangDetectException, detect  # type: ignore
+from openai import AsyncOpenAI, OpenAI
 from starlette.middleware.base import RequestResponseEndpoint
 
 try:
@@ -57,34 +58,72 @@ _load_environment()
 os.environ.setdefault("CHROMADB_DISABLE_TELEMETRY", "1")
 
 from .safety import (
+    MENTAL_HEALTH_FIRST_AID_EN,
     detect_red_flags,
     detect_mental_health_crisis,
     detect_pregnancy_emergency,
     extract_symptoms,
 )
-from .router import is_graph_intent, extract_city
-from .rag.retriever import retrieve, initialize_chroma_client
+from .router import is_graph_intent, extract_city, route_query
+from .phrase_matcher import match_phrases, register_vocabulary, shared_matcher
+from .rag.retriever import (
+    embed_query,
+    get_cached_results,
+    get_index_version,
+    initialize_chroma_client,
+    retrieve,
+    retrieve_many,
+)
+from .rag.citations import merge_citations
+from .rag.result_cache import retrieval_cache
+from .rag.tokenizer import count_tokens
+from .rag.embeddings import query_embedding_cache
 from .models import ChatRequest, ChatResponse, Profile, VoiceChatResponse
 
 from .graph import fallback as graph_fallback
 from .graph.cypher import (
-    get_red_flags as neo4j_get_red_flags,
-    get_contraindications as neo4j_get_contraindications,
     get_providers_in_city as neo4j_get_providers_in_city,
-    get_safe_actions_for_metabolic_conditions as neo4j_get_safe_actions,
-    get_related_symptoms as neo4j_get_related_symptoms,
+    fetch_graph_facts as neo4j_fetch_graph_facts,
 )
 from .graph.client import neo4j_client
+from .graph.async_client import async_neo4j_client
+from .graph.snapshot import get_snapshot, reload_snapshot
 from .database import db_client, db_service
 from .auth.routes import router as auth_router
 from .auth.middleware import require_auth, require_role
 from .pipeline_functions import (
-    detect_and_translate_to_english,
-    generate_final_answer,
+    detect_language_only_async,
+    generate_final_answer_async,
     generate_final_answer_stream,
-    translate_to_user_language,
+    speculative_detect_and_translate,
+    translate_to_english_async,
+    translate_to_user_language_async,
 )
+from .pipeline_scheduler import StageScheduler
+from .prompt_budget import pack_context
+from .pipeline_streaming import stream_with_pipelined_translation
+from .langid.identifier import get_identifier, identify_language
 from .services.cache import cache_service
+from .services.translation_memory import translation_memory
+from .services.answer_cache import answer_cache
+
+answer_cache.embed = embed_query
+
+# Per-stage timeouts (seconds) for the concurrent retrieval/graph/translation stages
+PIPELINE_STAGE_TIMEOUT = float(os.getenv("PIPELINE_STAGE_TIMEOUT", "10"))
+PIPELINE_TRANSLATION_TIMEOUT = float(os.getenv("PIPELINE_TRANSLATION_TIMEOUT", "60"))
+# Language detection: one combined detect+translate call raced against the local detector
+COMBINED_DETECT_TRANSLATE = os.getenv("COMBINED_DETECT_TRANSLATE", "1") == "1"
+LOCAL_LANGID_CONFIDENCE = float(os.getenv("LOCAL_LANGID_CONFIDENCE", "0.85"))
+# Streaming answers for non-English users: "pipelined" translates sentence by sentence
+# while the answer is generated, "batch" translates the whole answer afterwards
+STREAM_TRANSLATION_MODE = os.getenv("STREAM_TRANSLATION_MODE", "pipelined").lower()
+STREAM_TRANSLATION_CONCURRENCY = int(os.getenv("STREAM_TRANSLATION_CONCURRENCY", "4"))
+# Graph facts backend: "snapshot" answers from the in-process compiled graph,
+# "neo4j" queries the database (falling back to the snapshot on errors)
+GRAPH_BACKEND = os.getenv("GRAPH_BACKEND", "snapshot").lower()
+# Translate the static strings into every supported language at startup
+TRANSLATION_PREWARM = os.getenv("TRANSLATION_PREWARM", "1") == "1"
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 logging.basicConfig(
@@ -125,6 +164,8 @@ async def _startup() -> None:
         if neo4j_client.connect():
             logger.info("✅ Neo4j connection pool initialized successfully (persistent connection)")
             logger.info(f"Neo4j database: {neo4j_client.database or 'default'}")
+            if GRAPH_BACKEND == "neo4j" and await ensure_neo4j_async():
+                logger.info("✅ Neo4j async connection pool initialized for request handlers")
         else:
             logger.warning("⚠️ Neo4j connection failed - graph queries will use fallback")
             logger.warning("Check NEO4J_URI, NEO4J_USER, and NEO4J_PASSWORD environment variables")
@@ -133,10 +174,27 @@ async def _startup() -> None:
         logger.warning("⚠️ Neo4j not connected - graph queries will use fallback")
         logger.warning("The application will continue to work with in-memory fallback for symptom relationships")
     
+    try:
+        snapshot = await asyncio.to_thread(get_snapshot)
+        logger.info(f"Graph snapshot ready (backend={GRAPH_BACKEND}): {snapshot.info()}")
+    except Exception as e:
+        logger.error(f"Failed to load graph snapshot: {e}", exc_info=True)
+
     # Initialize cache service (Redis) - non-blocking
     logger.info("Initializing Redis cache (L2)...")
     cache_service.ensure_redis_connection()
-    
+
+    # Train the offline language identifier now rather than on the first chat request
+    try:
+        get_identifier()
+        logger.info("Local language identifier ready")
+    except Exception as e:
+        logger.warning(f"Local language identifier unavailable - falling back to remote detection: {e}")
+
+    # Compile the shared safety/symptom/router phrase automaton
+    matcher = shared_matcher()
+    logger.info(f"Phrase matcher ready ({matcher.phrase_count} phrases)")
+
     # Pre-warm database connection pool for faster cold start
     logger.info("Pre-warming database connection pool...")
     try:
@@ -184,6 +242,7 @@ async def _startup() -> None:
     logger.info("Pre-initializing OpenAI client...")
     try:
         openai_client = get_openai_client()
+        get_async_openai_client()
         if openai_client:
             logger.info("OpenAI client pre-initialized successfully")
         else:
@@ -191,6 +250,11 @@ async def _startup() -> None:
     except Exception as e:
         logger.warning(f"Failed to pre-initialize OpenAI client (will initialize on first use): {e}")
 
+    # Pre-warm the translation memory in the background (does not delay startup)
+    global _translation_prewarm_task
+    if TRANSLATION_PREWARM and get_async_openai_client():
+        _translation_prewarm_task = asyncio.create_task(_prewarm_static_translations())
+
 
 @app.on_event("shutdown")
 async def _shutdown() -> None:
@@ -198,6 +262,13 @@ async def _shutdown() -> None:
     logger.info("Shutting down database connections...")
     if neo4j_client.driver:
         neo4j_client.close()
+    if async_neo4j_client.driver:
+        await async_neo4j_client.close()
+    if _translation_prewarm_task is not None and not _translation_prewarm_task.done():
+        _translation_prewarm_task.cancel()
+    if _async_openai_client is not None:
+        await _async_openai_client.close()
+    await cache_service.close()
     # Close PostgreSQL connection pool
     await db_client.disconnect()
     logger.info("Database connections closed")
@@ -447,6 +518,15 @@ PREGNANCY_ALERT_GUIDANCE_EN = [
     "Contact your obstetrician or emergency services immediately.",
 ]
 
+# Fixed English strings translated on non-English requests; pre-warmed into the
+# translation memory so they never cost an LLM call on the request path
+STATIC_TRANSLATION_TEXTS: List[str] = [
+    DISCLAIMER_EN,
+    "\n".join(PREGNANCY_ALERT_GUIDANCE_EN),
+    *MENTAL_HEALTH_FIRST_AID_EN,
+    FALLBACK_MESSAGE_EN,
+]
+
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 ELEVENLABS_MODEL = os.getenv("ELEVENLABS_MODEL", "eleven_multilingual_v2")
 ELEVENLABS_VOICE_DEFAULT = os.getenv("ELEVENLABS_VOICE", "Bella")
@@ -594,6 +674,10 @@ OPENROUTER_EXTRA_HEADERS = {
     "X-Title": OPENROUTER_APP_NAME,
 }
 
+# langdetect is probabilistic; seed it so the same text always gets the same label
+DetectorFactory.seed = 0
+
+
 def detect_language(text: str) -> str:
     try:
         return detect(text)
@@ -629,6 +713,29 @@ def detect_romanized_language(text: str) -> Optional[str]:
     return None
 
 
+def detect_language_local(text: str) -> Tuple[Optional[str], float]:
+    """
+    Fast in-process language guess used to short-circuit remote detection.
+
+    Native script is settled from Unicode blocks; romanized and English text go
+    through the offline n-gram identifier in api/langid.
+
+    Returns:
+        Tuple of (language code or None, confidence between 0 and 1)
+    """
+    if not text or not text.strip():
+        return DEFAULT_LANG, 1.0
+
+    try:
+        lang, confidence = identify_language(text)
+    except Exception as exc:
+        logger.warning(f"Local language identifier failed: {exc}")
+        return None, 0.0
+    if lang not in SUPPORTED_LANG_CODES:
+        return None, 0.0
+    return lang, confidence
+
+
 def attempt_native_script_conversion(text: str, lang: str) -> Optional[str]:
     """Native script conversion is disabled."""
     return None
@@ -905,10 +1012,13 @@ def encode_audio_base64(audio_bytes: bytes) -> str:
 openai_api_key = os.getenv("OPENAI_API_KEY")
 openrouter_api_key = OPENROUTER_API_KEY
 _openai_client: Optional[OpenAI] = None
+_async_openai_client: Optional[AsyncOpenAI] = None
+_translation_prewarm_task: Optional[asyncio.Task] = None
 _openrouter_client: Optional[OpenAI] = None
 _chat_model_openai: str = os.getenv("OPENAI_CHAT_MODEL", "gpt-4o-mini")
 _chat_model_openrouter: str = OPENROUTER_MODEL
 _neo4j_available: Optional[bool] = None
+_async_neo4j_available: Optional[bool] = None
 
 
 def get_openai_client() -> Optional[OpenAI]:
@@ -939,6 +1049,30 @@ def get_openai_client() -> Optional[OpenAI]:
     return _openai_client
 
 
+def get_async_openai_client() -> Optional[AsyncOpenAI]:
+    """
+    Async OpenAI client used by the chat pipeline so LLM round-trips never block the event loop.
+    Shares configuration (timeouts, retries, model) with get_openai_client().
+    """
+    global _async_openai_client
+    if _async_openai_client is not None:
+        return _async_openai_client
+
+    if openai_api_key:
+        try:
+            timeout_seconds = int(os.getenv("OPENAI_TIMEOUT", "60"))
+            _async_openai_client = AsyncOpenAI(
+                api_key=openai_api_key,
+                timeout=timeout_seconds,
+                max_retries=2,
+            )
+            logger.info(f"Async OpenAI client initialised (timeout: {timeout_seconds}s)")
+        except Exception as exc:
+            logger.error("Async OpenAI client initialization error", extra={"error": str(exc)})
+            _async_openai_client = None
+    return _async_openai_client
+
+
 def get_openrouter_client() -> Optional[OpenAI]:
     global _openrouter_client, _chat_model_openrouter
     if _openrouter_client is not None:
@@ -1017,24 +1151,6 @@ def build_personalization_notes(profile: Profile) -> List[str]:
     return notes
 
 
-def graph_get_red_flags(symptoms: List[str]) -> List[Dict[str, Any]]:
-    if ensure_neo4j():
-        try:
-            return neo4j_get_red_flags(symptoms)
-        except Exception as exc:
-            logger.error("Neo4j red flag query failed", extra={"error": str(exc)})
-    return graph_fallback.get_red_flags(symptoms)
-
-
-def graph_get_contraindications(user_conditions: List[str]) -> List[Dict[str, Any]]:
-    if ensure_neo4j():
-        try:
-            return neo4j_get_contraindications(user_conditions)
-        except Exception as exc:
-            logger.error("Neo4j contraindications query failed", extra={"error": str(exc)})
-    return graph_fallback.get_contraindications(user_conditions)
-
-
 def graph_get_providers(city: str) -> List[Dict[str, Any]]:
     if ensure_neo4j():
         try:
@@ -1044,40 +1160,65 @@ def graph_get_providers(city: str) -> List[Dict[str, Any]]:
     return graph_fallback.get_providers_in_city(city)
 
 
-def graph_get_safe_actions(user_conditions: List[str]) -> List[Dict[str, Any]]:
-    if not user_conditions:
-        return []
-    
-    if ensure_neo4j():
+async def ensure_neo4j_async() -> bool:
+    """Async counterpart of ensure_neo4j for the pooled async driver"""
+    global _async_neo4j_available
+    if async_neo4j_client.is_connected():
+        _async_neo4j_available = True
+        return True
+
+    if _async_neo4j_available is None:
         try:
-            return neo4j_get_safe_actions()
+            _async_neo4j_available = await async_neo4j_client.connect()
+            if not _async_neo4j_available:
+                logger.warning("Async Neo4j connection unavailable, falling back to in-memory graph")
         except Exception as exc:
-            logger.error("Neo4j safe actions query failed", extra={"error": str(exc)})
-    return graph_fallback.get_safe_actions(user_conditions)
+            logger.error("Async Neo4j connection error", extra={"error": str(exc)})
+            _async_neo4j_available = False
+    return bool(_async_neo4j_available)
 
 
-def graph_get_related_symptoms(symptoms: List[str]) -> List[Dict[str, Any]]:
+async def graph_get_facts(
+    symptoms: Optional[List[str]] = None,
+    user_conditions: Optional[List[str]] = None,
+    city: Optional[str] = None,
+    related_symptoms: Optional[List[str]] = None,
+) -> Dict[str, Any]:
     """
-    Query Neo4j for symptoms related to the given symptoms through shared conditions
-    This helps identify symptom clusters (e.g., chest pain and left arm pain both related to heart attack)
+    Fetch every graph fact a request needs from the snapshot or in a single Neo4j round-trip
     
     Args:
-        symptoms: List of symptom names
+        symptoms: Current symptoms to check for red flags
+        user_conditions: Conditions for contraindications and safe actions
+        city: City for provider lookup
+        related_symptoms: Symptoms and phrases to find relationships between
         
     Returns:
-        List of dicts with related symptoms and shared conditions
+        Dict with "red_flags", "contraindications", "providers", "related_symptoms"
+        (lists) and "safe_actions" (condition -> safe action records)
     """
-    if not symptoms:
-        return []
-    
-    if ensure_neo4j():
+    user_conditions = user_conditions or []
+    if GRAPH_BACKEND != "neo4j":
+        return get_snapshot().facts(symptoms, user_conditions, city, related_symptoms)
+
+    facts: Optional[Dict[str, Any]] = None
+    if await ensure_neo4j_async():
         try:
-            return neo4j_get_related_symptoms(symptoms)
+            facts = await neo4j_fetch_graph_facts(symptoms, user_conditions, city, related_symptoms)
+            # The safe-action query covers every metabolic profile at once
+            safe_entries = facts.get("safe_actions", [])
+            facts["safe_actions"] = {condition: safe_entries for condition in user_conditions}
         except Exception as exc:
-            logger.error("Neo4j related symptoms query failed", extra={"error": str(exc)})
-            return []
-    # Fallback: return empty (no fallback data for symptom relationships)
-    return []
+            logger.error("Neo4j graph facts query failed", extra={"error": str(exc)})
+            facts = None
+
+    if facts is None:
+        return get_snapshot().facts(symptoms, user_conditions, city, related_symptoms)
+
+    for name in ("red_flags", "contraindications", "providers", "related_symptoms"):
+        facts.setdefault(name, [])
+    facts.setdefault("safe_actions", {})
+    return facts
 
 
 def build_fact_blocks(facts: List[Dict[str, Any]]) -> Tuple[str, str]:
@@ -1284,6 +1425,8 @@ async def health_check():
             "rag": True,
             "graph": ensure_neo4j(),
             "graph_fallback": True,
+            "graph_backend": GRAPH_BACKEND,
+            "graph_snapshot": get_snapshot().version,
             "safety": True,
             "database": db_client.is_connected()
         }
@@ -1305,7 +1448,7 @@ async def speech_to_text(
     
     try:
         audio_bytes = await file.read()
-        transcript = transcribe_audio_bytes(audio_bytes, language_hint=lang)
+        transcript = await asyncio.to_thread(transcribe_audio_bytes, audio_bytes, language_hint=lang)
         return {"text": transcript}
     except HTTPException:
         raise
@@ -1341,50 +1484,11 @@ def _extract_symptoms_from_history(conversation_history: Optional[List[Dict[str,
     return unique_symptoms
 
 
-def _extract_raw_symptom_phrases(text: str) -> List[str]:
-    """
-    Extract raw symptom phrases from text (before canonical mapping)
-    This helps when "left arm pain" maps to "chest pain" but we want to detect the relationship
-    
-    Args:
-        text: Text to extract symptoms from
-        
-    Returns:
-        List of raw symptom phrases found in text
-    """
-    if not text:
-        return []
-    
-    text_lower = text.lower()
-    found_phrases = []
-    
-    # Common symptom phrases that might be mentioned (expanded list)
-    symptom_phrases = [
-        "chest pain", "chest pressure", "tightness in chest",
-        "left arm pain", "right arm pain", "arm pain", "left arm numb", "right arm numb",
-        "jaw pain", "shoulder pain", "back pain", "upper back pain",
-        "shortness of breath", "difficulty breathing",
-        "cold sweats", "sweating", "excessive sweating",
-        "nausea", "vomiting",
-        "lightheadedness", "dizziness",
-        "headache", "severe headache",
-        "abdominal pain", "stomach pain",
-        "fever", "high fever",
-        "rash", "skin rash",
-        "cough", "persistent cough"
-    ]
-    
-    for phrase in symptom_phrases:
-        if phrase in text_lower:
-            found_phrases.append(phrase)
-    
-    return found_phrases
-
-
-def _check_symptom_relationships(processed_text: str, current_symptoms: List[str], 
-                                  conversation_history: Optional[List[Dict[str, str]]]) -> List[Dict[str, Any]]:
+def _symptom_relationship_context(processed_text: str, current_symptoms: List[str],
+                                   conversation_history: Optional[List[Dict[str, str]]]) -> Optional[Dict[str, Any]]:
     """
-    Check for symptom relationships between current query and conversation history
+    Collect the symptoms and raw phrases used to look for relationships between
+    the current query and the conversation history
     
     Args:
         processed_text: Processed English text from current query
@@ -1392,12 +1496,11 @@ def _check_symptom_relationships(processed_text: str, current_symptoms: List[str
         conversation_history: Previous conversation messages
         
     Returns:
-        List of facts containing symptom relationships or no-relationship info
+        Context dict (including "query_symptoms" for the graph lookup), or None when
+        the query or the history has no symptoms to relate
     """
-    facts = []
-    
     if not conversation_history:
-        return facts
+        return None
     
     # Extract canonical symptoms from conversation history
     history_symptoms = _extract_symptoms_from_history(conversation_history)
@@ -1431,124 +1534,168 @@ def _check_symptom_relationships(processed_text: str, current_symptoms: List[str
     # Need symptoms in current query AND symptoms/phrases in history
     has_current_symptoms = bool(current_symptoms or current_raw_phrases)
     has_history_symptoms = bool(history_symptoms or history_raw_phrases)
+    if not (has_current_symptoms and has_history_symptoms):
+        return None
     
-    if has_current_symptoms and has_history_symptoms:
-        # Query for relationships using all symptoms and phrases
-        # This will find relationships for symptoms mentioned in history, including cases where
-        # current symptoms map to the same canonical (e.g., "left arm pain" → "chest pain")
-        related_symptoms = graph_get_related_symptoms(all_symptoms_for_query) if all_symptoms_for_query else []
-        logger.debug(f"Neo4j returned {len(related_symptoms) if related_symptoms else 0} related symptoms")
-        
-        # Define lowercase versions for both if and else blocks
-        current_symptoms_lower = [s.lower() for s in current_symptoms]
-        history_symptoms_lower = [s.lower() for s in history_symptoms]
-        current_raw_lower = [p.lower() for p in current_raw_phrases]
-        history_raw_lower = [p.lower() for p in history_raw_phrases]
-        
-        if related_symptoms:
-            # Filter to only show relationships between current and history symptoms/phrases
-            relevant_relationships = []
-            
-            # Create combined lists for matching
-            all_current_lower = current_symptoms_lower + current_raw_lower
-            all_history_lower = history_symptoms_lower + history_raw_lower
-            
-            for rel in related_symptoms:
-                original = rel.get("original_symptom", "").lower()
-                related = rel.get("related_symptom", "").lower()
-                
-                # Check if this relationship connects current and history symptoms
-                # Match Neo4j symptom names with both canonical symptoms and raw phrases
-                
-                # Check if original symptom matches current (canonical or raw phrase)
-                original_in_current = (
-                    original in current_symptoms_lower or 
-                    original in current_raw_lower or
-                    any(original in phrase or phrase in original for phrase in current_raw_lower)
-                )
-                
-                # Check if related symptom matches current (canonical or raw phrase)
-                related_in_current = (
-                    related in current_symptoms_lower or 
-                    related in current_raw_lower or
-                    any(related in phrase or phrase in related for phrase in current_raw_lower)
-                )
-                
-                # Check if original symptom matches history (canonical or raw phrase)
-                original_in_history = (
-                    original in history_symptoms_lower or 
-                    original in history_raw_lower or
-                    any(original in phrase or phrase in original for phrase in history_raw_lower)
-                )
-                
-                # Check if related symptom matches history (canonical or raw phrase)
-                related_in_history = (
-                    related in history_symptoms_lower or 
-                    related in history_raw_lower or
-                    any(related in phrase or phrase in related for phrase in history_raw_lower)
-                )
-                
-                # Relationship connects current and history if:
-                # 1. One symptom is in history AND the other is in current, OR
-                # 2. Both symptoms are in both (confirming the relationship)
-                if (original_in_history and related_in_current) or (related_in_history and original_in_current):
-                    relevant_relationships.append(rel)
-                elif original_in_current and related_in_current and original_in_history and related_in_history:
-                    # Both symptoms mentioned in both - this confirms they're related
-                    relevant_relationships.append(rel)
-            
-            if relevant_relationships:
-                facts.append({
-                    "type": "symptom_relationships",
-                    "data": relevant_relationships
-                })
-                logger.info(
-                    f"Found {len(relevant_relationships)} symptom relationships between current and history. "
-                    f"Current: {all_current_lower}, History: {all_history_lower}, "
-                    f"Relationships: {[(r.get('original_symptom'), r.get('related_symptom')) for r in relevant_relationships[:3]]}"
-                )
-            else:
-                logger.debug(
-                    f"No relevant relationships found. Neo4j returned {len(related_symptoms)} relationships, "
-                    f"but none matched current ({all_current_lower}) and history ({all_history_lower})"
-                )
+    return {
+        "current_symptoms": current_symptoms,
+        "history_symptoms": history_symptoms,
+        "current_raw_phrases": current_raw_phrases,
+        "history_raw_phrases": history_raw_phrases,
+        "query_symptoms": all_symptoms_for_query,
+    }
+
+
+def _build_symptom_relationship_facts(context: Optional[Dict[str, Any]],
+                                      related_symptoms: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Turn graph relationships into facts about the current query and conversation history
+    
+    Args:
+        context: Result of _symptom_relationship_context
+        related_symptoms: Relationships returned by the graph for context["query_symptoms"]
+        
+    Returns:
+        List of facts containing symptom relationships or no-relationship info
+    """
+    facts = []
+    if not context:
+        return facts
+    
+    current_symptoms = context["current_symptoms"]
+    history_symptoms = context["history_symptoms"]
+    current_raw_phrases = context["current_raw_phrases"]
+    history_raw_phrases = context["history_raw_phrases"]
+    logger.debug(f"Neo4j returned {len(related_symptoms) if related_symptoms else 0} related symptoms")
+    
+    # Define lowercase versions for both if and else blocks
+    current_symptoms_lower = [s.lower() for s in current_symptoms]
+    history_symptoms_lower = [s.lower() for s in history_symptoms]
+    current_raw_lower = [p.lower() for p in current_raw_phrases]
+    history_raw_lower = [p.lower() for p in history_raw_phrases]
+
+    if related_symptoms:
+        # Filter to only show relationships between current and history symptoms/phrases
+        relevant_relationships = []
+
+        # Create combined lists for matching
+        all_current_lower = current_symptoms_lower + current_raw_lower
+        all_history_lower = history_symptoms_lower + history_raw_lower
+
+        for rel in related_symptoms:
+            original = rel.get("original_symptom", "").lower()
+            related = rel.get("related_symptom", "").lower()
+
+            # Check if this relationship connects current and history symptoms
+            # Match Neo4j symptom names with both canonical symptoms and raw phrases
+
+            # Check if original symptom matches current (canonical or raw phrase)
+            original_in_current = (
+                original in current_symptoms_lower or 
+                original in current_raw_lower or
+                any(original in phrase or phrase in original for phrase in current_raw_lower)
+            )
+
+            # Check if related symptom matches current (canonical or raw phrase)
+            related_in_current = (
+                related in current_symptoms_lower or 
+                related in current_raw_lower or
+                any(related in phrase or phrase in related for phrase in current_raw_lower)
+            )
+
+            # Check if original symptom matches history (canonical or raw phrase)
+            original_in_history = (
+                original in history_symptoms_lower or 
+                original in history_raw_lower or
+                any(original in phrase or phrase in original for phrase in history_raw_lower)
+            )
+
+            # Check if related symptom matches history (canonical or raw phrase)
+            related_in_history = (
+                related in history_symptoms_lower or 
+                related in history_raw_lower or
+                any(related in phrase or phrase in related for phrase in history_raw_lower)
+            )
+
+            # Relationship connects current and history if:
+            # 1. One symptom is in history AND the other is in current, OR
+            # 2. Both symptoms are in both (confirming the relationship)
+            if (original_in_history and related_in_current) or (related_in_history and original_in_current):
+                relevant_relationships.append(rel)
+            elif original_in_current and related_in_current and original_in_history and related_in_history:
+                # Both symptoms mentioned in both - this confirms they're related
+                relevant_relationships.append(rel)
+
+        if relevant_relationships:
+            facts.append({
+                "type": "symptom_relationships",
+                "data": relevant_relationships
+            })
+            logger.info(
+                f"Found {len(relevant_relationships)} symptom relationships between current and history. "
+                f"Current: {all_current_lower}, History: {all_history_lower}, "
+                f"Relationships: {[(r.get('original_symptom'), r.get('related_symptom')) for r in relevant_relationships[:3]]}"
+            )
         else:
-            # No relationships found - check if we should explicitly state no relationship
-            # Check if raw phrases are different (even if canonical symptoms are same)
-            current_phrases_set = set(current_raw_lower) if current_raw_phrases else set()
-            history_phrases_set = set(history_raw_lower) if history_raw_phrases else set()
-            
-            # Also check canonical symptoms
-            current_set = set([s.lower() for s in current_symptoms])
-            history_set = set([s.lower() for s in history_symptoms])
-            
-            # Symptoms are different if:
-            # 1. Canonical symptoms are different, OR
-            # 2. Raw phrases are different (even if canonical is same)
-            symptoms_different = (
-                (current_set != history_set and len(current_set & history_set) == 0) or
-                (current_phrases_set != history_phrases_set and len(current_phrases_set & history_phrases_set) == 0)
+            logger.debug(
+                f"No relevant relationships found. Neo4j returned {len(related_symptoms)} relationships, "
+                f"but none matched current ({all_current_lower}) and history ({all_history_lower})"
             )
-            
-            if symptoms_different and (current_symptoms or current_raw_phrases) and (history_symptoms or history_raw_phrases):
-                # No relationship found between different symptoms
-                current_display = ", ".join(current_symptoms + current_raw_phrases[:2])
-                history_display = ", ".join(history_symptoms + history_raw_phrases[:2])
-                
-                facts.append({
-                    "type": "symptom_no_relationship",
-                    "data": {
-                        "current_symptoms": current_symptoms,
-                        "history_symptoms": history_symptoms,
-                        "current_display": current_display,
-                        "history_display": history_display
-                    }
-                })
-                logger.debug(f"No relationship found between {current_display} and {history_display}")
-    
+    else:
+        # No relationships found - check if we should explicitly state no relationship
+        # Check if raw phrases are different (even if canonical symptoms are same)
+        current_phrases_set = set(current_raw_lower) if current_raw_phrases else set()
+        history_phrases_set = set(history_raw_lower) if history_raw_phrases else set()
+
+        # Also check canonical symptoms
+        current_set = set([s.lower() for s in current_symptoms])
+        history_set = set([s.lower() for s in history_symptoms])
+
+        # Symptoms are different if:
+        # 1. Canonical symptoms are different, OR
+        # 2. Raw phrases are different (even if canonical is same)
+        symptoms_different = (
+            (current_set != history_set and len(current_set & history_set) == 0) or
+            (current_phrases_set != history_phrases_set and len(current_phrases_set & history_phrases_set) == 0)
+        )
+
+        if symptoms_different and (current_symptoms or current_raw_phrases) and (history_symptoms or history_raw_phrases):
+            # No relationship found between different symptoms
+            current_display = ", ".join(current_symptoms + current_raw_phrases[:2])
+            history_display = ", ".join(history_symptoms + history_raw_phrases[:2])
+
+            facts.append({
+                "type": "symptom_no_relationship",
+                "data": {
+                    "current_symptoms": current_symptoms,
+                    "history_symptoms": history_symptoms,
+                    "current_display": current_display,
+                    "history_display": history_display
+                }
+            })
+            logger.debug(f"No relationship found between {current_display} and {history_display}")
+
     return facts
 
 
+# Common symptom phrases that might be mentioned, matched before canonical mapping
+RAW_SYMPTOM_PHRASES = [
+    "chest pain", "chest pressure", "tightness in chest",
+    "left arm pain", "right arm pain", "arm pain", "left arm numb", "right arm numb",
+    "jaw pain", "shoulder pain", "back pain", "upper back pain",
+    "shortness of breath", "difficulty breathing",
+    "cold sweats", "sweating", "excessive sweating",
+    "nausea", "vomiting",
+    "lightheadedness", "dizziness",
+    "headache", "severe headache",
+    "abdominal pain", "stomach pain",
+    "fever", "high fever",
+    "rash", "skin rash",
+    "cough", "persistent cough"
+]
+register_vocabulary("raw_symptoms", RAW_SYMPTOM_PHRASES)
+
+
 def _extract_raw_symptom_phrases(text: str) -> List[str]:
     """
     Extract raw symptom phrases from text (before canonical mapping)
@@ -1563,30 +1710,41 @@ def _extract_raw_symptom_phrases(text: str) -> List[str]:
     if not text:
         return []
     
-    text_lower = text.lower()
-    found_phrases = []
-    
-    # Common symptom phrases that might be mentioned (expanded list)
-    symptom_phrases = [
-        "chest pain", "chest pressure", "tightness in chest",
-        "left arm pain", "right arm pain", "arm pain", "left arm numb", "right arm numb",
-        "jaw pain", "shoulder pain", "back pain", "upper back pain",
-        "shortness of breath", "difficulty breathing",
-        "cold sweats", "sweating", "excessive sweating",
-        "nausea", "vomiting",
-        "lightheadedness", "dizziness",
-        "headache", "severe headache",
-        "abdominal pain", "stomach pain",
-        "fever", "high fever",
-        "rash", "skin rash",
-        "cough", "persistent cough"
-    ]
-    
-    for phrase in symptom_phrases:
-        if phrase in text_lower:
-            found_phrases.append(phrase)
-    
-    return found_phrases
+    found = match_phrases(text, "raw_symptoms")
+    return [phrase for phrase in RAW_SYMPTOM_PHRASES if phrase in found]
+
+
+async def _retrieve_stage(query: str, k: int = 4) -> List[Dict[str, Any]]:
+    """
+    Vector retrieval stage: results come from the retrieval result cache when
+    possible; otherwise the query vector comes from the embedding cache (LRU,
+    Redis, then the model in a worker thread) and the Chroma query runs in a
+    worker thread, so neither blocks the event loop.
+    """
+    # Cached results skip embedding the query as well as the index search
+    cached = get_cached_results(query, k)
+    if cached is not None:
+        return cached
+    query_embedding = await query_embedding_cache.embed(query)
+    if query_embedding is None:
+        # Embedding model unavailable: let Chroma embed the query text
+        return await asyncio.to_thread(retrieve, query, k)
+    return await asyncio.to_thread(retrieve, query, k, query_embedding)
+
+
+async def _retrieve_many_stage(queries: List[str], k: int = 4) -> List[Dict[str, Any]]:
+    """
+    Multi-query retrieval stage: searches with every phrasing of the request
+    (raw text, history-enhanced query, extracted symptoms). All query vectors
+    come from one batched embedding call and the backend is searched once;
+    results are merged and deduplicated. A single phrasing takes the plain
+    _retrieve_stage path.
+    """
+    unique_queries = list(dict.fromkeys(q for q in queries if q and q.strip()))
+    if len(unique_queries) <= 1:
+        return await _retrieve_stage(unique_queries[0] if unique_queries else "", k)
+    query_embeddings = await query_embedding_cache.embed_many(unique_queries)
+    return await asyncio.to_thread(retrieve_many, unique_queries, k, query_embeddings)
 
 
 def _enhance_search_query_with_context(current_query: str, conversation_history: Optional[List[Dict[str, str]]]) -> str:
@@ -1670,23 +1828,31 @@ def _format_conversation_history(messages: List[Dict[str, Any]]) -> List[Dict[st
     return formatted
 
 
-async def _get_conversation_history(session_id: Optional[str], customer_id: Optional[str] = None) -> List[Dict[str, str]]:
+async def _get_conversation_history(
+    session_id: Optional[str],
+    customer_id: Optional[str] = None,
+    cached_history: Optional[List[Dict[str, str]]] = None,
+) -> List[Dict[str, str]]:
     """
     Retrieve conversation history for a session (with Redis caching for performance)
     
     Args:
         session_id: Session ID to retrieve history for
         customer_id: Optional customer ID to filter feedback (if provided)
+        cached_history: History already read from the cache by _prepare_session_cache
         
     Returns:
         List of formatted messages for OpenAI API
     """
     if not session_id or not db_client.is_connected():
         return []
+    if cached_history is not None:
+        logger.info(f"✅ CACHE HIT for conversation history: {session_id} (prefetched)")
+        return cached_history
     
     try:
         # Try to get from Redis cache first (much faster than database query)
-        cache_key = f"conversation_history:{session_id}"
+        cache_key = _history_cache_key(session_id)
         cache_start = time.perf_counter()
         
         if cache_service.is_available():
@@ -1727,71 +1893,379 @@ async def _get_conversation_history(session_id: Optional[str], customer_id: Opti
         return []
 
 
-def _filter_md_sources(citations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def _history_cache_key(session_id: str) -> str:
     """
-    Filter citations to only include reference links (URLs) from .md files.
-    Returns clean citations with only source name and URL - similar to Perplexity.
-    No file paths, IDs, or internal references are included.
+    Cache key of a session's conversation history. It is keyed by the hashed
+    session ID, so a request carrying the hashed ID reads the history together
+    with the hash mapping that resolves it.
+    """
+    from .services.session_hash import session_cache_hash
     
-    Handles multiple cases:
-    1. Citations with url field (already filtered, from database) - uses directly
-    2. Citations with reference_sources (from ChromaDB, needs extraction)
-    3. Citations with just source and url (simplified format)
+    return f"conversation_history:{session_cache_hash(session_id)}"
+
+
+async def _read_session_cache(session_id: str) -> Dict[str, Any]:
+    """
+    Hash mapping and cached conversation history of the session ID a request
+    carries (hashed or not), in one cache round-trip
     """
-    filtered = []
-    seen_urls = set()  # Track URLs to avoid duplicates
+    from .services.session_hash import session_cache_hash
     
-    for citation in citations:
-        if not isinstance(citation, dict):
-            continue
-            
-        source = citation.get("source", "")
-        url = citation.get("url", "")
-        
-        # Case 1: Citation already has URL field (most common - from database)
-        if url and url not in seen_urls:
-            seen_urls.add(url)
-            # Return only source name and URL - clean structure like Perplexity
-            filtered.append({
-                "source": source or url,  # Source name/title
-                "url": url,  # The actual URL to open
-            })
-            continue
-        
-        # Case 2: Citation has reference_sources (from ChromaDB, needs extraction)
-        reference_sources = citation.get("reference_sources", [])
-        
-        # Check if it's from a .md file (source ends with .md or contains .md)
-        is_md_file = source and (source.endswith(".md") or ".md" in source)
-        
-        # Extract reference sources (URLs) from the citation
-        # Only include citations that have reference links (URLs)
-        if reference_sources and isinstance(reference_sources, list) and len(reference_sources) > 0:
-            for ref in reference_sources:
-                if isinstance(ref, dict):
-                    ref_url = ref.get("url", "")
-                    ref_name = ref.get("name", "")
-                    # Only add if URL is valid and not already seen
-                    if ref_url and ref_url not in seen_urls:
-                        seen_urls.add(ref_url)
-                        # Return only source name and URL - clean structure like Perplexity
-                        filtered.append({
-                            "source": ref_name or source or ref_url,  # Source name/title (e.g., "NHS — Chest Pain Advice")
-                            "url": ref_url,  # The actual URL to open
-                        })
-        # If no reference_sources but it's a .md file, still include it with source as name
-        elif is_md_file and source:
-            # Include .md file citations even without URLs (for display purposes)
-            # Use source as both name and a placeholder
-            filtered.append({
-                "source": source,
-                "url": f"file://{source}",  # Create a file URL for .md sources
-            })
+    try:
+        return await cache_service.get_many(
+            [f"session_hash:{session_cache_hash(session_id)}", _history_cache_key(session_id)]
+        )
+    except Exception as e:
+        logger.warning(f"Failed to read session cache: {e}")
+        return {}
+
+
+async def _prepare_session_cache(
+    session_id: str,
+    session_cache: Optional[Dict[str, Any]] = None,
+) -> Optional[List[Dict[str, str]]]:
+    """
+    Store the session's hash mapping if it is not cached yet and read its
+    cached conversation history, in one cache round-trip.
+    
+    Args:
+        session_id: The real session ID
+        session_cache: What _read_session_cache found for the request's session
+            ID; no round-trip is needed when it already holds this session's mapping
+    
+    Returns:
+        Cached conversation history, or None if it has to be loaded
+    """
+    from .services.session_hash import ensure_session_hash_mapping, hash_session_id
     
-    return filtered
+    history_key = _history_cache_key(session_id)
+    if session_cache and session_cache.get(f"session_hash:{hash_session_id(session_id)}") == session_id:
+        return session_cache.get(history_key)
+    try:
+        cached = await ensure_session_hash_mapping(session_id, prefetch=[history_key])
+    except Exception as e:
+        logger.warning(f"Failed to store session hash mapping: {e}")
+        return None
+    return cached.get(history_key)
+
+
+def _stored_citations(value: Any) -> List[Dict[str, Any]]:
+    """
+    Citations of a stored message. They are saved already normalized
+    ({"source", "url"} pairs from the citation table), so reading history only
+    decodes JSONB that arrives as a string.
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value) if value else []
+        except (json.JSONDecodeError, TypeError):
+            return []
+    return value if isinstance(value, list) else []
+
+
+def _session_tags(session_id: Optional[str], customer_id: Optional[str] = None) -> List[str]:
+    """
+    Cache tags of data derived from a session and its owner. Session lists are
+    tagged by customer, message lists and full sessions by session; bumping a
+    tag invalidates every page size at once (see CacheService.invalidate_tags).
+    """
+    tags = []
+    if session_id:
+        tags.append(f"session:{session_id}")
+    if customer_id:
+        tags.append(f"customer:{customer_id}")
+    return tags
+
+
+async def _detect_and_translate_input(
+    text: str,
+    openai_client: Optional[AsyncOpenAI],
+    model: Optional[str],
+    timings: Dict[str, float],
+) -> Tuple[str, str, str]:
+    """
+    STEP 1: Detect the input language and translate it to English.
+
+    Combined mode (default) races the local detector against a single structured
+    detect + translate call and cancels the remote call when the local detector is
+    confident the text is English. Sequential mode keeps the older romanized
+    heuristic -> detect_language_only -> translate_to_english chain.
+
+    Returns:
+        Tuple of (detected_language, english_text, detector_source)
+    """
+    detection_start = time.perf_counter()
+
+    if not (openai_client and model):
+        # Fallback to old method if OpenAI client not available
+        logger.warning("OpenAI client not available, using fallback language detection")
+        detected_lang, _ = detect_language_local(text)
+        if not detected_lang:
+            detected_lang = detect_language(text) if text else DEFAULT_LANG
+        detected_lang = detected_lang if detected_lang in SUPPORTED_LANG_CODES else DEFAULT_LANG
+        processed_text = text if detected_lang == "en" else translate_text(text, target_lang="en", src_lang=detected_lang)
+        timings["language_detection"] = time.perf_counter() - detection_start
+        return detected_lang, processed_text, "local"
+
+    if COMBINED_DETECT_TRANSLATE:
+        # A confidently identified phrasing we have translated before needs no LLM call
+        local_lang, local_confidence = detect_language_local(text)
+        if local_lang and local_lang != "en" and local_confidence >= LOCAL_LANGID_CONFIDENCE:
+            remembered = await translation_memory.get(text, local_lang, "en")
+            if remembered is not None:
+                timings["language_detection"] = time.perf_counter() - detection_start
+                timings["translation_to_english"] = 0.0
+                return local_lang, remembered, "local+memory"
+
+        detected_lang, processed_text, source = await speculative_detect_and_translate(
+            client=openai_client,
+            model=model,
+            user_text=text,
+            local_detector=detect_language_local,
+            confidence_threshold=LOCAL_LANGID_CONFIDENCE,
+        )
+        if detected_lang != "en" and processed_text != text:
+            await translation_memory.set(text, detected_lang, "en", processed_text)
+        # Detection and translation share one round-trip in this mode
+        timings["language_detection"] = time.perf_counter() - detection_start
+        timings["translation_to_english"] = 0.0
+        return detected_lang, processed_text, source
+
+    # Offline identifier first (native script, Tanglish, Hinglish, ...) - remote only when unsure
+    local_lang, local_confidence = detect_language_local(text)
+    if local_lang and local_confidence >= LOCAL_LANGID_CONFIDENCE:
+        detected_lang, source = local_lang, "local"
+    else:
+        detected_lang = detect_romanized_language(text)
+        source = "romanized_heuristic" if detected_lang else "remote"
+    if not detected_lang:
+        detected_lang = await detect_language_only_async(
+            client=openai_client,
+            model=model,
+            user_text=text
+        )
+    timings["language_detection"] = time.perf_counter() - detection_start
+
+    # Translate to English (SKIP if English detected)
+    translate_start = time.perf_counter()
+    if detected_lang == "en":
+        processed_text = text
+    else:
+        processed_text = await _translate_to_english(openai_client, model, text, detected_lang)
+    timings["translation_to_english"] = time.perf_counter() - translate_start
+    return detected_lang, processed_text, source
+
+
+CONDITION_KEYWORDS = {
+    "diabetes": "Diabetes",
+    "hypertension": "Hypertension",
+    "pregnancy": "Pregnancy",
+    "pregnant": "Pregnancy",
+    "asthma": "Asthma",
+    "heart disease": "Heart disease",
+    "kidney disease": "Kidney disease",
+    "liver disease": "Liver disease",
+    "epilepsy": "Epilepsy",
+}
+
+
+def _collect_user_conditions(profile: Profile, processed_text: str) -> List[str]:
+    """Collect condition labels from the profile and the (English) query for graph lookups"""
+    user_conditions: List[str] = []
+    # Add conditions from boolean fields (for backward compatibility)
+    if profile.diabetes:
+        user_conditions.append("Diabetes")
+    if profile.hypertension:
+        user_conditions.append("Hypertension")
+    if profile.pregnancy:
+        user_conditions.append("Pregnancy")
+    
+    # Add conditions from medical_conditions array
+    if hasattr(profile, 'medical_conditions') and profile.medical_conditions:
+        for condition in profile.medical_conditions:
+            # Capitalize first letter for consistency
+            condition_label = condition.capitalize().replace("_", " ")
+            if condition_label not in user_conditions:
+                user_conditions.append(condition_label)
+
+    processed_lower = processed_text.lower()
+    for keyword, label in CONDITION_KEYWORDS.items():
+        if keyword in processed_lower and label not in user_conditions:
+            user_conditions.append(label)
+    return user_conditions
+
+
+def _build_contraindication_fact(
+    contras: List[Dict[str, Any]], user_conditions: List[str]
+) -> Optional[Dict[str, Any]]:
+    """Group graph contraindications by the user's conditions"""
+    condition_avoid_map: Dict[str, List[str]] = {}
+    for entry in contras:
+        avoid_item = entry.get("avoid")
+        for cond in entry.get("because", []):
+            if cond in user_conditions and avoid_item:
+                condition_avoid_map.setdefault(cond, []).append(avoid_item)
+
+    if not condition_avoid_map:
+        return None
+    return {
+        "type": "contraindications",
+        "data": [
+            {
+                "condition": cond,
+                "avoid": sorted(set(items)),
+            }
+            for cond, items in condition_avoid_map.items()
+        ],
+    }
+
+
+def _build_safe_actions_map(per_condition: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[str]]:
+    """Collapse safe action records for each condition into sorted action names"""
+    safe_actions_map: Dict[str, List[str]] = {}
+    for condition, safe_entries in per_condition.items():
+        actions = sorted(
+            {
+                entry.get("safeAction")
+                for entry in safe_entries
+                if entry.get("safeAction")
+            }
+        )
+        if actions:
+            safe_actions_map[condition] = actions
+    return safe_actions_map
+
+
+async def _translate_to_user_language(
+    openai_client: AsyncOpenAI, model: str, english_text: str, target_language: str
+) -> str:
+    """translate_to_user_language_async backed by the translation memory"""
+    return await translation_memory.translate(
+        english_text,
+        "en",
+        target_language,
+        partial(translate_to_user_language_async, openai_client, model, english_text, target_language),
+    )
+
+
+async def _translate_to_english(
+    openai_client: AsyncOpenAI, model: str, text: str, source_language: str
+) -> str:
+    """translate_to_english_async backed by the translation memory"""
+    return await translation_memory.translate(
+        text,
+        source_language,
+        "en",
+        partial(translate_to_english_async, openai_client, model, text, source_language),
+    )
+
+
+async def _prewarm_static_translations() -> None:
+    """Fill the translation memory with every static string in every supported language"""
+    openai_client = get_async_openai_client()
+    if not openai_client:
+        return
+    try:
+        fetched = await translation_memory.prewarm(
+            STATIC_TRANSLATION_TEXTS,
+            sorted(SUPPORTED_LANG_CODES - {"en"}),
+            partial(translate_to_user_language_async, openai_client, _chat_model_openai),
+        )
+        logger.info(f"Translation memory pre-warmed ({fetched} translations fetched from the LLM)")
+    except Exception as e:
+        logger.warning(f"Translation memory pre-warm failed: {e}")
+
+
+async def _translate_lines(translate, lines: List[str], target_language: str) -> List[str]:
+    """Translate independent lines (e.g. first-aid steps) concurrently, preserving order"""
+    return list(await asyncio.gather(*(translate(line, target_language) for line in lines)))
+
+
+def _build_fact_summary(facts_en: List[Dict[str, Any]]) -> str:
+    """Render graph facts as a short text block appended to the RAG context"""
+    fact_summary = "\n\nRelevant facts from database:\n"
+    for fact_group in facts_en:
+        if fact_group["type"] == "red_flags":
+            fact_summary += "⚠️ Red flag conditions detected\n"
+        elif fact_group["type"] == "contraindications":
+            avoid_phrases = []
+            for entry in fact_group["data"]:
+                avoid_items = ", ".join(entry["avoid"])
+                avoid_phrases.append(f"{entry['condition']}: {avoid_items}")
+            if avoid_phrases:
+                fact_summary += f"⛔ Things to avoid — {'; '.join(avoid_phrases)}\n"
+        elif fact_group["type"] == "providers":
+            fact_summary += f"🏥 {len(fact_group['data'])} healthcare providers found\n"
+        elif fact_group["type"] == "symptom_relationships":
+            for entry in fact_group["data"]:
+                original = entry.get("original_symptom", "")
+                related = entry.get("related_symptom", "")
+                shared_conditions = entry.get("shared_conditions", [])
+                if original and related and shared_conditions:
+                    fact_summary += f"🔗 {original} and {related} are related symptoms, both associated with: {', '.join(shared_conditions)}\n"
+                    fact_summary += f"   This suggests these symptoms may be part of the same condition cluster.\n"
+        elif fact_group["type"] == "symptom_no_relationship":
+            current_display = fact_group["data"].get("current_display", "")
+            history_display = fact_group["data"].get("history_display", "")
+            fact_summary += f"❌ No relationship found between current symptoms ({current_display}) and history symptoms ({history_display})\n"
+            fact_summary += f"   These symptoms appear to be unrelated based on available medical knowledge.\n"
+    return fact_summary
+
+
+def _personalization_block(personalization_notes: List[str]) -> str:
+    if not personalization_notes:
+        return ""
+    return "\n\nPersonalization notes:\n" + "\n".join(f"- {note}" for note in personalization_notes)
+
+
+def _pack_rag_context(rag_results: Optional[List[Dict[str, Any]]], extras: str, timings: Dict[str, float]) -> str:
+    """
+    Retrieved chunks packed into the prompt context budget, followed by `extras`
+    (fact summary, notes), which are always kept. Token counts go into timings.
+    """
+    chunks = [r["chunk"] for r in rag_results or []]
+    context, report = pack_context(chunks, reserved=count_tokens(extras))
+    timings.update(report)
+    return context + extras
+
+
+def _answer_cache_bypass_reason(
+    safety_result: Dict[str, Any],
+    mental_health: Dict[str, Any],
+    pregnancy_alert: Dict[str, Any],
+    profile: Profile,
+    conversation_history: Optional[List[Dict[str, str]]],
+) -> Optional[str]:
+    """Reasons a response must always be generated fresh (None if cacheable)"""
+    if safety_result.get("red_flag"):
+        return "red_flag"
+    if mental_health.get("crisis"):
+        return "mental_health_crisis"
+    if pregnancy_alert.get("concern") or profile.pregnancy:
+        return "pregnancy"
+    if conversation_history:
+        # Follow-up questions depend on earlier turns
+        return "conversation_history"
+    return None
 
 
-def process_chat_request(
+def _answer_cache_profile(profile: Profile, processed_text: str) -> List[str]:
+    """
+    Profile facts that change the generated answer: everything
+    format_user_profile puts into the answer prompt (conditions, exact age,
+    sex, city), so a cached answer is never served to a different profile
+    """
+    profile_key = _collect_user_conditions(profile, processed_text)
+    if profile.age:
+        profile_key.append(f"age:{profile.age}")
+    if profile.sex:
+        profile_key.append(f"sex:{profile.sex.strip().lower()}")
+    if profile.city:
+        profile_key.append(f"city:{profile.city.strip().lower()}")
+    return profile_key
+
+
+async def process_chat_request(
     request: ChatRequest, 
     conversation_history: Optional[List[Dict[str, str]]] = None
 ) -> Tuple[ChatResponse, str, Dict[str, float]]:
@@ -1808,62 +2282,19 @@ def process_chat_request(
     # ============================================================
     # STEP 1: GPT-4o-mini → Detect Language + Translate to English
     # ============================================================
-    detection_start = time.perf_counter()
-    openai_client = get_openai_client()
+    openai_client = get_async_openai_client()
     model = _chat_model_openai
     
-    # Import pipeline functions at the top to ensure they're available
-    from .pipeline_functions import detect_language_only, translate_to_english
-    
-    # First check for romanized text (Tanglish, Hinglish, etc.) - fast heuristic
-    detected_lang = None
-    romanized_lang = detect_romanized_language(text)
-    if romanized_lang:
-        detected_lang = romanized_lang
-        logger.info(f"Detected romanized language: {detected_lang} for text: {text[:50]}...")
-    
-    # If not romanized, use GPT-4o-mini for language detection
-    if not detected_lang:
-        if openai_client and model:
-            detected_lang = detect_language_only(
-                client=openai_client,
-                model=model,
-                user_text=text
-            )
-            logger.debug(f"GPT-4o-mini detected language: {detected_lang}")
-        else:
-            # Fallback to old method if OpenAI client not available
-            logger.warning("OpenAI client not available, using fallback language detection")
-            detected_lang = detect_language(text) if text else DEFAULT_LANG
-            detected_lang = detected_lang if detected_lang in SUPPORTED_LANG_CODES else DEFAULT_LANG
+    detected_lang, processed_text, detector_source = await _detect_and_translate_input(
+        text, openai_client, model, timings
+    )
     
     # Use requested language if provided, otherwise use detected
     requested_lang_raw = request.lang if request.lang in SUPPORTED_LANG_CODES else None
     target_lang = requested_lang_raw or detected_lang or DEFAULT_LANG
     
     # Log final detected language (for debugging)
-    logger.info(f"Language detection complete - detected_lang: {detected_lang}, target_lang: {target_lang}, will translate back to: {detected_lang}")
-    
-    # Translate to English using GPT-4o-mini (SKIP if English detected)
-    if detected_lang == "en":
-        # Skip translation entirely if English detected - optimize pipeline
-        processed_text = text
-        logger.debug("English detected - skipping translation to English step")
-    else:
-        # Translate to English only if not English
-        if openai_client and model:
-            processed_text = translate_to_english(
-                client=openai_client,
-                model=model,
-                user_text=text,
-                source_language=detected_lang
-            )
-        else:
-            # Fallback to old method
-            processed_text = translate_text(text, target_lang="en", src_lang=detected_lang)
-    
-    timings["language_detection"] = time.perf_counter() - detection_start
-    timings["translation_to_english"] = 0.0 if detected_lang == "en" else (time.perf_counter() - detection_start - timings.get("language_detection", 0))
+    logger.info(f"Language detection complete - detected_lang: {detected_lang} ({detector_source}), target_lang: {target_lang}, will translate back to: {detected_lang}")
     
     debug_info: Dict[str, Any] = {
         "input_text": text,
@@ -1871,6 +2302,7 @@ def process_chat_request(
         "target_language": target_lang,
         "processed_text_en": processed_text,
         "translation_skipped": (detected_lang == "en"),
+        "language_detector": detector_source,
         "pipeline": "optimized_multilingual_pipeline",
     }
 
@@ -1880,63 +2312,136 @@ def process_chat_request(
     pregnancy_alert_en = detect_pregnancy_emergency(processed_text)
     timings["safety_analysis"] = time.perf_counter() - safety_start
 
-    # Translate mental health and pregnancy alerts if needed (skip if English detected)
-    # Use detected_lang (not target_lang) to respond in the language user typed in
-    mental_health_display = mental_health_en
-    if detected_lang != "en" and mental_health_en["first_aid"] and openai_client and model:
-        # Translate first aid steps
-        translated_first_aid = []
-        for step in mental_health_en["first_aid"]:
-            translated = translate_to_user_language(
-                client=openai_client,
-                model=model,
-                english_text=step,
-                target_language=detected_lang,
+    # Opt-in answer cache: exact query first, then a semantically similar cached question
+    cache_bypass = _answer_cache_bypass_reason(
+        safety_result, mental_health_en, pregnancy_alert_en, profile, conversation_history
+    )
+    cache_profile: List[str] = []
+    cache_index_version = ""
+    query_embedding = None
+    if answer_cache.enabled:
+        if cache_bypass:
+            answer_cache.record_bypass()
+            debug_info["answer_cache"] = {"bypass": cache_bypass}
+        else:
+            cache_start = time.perf_counter()
+            cache_profile = _answer_cache_profile(profile, processed_text)
+            cache_index_version = get_index_version()
+            cache_hit, query_embedding = await answer_cache.lookup(
+                processed_text, detected_lang, cache_profile, cache_index_version
             )
-            translated_first_aid.append(translated)
-        mental_health_display = {
-            **mental_health_en,
-            "first_aid": translated_first_aid,
-        }
-
-    pregnancy_guidance_display = PREGNANCY_ALERT_GUIDANCE_EN
-    if detected_lang != "en" and openai_client and model:
-        pregnancy_guidance_display = translate_to_user_language(
-            client=openai_client,
-            model=model,
-            english_text="\n".join(PREGNANCY_ALERT_GUIDANCE_EN),
-            target_language=detected_lang,
-        ).split("\n")
-    pregnancy_alert_display = {
-        **pregnancy_alert_en,
-        "guidance": pregnancy_guidance_display,
-    }
+            timings["answer_cache_lookup"] = time.perf_counter() - cache_start
+            if cache_hit:
+                payload = cache_hit["payload"]
+                timings["total"] = time.perf_counter() - total_start
+                cache_info = {"match": cache_hit["match"], "similarity": round(cache_hit["similarity"], 4)}
+                logger.info(f"Answer cache hit ({cache_info['match']}, similarity={cache_info['similarity']})")
+                response = ChatResponse(
+                    answer=payload["answer"],
+                    route=payload.get("route", "vector"),
+                    facts=payload.get("facts", []),
+                    citations=payload.get("citations", []),
+                    safety={**safety_result, "mental_health": mental_health_en, "pregnancy": pregnancy_alert_en},
+                    metadata={},
+                )
+                metadata_payload: Dict[str, Any] = {
+                    "timings": timings,
+                    "target_language": target_lang,
+                    "detected_language": detected_lang,
+                    "pipeline": "new_multilingual",
+                    "answer_cache": cache_info,
+                }
+                if request.debug:
+                    metadata_payload["debug"] = {**debug_info, "answer_cache": cache_info}
+                response.metadata = metadata_payload
+                return response, target_lang, timings
 
     # ============================================================
-    # STEP 3: Neo4j (Knowledge graph fallback)
+    # STEP 2/3: ChromaDB + Neo4j + static translations (concurrent stages)
     # ============================================================
     use_graph = is_graph_intent(processed_text)
+    route = "graph" if use_graph else "vector"
+    if request.debug:
+        # Routing decisions are memoized, so this reuses the is_graph_intent evaluation
+        debug_info["route_rules"] = route_query(processed_text)["rules"]
+    needs_translation = bool(detected_lang != "en" and openai_client and model)
 
-    facts_en: List[Dict[str, Any]] = []
-    citations: List[Dict[str, Any]] = []
-    answer = ""
-    route = "vector"
-    rag_results: List[Dict[str, Any]] = []
-    
     # Extract symptoms from current query
     current_symptoms = extract_symptoms(processed_text)
-    
+    # Enhance query with conversation history for better context
+    enhanced_query = _enhance_search_query_with_context(processed_text, conversation_history)
+    user_conditions = _collect_user_conditions(profile, processed_text) if use_graph else []
+    city = (profile.city or extract_city(processed_text)) if use_graph else None
+
+    scheduler = StageScheduler(default_timeout=PIPELINE_STAGE_TIMEOUT)
+    scheduler.add(
+        "retrieval",
+        partial(_retrieve_many_stage, [enhanced_query, processed_text, *current_symptoms], k=3 if use_graph else 4),
+        default=[],
+    )
     # Check for symptom relationships when there's conversation history
     # This helps with follow-up questions like "what about left arm pain?" after "chest pain"
-    relationship_facts = _check_symptom_relationships(processed_text, current_symptoms, conversation_history)
-    facts_en.extend(relationship_facts)
-    
-    if safety_result["red_flag"] or current_symptoms:
-        # Use current symptoms for red flag detection
-        symptoms = current_symptoms if current_symptoms else extract_symptoms(processed_text)
-        red_flag_results = graph_get_red_flags(symptoms)
-        if red_flag_results:
-            facts_en.append({"type": "red_flags", "data": red_flag_results})
+    relationship_context = _symptom_relationship_context(processed_text, current_symptoms, conversation_history)
+    # Red flags, profile facts, providers and symptom relationships share one graph round-trip
+    scheduler.add(
+        "graph_facts",
+        partial(
+            graph_get_facts,
+            symptoms=current_symptoms,
+            user_conditions=user_conditions,
+            city=city,
+            related_symptoms=relationship_context["query_symptoms"] if relationship_context else None,
+        ),
+        default={},
+    )
+
+    # Translations of static text only depend on the detected language, so they
+    # run alongside retrieval and generation instead of after them.
+    # Use detected_lang (not target_lang) to respond in the language user typed in
+    if needs_translation:
+        translate_static = partial(_translate_to_user_language, openai_client, model)
+        if mental_health_en["first_aid"]:
+            scheduler.add(
+                "first_aid_translation",
+                partial(_translate_lines, translate_static, mental_health_en["first_aid"], detected_lang),
+                timeout=PIPELINE_TRANSLATION_TIMEOUT,
+                default=mental_health_en["first_aid"],
+            )
+        scheduler.add(
+            "pregnancy_translation",
+            partial(translate_static, "\n".join(PREGNANCY_ALERT_GUIDANCE_EN), detected_lang),
+            timeout=PIPELINE_TRANSLATION_TIMEOUT,
+            default="\n".join(PREGNANCY_ALERT_GUIDANCE_EN),
+        )
+        if not safety_result["red_flag"]:
+            scheduler.add(
+                "disclaimer_translation",
+                partial(translate_static, DISCLAIMER_EN, detected_lang),
+                timeout=PIPELINE_TRANSLATION_TIMEOUT,
+                default=DISCLAIMER_EN,
+            )
+    scheduler.start()
+
+    facts_en: List[Dict[str, Any]] = []
+    citations: List[Dict[str, Any]] = []
+    answer = ""
+
+    rag_results, graph_facts = await scheduler.gather("retrieval", "graph_facts")
+    graph_facts = graph_facts or {}
+    relationship_facts = _build_symptom_relationship_facts(
+        relationship_context, graph_facts.get("related_symptoms", [])
+    )
+    red_flag_results = graph_facts.get("red_flags", [])
+    contras = graph_facts.get("contraindications", [])
+    safe_actions_map = _build_safe_actions_map(graph_facts.get("safe_actions", {}))
+    providers = graph_facts.get("providers", [])
+    rag_results = rag_results or []
+    timings["retrieval"] = scheduler.timings.get("retrieval", 0.0)
+    debug_info["rag_context_snippets"] = [r["chunk"][:200] for r in rag_results]
+
+    facts_en.extend(relationship_facts or [])
+    if red_flag_results:
+        facts_en.append({"type": "red_flags", "data": red_flag_results})
 
     if mental_health_en["crisis"]:
         facts_en.append(
@@ -1961,171 +2466,111 @@ def process_chat_request(
         )
 
     if use_graph:
-        route = "graph"
+        contraindication_fact = _build_contraindication_fact(contras or [], user_conditions)
+        if contraindication_fact:
+            facts_en.append(contraindication_fact)
+
+        if safe_actions_map:
+            facts_en.append(
+                {
+                    "type": "safe_actions",
+                    "data": [
+                        {"condition": cond, "actions": actions}
+                        for cond, actions in safe_actions_map.items()
+                    ],
+                }
+            )
+
+        if providers:
+            facts_en.append({"type": "providers", "data": providers})
+
+        citations = merge_citations(rag_results)
+        debug_info["citations"] = citations
         
-        user_conditions: List[str] = []
-        # Add conditions from boolean fields (for backward compatibility)
+        extras = _build_fact_summary(facts_en) if facts_en else ""
+
+        if personalization_notes:
+            extras += _personalization_block(personalization_notes)
+            if not any(f.get("type") == "personalization" for f in facts_en):
+                facts_en.append({"type": "personalization", "data": personalization_notes})
+
+        context = _pack_rag_context(rag_results, extras, timings)
+
+        answer_history = conversation_history
+    elif not rag_results:
+        context = ""
+    else:
+        citations = merge_citations(rag_results)
+        debug_info["citations"] = citations
+
+        extras = ""
+        personalized_conditions: List[str] = []
         if profile.diabetes:
-            user_conditions.append("Diabetes")
+            personalized_conditions.append("diabetes")
         if profile.hypertension:
-            user_conditions.append("Hypertension")
+            personalized_conditions.append("hypertension")
         if profile.pregnancy:
-            user_conditions.append("Pregnancy")
-        
+            personalized_conditions.append("pregnancy")
         # Add conditions from medical_conditions array
         if hasattr(profile, 'medical_conditions') and profile.medical_conditions:
-            for condition in profile.medical_conditions:
-                # Capitalize first letter for consistency
-                condition_label = condition.capitalize().replace("_", " ")
-                if condition_label not in user_conditions:
-                    user_conditions.append(condition_label)
-
-        condition_keywords = {
-            "diabetes": "Diabetes",
-            "hypertension": "Hypertension",
-            "pregnancy": "Pregnancy",
-            "pregnant": "Pregnancy",
-            "asthma": "Asthma",
-            "heart disease": "Heart disease",
-            "kidney disease": "Kidney disease",
-            "liver disease": "Liver disease",
-            "epilepsy": "Epilepsy",
-        }
-        processed_lower = processed_text.lower()
-        for keyword, label in condition_keywords.items():
-            if keyword in processed_lower and label not in user_conditions:
-                user_conditions.append(label)
-        
-        if user_conditions:
-            contras = graph_get_contraindications(user_conditions)
-            if contras:
-                condition_avoid_map: Dict[str, List[str]] = {}
-                for entry in contras:
-                    avoid_item = entry.get("avoid")
-                    for cond in entry.get("because", []):
-                        if cond in user_conditions and avoid_item:
-                            condition_avoid_map.setdefault(cond, []).append(avoid_item)
-
-                if condition_avoid_map:
-                    facts_en.append(
-                        {
-                    "type": "contraindications",
-                            "data": [
-                                {
-                                    "condition": cond,
-                                    "avoid": sorted(set(items)),
-                                }
-                                for cond, items in condition_avoid_map.items()
-                            ],
-                        }
-                    )
+            personalized_conditions.extend(profile.medical_conditions)
+        if personalized_conditions:
+            extras += (
+                "\n\nNote: User has "
+                + " and ".join(personalized_conditions)
+                + ". Provide relevant precautions."
+            )
 
-            safe_actions_map: Dict[str, List[str]] = {}
-            for condition in user_conditions:
-                safe_entries = graph_get_safe_actions([condition])
-                actions = sorted(
-                    {
-                        entry.get("safeAction")
-                        for entry in safe_entries
-                        if entry.get("safeAction")
-                    }
-                )
-                if actions:
-                    safe_actions_map[condition] = actions
-
-            if safe_actions_map:
-                facts_en.append(
-                    {
-                        "type": "safe_actions",
-                        "data": [
-                            {"condition": cond, "actions": actions}
-                            for cond, actions in safe_actions_map.items()
-                        ],
-                    }
-                )
+        if personalization_notes:
+            extras += _personalization_block(personalization_notes)
+            facts_en.append({"type": "personalization", "data": personalization_notes})
 
-        city = profile.city or extract_city(processed_text)
-        if city:
-            providers = graph_get_providers(city)
-            if providers:
-                facts_en.append({"type": "providers", "data": providers})
-        
-        # ============================================================
-        # STEP 2: ChromaDB (Semantic search)
-        # ============================================================
-        rag_start = time.perf_counter()
-        # Enhance query with conversation history for better context
-        enhanced_query = _enhance_search_query_with_context(processed_text, conversation_history)
-        rag_results = retrieve(enhanced_query, k=3)
-        timings["retrieval"] = time.perf_counter() - rag_start
-        context = "\n\n".join([r["chunk"] for r in rag_results])
-        citations = _filter_md_sources([
-            {
-                "source": r["source"], 
-                "id": r["id"], 
-                "topic": r.get("topic"),
-                "reference_sources": r.get("reference_sources", [])
-            }
-            for r in rag_results
-        ])
-        debug_info["rag_context_snippets"] = [r["chunk"][:200] for r in rag_results]
-        debug_info["citations"] = citations
-        
-        if facts_en:
-            fact_summary = "\n\nRelevant facts from database:\n"
-            for fact_group in facts_en:
-                if fact_group["type"] == "red_flags":
-                    fact_summary += "⚠️ Red flag conditions detected\n"
-                elif fact_group["type"] == "contraindications":
-                    avoid_phrases = []
-                    for entry in fact_group["data"]:
-                        avoid_items = ", ".join(entry["avoid"])
-                        avoid_phrases.append(f"{entry['condition']}: {avoid_items}")
-                    if avoid_phrases:
-                        fact_summary += f"⛔ Things to avoid — {'; '.join(avoid_phrases)}\n"
-                elif fact_group["type"] == "providers":
-                    fact_summary += f"🏥 {len(fact_group['data'])} healthcare providers found\n"
-                elif fact_group["type"] == "symptom_relationships":
-                    for entry in fact_group["data"]:
-                        original = entry.get("original_symptom", "")
-                        related = entry.get("related_symptom", "")
-                        shared_conditions = entry.get("shared_conditions", [])
-                        if original and related and shared_conditions:
-                            fact_summary += f"🔗 {original} and {related} are related symptoms, both associated with: {', '.join(shared_conditions)}\n"
-                            fact_summary += f"   This suggests these symptoms may be part of the same condition cluster.\n"
-                elif fact_group["type"] == "symptom_no_relationship":
-                    current_display = fact_group["data"].get("current_display", "")
-                    history_display = fact_group["data"].get("history_display", "")
-                    fact_summary += f"❌ No relationship found between current symptoms ({current_display}) and history symptoms ({history_display})\n"
-                    fact_summary += f"   These symptoms appear to be unrelated based on available medical knowledge.\n"
-            context += fact_summary
+        context = _pack_rag_context(rag_results, extras, timings)
 
-        if personalization_notes:
-            context += "\n\nPersonalization notes:\n" + "\n".join(
-                f"- {note}" for note in personalization_notes
-            )
-            if not any(f.get("type") == "personalization" for f in facts_en):
-                facts_en.append({"type": "personalization", "data": personalization_notes})
+        answer_history = None
 
+    if not use_graph and not rag_results:
+        answer_en = (
+            "I don't have enough information from my sources. "
+            "For health concerns, please consult a healthcare professional."
+        )
+        localized_answer = localize_text(
+            answer_en,
+            target_lang=target_lang,
+            response_style=response_style,
+        )
+        provider_meta = {
+            "provider": None,
+            "model": None,
+            "fallback": True,
+            "reason": "insufficient_context",
+        }
+        answer = localized_answer
+        debug_info["llm"] = provider_meta
+        debug_info["answer_en"] = answer_en
+        debug_info["answer_localized"] = localized_answer
+    else:
         # ============================================================
         # STEP 4: GPT-4o-mini → Final reasoning + Generate answer in English
         # ============================================================
         generation_start = time.perf_counter()
         
         if openai_client and model:
-            answer_en = generate_final_answer(
+            answer_en, generation_failed = await generate_final_answer_async(
                 client=openai_client,
                 model=model,
                 user_question=processed_text,
                 rag_context=context,
                 facts=facts_en,
                 profile=profile,
-                conversation_history=conversation_history,
+                conversation_history=answer_history,
+                timings=timings,
             )
-            provider_meta = {"provider": "openai", "model": model, "fallback": False}
+            provider_meta = {"provider": "openai", "model": model, "fallback": generation_failed}
         else:
             # Fallback to old method
-            answer_en, provider_meta = generate_answer(
+            answer_en, provider_meta = await asyncio.to_thread(
+                generate_answer,
                 context=context,
                 query_en=processed_text,
                 llm_language_label="English",
@@ -2145,15 +2590,10 @@ def process_chat_request(
         if detected_lang == "en":
             answer = answer_en
             logger.debug("English detected - skipping translation back to user's language step")
-        elif detected_lang != "en" and openai_client and model:
+        elif needs_translation:
             # Translate to user's detected language (always native script, not romanized)
             logger.info(f"Translating answer back to {detected_lang} (native script)")
-            answer = translate_to_user_language(
-                client=openai_client,
-                model=model,
-                english_text=answer_en,
-                target_language=detected_lang,
-            )
+            answer = await _translate_to_user_language(openai_client, model, answer_en, detected_lang)
             logger.debug(f"Translation complete - answer length: {len(answer)} characters")
         else:
             answer = answer_en
@@ -2165,147 +2605,29 @@ def process_chat_request(
         debug_info["llm"] = provider_meta
         debug_info["answer_en"] = answer_en
         debug_info["answer_localized"] = answer
-        
-    else:
-        # ============================================================
-        # STEP 2: ChromaDB (Semantic search)
-        # ============================================================
-        rag_start = time.perf_counter()
-        # Enhance query with conversation history for better context
-        enhanced_query = _enhance_search_query_with_context(processed_text, conversation_history)
-        rag_results = retrieve(enhanced_query, k=4)
-        timings["retrieval"] = time.perf_counter() - rag_start
-        debug_info["rag_context_snippets"] = [r["chunk"][:200] for r in rag_results] if rag_results else []
-        
-        if not rag_results:
-            answer_en = (
-                "I don't have enough information from my sources. "
-                "For health concerns, please consult a healthcare professional."
-            )
-            localized_answer = localize_text(
-                answer_en,
-                target_lang=target_lang,
-                response_style=response_style,
-            )
-            provider_meta = {
-                "provider": None,
-                "model": None,
-                "fallback": True,
-                "reason": "insufficient_context",
-            }
-            answer = localized_answer
-            debug_info["llm"] = provider_meta
-            debug_info["answer_en"] = answer_en
-            debug_info["answer_localized"] = localized_answer
-        else:
-            context = "\n\n".join([r["chunk"] for r in rag_results])
-            citations = _filter_md_sources([
-                {
-                    "source": r["source"], 
-                    "id": r["id"], 
-                    "topic": r.get("topic"),
-                    "reference_sources": r.get("reference_sources", [])
-                }
-                for r in rag_results
-            ])
-            debug_info["citations"] = citations
-
-            personalized_conditions: List[str] = []
-            if profile.diabetes:
-                personalized_conditions.append("diabetes")
-            if profile.hypertension:
-                personalized_conditions.append("hypertension")
-            if profile.pregnancy:
-                personalized_conditions.append("pregnancy")
-            # Add conditions from medical_conditions array
-            if hasattr(profile, 'medical_conditions') and profile.medical_conditions:
-                personalized_conditions.extend(profile.medical_conditions)
-            if personalized_conditions:
-                context += (
-                    "\n\nNote: User has "
-                    + " and ".join(personalized_conditions)
-                    + ". Provide relevant precautions."
-                )
-
-            if personalization_notes:
-                context += "\n\nPersonalization notes:\n" + "\n".join(
-                    f"- {note}" for note in personalization_notes
-                )
-                facts_en.append({"type": "personalization", "data": personalization_notes})
 
-            # ============================================================
-            # STEP 4: GPT-4o-mini → Final reasoning + Generate answer in English
-            # ============================================================
-            generation_start = time.perf_counter()
-            
-            if openai_client and model:
-                answer_en = generate_final_answer(
-                    client=openai_client,
-                    model=model,
-                    user_question=processed_text,
-                    rag_context=context,
-                    facts=facts_en,
-                    profile=profile,
-                )
-                provider_meta = {"provider": "openai", "model": model, "fallback": False}
-            else:
-                # Fallback to old method
-                answer_en, provider_meta = generate_answer(
-                    context=context,
-                    query_en=processed_text,
-                    llm_language_label="English",
-                    original_query=text,
-                    facts=facts_en,
-                    citations=citations,
-                )
-            
-            # ============================================================
-            # STEP 5: GPT-4o-mini → Translate answer back to user's language (native script)
-            # SKIP if English detected
-            # ============================================================
-            translation_start = time.perf_counter()
-            
-            # Skip translation back if English was detected (optimization)
-            # Use detected_lang (not target_lang) to respond in the language user typed in
-            if detected_lang == "en":
-                answer = answer_en
-                logger.debug("English detected - skipping translation back to user's language step")
-            elif detected_lang != "en" and openai_client and model:
-                # Translate to user's detected language (always native script, not romanized)
-                logger.info(f"Translating answer back to {detected_lang} (native script)")
-                answer = translate_to_user_language(
-                    client=openai_client,
-                    model=model,
-                    english_text=answer_en,
-                    target_language=detected_lang,
-                )
-                logger.debug(f"Translation complete - answer length: {len(answer)} characters")
-            else:
-                answer = answer_en
-                logger.warning(f"Translation skipped - detected_lang: {detected_lang}, openai_client: {bool(openai_client)}, model: {model}")
-            
-            timings["answer_generation"] = time.perf_counter() - generation_start
-            timings["answer_translation"] = time.perf_counter() - translation_start
-            
-            debug_info["llm"] = provider_meta
-            debug_info["answer_en"] = answer_en
-            debug_info["answer_localized"] = answer
+    # Static translations were started alongside retrieval; by now they are usually done
+    mental_health_display = mental_health_en
+    pregnancy_guidance_display = PREGNANCY_ALERT_GUIDANCE_EN
+    if needs_translation:
+        translated_first_aid, translated_guidance = await scheduler.gather(
+            "first_aid_translation", "pregnancy_translation"
+        )
+        if translated_first_aid:
+            mental_health_display = {
+                **mental_health_en,
+                "first_aid": translated_first_aid,
+            }
+        if translated_guidance:
+            pregnancy_guidance_display = translated_guidance.split("\n")
+    pregnancy_alert_display = {
+        **pregnancy_alert_en,
+        "guidance": pregnancy_guidance_display,
+    }
 
     if not safety_result["red_flag"]:
-        # Translate disclaimer to user's language (skip if English detected)
-        # Use detected_lang (not target_lang) to respond in the language user typed in
-        disclaimer_en = DISCLAIMER_EN
-        if detected_lang == "en":
-            disclaimer = disclaimer_en
-        elif detected_lang != "en" and openai_client and model:
-            disclaimer = translate_to_user_language(
-                client=openai_client,
-                model=model,
-                english_text=disclaimer_en,
-                target_language=detected_lang,
-            )
-        else:
-            disclaimer = disclaimer_en
+        # Translated disclaimer if the language needs it (skip if English detected)
+        disclaimer = await scheduler.result("disclaimer_translation", default=DISCLAIMER_EN)
         answer += "\n\n" + disclaimer
 
     # Translate facts if needed (simplified - keeping facts in English for now)
@@ -2343,6 +2665,27 @@ def process_chat_request(
             "pipeline": "new_multilingual",
         },
     )
+    for stage_name, stage_duration in scheduler.timings.items():
+        timings.setdefault(stage_name, stage_duration)
+    if scheduler.errors:
+        debug_info["stage_errors"] = scheduler.errors
+
+    # Only complete, non-degraded answers are cached
+    llm_meta = debug_info.get("llm") or {}
+    if (
+        answer_cache.enabled
+        and not cache_bypass
+        and not scheduler.errors
+        and not llm_meta.get("fallback")
+    ):
+        await answer_cache.store(
+            processed_text,
+            detected_lang,
+            cache_profile,
+            cache_index_version,
+            {"answer": answer, "route": route, "facts": facts_response, "citations": citations},
+            embedding=query_embedding,
+        )
     timings["total"] = time.perf_counter() - total_start
 
     metadata_payload: Dict[str, Any] = {
@@ -2429,56 +2772,45 @@ async def save_chat_messages_background(
         logger.info(f"✅ Saved message with {len(assistant_response.citations) if assistant_response.citations else 0} citations to database")
         
         # Invalidate cache for customer sessions and session messages after saving
+        # (one generation bump per tag makes every cached page size stale), and
+        # update the conversation history cache instead of invalidating it, so
+        # the next message does not fetch it from the DB. The two writes run
+        # concurrently: one round-trip.
         cache_invalidated = 0
         try:
-            if customer_id:
-                # Invalidate customer sessions cache (all limits)
-                for limit_val in [10, 50, 100, 200, 500, 1000]:
-                    cache_key = f"sessions:{customer_id}:{limit_val}"
-                    await cache_service.delete(cache_key)
-                    cache_invalidated += 1
-                    logger.debug(f"Invalidated cache: {cache_key}")
+            conversation_history_key = _history_cache_key(session_id)
+            # Usually served from L1: the chat request just read it
+            existing_history = await cache_service.get(conversation_history_key)
+            if existing_history is None:
+                existing_history = []
+            
+            # Append new messages to the cached history
+            # Format: [{"role": "user", "content": "..."}, {"role": "assistant", "content": "..."}]
+            new_messages = [
+                {"role": "user", "content": user_message},
+                {"role": "assistant", "content": assistant_response.answer}
+            ]
             
-            # Invalidate session messages cache (all limits)
-            if session_id:
-                for limit_val in [10, 50, 100, 200, 500, 1000]:
-                    cache_key = f"session_messages:{session_id}:{limit_val}"
-                    await cache_service.delete(cache_key)
-                    cache_invalidated += 1
-                    logger.debug(f"Invalidated cache: {cache_key}")
-                # Invalidate full session cache
-                await cache_service.delete(f"session_full:{session_id}")
+            # Append new messages and keep only last 20 messages (limit used in _get_conversation_history)
+            updated_history = (existing_history + new_messages)[-20:]
+            
+            tags = _session_tags(session_id, customer_id)
+            invalidated, history_updated = await asyncio.gather(
+                cache_service.invalidate_tags(tags),
+                cache_service.set(conversation_history_key, updated_history, ttl=120),  # 2 minute TTL
+                return_exceptions=True,
+            )
+            if invalidated is True:
+                cache_invalidated += len(tags)
+                logger.debug(f"Invalidated cache tags: {tags}")
+            if history_updated is True:
+                logger.debug(f"Updated conversation history cache: {conversation_history_key} (now has {len(updated_history)} messages)")
+            else:
+                # If cache update fails, just invalidate it (fallback)
+                logger.warning(f"Failed to update conversation history cache, invalidating instead: {history_updated}")
+                await cache_service.delete(conversation_history_key)
                 cache_invalidated += 1
-                logger.debug(f"Invalidated cache: session_full:{session_id}")
-                
-                # Update conversation history cache instead of invalidating it
-                # This avoids fetching from DB on every new message
-                conversation_history_key = f"conversation_history:{session_id}"
-                try:
-                    # Get existing cached history
-                    existing_history = await cache_service.get(conversation_history_key)
-                    if existing_history is None:
-                        existing_history = []
-                    
-                    # Append new messages to the cached history
-                    # Format: [{"role": "user", "content": "..."}, {"role": "assistant", "content": "..."}]
-                    new_messages = [
-                        {"role": "user", "content": user_message},
-                        {"role": "assistant", "content": assistant_response.answer}
-                    ]
-                    
-                    # Append new messages and keep only last 20 messages (limit used in _get_conversation_history)
-                    updated_history = (existing_history + new_messages)[-20:]
-                    
-                    # Update cache with new history (2 minute TTL)
-                    await cache_service.set(conversation_history_key, updated_history, ttl=120)
-                    logger.debug(f"Updated conversation history cache: {conversation_history_key} (now has {len(updated_history)} messages)")
-                except Exception as cache_error:
-                    # If cache update fails, just invalidate it (fallback)
-                    logger.warning(f"Failed to update conversation history cache, invalidating instead: {cache_error}")
-                    await cache_service.delete(conversation_history_key)
-                    cache_invalidated += 1
-                    logger.debug(f"Invalidated cache: {conversation_history_key}")
+                logger.debug(f"Invalidated cache: {conversation_history_key}")
         except Exception as e:
             logger.warning(f"Failed to invalidate cache: {e}", exc_info=True)
         
@@ -2524,16 +2856,22 @@ async def chat(
         customer_id = user.get("user_id") or request.customer_id
         session_id = request.session_id
         
-        # Resolve hashed session ID if needed
+        # Resolve hashed session ID if needed; the hash mapping is read together
+        # with the session's cached history
+        session_cache: Dict[str, Any] = {}
         if session_id:
             from .services.session_hash import resolve_session_id, is_hashed_session_id
+            session_cache = await _read_session_cache(session_id)
             if is_hashed_session_id(session_id):
-                resolved_id = await resolve_session_id(session_id, db_service, customer_id=customer_id)
+                resolved_id = await resolve_session_id(
+                    session_id, db_service, customer_id=customer_id, cached=session_cache
+                )
                 if resolved_id:
                     session_id = resolved_id
                 # If resolution fails, continue with None (will create new session)
         
         # Prepare session in background (non-blocking, but needed for message saving)
+        cached_history = None
         if db_client.is_connected():
             try:
                 # Update authenticated user's profile if needed
@@ -2565,12 +2903,8 @@ async def chat(
                 
                 if chat_session:
                     session_id = chat_session["id"]
-                    # Store hash mapping for the session
-                    try:
-                        from .services.session_hash import store_session_hash_mapping
-                        await store_session_hash_mapping(session_id)
-                    except Exception as e:
-                        logger.warning(f"Failed to store session hash mapping: {e}")
+                    # Store hash mapping for the session (and prefetch its history)
+                    cached_history = await _prepare_session_cache(session_id, session_cache)
             except HTTPException:
                 raise
             except Exception as e:
@@ -2587,7 +2921,9 @@ async def chat(
             # Fall back to database if not provided in request
             try:
                 logger.info(f"Retrieving conversation history for session_id: {session_id}")
-                conversation_history = await _get_conversation_history(session_id, customer_id=customer_id)
+                conversation_history = await _get_conversation_history(
+                    session_id, customer_id=customer_id, cached_history=cached_history
+                )
                 if conversation_history:
                     logger.info(f"Retrieved {len(conversation_history)} previous messages for context")
                     logger.debug(f"Conversation history: {[msg.get('role') + ': ' + msg.get('content', '')[:50] for msg in conversation_history[:3]]}")
@@ -2598,9 +2934,9 @@ async def chat(
         else:
             logger.debug(f"No conversation history - session_id: {session_id}, db_connected: {db_client.is_connected() if db_client else False}")
         
-        # Process chat request (no caching for chat responses)
+        # Process chat request (served from the opt-in answer cache when possible)
         # This is the main work - generate AI response
-        response, target_lang, timings = process_chat_request(request, conversation_history=conversation_history)
+        response, target_lang, timings = await process_chat_request(request, conversation_history=conversation_history)
         
         # Add customer_id and session_id to response metadata
         if customer_id:
@@ -2621,7 +2957,7 @@ async def chat(
                 target_lang=target_lang,
             )
         
-        # Note: Chat responses are NOT cached - only dynamic content (sessions, messages) is cached
+        # Chat responses are only cached when ENABLE_ANSWER_CACHE is set (see services/answer_cache.py)
         
         logger.info(
             "Chat response ready",
@@ -2636,7 +2972,7 @@ async def chat(
             },
         )
         
-        # Return response (no caching for chat responses)
+        # Return response
         from fastapi.responses import JSONResponse
         response_data = response.model_dump()
         json_response = JSONResponse(content=response_data)
@@ -2680,55 +3016,17 @@ async def process_chat_request_stream(
     total_start = time.perf_counter()
     
     detection_start = time.perf_counter()
-    openai_client = get_openai_client()
+    openai_client = get_async_openai_client()
     model = _chat_model_openai
     
-    from .pipeline_functions import detect_language_only, translate_to_english
-    
-    detected_lang = None
-    romanized_start = time.perf_counter()
-    romanized_lang = detect_romanized_language(text)
-    pipeline_timings["romanized_detection"] = time.perf_counter() - romanized_start
-    
-    if romanized_lang:
-        detected_lang = romanized_lang
-        logger.info(f"⚡ Fast romanized language detection: {detected_lang} ({pipeline_timings['romanized_detection']*1000:.2f}ms)")
-    
-    if not detected_lang:
-        if openai_client and model:
-            lang_detect_start = time.perf_counter()
-            detected_lang = detect_language_only(
-                client=openai_client,
-                model=model,
-                user_text=text
-            )
-            pipeline_timings["language_detection"] = time.perf_counter() - lang_detect_start
-            logger.info(f"🌐 Language detection via API: {detected_lang} ({pipeline_timings.get('language_detection', 0)*1000:.2f}ms)")
-        else:
-            detected_lang = detect_language(text) if text else DEFAULT_LANG
-            detected_lang = detected_lang if detected_lang in SUPPORTED_LANG_CODES else DEFAULT_LANG
+    detected_lang, processed_text, detector_source = await _detect_and_translate_input(
+        text, openai_client, model, pipeline_timings
+    )
+    logger.info(f"🌐 Language detection: {detected_lang} via {detector_source} ({(time.perf_counter() - detection_start)*1000:.2f}ms)")
     
     requested_lang_raw = request.lang if request.lang in SUPPORTED_LANG_CODES else None
     target_lang = requested_lang_raw or detected_lang or DEFAULT_LANG
     
-    # Translate to English if needed
-    if detected_lang == "en":
-        processed_text = text
-        logger.info(f"✅ Text already in English - skipping translation")
-    else:
-        if openai_client and model:
-            translate_start = time.perf_counter()
-            processed_text = translate_to_english(
-                client=openai_client,
-                model=model,
-                user_text=text,
-                source_language=detected_lang
-            )
-            pipeline_timings["translation_to_english"] = time.perf_counter() - translate_start
-            logger.info(f"🔄 Translation to English: {pipeline_timings.get('translation_to_english', 0)*1000:.2f}ms")
-        else:
-            processed_text = translate_text(text, target_lang="en", src_lang=detected_lang)
-    
     pipeline_timings["detection_total"] = time.perf_counter() - detection_start
     
     # Safety analysis
@@ -2738,253 +3036,269 @@ async def process_chat_request_stream(
     pregnancy_alert_en = detect_pregnancy_emergency(processed_text)
     pipeline_timings["safety_analysis"] = time.perf_counter() - safety_start
     
-    # RAG retrieval - enhance query with conversation history for better context
-    rag_start = time.perf_counter()
-    enhanced_query = _enhance_search_query_with_context(processed_text, conversation_history)
-    rag_results = retrieve(enhanced_query, k=4)
-    pipeline_timings["rag_retrieval"] = time.perf_counter() - rag_start
-    context = "\n\n".join([r["chunk"] for r in rag_results]) if rag_results else ""
-    
-    # Build citations from RAG results
-    raw_citations = []
-    if rag_results:
-        for r in rag_results:
-            citation = {
-                "source": r.get("source", "unknown"), 
-                "id": r.get("id", ""), 
-                "topic": r.get("topic"),
-                "reference_sources": r.get("reference_sources", [])
-            }
-            raw_citations.append(citation)
-            logger.debug(f"RAG result citation: source={citation['source']}, has_refs={len(citation.get('reference_sources', []))}")
-    
-    logger.info(f"📚 Generated {len(raw_citations)} raw citations from {len(rag_results) if rag_results else 0} RAG results")
-    
-    # Filter citations
-    citations = _filter_md_sources(raw_citations) if raw_citations else []
-    
-    logger.info(f"🔍 After filtering: {len(citations)} citations remain (from {len(raw_citations)} raw citations)")
-    if len(raw_citations) > 0 and len(citations) == 0:
-        logger.warning(f"⚠️ All citations filtered out! Sample raw citation: {json.dumps(raw_citations[0] if raw_citations else {}, indent=2)}")
-    
-    # Extract symptoms from current query
+    # Retrieval, graph lookups and the disclaimer translation run as concurrent stages;
+    # generation starts as soon as the stages it needs have finished
     current_symptoms = extract_symptoms(processed_text)
-    
-    # Build facts
-    facts_en: List[Dict[str, Any]] = []
-    
+    enhanced_query = _enhance_search_query_with_context(processed_text, conversation_history)
+    needs_translation = bool(detected_lang != "en" and openai_client and model)
+
+    scheduler = StageScheduler(default_timeout=PIPELINE_STAGE_TIMEOUT)
+    scheduler.add(
+        "rag_retrieval",
+        partial(_retrieve_many_stage, [enhanced_query, processed_text, *current_symptoms], k=4),
+        default=[],
+    )
     # Check for symptom relationships when there's conversation history
     # This helps with follow-up questions like "what about left arm pain?" after "chest pain"
-    relationship_facts = _check_symptom_relationships(processed_text, current_symptoms, conversation_history)
-    facts_en.extend(relationship_facts)
-    
-    if safety_result["red_flag"] or current_symptoms:
-        # Use current symptoms for red flag detection
-        symptoms = current_symptoms if current_symptoms else extract_symptoms(processed_text)
-        red_flag_results = graph_get_red_flags(symptoms)
-        if red_flag_results:
-            facts_en.append({"type": "red_flags", "data": red_flag_results})
-    
-    if mental_health_en["crisis"]:
-        facts_en.append({
-            "type": "mental_health_crisis",
-            "data": {
-                "matched": mental_health_en["matched"],
-                "actions": mental_health_en["first_aid"],
-            },
-        })
-    
-    if pregnancy_alert_en["concern"]:
-        facts_en.append({
-            "type": "pregnancy_alert",
-            "data": {
-                "matched": pregnancy_alert_en["matched"],
-                "guidance": PREGNANCY_ALERT_GUIDANCE_EN,
-            },
-        })
-    
-    # Add personalization notes
-    if personalization_notes:
-        context += "\n\nPersonalization notes:\n" + "\n".join(
-            f"- {note}" for note in personalization_notes
-        )
-        facts_en.append({"type": "personalization", "data": personalization_notes})
-    
-    # Generate the answer (collect all chunks first if translation is needed)
-    answer_en_chunks = []
-    generation_start = time.perf_counter()
-    needs_translation = detected_lang != "en" and openai_client and model
-    
-    if openai_client and model:
-        # Use context if available, otherwise use empty string
-        rag_context = context if context else ""
-        logger.info(f"🤖 Starting AI generation with model: {model}")
-        async for chunk in generate_final_answer_stream(
-            client=openai_client,
-            model=model,
-            user_question=processed_text,
-            rag_context=rag_context,
-            facts=facts_en,
-            profile=profile,
-            conversation_history=conversation_history,
-        ):
-            answer_en_chunks.append(chunk)
-            # Stream English chunks immediately for progress feedback (even if translation is needed)
-            # This gives users immediate feedback while translation happens in background
-            if not needs_translation:
-                yield f"data: {json.dumps({'type': 'chunk', 'content': chunk})}\n\n"
-            else:
-                # For non-English: stream English chunks as "loading" indicator
-                # This shows progress while translation is being prepared
-                yield f"data: {json.dumps({'type': 'chunk', 'content': chunk})}\n\n"
-        pipeline_timings["ai_generation"] = time.perf_counter() - generation_start
-        logger.info(f"✅ AI generation completed: {pipeline_timings['ai_generation']:.2f}s ({len(''.join(answer_en_chunks))} chars)")
-    else:
-        # Fallback: generate a simple response if no client/model available
-        fallback_answer = build_fallback_answer(
-            query_en=processed_text,
-            rag_results=rag_results,
-            facts=facts_en,
-            citations=citations,
-            target_lang="en",
-            response_style="native",
+    relationship_context = _symptom_relationship_context(processed_text, current_symptoms, conversation_history)
+    scheduler.add(
+        "graph_facts",
+        partial(
+            graph_get_facts,
+            symptoms=current_symptoms,
+            related_symptoms=relationship_context["query_symptoms"] if relationship_context else None,
+        ),
+        default={},
+    )
+    if needs_translation and not safety_result["red_flag"]:
+        scheduler.add(
+            "disclaimer_translation",
+            partial(_translate_to_user_language, openai_client, model, DISCLAIMER_EN, detected_lang),
+            timeout=PIPELINE_TRANSLATION_TIMEOUT,
+            default=DISCLAIMER_EN,
         )
-        # Stream the fallback answer character by character for consistency
-        for char in fallback_answer:
-            answer_en_chunks.append(char)
-            # Always stream for progress feedback
-            yield f"data: {json.dumps({'type': 'chunk', 'content': char})}\n\n"
-    
-    # Combine all chunks
-    answer_en = "".join(answer_en_chunks)
-    
-    # Translate if needed, then stream the translated answer
-    translate_back_start = time.perf_counter()
-    if detected_lang == "en":
-        answer = answer_en
-        logger.info(f"✅ Answer already in English - skipping translation back")
-    elif detected_lang != "en" and openai_client and model:
-        logger.info(f"🔄 Translating answer back to {detected_lang}...")
-        answer = translate_to_user_language(
-            client=openai_client,
-            model=model,
-            english_text=answer_en,
-            target_language=detected_lang,
+    scheduler.start()
+
+    try:
+        rag_results, graph_facts = await scheduler.gather("rag_retrieval", "graph_facts")
+        graph_facts = graph_facts or {}
+        relationship_facts = _build_symptom_relationship_facts(
+            relationship_context, graph_facts.get("related_symptoms", [])
         )
-        pipeline_timings["translation_back"] = time.perf_counter() - translate_back_start
-        logger.info(f"✅ Translation back completed: {pipeline_timings.get('translation_back', 0)*1000:.2f}ms")
-        
-        # Stream the translated answer in larger chunks for better performance
-        # Split by sentences and punctuation for natural flow, but larger than word-by-word
-        # Split on sentence endings but keep the punctuation with the sentence
-        sentence_pattern = r'([.!?।]+\s*|[\n]+)'
-        parts = re.split(sentence_pattern, answer)
-        
-        # Clear the English chunks that were shown as loading indicator
-        # Send a signal to clear and replace with translated content
-        yield f"data: {json.dumps({'type': 'translated_start'})}\n\n"
-        
-        # Stream sentence by sentence for natural flow and better performance
-        chunk_buffer = ''
-        for part in parts:
-            if part:
-                chunk_buffer += part
-                # Send chunks every ~50 characters or at sentence boundaries
-                if len(chunk_buffer) >= 50 or part.strip().endswith(('.', '!', '?', '।', '\n')):
-                    yield f"data: {json.dumps({'type': 'chunk', 'content': chunk_buffer})}\n\n"
-                    chunk_buffer = ''
-        
-        # Send any remaining buffer
-        if chunk_buffer:
-            yield f"data: {json.dumps({'type': 'chunk', 'content': chunk_buffer})}\n\n"
-    else:
-        answer = answer_en
-    
-    # Add disclaimer
-    disclaimer_start = time.perf_counter()
-    if not safety_result["red_flag"]:
-        disclaimer_en = DISCLAIMER_EN
-        if detected_lang == "en":
-            disclaimer = disclaimer_en
-        elif detected_lang != "en" and openai_client and model:
-            logger.info(f"🔄 Translating disclaimer to {detected_lang}...")
-            disclaimer = translate_to_user_language(
+        red_flag_results = graph_facts.get("red_flags", [])
+        
+        # Citations are precompiled per document; merging only de-duplicates URLs
+        citations = merge_citations(rag_results) if rag_results else []
+        logger.info(f"📚 {len(citations)} citations from {len(rag_results) if rag_results else 0} RAG results")
+        
+        # Build facts
+        facts_en: List[Dict[str, Any]] = []
+        facts_en.extend(relationship_facts or [])
+        
+        if red_flag_results:
+            facts_en.append({"type": "red_flags", "data": red_flag_results})
+        
+        if mental_health_en["crisis"]:
+            facts_en.append({
+                "type": "mental_health_crisis",
+                "data": {
+                    "matched": mental_health_en["matched"],
+                    "actions": mental_health_en["first_aid"],
+                },
+            })
+        
+        if pregnancy_alert_en["concern"]:
+            facts_en.append({
+                "type": "pregnancy_alert",
+                "data": {
+                    "matched": pregnancy_alert_en["matched"],
+                    "guidance": PREGNANCY_ALERT_GUIDANCE_EN,
+                },
+            })
+        
+        # Add personalization notes
+        if personalization_notes:
+            facts_en.append({"type": "personalization", "data": personalization_notes})
+        # Retrieved chunks are packed into the prompt budget; notes are always kept
+        context = _pack_rag_context(rag_results, _personalization_block(personalization_notes), pipeline_timings)
+        
+        # Generate the answer (collect all chunks first if translation is needed)
+        answer_en_chunks = []
+        answer_chunks: List[str] = []
+        generation_start = time.perf_counter()
+        pipelined_translation = needs_translation and STREAM_TRANSLATION_MODE == "pipelined"
+        
+        if openai_client and model:
+            # Use context if available, otherwise use empty string
+            rag_context = context if context else ""
+            logger.info(f"🤖 Starting AI generation with model: {model}")
+            english_stream = generate_final_answer_stream(
                 client=openai_client,
                 model=model,
-                english_text=disclaimer_en,
-                target_language=detected_lang,
+                user_question=processed_text,
+                rag_context=rag_context,
+                facts=facts_en,
+                profile=profile,
+                conversation_history=conversation_history,
+                timings=pipeline_timings,
             )
-            pipeline_timings["disclaimer_translation"] = time.perf_counter() - disclaimer_start
+            if pipelined_translation:
+                # Segments are translated while generation continues. English chunks are
+                # streamed as a loading indicator until the first translated segment is ready,
+                # then translated_start clears them and translated segments follow in order.
+                logger.info(f"🔄 Pipelined translation to {detected_lang} enabled")
+                translated_started = False
+                async for kind, content in stream_with_pipelined_translation(
+                    english_stream,
+                    partial(_translate_to_user_language, openai_client, model, target_language=detected_lang),
+                    concurrency=STREAM_TRANSLATION_CONCURRENCY,
+                ):
+                    if kind == "source":
+                        answer_en_chunks.append(content)
+                        if not translated_started:
+                            yield f"data: {json.dumps({'type': 'chunk', 'content': content})}\n\n"
+                        continue
+                    if not translated_started:
+                        translated_started = True
+                        pipeline_timings["first_translated_chunk"] = time.perf_counter() - generation_start
+                        yield f"data: {json.dumps({'type': 'translated_start'})}\n\n"
+                    answer_chunks.append(content)
+                    yield f"data: {json.dumps({'type': 'chunk', 'content': content})}\n\n"
+            else:
+                async for chunk in english_stream:
+                    answer_en_chunks.append(chunk)
+                    # Stream English chunks immediately for progress feedback (even if translation is needed)
+                    # For non-English this is a "loading" indicator while translation is being prepared
+                    yield f"data: {json.dumps({'type': 'chunk', 'content': chunk})}\n\n"
+            pipeline_timings["ai_generation"] = time.perf_counter() - generation_start
+            logger.info(f"✅ AI generation completed: {pipeline_timings['ai_generation']:.2f}s ({len(''.join(answer_en_chunks))} chars)")
         else:
-            disclaimer = disclaimer_en
-        
-        # Stream disclaimer (always stream, whether translated or not)
-        # Use larger chunks for better performance
-        disclaimer_text = "\n\n" + disclaimer
-        # Split into sentences for natural streaming
-        sentence_pattern = r'([.!?।]+\s*|[\n]+)'
-        parts = re.split(sentence_pattern, disclaimer_text)
-        
-        chunk_buffer = ''
-        for part in parts:
-            if part:
-                chunk_buffer += part
-                # Send chunks every ~50 characters or at sentence boundaries
-                if len(chunk_buffer) >= 50 or part.strip().endswith(('.', '!', '?', '।', '\n')):
-                    yield f"data: {json.dumps({'type': 'chunk', 'content': chunk_buffer})}\n\n"
-                    chunk_buffer = ''
-        
-        # Send any remaining buffer
-        if chunk_buffer:
-            yield f"data: {json.dumps({'type': 'chunk', 'content': chunk_buffer})}\n\n"
+            # Fallback: generate a simple response if no client/model available
+            fallback_answer = build_fallback_answer(
+                query_en=processed_text,
+                rag_results=rag_results,
+                facts=facts_en,
+                citations=citations,
+                target_lang="en",
+                response_style="native",
+            )
+            # Stream the fallback answer character by character for consistency
+            for char in fallback_answer:
+                answer_en_chunks.append(char)
+                # Always stream for progress feedback
+                yield f"data: {json.dumps({'type': 'chunk', 'content': char})}\n\n"
         
-        answer += "\n\n" + disclaimer
-    
-    # Log total pipeline timing
-    total_time = time.perf_counter() - total_start
-    pipeline_timings["total"] = total_time
-    
-    logger.info(
-        f"⏱️ PIPELINE TIMING SUMMARY: "
-        f"Total={total_time:.2f}s | "
-        f"Detection={pipeline_timings.get('detection_total', 0):.2f}s | "
-        f"Safety={pipeline_timings.get('safety_analysis', 0):.3f}s | "
-        f"RAG={pipeline_timings.get('rag_retrieval', 0):.3f}s | "
-        f"AI={pipeline_timings.get('ai_generation', 0):.2f}s | "
-        f"Translation={pipeline_timings.get('translation_back', 0):.3f}s"
-    )
-    
-    # Send completion message with full response metadata
-    safety_payload = {
-        **safety_result,
-        "mental_health": mental_health_en,
-        "pregnancy": pregnancy_alert_en,
-    }
-    
-    completion_data = {
-        "type": "done",
-        "answer": answer,
-        "route": "vector",
-        "facts": facts_en,
-        "citations": citations,
-        "safety": safety_payload,
-        "metadata": {
-            "target_language": target_lang,
-            "detected_language": detected_lang,
+        # Combine all chunks
+        answer_en = "".join(answer_en_chunks)
+        
+        # Translate if needed, then stream the translated answer
+        translate_back_start = time.perf_counter()
+        if detected_lang == "en":
+            answer = answer_en
+            logger.info(f"✅ Answer already in English - skipping translation back")
+        elif pipelined_translation:
+            # Already translated and streamed segment by segment during generation
+            answer = "".join(answer_chunks)
+            pipeline_timings["translation_back"] = 0.0
+        elif detected_lang != "en" and openai_client and model:
+            logger.info(f"🔄 Translating answer back to {detected_lang}...")
+            answer = await _translate_to_user_language(openai_client, model, answer_en, detected_lang)
+            pipeline_timings["translation_back"] = time.perf_counter() - translate_back_start
+            logger.info(f"✅ Translation back completed: {pipeline_timings.get('translation_back', 0)*1000:.2f}ms")
+            
+            # Stream the translated answer in larger chunks for better performance
+            # Split by sentences and punctuation for natural flow, but larger than word-by-word
+            # Split on sentence endings but keep the punctuation with the sentence
+            sentence_pattern = r'([.!?।]+\s*|[\n]+)'
+            parts = re.split(sentence_pattern, answer)
+            
+            # Clear the English chunks that were shown as loading indicator
+            # Send a signal to clear and replace with translated content
+            yield f"data: {json.dumps({'type': 'translated_start'})}\n\n"
+            
+            # Stream sentence by sentence for natural flow and better performance
+            chunk_buffer = ''
+            for part in parts:
+                if part:
+                    chunk_buffer += part
+                    # Send chunks every ~50 characters or at sentence boundaries
+                    if len(chunk_buffer) >= 50 or part.strip().endswith(('.', '!', '?', '।', '\n')):
+                        yield f"data: {json.dumps({'type': 'chunk', 'content': chunk_buffer})}\n\n"
+                        chunk_buffer = ''
+            
+            # Send any remaining buffer
+            if chunk_buffer:
+                yield f"data: {json.dumps({'type': 'chunk', 'content': chunk_buffer})}\n\n"
+        else:
+            answer = answer_en
+        
+        # Add disclaimer (translation was started before generation and is usually done by now)
+        if not safety_result["red_flag"]:
+            disclaimer = await scheduler.result("disclaimer_translation", default=DISCLAIMER_EN)
+            
+            # Stream disclaimer (always stream, whether translated or not)
+            # Use larger chunks for better performance
+            disclaimer_text = "\n\n" + disclaimer
+            # Split into sentences for natural streaming
+            sentence_pattern = r'([.!?।]+\s*|[\n]+)'
+            parts = re.split(sentence_pattern, disclaimer_text)
+            
+            chunk_buffer = ''
+            for part in parts:
+                if part:
+                    chunk_buffer += part
+                    # Send chunks every ~50 characters or at sentence boundaries
+                    if len(chunk_buffer) >= 50 or part.strip().endswith(('.', '!', '?', '।', '\n')):
+                        yield f"data: {json.dumps({'type': 'chunk', 'content': chunk_buffer})}\n\n"
+                        chunk_buffer = ''
+            
+            # Send any remaining buffer
+            if chunk_buffer:
+                yield f"data: {json.dumps({'type': 'chunk', 'content': chunk_buffer})}\n\n"
+            
+            answer += "\n\n" + disclaimer
+        
+        # Log total pipeline timing
+        for stage_name, stage_duration in scheduler.timings.items():
+            pipeline_timings.setdefault(stage_name, stage_duration)
+        total_time = time.perf_counter() - total_start
+        pipeline_timings["total"] = total_time
+        
+        logger.info(
+            f"⏱️ PIPELINE TIMING SUMMARY: "
+            f"Total={total_time:.2f}s | "
+            f"Detection={pipeline_timings.get('detection_total', 0):.2f}s | "
+            f"Safety={pipeline_timings.get('safety_analysis', 0):.3f}s | "
+            f"RAG={pipeline_timings.get('rag_retrieval', 0):.3f}s | "
+            f"AI={pipeline_timings.get('ai_generation', 0):.2f}s | "
+            f"Translation={pipeline_timings.get('translation_back', 0):.3f}s"
+        )
+        
+        # Send completion message with full response metadata
+        safety_payload = {
+            **safety_result,
+            "mental_health": mental_health_en,
+            "pregnancy": pregnancy_alert_en,
         }
-    }
-    
-    # Store English answer in metadata for non-English prompts (for DB persistence)
-    if detected_lang != "en":
-        completion_data["metadata"]["english_answer"] = answer_en
-    
-    # Add session_id and customer_id to metadata if available
-    if session_id:
-        completion_data["metadata"]["session_id"] = session_id
-    if customer_id:
-        completion_data["metadata"]["customer_id"] = customer_id
-    
-    yield f"data: {json.dumps(completion_data)}\n\n"
+        
+        completion_data = {
+            "type": "done",
+            "answer": answer,
+            "route": "vector",
+            "facts": facts_en,
+            "citations": citations,
+            "safety": safety_payload,
+            "metadata": {
+                "target_language": target_lang,
+                "detected_language": detected_lang,
+                "timings": pipeline_timings,
+            }
+        }
+        
+        # Store English answer in metadata for non-English prompts (for DB persistence)
+        if detected_lang != "en":
+            completion_data["metadata"]["english_answer"] = answer_en
+        
+        # Add session_id and customer_id to metadata if available
+        if session_id:
+            completion_data["metadata"]["session_id"] = session_id
+        if customer_id:
+            completion_data["metadata"]["customer_id"] = customer_id
+        
+        yield f"data: {json.dumps(completion_data)}\n\n"
+    finally:
+        # Stages still running when the client disconnects (or generation fails) are not left behind
+        scheduler.cancel()
 
 
 @app.post("/chat/stream")
@@ -3009,16 +3323,22 @@ async def chat_stream(
         customer_id = user.get("user_id") or request.customer_id
         session_id = request.session_id
         
-        # Resolve hashed session ID if needed
+        # Resolve hashed session ID if needed; the hash mapping is read together
+        # with the session's cached history
+        session_cache: Dict[str, Any] = {}
         if session_id:
             from .services.session_hash import resolve_session_id, is_hashed_session_id
+            session_cache = await _read_session_cache(session_id)
             if is_hashed_session_id(session_id):
-                resolved_id = await resolve_session_id(session_id, db_service, customer_id=customer_id)
+                resolved_id = await resolve_session_id(
+                    session_id, db_service, customer_id=customer_id, cached=session_cache
+                )
                 if resolved_id:
                     session_id = resolved_id
                 # If resolution fails, continue with None (will create new session)
         
         # Prepare session
+        cached_history = None
         if db_client.is_connected():
             try:
                 profile_data = request.profile.model_dump(exclude_none=True)
@@ -3044,12 +3364,8 @@ async def chat_stream(
                 
                 if chat_session:
                     session_id = chat_session["id"]
-                    # Store hash mapping for the session
-                    try:
-                        from .services.session_hash import store_session_hash_mapping
-                        await store_session_hash_mapping(session_id)
-                    except Exception as e:
-                        logger.warning(f"Failed to store session hash mapping: {e}")
+                    # Store hash mapping for the session (and prefetch its history)
+                    cached_history = await _prepare_session_cache(session_id, session_cache)
             except HTTPException:
                 raise
             except Exception as e:
@@ -3066,7 +3382,9 @@ async def chat_stream(
             # Fall back to database if not provided in request
             try:
                 logger.info(f"Retrieving conversation history for session_id: {session_id}")
-                conversation_history = await _get_conversation_history(session_id, customer_id=customer_id)
+                conversation_history = await _get_conversation_history(
+                    session_id, customer_id=customer_id, cached_history=cached_history
+                )
                 if conversation_history:
                     logger.info(f"Retrieved {len(conversation_history)} previous messages for context")
                     logger.debug(f"Conversation history: {[msg.get('role') + ': ' + msg.get('content', '')[:50] for msg in conversation_history[:3]]}")
@@ -3203,6 +3521,10 @@ async def get_cache_stats(
     return {
         "statistics": stats,
         "info": info,
+        "translation_memory": translation_memory.get_statistics(),
+        "answer_cache": answer_cache.get_statistics(),
+        "query_embeddings": query_embedding_cache.get_statistics(),
+        "retrieval_results": retrieval_cache.get_statistics(),
     }
 
 
@@ -3242,6 +3564,32 @@ async def invalidate_cache_endpoint(
     }
 
 
+@app.post("/graph/reload")
+async def reload_graph_snapshot_endpoint(
+    source: Optional[str] = None,
+    user: dict = Depends(require_auth)
+):
+    """
+    Rebuild the in-process graph snapshot from the CSV files or Neo4j
+    Requires authentication and admin role
+    """
+    user_role = user.get("role", "user")
+    if user_role != "admin":
+        raise HTTPException(status_code=403, detail="Only admins can reload the graph snapshot")
+
+    try:
+        snapshot, previous_version = await asyncio.to_thread(reload_snapshot, source)
+    except Exception as e:
+        logger.error(f"Graph snapshot reload failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Graph snapshot reload failed") from e
+
+    return {
+        **snapshot.info(),
+        "previous_version": previous_version,
+        "changed": previous_version != snapshot.version,
+    }
+
+
 @app.post("/voice-chat", response_model=VoiceChatResponse)
 async def voice_chat(
     background_tasks: BackgroundTasks,
@@ -3263,7 +3611,7 @@ async def voice_chat(
     try:
         audio_bytes = await audio.read()
         stt_start = time.perf_counter()
-        transcript = transcribe_audio_bytes(audio_bytes, language_hint=lang)
+        transcript = await asyncio.to_thread(transcribe_audio_bytes, audio_bytes, language_hint=lang)
         stt_duration = time.perf_counter() - stt_start
 
         profile_payload: Dict[str, Any] = {}
@@ -3285,6 +3633,7 @@ async def voice_chat(
         )
 
         # Prepare session (non-blocking, but needed for message saving)
+        cached_history = None
         if db_client.is_connected():
             try:
                 profile_data = chat_request.profile.model_dump(exclude_none=True)
@@ -3311,12 +3660,8 @@ async def voice_chat(
                 
                 if chat_session:
                     session_id = chat_session["id"]
-                    # Store hash mapping for the session
-                    try:
-                        from .services.session_hash import store_session_hash_mapping
-                        await store_session_hash_mapping(session_id)
-                    except Exception as e:
-                        logger.warning(f"Failed to store session hash mapping: {e}")
+                    # Store hash mapping for the session (and prefetch its history)
+                    cached_history = await _prepare_session_cache(session_id)
                     session_id = chat_session["id"]
             except HTTPException:
                 raise
@@ -3327,14 +3672,16 @@ async def voice_chat(
         conversation_history = []
         if session_id and db_client.is_connected():
             try:
-                conversation_history = await _get_conversation_history(session_id, customer_id=customer_id)
+                conversation_history = await _get_conversation_history(
+                    session_id, customer_id=customer_id, cached_history=cached_history
+                )
                 if conversation_history:
                     logger.debug(f"Retrieved {len(conversation_history)} previous messages for context")
             except Exception as e:
                 logger.warning(f"Failed to retrieve conversation history: {e}", exc_info=True)
 
         # Process chat request - generate AI response
-        chat_response, target_lang, chat_timings = process_chat_request(chat_request, conversation_history=conversation_history)
+        chat_response, target_lang, chat_timings = await process_chat_request(chat_request, conversation_history=conversation_history)
 
         # Queue background task to save messages (non-blocking)
         # This allows the response to be returned immediately
@@ -3350,7 +3697,9 @@ async def voice_chat(
             )
 
         tts_start = time.perf_counter()
-        audio_bytes_out, tts_provider, audio_mime = synthesize_speech(chat_response.answer, target_lang)
+        audio_bytes_out, tts_provider, audio_mime = await asyncio.to_thread(
+            synthesize_speech, chat_response.answer, target_lang
+        )
         tts_duration = time.perf_counter() - tts_start
 
         metadata = {
@@ -3563,35 +3912,33 @@ async def get_customer_sessions(
             detail="You can only view your own sessions"
         )
     
-    # Try to get from Redis cache first
-    cache_key = f"sessions:{customer_id}:{limit}"
-    cached_result = await cache_service.get(cache_key)
-    if cached_result is not None:
-        logger.debug(f"Cache hit for customer sessions: {customer_id}")
-        return cached_result
-    
-    # If not in cache, fetch from database
-    sessions = await db_service.get_customer_sessions(customer_id, limit=limit)
-    result = []
-    for session in sessions:
-        # Use last_activity_at (last message time) if available, otherwise use session created_at
-        last_activity = session.get("last_activity_at") or session.get("created_at")
-        result.append({
-            "id": session["id"],
-            "customerId": session["customer_id"],
-            "createdAt": session["created_at"].isoformat() if session.get("created_at") else None,
-            "updatedAt": session["updated_at"].isoformat() if session.get("updated_at") else None,
-            "lastActivityAt": last_activity.isoformat() if last_activity else None,  # Last message time (for display)
-            "language": session.get("language"),
-            "sessionMetadata": session.get("session_metadata"),
-            "messageCount": session.get("message_count", 0),  # Already included in query
-            "firstMessage": session.get("first_message_text"),  # Already included in query
-        })
-    
-    # Cache the result for 5 minutes (300 seconds)
-    await cache_service.set(cache_key, result, ttl=300)
+    async def load_sessions() -> List[Dict[str, Any]]:
+        sessions = await db_service.get_customer_sessions(customer_id, limit=limit)
+        result = []
+        for session in sessions:
+            # Use last_activity_at (last message time) if available, otherwise use session created_at
+            last_activity = session.get("last_activity_at") or session.get("created_at")
+            result.append({
+                "id": session["id"],
+                "customerId": session["customer_id"],
+                "createdAt": session["created_at"].isoformat() if session.get("created_at") else None,
+                "updatedAt": session["updated_at"].isoformat() if session.get("updated_at") else None,
+                "lastActivityAt": last_activity.isoformat() if last_activity else None,  # Last message time (for display)
+                "language": session.get("language"),
+                "sessionMetadata": session.get("session_metadata"),
+                "messageCount": session.get("message_count", 0),  # Already included in query
+                "firstMessage": session.get("first_message_text"),  # Already included in query
+            })
+        
+        return result
     
-    return result
+    # Cached for 5 minutes; every page size is invalidated together through the customer tag
+    return await cache_service.get_or_load(
+        f"sessions:{customer_id}:{limit}",
+        load_sessions,
+        ttl=300,
+        tags=_session_tags(None, customer_id),
+    )
 
 
 @app.get("/session/{session_id}/messages")
@@ -3649,84 +3996,38 @@ async def get_session_messages(
                 detail="You can only view messages from your own sessions"
             )
     
-    # Try to get from Redis cache first
-    cache_key = f"session_messages:{session_id}:{limit}"
-    cached_messages = await cache_service.get(cache_key)
-    if cached_messages is not None:
-        logger.debug(f"Cache hit for session messages: {session_id}")
-        # Apply filter to cached messages as well to ensure only .md sources are shown
-        filtered_cached = []
-        for msg in cached_messages:
-            filtered_msg = msg.copy()
-            # Parse citations if it's a string
-            citations = filtered_msg.get("citations")
-            if isinstance(citations, str):
-                try:
-                    citations = json.loads(citations) if citations else []
-                except (json.JSONDecodeError, TypeError):
-                    citations = []
-            elif citations is None:
-                citations = []
-            # Filter citations to only show .md file references
-            filtered_msg["citations"] = _filter_md_sources(citations) if citations else []
-            filtered_cached.append(filtered_msg)
-        return filtered_cached
-    
-    # If not in cache, fetch from database
-    messages = await db_service.get_session_messages(session_id, limit=limit, customer_id=user_id)
-    result = []
-    for message in messages:
-        # Parse citations from JSONB if it's a string
-        citations = message.get("citations")
-        if isinstance(citations, str):
-            try:
-                citations = json.loads(citations) if citations else []
-            except (json.JSONDecodeError, TypeError):
-                citations = []
-        elif citations is None:
-            citations = []
+    async def load_messages() -> List[Dict[str, Any]]:
+        messages = await db_service.get_session_messages(session_id, limit=limit, customer_id=user_id)
+        result = []
+        for message in messages:
+            citations = _stored_citations(message.get("citations"))
+            
+            result.append({
+                "id": message["id"],
+                "sessionId": message["session_id"],
+                "createdAt": message["created_at"].isoformat() if message.get("created_at") else None,
+                "role": message["role"],
+                "messageText": message["message_text"],
+                "language": message.get("language"),
+                "route": message.get("route"),
+                "answer": message.get("answer"),
+                "safetyData": message.get("safety_data"),
+                "facts": message.get("facts"),
+                "citations": citations,  # Always include citations, even if empty
+                "metadata": message.get("metadata"),
+                "userFeedback": message.get("user_feedback"),  # Include feedback from message_feedback table
+            })
         
-        # Debug: Log citations before filtering
-        if message.get("role") == "assistant" and citations:
-            logger.debug(f"Message {message.get('id')} has {len(citations)} citations before filtering")
-            logger.debug(f"Sample citation structure: {citations[0] if citations else 'None'}")
-        
-        # Filter citations to only show .md file references for old messages too
-        filtered_citations = _filter_md_sources(citations) if citations else []
-        
-        # Debug: Log citations for assistant messages
-        if message.get("role") == "assistant":
-            logger.info(f"Message {message.get('id')[:8]}... - Citations before filter: {len(citations)}, after filter: {len(filtered_citations)}")
-            if len(citations) > 0:
-                logger.info(f"Sample citation structure: {json.dumps(citations[0] if citations else {}, indent=2)}")
-            if len(citations) > 0 and len(filtered_citations) == 0:
-                logger.warning(f"⚠️ All citations filtered out for message {message.get('id')}. Original citations structure: {json.dumps(citations[:1], indent=2)}")
-                # TEMPORARY: Return unfiltered citations if filter removes all (for debugging)
-                # This helps us see what format the citations are in
-                if len(citations) > 0:
-                    logger.warning(f"⚠️ Returning unfiltered citations for debugging - message {message.get('id')[:8]}")
-                    filtered_citations = citations  # Return original for debugging
-        
-        result.append({
-            "id": message["id"],
-            "sessionId": message["session_id"],
-            "createdAt": message["created_at"].isoformat() if message.get("created_at") else None,
-            "role": message["role"],
-            "messageText": message["message_text"],
-            "language": message.get("language"),
-            "route": message.get("route"),
-            "answer": message.get("answer"),
-            "safetyData": message.get("safety_data"),
-            "facts": message.get("facts"),
-            "citations": filtered_citations,  # Always include citations, even if empty
-            "metadata": message.get("metadata"),
-            "userFeedback": message.get("user_feedback"),  # Include feedback from message_feedback table
-        })
-    
-    # Cache the result for 5 minutes (300 seconds)
-    await cache_service.set(cache_key, result, ttl=300)
+        return result
     
-    return result
+    # Cached for 5 minutes; every page size is invalidated together through the session tag.
+    # Entries hold the response built above: citations are already decoded.
+    return await cache_service.get_or_load(
+        f"session_messages:{session_id}:{limit}",
+        load_messages,
+        ttl=300,
+        tags=_session_tags(session_id),
+    )
 
 
 @app.delete("/session/{session_id}")
@@ -3780,24 +4081,14 @@ async def delete_session(
     if not deleted:
         raise HTTPException(status_code=500, detail="Failed to delete session")
     
-    # Invalidate cache for customer sessions and session data
-    if cache_service.is_available():
-        try:
-            if user_id:
-                # Invalidate customer sessions cache (all limits)
-                for limit_val in [10, 50, 100, 200, 500, 1000]:
-                    cache_key = f"sessions:{user_id}:{limit_val}"
-                    await cache_service.delete(cache_key)
-            # Invalidate session messages cache (all limits)
-            for limit_val in [10, 50, 100, 200, 500, 1000]:
-                cache_key = f"session_messages:{session_id}:{limit_val}"
-                await cache_service.delete(cache_key)
-            # Invalidate full session cache
-            await cache_service.delete(f"session_full:{session_id}")
-            # Invalidate conversation history cache
-            await cache_service.delete(f"conversation_history:{session_id}")
-        except Exception as e:
-            logger.warning(f"Failed to invalidate cache after session deletion: {e}")
+    # Invalidate cache for customer sessions and session data (one round-trip)
+    try:
+        await cache_service.invalidate_tags(
+            _session_tags(session_id, user_id),
+            delete_keys=[_history_cache_key(session_id)],
+        )
+    except Exception as e:
+        logger.warning(f"Failed to invalidate cache after session deletion: {e}")
     
     return {"success": True, "message": "Session deleted successfully"}
 
@@ -3872,17 +4163,13 @@ async def submit_feedback(
         logger.info(f"Feedback submitted: message_id={message_id[:8]}, customer_id={user_id[:8] if user_id else 'N/A'}, feedback={feedback}")
         
         # Invalidate cache for the session messages to ensure feedback shows up on reload
+        # (every page size, through the session tag)
         session_id = message.get("session_id")
         if session_id:
-            # Invalidate cache for common limit values used by the frontend
-            # This ensures feedback appears correctly after page reload
-            for limit in [20, 50, 100]:
-                cache_key = f"session_messages:{session_id}:{limit}"
-                try:
-                    await cache_service.delete(cache_key)
-                    logger.debug(f"Invalidated cache key: {cache_key}")
-                except Exception as e:
-                    logger.warning(f"Failed to invalidate cache key {cache_key}: {e}")
+            try:
+                await cache_service.invalidate_tags(_session_tags(str(session_id)))
+            except Exception as e:
+                logger.warning(f"Failed to invalidate cache for session {str(session_id)[:8]}: {e}")
         
         return JSONResponse(content={"success": True, "message": "Feedback submitted"})
         
@@ -3925,49 +4212,10 @@ async def get_session(
     if not db_client.is_connected():
         raise HTTPException(status_code=503, detail="Database not available")
     
-    # Try to get from Redis cache first
-    cache_key = f"session_full:{session_id}"
-    cached_session = await cache_service.get(cache_key)
-    if cached_session is not None:
-        logger.debug(f"Cache hit for session: {session_id}")
-        # Verify session belongs to user (unless admin)
-        user_role = user.get("role", "user")
-        user_id = user.get("user_id")
-        if user_role != "admin" and cached_session.get("customerId") != user_id:
-            raise HTTPException(
-                status_code=403,
-                detail="You can only view your own sessions"
-            )
-        # Apply filter to cached session messages as well
-        if "messages" in cached_session:
-            for msg in cached_session["messages"]:
-                # Parse citations if it's a string
-                citations = msg.get("citations")
-                if isinstance(citations, str):
-                    try:
-                        citations = json.loads(citations) if citations else []
-                    except (json.JSONDecodeError, TypeError):
-                        citations = []
-                elif citations is None:
-                    citations = []
-                # Filter citations to only show .md file references
-                msg["citations"] = _filter_md_sources(citations) if citations else []
-        return cached_session
-    
-    try:
+    async def load_session() -> Optional[Dict[str, Any]]:
         chat_session = await db_service.get_session(session_id)
         if not chat_session:
-            raise HTTPException(status_code=404, detail="Session not found")
-        
-        # Verify session belongs to user (unless admin)
-        user_role = user.get("role", "user")
-        user_id = user.get("user_id")
-        
-        if user_role != "admin" and chat_session.get("customer_id") != user_id:
-            raise HTTPException(
-                status_code=403,
-                detail="You can only view your own sessions"
-            )
+            return None
         
         # Get customer info
         customer = None
@@ -3985,21 +4233,10 @@ async def get_session(
         # Get messages
         messages = chat_session.get("messages", [])
         
-        # Process messages to ensure citations are properly parsed and filtered
+        # Process messages to ensure citations are properly parsed
         processed_messages = []
         for message in messages:
-            # Parse citations from JSONB if it's a string
-            citations = message.get("citations")
-            if isinstance(citations, str):
-                try:
-                    citations = json.loads(citations) if citations else []
-                except (json.JSONDecodeError, TypeError):
-                    citations = []
-            elif citations is None:
-                citations = []
-            
-            # Filter citations to only show .md file references
-            filtered_citations = _filter_md_sources(citations) if citations else []
+            citations = _stored_citations(message.get("citations"))
             
             processed_messages.append({
                 "id": message["id"],
@@ -4011,7 +4248,7 @@ async def get_session(
                 "answer": message.get("answer"),
                 "safetyData": message.get("safety_data"),
                 "facts": message.get("facts"),
-                "citations": filtered_citations,  # Always include citations, even if empty
+                "citations": citations,  # Always include citations, even if empty
                 "metadata": message.get("metadata"),
             })
         
@@ -4025,16 +4262,31 @@ async def get_session(
             "customer": customer,
             "messages": processed_messages,
         }
-        
-        # Cache the result for 5 minutes (300 seconds)
-        await cache_service.set(cache_key, result, ttl=300)
-        
         return result
-    except HTTPException:
-        raise
+    
+    try:
+        # Cached for 5 minutes, until the session tag is bumped. Entries hold
+        # the response built above: citations are already decoded
+        result = await cache_service.get_or_load(
+            f"session_full:{session_id}",
+            load_session,
+            ttl=300,
+            tags=_session_tags(session_id),
+        )
     except Exception as e:
         logger.error(f"Error retrieving session: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to retrieve session") from e
+    if result is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    # Verify session belongs to user (unless admin)
+    user_role = user.get("role", "user")
+    if user_role != "admin" and result.get("customerId") != user_id:
+        raise HTTPException(
+            status_code=403,
+            detail="You can only view your own sessions"
+        )
+    return result
 
 
 if __name__ == "__main__":
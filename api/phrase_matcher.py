@@ -0,0 +1,190 @@
+"""
+Shared multi-phrase matcher for safety detection, symptom extraction and routing.
+
+All phrase vocabularies (red flags, crisis terms, symptom synonyms, router
+terms, ...) are registered under a name and compiled into one Aho–Corasick
+automaton. A single pass over the lowercased text reports every vocabulary
+phrase it contains, including overlapping ones ("chest pain" inside
+"unconscious with chest pain").
+
+Matches must start and end on word boundaries, so "ulti" no longer fires
+inside "multiple" and "fits" no longer fires inside "benefits". A phrase may
+be followed by a common inflection ("seizures", "coughing"), and a phrase
+ending in a number by a unit ("sugar 300mg"), to keep the recall of the
+previous substring checks.
+"""
+
+import threading
+from collections import deque
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+# Endings accepted after a phrase before the closing word boundary
+WORD_SUFFIXES: Tuple[str, ...] = ("s", "es", "ed", "ing")
+
+EMPTY: FrozenSet[str] = frozenset()
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class PhraseMatcher:
+    """Aho–Corasick automaton over named phrase vocabularies"""
+
+    def __init__(self, vocabularies: Mapping[str, Iterable[str]], suffixes: Tuple[str, ...] = WORD_SUFFIXES) -> None:
+        self.suffixes = suffixes
+        phrase_tags: Dict[str, set] = {}
+        for name, phrases in vocabularies.items():
+            for phrase in phrases:
+                phrase = phrase.strip().lower()
+                if phrase:
+                    phrase_tags.setdefault(phrase, set()).add(name)
+
+        # Trie: goto[state] maps a character to the next state
+        self._goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[Tuple[int, str, FrozenSet[str]]]] = [[]]
+        for phrase, tags in phrase_tags.items():
+            state = 0
+            for ch in phrase:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append((len(phrase), phrase, frozenset(tags)))
+
+        # Failure links (breadth-first); each state also reports its suffix states' phrases
+        self._fail: List[int] = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                link = self._goto[fallback].get(ch, 0)
+                self._fail[child] = link if link != child else 0
+                outputs[child].extend(outputs[self._fail[child]])
+        self._outputs: List[Tuple[Tuple[int, str, FrozenSet[str]], ...]] = [tuple(out) for out in outputs]
+        self.phrase_count = len(phrase_tags)
+
+    def _ends_word(self, text: str, end: int) -> bool:
+        if end == len(text) or not _is_word_char(text[end]):
+            return True
+        if text[end - 1].isdigit() and not text[end].isdigit():
+            # A number followed by its unit ("sugar 300mg/dl") ends the phrase
+            return True
+        for suffix in self.suffixes:
+            if text.startswith(suffix, end):
+                after = end + len(suffix)
+                if after == len(text) or not _is_word_char(text[after]):
+                    return True
+        return False
+
+    def find(self, text: str) -> List[Tuple[int, int, str, FrozenSet[str]]]:
+        """
+        Find every whole-word phrase occurrence in one pass.
+
+        Returns:
+            (start, end, phrase, vocabulary names) for each match, in text order
+            of the end position. Offsets refer to text.lower().
+        """
+        text = text.lower()
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        matches = []
+        state = 0
+        for index, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if outputs[state]:
+                end = index + 1
+                for length, phrase, tags in outputs[state]:
+                    start = end - length
+                    if start and _is_word_char(text[start - 1]):
+                        continue
+                    if self._ends_word(text, end):
+                        matches.append((start, end, phrase, tags))
+        return matches
+
+    def match(self, text: str) -> Dict[str, FrozenSet[str]]:
+        """Matched phrases grouped by vocabulary name"""
+        grouped: Dict[str, set] = {}
+        for _, _, phrase, tags in self.find(text):
+            for tag in tags:
+                grouped.setdefault(tag, set()).add(phrase)
+        return {tag: frozenset(phrases) for tag, phrases in grouped.items()}
+
+
+# ---------------------------------------------------------------------------
+# Shared automaton: modules register their vocabularies at import time and the
+# automaton is compiled once, on first use, over all of them.
+# ---------------------------------------------------------------------------
+_vocabularies: Dict[str, FrozenSet[str]] = {}
+_shared: Optional[PhraseMatcher] = None
+_lock = threading.Lock()
+
+
+def register_vocabulary(name: str, phrases: Iterable[str]) -> None:
+    """Add (or replace) a named vocabulary in the shared automaton"""
+    global _shared
+    with _lock:
+        _vocabularies[name] = frozenset(phrase.strip().lower() for phrase in phrases)
+        _shared = None
+    _find_cached.cache_clear()
+    _match_cached.cache_clear()
+
+
+def shared_matcher() -> PhraseMatcher:
+    """The automaton over every registered vocabulary"""
+    global _shared
+    matcher = _shared
+    if matcher is None:
+        with _lock:
+            if _shared is None:
+                _shared = PhraseMatcher(_vocabularies)
+            matcher = _shared
+    return matcher
+
+
+@lru_cache(maxsize=1024)
+def _find_cached(text: str) -> Tuple[Tuple[int, int, str, FrozenSet[str]], ...]:
+    return tuple(shared_matcher().find(text))
+
+
+@lru_cache(maxsize=1024)
+def _match_cached(text: str) -> Mapping[str, FrozenSet[str]]:
+    grouped: Dict[str, set] = {}
+    for _, _, phrase, tags in _find_cached(text):
+        for tag in tags:
+            grouped.setdefault(tag, set()).add(phrase)
+    return MappingProxyType({tag: frozenset(phrases) for tag, phrases in grouped.items()})
+
+
+def find_all(text: str) -> Tuple[Tuple[int, int, str, FrozenSet[str]], ...]:
+    """Every match of every registered vocabulary with its offsets (cached per text)"""
+    if not text:
+        return ()
+    return _find_cached(text)
+
+
+def match_all(text: str) -> Mapping[str, FrozenSet[str]]:
+    """
+    Scan text once for every registered vocabulary.
+
+    Results are cached per text, so the detectors that look at the same
+    message during a request share a single scan.
+    """
+    if not text:
+        return MappingProxyType({})
+    return _match_cached(text)
+
+
+def match_phrases(text: str, vocabulary: str) -> FrozenSet[str]:
+    """Phrases of one vocabulary found in text"""
+    return match_all(text).get(vocabulary, EMPTY)
@@ -2,12 +2,13 @@
 Pipeline functions for the multilingual healthcare chatbot
 """
 
+import asyncio
 import json
 import logging
 import os
 import time
-from typing import Dict, Optional, Tuple, Any, List
-from openai import OpenAI
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from openai import AsyncOpenAI, OpenAI
 from openai import APIError, RateLimitError
 
 try:
@@ -19,6 +20,7 @@ try:
         format_facts_context,
         format_user_profile,
     )
+    from .prompt_budget import compress_history, count_message_tokens
 except ImportError:
     # Fallback to absolute import (when run as script)
     from pipeline_prompts import (
@@ -28,28 +30,26 @@ except ImportError:
         format_facts_context,
         format_user_profile,
     )
+    from prompt_budget import compress_history, count_message_tokens
 
 logger = logging.getLogger("health_assistant")
 
 
-def detect_language_only(
-    client: OpenAI,
-    model: str,
-    user_text: str,
-    retry_count: int = 3
-) -> str:
-    """
-    Detect language only (no translation) using GPT-4o-mini
-    
-    Args:
-        client: OpenAI client
-        model: Model name (should be gpt-4o-mini)
-        user_text: User's input text
-        retry_count: Number of retries on failure
-        
-    Returns:
-        Detected language code (en, hi, ta, te, kn, ml)
-    """
+VALID_LANGUAGE_CODES = {"en", "hi", "ta", "te", "kn", "ml"}
+
+LANGUAGE_NAMES = {
+    "hi": "Hindi",
+    "ta": "Tamil",
+    "te": "Telugu",
+    "kn": "Kannada",
+    "ml": "Malayalam",
+}
+
+ANSWER_SYSTEM_PROMPT = "You are a knowledgeable, empathetic healthcare assistant. For medical facts, use ONLY the indexed knowledge base provided in the context. For understanding follow-up questions, use conversation history to understand what the user is asking about. Once you understand the question from conversation history, use the knowledge base context to provide factual medical information. Never make up or invent medical facts. Always give thorough responses when context is available, covering understanding the concern, causes, solutions, and when to seek medical attention. Format your response using proper Markdown: use ## headings for main sections, ### for subsections, bullet points (-) for lists, numbered lists (1., 2., 3.) for sequential steps, and **bold** for important terms. Structure your response with clear sections and proper spacing for excellent readability."
+
+
+def _build_detection_messages(user_text: str) -> List[Dict[str, str]]:
+    """Build the chat messages for language-only detection"""
     detection_prompt = f"""Detect the language of the following text and respond with ONLY a valid JSON object.
 
 Valid language codes: "en" (English), "hi" (Hindi), "ta" (Tamil), "te" (Telugu), "kn" (Kannada), "ml" (Malayalam)
@@ -72,21 +72,157 @@ Respond with ONLY this JSON format:
 }}
 
 Do NOT translate. Only detect the language code."""
+    return [
+        {
+            "role": "system",
+            "content": "You are a language detection expert. Respond ONLY with valid JSON containing the detected language code."
+        },
+        {
+            "role": "user",
+            "content": detection_prompt
+        }
+    ]
+
+
+def _parse_json_response(response_text: str) -> Dict[str, Any]:
+    """Parse a JSON model response, stripping markdown code fences if present"""
+    if response_text.startswith("```"):
+        response_text = response_text.split("```")[1]
+        if response_text.startswith("json"):
+            response_text = response_text[4:]
+        response_text = response_text.strip()
+    return json.loads(response_text)
+
+
+def _normalize_language_code(detected_lang: Any) -> str:
+    """Validate a detected language code, defaulting to 'en'"""
+    detected_lang = str(detected_lang or "en").lower()
+    if detected_lang not in VALID_LANGUAGE_CODES:
+        logger.warning(f"Invalid language code detected: {detected_lang}, defaulting to 'en'")
+        return "en"
+    return detected_lang
+
+
+def _build_translation_messages(user_text: str, source_language: str) -> List[Dict[str, str]]:
+    """Build the chat messages for translating user text to English"""
+    lang_name = LANGUAGE_NAMES.get(source_language, "Unknown")
+    translation_prompt = f"""Translate the following {lang_name} text to English. Translate accurately while maintaining the meaning.
+
+{lang_name} text:
+{user_text}
+
+Respond with ONLY the English translation, nothing else."""
+    return [
+        {
+            "role": "system",
+            "content": f"You are a professional translator. Translate {lang_name} to English accurately."
+        },
+        {
+            "role": "user",
+            "content": translation_prompt
+        }
+    ]
+
+
+def _build_answer_messages(
+    user_question: str,
+    rag_context: str,
+    facts: list,
+    profile: Any,
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+    timings: Optional[Dict[str, float]] = None,
+) -> List[Dict[str, str]]:
+    """
+    Build the chat messages for final answer generation (shared by streaming and non-streaming calls).
+    History is fitted to the prompt budget; token counts are recorded in `timings` when given.
+    """
+    facts_context = format_facts_context(facts)
+    user_profile_str = format_user_profile(profile)
+    
+    # Format RAG context - if empty, clearly indicate no information available
+    if not rag_context or rag_context.strip() == "":
+        formatted_rag_context = "⚠️ NO INFORMATION AVAILABLE IN KNOWLEDGE BASE: The knowledge base does not contain any relevant information for this query."
+    else:
+        formatted_rag_context = rag_context
+    
+    prompt = REASONING_ANSWER_PROMPT.format(
+        rag_context=formatted_rag_context,
+        facts_context=facts_context or "No specific facts from database.",
+        user_question=user_question,
+        user_profile=user_profile_str
+    )
+    
+    # Build messages array with conversation history
+    messages = [
+        {
+            "role": "system",
+            "content": ANSWER_SYSTEM_PROMPT
+        }
+    ]
+    
+    # Add conversation history if provided: recent turns verbatim, older ones summarized
+    history_messages, history_report = compress_history(conversation_history)
+    if history_messages:
+        messages.extend(history_messages)
+        logger.debug(f"Including {len(history_messages)} history messages ({history_report['prompt_tokens_history']} tokens)")
+    
+    # Add current user question
+    messages.append({
+        "role": "user",
+        "content": prompt
+    })
+    if timings is not None:
+        timings.update(history_report)
+        timings["prompt_tokens"] = count_message_tokens(messages)
+    return messages
+
+
+def _build_translation_back_messages(english_text: str, target_language: str) -> List[Dict[str, str]]:
+    """Build the chat messages for translating an English answer to the user's language"""
+    lang_name = LANGUAGE_NAMES.get(target_language, "English")
+    # Always use native script (not romanized)
+    prompt = TRANSLATION_BACK_PROMPT.format(
+        target_language=lang_name,
+        english_text=english_text
+    )
+    system_content = f"You are a professional medical translator. Translate accurately to {lang_name} in NATIVE SCRIPT (NOT romanized/English script). For example, Tamil must be in Tamil script (தமிழ்), Telugu in Telugu script (తెలుగు), Kannada in Kannada script (ಕನ್ನಡ), Malayalam in Malayalam script (മലയാളം), and Hindi in Devanagari script (हिंदी). PRESERVE ALL MARKDOWN FORMATTING: Keep all headings (##, ###), bullet points (-, *), numbered lists (1., 2., 3.), and bold text (**text**) exactly as they appear. Translate only the text content, keeping all Markdown symbols intact."
+    return [
+        {
+            "role": "system",
+            "content": system_content
+        },
+        {
+            "role": "user",
+            "content": prompt
+        }
+    ]
+
+
+def detect_language_only(
+    client: OpenAI,
+    model: str,
+    user_text: str,
+    retry_count: int = 3
+) -> str:
+    """
+    Detect language only (no translation) using GPT-4o-mini
+    
+    Args:
+        client: OpenAI client
+        model: Model name (should be gpt-4o-mini)
+        user_text: User's input text
+        retry_count: Number of retries on failure
+        
+    Returns:
+        Detected language code (en, hi, ta, te, kn, ml)
+    """
+    messages = _build_detection_messages(user_text)
     
     for attempt in range(retry_count):
         try:
             response = client.chat.completions.create(
                 model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a language detection expert. Respond ONLY with valid JSON containing the detected language code."
-                    },
-                    {
-                        "role": "user",
-                        "content": detection_prompt
-                    }
-                ],
+                messages=messages,
                 max_tokens=50,
                 temperature=0.1,
                 timeout=30.0,  # 30 second timeout for language detection
@@ -96,23 +232,8 @@ Do NOT translate. Only detect the language code."""
             
             # Try to parse JSON response
             try:
-                # Remove markdown code blocks if present
-                if response_text.startswith("```"):
-                    response_text = response_text.split("```")[1]
-                    if response_text.startswith("json"):
-                        response_text = response_text[4:]
-                    response_text = response_text.strip()
-                
-                result = json.loads(response_text)
-                detected_lang = result.get("detected_language", "en").lower()
-                
-                # Validate language code
-                valid_langs = {"en", "hi", "ta", "te", "kn", "ml"}
-                if detected_lang not in valid_langs:
-                    logger.warning(f"Invalid language code detected: {detected_lang}, defaulting to 'en'")
-                    detected_lang = "en"
-                
-                return detected_lang
+                result = _parse_json_response(response_text)
+                return _normalize_language_code(result.get("detected_language", "en"))
                 
             except json.JSONDecodeError as e:
                 logger.warning(f"Failed to parse JSON response: {response_text[:100]}, error: {e}")
@@ -125,7 +246,6 @@ Do NOT translate. Only detect the language code."""
             if attempt < retry_count - 1:
                 wait_time = (attempt + 1) * 2
                 logger.warning(f"Rate limit hit, waiting {wait_time}s before retry...")
-                import time
                 time.sleep(wait_time)
                 continue
             logger.error(f"Rate limit error after {retry_count} attempts: {e}")
@@ -135,7 +255,6 @@ Do NOT translate. Only detect the language code."""
             if attempt < retry_count - 1:
                 wait_time = (attempt + 1) * 2
                 logger.warning(f"API error, waiting {wait_time}s before retry...")
-                import time
                 time.sleep(wait_time)
                 continue
             logger.error(f"API error after {retry_count} attempts: {e}")
@@ -150,6 +269,59 @@ Do NOT translate. Only detect the language code."""
     return "en"
 
 
+async def detect_language_only_async(
+    client: AsyncOpenAI,
+    model: str,
+    user_text: str,
+    retry_count: int = 3
+) -> str:
+    """
+    Async version of detect_language_only (does not block the event loop)
+    
+    Returns:
+        Detected language code (en, hi, ta, te, kn, ml)
+    """
+    messages = _build_detection_messages(user_text)
+    
+    for attempt in range(retry_count):
+        try:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=50,
+                temperature=0.1,
+                timeout=30.0,
+            )
+            
+            response_text = response.choices[0].message.content.strip()
+            
+            try:
+                result = _parse_json_response(response_text)
+                return _normalize_language_code(result.get("detected_language", "en"))
+            except json.JSONDecodeError as e:
+                logger.warning(f"Failed to parse JSON response: {response_text[:100]}, error: {e}")
+                if attempt < retry_count - 1:
+                    continue
+                return "en"
+                
+        except (RateLimitError, APIError) as e:
+            if attempt < retry_count - 1:
+                wait_time = (attempt + 1) * 2
+                logger.warning(f"{type(e).__name__} in language detection, waiting {wait_time}s before retry...")
+                await asyncio.sleep(wait_time)
+                continue
+            logger.error(f"Language detection failed after {retry_count} attempts: {e}")
+            return "en"
+            
+        except Exception as e:
+            logger.error(f"Unexpected error in language detection: {e}")
+            if attempt < retry_count - 1:
+                continue
+            return "en"
+    
+    return "en"
+
+
 def translate_to_english(
     client: OpenAI,
     model: str,
@@ -170,37 +342,13 @@ def translate_to_english(
     Returns:
         English translation of the text
     """
-    lang_names = {
-        "hi": "Hindi",
-        "ta": "Tamil",
-        "te": "Telugu",
-        "kn": "Kannada",
-        "ml": "Malayalam",
-    }
-    
-    lang_name = lang_names.get(source_language, "Unknown")
-    
-    translation_prompt = f"""Translate the following {lang_name} text to English. Translate accurately while maintaining the meaning.
-
-{lang_name} text:
-{user_text}
-
-Respond with ONLY the English translation, nothing else."""
+    messages = _build_translation_messages(user_text, source_language)
     
     for attempt in range(retry_count):
         try:
             response = client.chat.completions.create(
                 model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are a professional translator. Translate {lang_name} to English accurately."
-                    },
-                    {
-                        "role": "user",
-                        "content": translation_prompt
-                    }
-                ],
+                messages=messages,
                 max_tokens=500,
                 temperature=0.3,
             )
@@ -212,7 +360,6 @@ Respond with ONLY the English translation, nothing else."""
             if attempt < retry_count - 1:
                 wait_time = (attempt + 1) * 2
                 logger.warning(f"Rate limit hit, waiting {wait_time}s before retry...")
-                import time
                 time.sleep(wait_time)
                 continue
             logger.error(f"Rate limit error after {retry_count} attempts: {e}")
@@ -222,7 +369,6 @@ Respond with ONLY the English translation, nothing else."""
             if attempt < retry_count - 1:
                 wait_time = (attempt + 1) * 2
                 logger.warning(f"API error, waiting {wait_time}s before retry...")
-                import time
                 time.sleep(wait_time)
                 continue
             logger.error(f"API error after {retry_count} attempts: {e}")
@@ -237,6 +383,73 @@ Respond with ONLY the English translation, nothing else."""
     return user_text
 
 
+async def translate_to_english_async(
+    client: AsyncOpenAI,
+    model: str,
+    user_text: str,
+    source_language: str,
+    retry_count: int = 3
+) -> str:
+    """
+    Async version of translate_to_english (does not block the event loop)
+    
+    Returns:
+        English translation of the text (original text on failure)
+    """
+    messages = _build_translation_messages(user_text, source_language)
+    
+    for attempt in range(retry_count):
+        try:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=500,
+                temperature=0.3,
+            )
+            return response.choices[0].message.content.strip()
+            
+        except (RateLimitError, APIError) as e:
+            if attempt < retry_count - 1:
+                wait_time = (attempt + 1) * 2
+                logger.warning(f"{type(e).__name__} in translation, waiting {wait_time}s before retry...")
+                await asyncio.sleep(wait_time)
+                continue
+            logger.error(f"Translation failed after {retry_count} attempts: {e}")
+            return user_text
+            
+        except Exception as e:
+            logger.error(f"Unexpected error in translation: {e}")
+            if attempt < retry_count - 1:
+                continue
+            return user_text
+    
+    return user_text
+
+
+def _build_detect_and_translate_messages(user_text: str) -> List[Dict[str, str]]:
+    """Build the chat messages for the combined detect + translate call"""
+    return [
+        {
+            "role": "system",
+            "content": "You are a language detection and translation expert. Respond ONLY with valid JSON."
+        },
+        {
+            "role": "user",
+            "content": LANGUAGE_DETECTION_TRANSLATION_PROMPT.format(user_text=user_text)
+        }
+    ]
+
+
+def _parse_detect_and_translate(response_text: str, user_text: str) -> Tuple[str, str]:
+    """Parse the combined detect + translate JSON response"""
+    result = _parse_json_response(response_text)
+    detected_lang = _normalize_language_code(result.get("detected_language", "en"))
+    if detected_lang == "en":
+        return "en", user_text
+    english_text = str(result.get("english_text") or "").strip()
+    return detected_lang, english_text or user_text
+
+
 def detect_and_translate_to_english(
     client: OpenAI,
     model: str,
@@ -244,8 +457,8 @@ def detect_and_translate_to_english(
     retry_count: int = 3
 ) -> Tuple[str, str]:
     """
-    Detect language and translate to English using GPT-4o-mini
-    (Kept for backward compatibility, but now uses separate detection and translation)
+    Detect language and translate to English in a single structured GPT-4o-mini call
+    Falls back to separate detection + translation if the combined response cannot be parsed
     
     Args:
         client: OpenAI client
@@ -256,33 +469,168 @@ def detect_and_translate_to_english(
     Returns:
         Tuple of (detected_language_code, english_text)
     """
-    # First detect language
-    detected_lang = detect_language_only(client, model, user_text, retry_count)
+    messages = _build_detect_and_translate_messages(user_text)
     
-    # If English, no translation needed
+    for attempt in range(retry_count):
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=600,
+                temperature=0.1,
+                response_format={"type": "json_object"},
+                timeout=30.0,
+            )
+            return _parse_detect_and_translate(response.choices[0].message.content.strip(), user_text)
+            
+        except (json.JSONDecodeError, AttributeError) as e:
+            logger.warning(f"Failed to parse combined detect/translate response: {e}")
+            break
+            
+        except (RateLimitError, APIError) as e:
+            if attempt < retry_count - 1:
+                wait_time = (attempt + 1) * 2
+                logger.warning(f"{type(e).__name__} in detect/translate, waiting {wait_time}s before retry...")
+                time.sleep(wait_time)
+                continue
+            logger.error(f"Combined detect/translate failed after {retry_count} attempts: {e}")
+            break
+            
+        except Exception as e:
+            logger.error(f"Unexpected error in combined detect/translate: {e}")
+            if attempt < retry_count - 1:
+                continue
+            break
+    
+    # Fall back to the two-step path
+    detected_lang = detect_language_only(client, model, user_text, retry_count)
     if detected_lang == "en":
         return "en", user_text
-    
-    # Otherwise, translate to English
     english_text = translate_to_english(client, model, user_text, detected_lang, retry_count)
     return detected_lang, english_text
 
 
+async def detect_and_translate_to_english_async(
+    client: AsyncOpenAI,
+    model: str,
+    user_text: str,
+    retry_count: int = 3
+) -> Tuple[str, str]:
+    """
+    Async version of detect_and_translate_to_english (one round-trip in the common case)
+    
+    Returns:
+        Tuple of (detected_language_code, english_text)
+    """
+    messages = _build_detect_and_translate_messages(user_text)
+    
+    for attempt in range(retry_count):
+        try:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=600,
+                temperature=0.1,
+                response_format={"type": "json_object"},
+                timeout=30.0,
+            )
+            return _parse_detect_and_translate(response.choices[0].message.content.strip(), user_text)
+            
+        except (json.JSONDecodeError, AttributeError) as e:
+            logger.warning(f"Failed to parse combined detect/translate response: {e}")
+            break
+            
+        except (RateLimitError, APIError) as e:
+            if attempt < retry_count - 1:
+                wait_time = (attempt + 1) * 2
+                logger.warning(f"{type(e).__name__} in detect/translate, waiting {wait_time}s before retry...")
+                await asyncio.sleep(wait_time)
+                continue
+            logger.error(f"Combined detect/translate failed after {retry_count} attempts: {e}")
+            break
+            
+        except Exception as e:
+            logger.error(f"Unexpected error in combined detect/translate: {e}")
+            if attempt < retry_count - 1:
+                continue
+            break
+    
+    detected_lang = await detect_language_only_async(client, model, user_text, retry_count)
+    if detected_lang == "en":
+        return "en", user_text
+    english_text = await translate_to_english_async(client, model, user_text, detected_lang, retry_count)
+    return detected_lang, english_text
+
+
+async def speculative_detect_and_translate(
+    client: AsyncOpenAI,
+    model: str,
+    user_text: str,
+    local_detector: Callable[[str], Tuple[Optional[str], float]],
+    confidence_threshold: float = 0.85,
+) -> Tuple[str, str, str]:
+    """
+    Race a local language detector against the combined remote detect + translate call
+    
+    The remote call is started first so it is already in flight while the local detector
+    runs. If the local detector is confident the text is English, the remote call is
+    cancelled (no round-trip on the critical path). If it is confident about another
+    language, its label wins and the remote call only supplies the English translation,
+    unless the remote call says the text is English: short English inputs ("hi") can
+    look like another language to the local detector, so remote "en" is trusted.
+    
+    Args:
+        client: Async OpenAI client
+        model: Model name
+        user_text: User's input text
+        local_detector: Callable returning (language_code or None, confidence 0-1)
+        confidence_threshold: Minimum local confidence to trust the local label
+        
+    Returns:
+        Tuple of (detected_language_code, english_text, source) where source is
+        "local", "local+remote" or "remote"
+    """
+    remote = asyncio.create_task(
+        detect_and_translate_to_english_async(client, model, user_text)
+    )
+    try:
+        local_lang, confidence = await asyncio.to_thread(local_detector, user_text)
+    except Exception as e:
+        logger.warning(f"Local language detector failed, waiting for remote detection: {e}")
+        local_lang, confidence = None, 0.0
+    
+    local_confident = bool(local_lang) and confidence >= confidence_threshold
+    if local_confident and local_lang == "en":
+        remote.cancel()
+        return "en", user_text, "local"
+    
+    try:
+        remote_lang, english_text = await remote
+    except Exception as e:
+        logger.error(f"Remote detect/translate failed: {e}")
+        remote_lang, english_text = (local_lang or "en"), user_text
+    
+    if local_confident and remote_lang != "en":
+        return local_lang, english_text, "local+remote"
+    return remote_lang, english_text, "remote"
+
+
 async def generate_final_answer_stream(
-    client: OpenAI,
+    client: AsyncOpenAI,
     model: str,
     user_question: str,
     rag_context: str,
     facts: list,
     profile: Any,
     conversation_history: Optional[List[Dict[str, str]]] = None,
-    retry_count: int = 3
+    retry_count: int = 3,
+    timings: Optional[Dict[str, float]] = None,
 ):
     """
     Generate final answer in English using GPT-4o-mini with RAG context and facts (STREAMING VERSION)
     
     Args:
-        client: OpenAI client
+        client: Async OpenAI client (chunks are awaited, so the event loop is never blocked)
         model: Model name (should be gpt-4o-mini)
         user_question: User's question in English
         rag_context: Context from ChromaDB RAG
@@ -290,46 +638,12 @@ async def generate_final_answer_stream(
         profile: User profile object
         conversation_history: Previous conversation messages for context (list of {"role": "user"/"assistant", "content": "..."})
         retry_count: Number of retries on failure
+        timings: Optional dict that receives prompt token counts
         
     Yields:
         Text chunks as they are generated
     """
-    facts_context = format_facts_context(facts)
-    user_profile_str = format_user_profile(profile)
-    
-    # Format RAG context - if empty, clearly indicate no information available
-    if not rag_context or rag_context.strip() == "":
-        formatted_rag_context = "⚠️ NO INFORMATION AVAILABLE IN KNOWLEDGE BASE: The knowledge base does not contain any relevant information for this query."
-    else:
-        formatted_rag_context = rag_context
-    
-    prompt = REASONING_ANSWER_PROMPT.format(
-        rag_context=formatted_rag_context,
-        facts_context=facts_context or "No specific facts from database.",
-        user_question=user_question,
-        user_profile=user_profile_str
-    )
-    
-    # Build messages array with conversation history
-    messages = [
-        {
-            "role": "system",
-            "content": "You are a knowledgeable, empathetic healthcare assistant. For medical facts, use ONLY the indexed knowledge base provided in the context. For understanding follow-up questions, use conversation history to understand what the user is asking about. Once you understand the question from conversation history, use the knowledge base context to provide factual medical information. Never make up or invent medical facts. Always give thorough responses when context is available, covering understanding the concern, causes, solutions, and when to seek medical attention. Format your response using proper Markdown: use ## headings for main sections, ### for subsections, bullet points (-) for lists, numbered lists (1., 2., 3.) for sequential steps, and **bold** for important terms. Structure your response with clear sections and proper spacing for excellent readability."
-        }
-    ]
-    
-    # Add conversation history if provided
-    if conversation_history:
-        # Limit to last 10 messages to avoid token limits
-        recent_history = conversation_history[-10:] if len(conversation_history) > 10 else conversation_history
-        messages.extend(recent_history)
-        logger.debug(f"Including {len(recent_history)} previous messages for context")
-    
-    # Add current user question
-    messages.append({
-        "role": "user",
-        "content": prompt
-    })
+    messages = _build_answer_messages(user_question, rag_context, facts, profile, conversation_history, timings)
     
     for attempt in range(retry_count):
         try:
@@ -338,7 +652,7 @@ async def generate_final_answer_stream(
             # Configurable via env var for platform compatibility (Vercel Pro: 60s, Render: 90s+)
             generation_timeout = float(os.getenv("AI_GENERATION_TIMEOUT", "90.0"))
             
-            stream = client.chat.completions.create(
+            stream = await client.chat.completions.create(
                 model=model,
                 messages=messages,
                 max_tokens=1500,  # Optimized: Balance between detailed responses and speed (was 2000)
@@ -349,8 +663,8 @@ async def generate_final_answer_stream(
             
             chunk_count = 0
             start_time = time.time()
-            for chunk in stream:
-                if chunk.choices[0].delta.content:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
                     content = chunk.choices[0].delta.content
                     chunk_count += 1
                     yield content
@@ -378,7 +692,6 @@ async def generate_final_answer_stream(
                 # Exponential backoff: 1s, 2s, 4s
                 wait_time = 2 ** attempt
                 logger.info(f"⏳ Retrying in {wait_time}s...")
-                import asyncio
                 await asyncio.sleep(wait_time)
             else:
                 logger.error(f"❌ Failed to generate answer after {retry_count} attempts")
@@ -399,7 +712,8 @@ def generate_final_answer(
     facts: list,
     profile: Any,
     conversation_history: Optional[List[Dict[str, str]]] = None,
-    retry_count: int = 3
+    retry_count: int = 3,
+    timings: Optional[Dict[str, float]] = None,
 ) -> str:
     """
     Generate final answer in English using GPT-4o-mini with RAG context and facts
@@ -413,46 +727,12 @@ def generate_final_answer(
         profile: User profile object
         conversation_history: Previous conversation messages for context (list of {"role": "user"/"assistant", "content": "..."})
         retry_count: Number of retries on failure
+        timings: Optional dict that receives prompt token counts
         
     Returns:
         Answer text in English
     """
-    facts_context = format_facts_context(facts)
-    user_profile_str = format_user_profile(profile)
-    
-    # Format RAG context - if empty, clearly indicate no information available
-    if not rag_context or rag_context.strip() == "":
-        formatted_rag_context = "⚠️ NO INFORMATION AVAILABLE IN KNOWLEDGE BASE: The knowledge base does not contain any relevant information for this query."
-    else:
-        formatted_rag_context = rag_context
-    
-    prompt = REASONING_ANSWER_PROMPT.format(
-        rag_context=formatted_rag_context,
-        facts_context=facts_context or "No specific facts from database.",
-        user_question=user_question,
-        user_profile=user_profile_str
-    )
-    
-    # Build messages array with conversation history
-    messages = [
-        {
-            "role": "system",
-            "content": "You are a knowledgeable, empathetic healthcare assistant. For medical facts, use ONLY the indexed knowledge base provided in the context. For understanding follow-up questions, use conversation history to understand what the user is asking about. Once you understand the question from conversation history, use the knowledge base context to provide factual medical information. Never make up or invent medical facts. Always give thorough responses when context is available, covering understanding the concern, causes, solutions, and when to seek medical attention. Format your response using proper Markdown: use ## headings for main sections, ### for subsections, bullet points (-) for lists, numbered lists (1., 2., 3.) for sequential steps, and **bold** for important terms. Structure your response with clear sections and proper spacing for excellent readability."
-        }
-    ]
-    
-    # Add conversation history if provided
-    if conversation_history:
-        # Limit to last 10 messages to avoid token limits
-        recent_history = conversation_history[-10:] if len(conversation_history) > 10 else conversation_history
-        messages.extend(recent_history)
-        logger.debug(f"Including {len(recent_history)} previous messages for context")
-    
-    # Add current user question
-    messages.append({
-        "role": "user",
-        "content": prompt
-    })
+    messages = _build_answer_messages(user_question, rag_context, facts, profile, conversation_history, timings)
     
     for attempt in range(retry_count):
         try:
@@ -471,7 +751,6 @@ def generate_final_answer(
             if attempt < retry_count - 1:
                 wait_time = (attempt + 1) * 2
                 logger.warning(f"Rate limit hit, waiting {wait_time}s before retry...")
-                import time
                 time.sleep(wait_time)
             else:
                 logger.error(f"Rate limit error after {retry_count} attempts: {e}")
@@ -480,7 +759,6 @@ def generate_final_answer(
         except Exception as e:
             logger.warning(f"Error in generate_final_answer (attempt {attempt + 1}): {e}")
             if attempt < retry_count - 1:
-                import time
                 time.sleep(1)
             else:
                 logger.error(f"Failed to generate answer after {retry_count} attempts")
@@ -489,6 +767,57 @@ def generate_final_answer(
     return "I apologize, but I encountered an error processing your request. Please try again."
 
 
+async def generate_final_answer_async(
+    client: AsyncOpenAI,
+    model: str,
+    user_question: str,
+    rag_context: str,
+    facts: list,
+    profile: Any,
+    conversation_history: Optional[List[Dict[str, str]]] = None,
+    retry_count: int = 3,
+    timings: Optional[Dict[str, float]] = None,
+) -> Tuple[str, bool]:
+    """
+    Async version of generate_final_answer (does not block the event loop)
+    
+    Returns:
+        (answer text in English, True if generation failed and the text is
+        the apology shown instead; such answers must not be cached)
+    """
+    messages = _build_answer_messages(user_question, rag_context, facts, profile, conversation_history, timings)
+    
+    for attempt in range(retry_count):
+        try:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=1500,
+                temperature=0.7,
+                timeout=float(os.getenv("AI_GENERATION_TIMEOUT", "90.0")),
+            )
+            return response.choices[0].message.content.strip(), False
+            
+        except RateLimitError as e:
+            if attempt < retry_count - 1:
+                wait_time = (attempt + 1) * 2
+                logger.warning(f"Rate limit hit, waiting {wait_time}s before retry...")
+                await asyncio.sleep(wait_time)
+            else:
+                logger.error(f"Rate limit error after {retry_count} attempts: {e}")
+                return "I apologize, but I'm experiencing high demand. Please try again in a moment.", True
+                
+        except Exception as e:
+            logger.warning(f"Error in generate_final_answer_async (attempt {attempt + 1}): {e}")
+            if attempt < retry_count - 1:
+                await asyncio.sleep(1)
+            else:
+                logger.error(f"Failed to generate answer after {retry_count} attempts")
+                return "I apologize, but I encountered an error processing your request. Please try again.", True
+    
+    return "I apologize, but I encountered an error processing your request. Please try again.", True
+
+
 def translate_to_user_language(
     client: OpenAI,
     model: str,
@@ -510,43 +839,17 @@ def translate_to_user_language(
     Returns:
         Translated text in target language (native script)
     """
-    # Language name mapping
-    lang_names = {
-        "hi": "Hindi",
-        "ta": "Tamil",
-        "te": "Telugu",
-        "kn": "Kannada",
-        "ml": "Malayalam",
-    }
-    
-    lang_name = lang_names.get(target_language, "English")
-    
     # If target is English, return as is
     if target_language == "en":
         return english_text
     
-    # Always use native script (not romanized)
-    prompt = TRANSLATION_BACK_PROMPT.format(
-        target_language=lang_name,
-        english_text=english_text
-    )
+    messages = _build_translation_back_messages(english_text, target_language)
     
     for attempt in range(retry_count):
         try:
-            system_content = f"You are a professional medical translator. Translate accurately to {lang_name} in NATIVE SCRIPT (NOT romanized/English script). For example, Tamil must be in Tamil script (தமிழ்), Telugu in Telugu script (తెలుగు), Kannada in Kannada script (ಕನ್ನಡ), Malayalam in Malayalam script (മലയാളം), and Hindi in Devanagari script (हिंदी). PRESERVE ALL MARKDOWN FORMATTING: Keep all headings (##, ###), bullet points (-, *), numbered lists (1., 2., 3.), and bold text (**text**) exactly as they appear. Translate only the text content, keeping all Markdown symbols intact."
-            
             response = client.chat.completions.create(
                 model=model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_content
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+                messages=messages,
                 max_tokens=1000,
                 temperature=0.3,
                 timeout=60.0,  # 60 second timeout for translation back
@@ -559,7 +862,6 @@ def translate_to_user_language(
             if attempt < retry_count - 1:
                 wait_time = (attempt + 1) * 2
                 logger.warning(f"Rate limit hit, waiting {wait_time}s before retry...")
-                import time
                 time.sleep(wait_time)
             else:
                 logger.error(f"Rate limit error after {retry_count} attempts: {e}")
@@ -568,7 +870,6 @@ def translate_to_user_language(
         except Exception as e:
             logger.warning(f"Error in translate_to_user_language (attempt {attempt + 1}): {e}")
             if attempt < retry_count - 1:
-                import time
                 time.sleep(1)
             else:
                 logger.error(f"Failed to translate after {retry_count} attempts")
@@ -576,3 +877,51 @@ def translate_to_user_language(
     
     return english_text  # Final fallback to English
 
+
+async def translate_to_user_language_async(
+    client: AsyncOpenAI,
+    model: str,
+    english_text: str,
+    target_language: str,
+    retry_count: int = 3
+) -> str:
+    """
+    Async version of translate_to_user_language (does not block the event loop)
+    
+    Returns:
+        Translated text in target language (native script), English text on failure
+    """
+    if target_language == "en":
+        return english_text
+    
+    messages = _build_translation_back_messages(english_text, target_language)
+    
+    for attempt in range(retry_count):
+        try:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=1000,
+                temperature=0.3,
+                timeout=60.0,
+            )
+            return response.choices[0].message.content.strip()
+            
+        except RateLimitError as e:
+            if attempt < retry_count - 1:
+                wait_time = (attempt + 1) * 2
+                logger.warning(f"Rate limit hit, waiting {wait_time}s before retry...")
+                await asyncio.sleep(wait_time)
+            else:
+                logger.error(f"Rate limit error after {retry_count} attempts: {e}")
+                return english_text
+                
+        except Exception as e:
+            logger.warning(f"Error in translate_to_user_language_async (attempt {attempt + 1}): {e}")
+            if attempt < retry_count - 1:
+                await asyncio.sleep(1)
+            else:
+                logger.error(f"Failed to translate after {retry_count} attempts")
+                return english_text
+    
+    return english_text
@@ -132,6 +132,10 @@ VALIDATION CHECK BEFORE RESPONDING:
 
 Respond ONLY with the detailed answer text in English using proper Markdown formatting (headings, bullet points, numbered lists, bold text). Do not include any explanations, metadata, or JSON formatting. Provide a well-formatted, comprehensive, detailed answer using ONLY information from the context above."""
 
+# Version of the translation prompts; part of every translation-memory key, so
+# bump it whenever a translation prompt changes to stop serving old translations
+TRANSLATION_PROMPT_VERSION = "1"
+
 # Translation back to user language prompt
 TRANSLATION_BACK_PROMPT = """You are a professional medical translator. Translate the following English medical response to {target_language}.
 
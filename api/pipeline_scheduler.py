@@ -0,0 +1,161 @@
+"""
+Stage scheduler for the chat pipeline.
+
+Independent pipeline steps (retrieval, graph lookups, static translations) are
+registered as named stages with optional dependencies. Stages start as soon as
+their dependencies finish, so the wall-clock time of a request is the slowest
+branch rather than the sum of all steps. Each stage has its own timeout and a
+default value that is used when it times out or fails, so one slow backend
+cannot stall the whole response.
+"""
+
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger("health_assistant")
+
+
+class StageScheduler:
+    """
+    Run pipeline stages concurrently according to their dependencies.
+
+    A stage function receives the results of its dependencies as positional
+    arguments (in the order the dependencies were declared). Coroutine functions
+    are awaited directly; plain functions run in a worker thread so blocking
+    clients (Chroma, sync Neo4j driver) never block the event loop.
+
+    Usage:
+        scheduler = StageScheduler(default_timeout=8.0)
+        scheduler.add("retrieval", partial(retrieve, query, k=4), default=[])
+        scheduler.add("facts", build_facts, deps=("retrieval",))
+        scheduler.start()
+        rag_results, facts = await scheduler.gather("retrieval", "facts")
+    """
+
+    def __init__(self, default_timeout: Optional[float] = None) -> None:
+        self.default_timeout = default_timeout
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self._stages: Dict[str, Dict[str, Any]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def add(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        *,
+        deps: Iterable[str] = (),
+        timeout: Optional[float] = None,
+        default: Any = None,
+    ) -> None:
+        """
+        Register a stage.
+
+        Args:
+            name: Unique stage name (also used as the timing key)
+            func: Coroutine function or plain function to run
+            deps: Names of stages whose results are passed to func
+            timeout: Per-stage timeout in seconds (falls back to default_timeout)
+            default: Value returned when the stage fails, times out or a dependency failed
+        """
+        if name in self._stages:
+            raise ValueError(f"Stage '{name}' is already registered")
+        deps = tuple(deps)
+        missing = [dep for dep in deps if dep not in self._stages]
+        if missing:
+            # Dependencies must be registered first, which also rules out cycles
+            raise ValueError(f"Stage '{name}' depends on unknown stage(s): {', '.join(missing)}")
+        self._stages[name] = {
+            "func": func,
+            "deps": deps,
+            "timeout": timeout if timeout is not None else self.default_timeout,
+            "default": default,
+        }
+        if self._tasks:
+            # Scheduler already running - start late-registered stages immediately
+            self._tasks[name] = asyncio.create_task(self._run_stage(name))
+
+    def has(self, name: str) -> bool:
+        return name in self._stages
+
+    def start(self) -> None:
+        """Start every registered stage (idempotent)."""
+        for name in self._stages:
+            if name not in self._tasks:
+                self._tasks[name] = asyncio.create_task(self._run_stage(name))
+
+    async def result(self, name: str, default: Any = None) -> Any:
+        """
+        Await a single stage's result.
+
+        Returns `default` if no stage with that name was registered, which lets
+        callers skip conditional stages without extra branching.
+        """
+        if name not in self._stages:
+            return default
+        self.start()
+        return await self._tasks[name]
+
+    async def gather(self, *names: str) -> List[Any]:
+        """Await several stages concurrently and return their results in order."""
+        return list(await asyncio.gather(*(self.result(name) for name in names)))
+
+    async def run(self) -> Dict[str, Any]:
+        """Run all registered stages and return a name -> result mapping."""
+        self.start()
+        names = list(self._stages)
+        results = await asyncio.gather(*(self._tasks[name] for name in names))
+        return dict(zip(names, results))
+
+    def cancel(self) -> None:
+        """Cancel any stages that are still running (e.g. client disconnected)."""
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+
+    @staticmethod
+    async def _invoke(func: Callable[..., Any], args: List[Any]) -> Any:
+        if inspect.iscoroutinefunction(func):
+            return await func(*args)
+        value = await asyncio.to_thread(func, *args)
+        # Plain callables (e.g. lambdas) may still hand back a coroutine
+        if inspect.isawaitable(value):
+            value = await value
+        return value
+
+    async def _run_stage(self, name: str) -> Any:
+        stage = self._stages[name]
+        default = stage["default"]
+
+        dep_results = []
+        for dep in stage["deps"]:
+            dep_results.append(await self._tasks[dep])
+        failed_deps = [dep for dep in stage["deps"] if dep in self.errors]
+        if failed_deps:
+            self.errors[name] = f"dependency failed: {', '.join(failed_deps)}"
+            self.timings[name] = 0.0
+            return default
+
+        func = stage["func"]
+        timeout = stage["timeout"]
+        start = time.perf_counter()
+        try:
+            awaitable = self._invoke(func, dep_results)
+            if timeout:
+                return await asyncio.wait_for(awaitable, timeout=timeout)
+            return await awaitable
+        except asyncio.TimeoutError:
+            self.errors[name] = "timeout"
+            logger.warning(f"Pipeline stage '{name}' timed out after {timeout:.1f}s, using default")
+            return default
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self.errors[name] = str(exc)
+            logger.warning(f"Pipeline stage '{name}' failed: {exc}", exc_info=True)
+            return default
+        finally:
+            self.timings[name] = time.perf_counter() - start
@@ -0,0 +1,182 @@
+"""
+Pipelined translation for streamed answers.
+
+The English answer is generated token by token. Instead of waiting for the
+whole answer and translating it in one call, the token stream is cut into
+segments (markdown lines/blocks, and sentences inside long paragraphs). Each
+completed segment is handed to a translation worker as soon as it is complete,
+and translated segments are emitted strictly in order as they finish. The
+first translated text therefore appears roughly one sentence after generation
+starts instead of after generation plus a full-answer translation.
+"""
+
+import asyncio
+import logging
+import re
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Deque, List, Optional, Tuple
+
+logger = logging.getLogger("health_assistant")
+
+# Sentence end inside a paragraph: terminal punctuation (incl. Devanagari danda) + space
+_SENTENCE_END_RE = re.compile(r"[.!?।](?=\s)")
+# Segments with no letters (blank lines, "---", bullets only) are passed through untranslated
+_HAS_LETTER_RE = re.compile(r"[^\W\d_]")
+
+
+class MarkdownSegmenter:
+    """
+    Cut a streamed markdown answer into translatable segments.
+
+    Every line ends a segment (headings, list items and paragraphs are separate
+    markdown blocks). Inside a long line a segment also ends at a sentence
+    boundary once it holds at least `min_chars` characters, so short
+    abbreviations ("e.g. ", "Dr. ") rarely split a sentence. Concatenating the
+    segments always reproduces the input exactly.
+    """
+
+    def __init__(self, min_chars: int = 40) -> None:
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text and return the segments completed by it."""
+        self._buffer += text
+        segments: List[str] = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            segments.append(self._buffer[:cut])
+            self._buffer = self._buffer[cut:]
+        return segments
+
+    def flush(self) -> List[str]:
+        """Return whatever is left once the stream has ended."""
+        rest, self._buffer = self._buffer, ""
+        return [rest] if rest else []
+
+    def _find_cut(self) -> Optional[int]:
+        newline = self._buffer.find("\n")
+        if newline != -1:
+            # Keep consecutive newlines (blank lines) with the block they close
+            end = newline + 1
+            while end < len(self._buffer) and self._buffer[end] == "\n":
+                end += 1
+            # More newlines may still arrive with the next chunk
+            return None if end == len(self._buffer) else end
+
+        for match in _SENTENCE_END_RE.finditer(self._buffer):
+            end = match.end()
+            if end < self.min_chars:
+                continue
+            # Include the whitespace that follows the punctuation
+            while end < len(self._buffer) and self._buffer[end] in " \t":
+                end += 1
+            if end == len(self._buffer):
+                return None
+            return end
+        return None
+
+
+def _needs_translation(segment: str) -> bool:
+    return bool(_HAS_LETTER_RE.search(segment))
+
+
+async def _translate_segment(
+    translate: Callable[[str], Awaitable[str]],
+    segment: str,
+    semaphore: asyncio.Semaphore,
+) -> str:
+    """Translate the text of a segment, keeping its surrounding whitespace intact"""
+    if not _needs_translation(segment):
+        return segment
+    core = segment.strip()
+    leading = segment[: len(segment) - len(segment.lstrip())]
+    trailing = segment[len(segment.rstrip()):]
+    async with semaphore:
+        try:
+            translated = await translate(core)
+        except Exception as exc:
+            logger.warning(f"Segment translation failed, keeping English: {exc}")
+            translated = core
+    return f"{leading}{(translated or core).strip()}{trailing}"
+
+
+async def stream_with_pipelined_translation(
+    source_chunks: AsyncIterator[str],
+    translate: Callable[[str], Awaitable[str]],
+    concurrency: int = 4,
+    min_segment_chars: int = 40,
+) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Translate a token stream segment by segment while it is still being generated.
+
+    Args:
+        source_chunks: Async iterator of English text chunks (the LLM stream)
+        translate: Coroutine translating one segment into the target language
+        concurrency: Maximum number of segment translations in flight
+        min_segment_chars: Minimum length before a sentence boundary ends a segment
+
+    Yields:
+        ("source", chunk) for every English chunk as it arrives, and
+        ("translated", text) for every translated segment, in answer order
+    """
+    segmenter = MarkdownSegmenter(min_chars=min_segment_chars)
+    semaphore = asyncio.Semaphore(concurrency)
+    events: asyncio.Queue = asyncio.Queue()
+    pending: Deque[asyncio.Task] = deque()
+    done_marker = object()
+
+    def schedule(segments: List[str]) -> None:
+        for segment in segments:
+            task = asyncio.create_task(_translate_segment(translate, segment, semaphore))
+            pending.append(task)
+
+    async def produce() -> None:
+        try:
+            async for chunk in source_chunks:
+                if not chunk:
+                    continue
+                events.put_nowait(("source", chunk))
+                schedule(segmenter.feed(chunk))
+            schedule(segmenter.flush())
+        finally:
+            events.put_nowait((done_marker, None))
+
+    producer = asyncio.create_task(produce())
+    next_event: Optional[asyncio.Task] = None
+    producer_done = False
+    try:
+        while True:
+            # Emit every translated segment at the head of the queue that has finished
+            while pending and pending[0].done():
+                yield "translated", pending.popleft().result()
+            if producer_done and not pending:
+                break
+
+            waiters = set()
+            if not producer_done:
+                if next_event is None:
+                    next_event = asyncio.create_task(events.get())
+                waiters.add(next_event)
+            if pending:
+                waiters.add(pending[0])
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+
+            if next_event is not None and next_event.done():
+                kind, payload = next_event.result()
+                next_event = None
+                if kind is done_marker:
+                    producer_done = True
+                    # Surface errors from the generation stream
+                    await producer
+                elif kind == "source":
+                    yield "source", payload
+    finally:
+        if next_event is not None:
+            next_event.cancel()
+        if not producer.done():
+            producer.cancel()
+        for task in pending:
+            task.cancel()
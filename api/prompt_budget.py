@@ -0,0 +1,179 @@
+"""
+Token budgets for the answer prompt.
+
+The answer prompt is built from retrieved chunks, a fact summary,
+personalization notes and the conversation history. Without limits its size
+(and so generation latency and cost) varies with however much each part
+happens to contain. Every part is measured with the local tokenizer
+(rag/tokenizer.py) and packed into a fixed budget:
+
+    context  fact summary and notes are always kept and counted first; the
+             retrieved chunks, de-duplicated, fill the rest of
+             PROMPT_CONTEXT_TOKENS in retrieval rank order (the last one is
+             truncated when enough room is left for it to be useful)
+    history  the last PROMPT_HISTORY_RECENT_MESSAGES messages are kept
+             (long ones truncated); older messages are compressed into one
+             summary message; all within PROMPT_HISTORY_TOKENS
+
+Token counts are reported as prompt_tokens_* entries in metadata.timings.
+"""
+
+import os
+import re
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    from .rag.tokenizer import count_tokens, truncate_to_tokens
+except ImportError:
+    from rag.tokenizer import count_tokens, truncate_to_tokens
+
+PROMPT_CONTEXT_TOKENS = int(os.getenv("PROMPT_CONTEXT_TOKENS", "1800"))
+PROMPT_HISTORY_TOKENS = int(os.getenv("PROMPT_HISTORY_TOKENS", "800"))
+PROMPT_HISTORY_RECENT_MESSAGES = int(os.getenv("PROMPT_HISTORY_RECENT_MESSAGES", "4"))
+# A truncated chunk shorter than this is left out instead
+MIN_TRUNCATED_CHUNK_TOKENS = 60
+# Share of a chunk's word trigrams found in a kept chunk above which it is a duplicate
+DUPLICATE_OVERLAP = 0.8
+# Per-message cap inside the history summary
+SUMMARY_LINE_TOKENS = 40
+# Role/formatting overhead of one chat message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _shingles(text: str) -> Set[Tuple[str, ...]]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < 3:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + 3]) for i in range(len(words) - 2)}
+
+
+def dedupe_chunks(chunks: Sequence[str]) -> List[str]:
+    """
+    Drop chunks that repeat a higher-ranked chunk (same text, or mostly the same
+    word trigrams, e.g. overlapping windows or a chunk and its expanded
+    section). When a later chunk is a superset of a kept one, it takes the
+    kept one's place.
+    """
+    kept: List[Tuple[str, Set[Tuple[str, ...]]]] = []
+    for chunk in chunks:
+        shingles = _shingles(chunk)
+        if not shingles:
+            continue
+        duplicate = False
+        for position, (kept_chunk, kept_shingles) in enumerate(kept):
+            shared = len(shingles & kept_shingles)
+            if shared >= DUPLICATE_OVERLAP * len(shingles):
+                duplicate = True
+                break
+            if shared >= DUPLICATE_OVERLAP * len(kept_shingles):
+                kept[position] = (chunk, shingles)
+                duplicate = True
+                break
+        if not duplicate:
+            kept.append((chunk, shingles))
+    return [chunk for chunk, _ in kept]
+
+
+def pack_context(
+    chunks: Sequence[str],
+    budget: int = PROMPT_CONTEXT_TOKENS,
+    reserved: int = 0,
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Join ranked chunks into a context of at most `budget - reserved` tokens.
+
+    Args:
+        chunks: Retrieved chunk texts, best first
+        budget: Token budget of the whole context
+        reserved: Tokens already taken by parts that are always kept (fact summary, notes)
+
+    Returns:
+        (context text, token report)
+    """
+    unique = dedupe_chunks(chunks)
+    available = max(budget - reserved, 0)
+    parts: List[str] = []
+    used = 0
+    for chunk in unique:
+        tokens = count_tokens(chunk)
+        if used + tokens <= available:
+            parts.append(chunk)
+            used += tokens
+            continue
+        remaining = available - used
+        if remaining >= MIN_TRUNCATED_CHUNK_TOKENS:
+            parts.append(truncate_to_tokens(chunk, remaining, " …"))
+        break
+
+    context = "\n\n".join(parts)
+    return context, {
+        "prompt_tokens_context": count_tokens(context) + reserved,
+        "context_chunks": len(parts),
+        "context_chunks_deduplicated": len(chunks) - len(unique),
+        "context_chunks_dropped": len(unique) - len(parts),
+    }
+
+
+def _summary_line(message: Dict[str, Any]) -> str:
+    """First meaningful line of a message, without markdown decoration"""
+    role = "User" if message.get("role") == "user" else "Assistant"
+    for line in str(message.get("content") or "").splitlines():
+        line = line.strip().lstrip("#*->0123456789. ").strip()
+        if line:
+            return f"{role}: {truncate_to_tokens(line, SUMMARY_LINE_TOKENS, '…')}"
+    return ""
+
+
+def compress_history(
+    history: Optional[Sequence[Dict[str, Any]]],
+    budget: int = PROMPT_HISTORY_TOKENS,
+    keep_recent: int = PROMPT_HISTORY_RECENT_MESSAGES,
+) -> Tuple[List[Dict[str, str]], Dict[str, int]]:
+    """
+    Fit conversation history into `budget` tokens.
+
+    Returns:
+        (messages for the chat request, token report)
+    """
+    if not history or budget <= 0:
+        return [], {"prompt_tokens_history": 0, "history_messages_summarized": 0}
+
+    history = [m for m in history if m.get("content")]
+    recent = history[-keep_recent:] if keep_recent > 0 else []
+    older = history[:len(history) - len(recent)]
+
+    # Recent messages verbatim, each capped so one long answer cannot take the whole budget
+    cap = max(budget // (len(recent) + 1), MIN_TRUNCATED_CHUNK_TOKENS) if recent else 0
+    recent_messages = [
+        {"role": m["role"], "content": truncate_to_tokens(str(m["content"]), cap, " …")}
+        for m in recent
+    ]
+    used = sum(count_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in recent_messages)
+
+    # Older messages as one summary, newest lines first until the budget is used
+    lines: List[str] = []
+    remaining = budget - used - MESSAGE_OVERHEAD_TOKENS - count_tokens("Summary of earlier conversation:")
+    for message in reversed(older):
+        line = _summary_line(message)
+        tokens = count_tokens(line) + 2
+        if not line or tokens > remaining:
+            continue
+        lines.insert(0, line)
+        remaining -= tokens
+
+    messages: List[Dict[str, str]] = []
+    if lines:
+        summary = "Summary of earlier conversation:\n" + "\n".join(f"- {line}" for line in lines)
+        messages.append({"role": "system", "content": summary})
+    messages.extend(recent_messages)
+    return messages, {
+        "prompt_tokens_history": count_message_tokens(messages),
+        "history_messages_summarized": len(lines),
+    }
+
+
+def count_message_tokens(messages: Sequence[Dict[str, Any]]) -> int:
+    """Tokens of a chat request's messages, including per-message overhead"""
+    return sum(count_tokens(str(m.get("content") or "")) + MESSAGE_OVERHEAD_TOKENS for m in messages)
@@ -0,0 +1,204 @@
+"""
+Lexical BM25 index over the knowledge-base chunks.
+
+Dense retrieval ranks short symptom queries ("ulti", "loose motion", "kick
+count") and exact medical terms poorly; BM25 matches them literally. The
+index is built next to the vector index by build_index.py and stored as one
+compressed .npz file with CSR-style postings:
+    terms    sorted vocabulary (term id = position)
+    offsets  postings of term t are doc_ids/tfs[offsets[t]:offsets[t + 1]]
+    doc_ids  chunk row of each posting (smallest unsigned dtype that fits)
+    tfs      term frequency of each posting (uint16)
+plus per-chunk lengths, ids and categories. Scoring a query is a handful of
+vectorized updates over the postings of its terms.
+"""
+
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .numpy_index import NUMPY_INDEX_PATH
+
+BM25_INDEX_PATH = Path(os.getenv("RAG_BM25_INDEX_PATH", str(NUMPY_INDEX_PATH / "bm25.npz")))
+BM25_K1 = float(os.getenv("RAG_BM25_K1", "1.2"))
+BM25_B = float(os.getenv("RAG_BM25_B", "0.75"))
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+# Function words that only add noise to lexical matching
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i if in is it its me my of on or "
+    "should so than that the their them then there these this to was what when which who why will "
+    "with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens without stopwords"""
+    return [token for token in _TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over CSR postings"""
+
+    def __init__(
+        self,
+        terms: Sequence[str],
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        tfs: np.ndarray,
+        doc_lengths: np.ndarray,
+        ids: Sequence[str],
+        categories: Sequence[str],
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+    ) -> None:
+        self.term_ids: Dict[str, int] = {term: i for i, term in enumerate(terms)}
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_lengths = doc_lengths
+        self.ids = list(ids)
+        self.categories = np.asarray(categories)
+        self.k1 = k1
+        self.b = b
+
+        doc_count = len(self.ids)
+        document_frequency = np.diff(offsets).astype(np.float64)
+        self.idf = np.log1p((doc_count - document_frequency + 0.5) / (document_frequency + 0.5))
+        average_length = float(doc_lengths.mean()) if doc_count else 0.0
+        # Length normalization term k1 * (1 - b + b * |d| / avgdl), per chunk
+        self._length_norm = k1 * (1 - b + b * doc_lengths / average_length) if average_length else np.full(doc_count, k1)
+
+    @classmethod
+    def build(cls, ids: Sequence[str], documents: Sequence[str], categories: Sequence[str]) -> "BM25Index":
+        counts = [Counter(tokenize(document)) for document in documents]
+        terms = sorted({term for count in counts for term in count})
+        term_ids = {term: i for i, term in enumerate(terms)}
+
+        postings: List[List[Tuple[int, int]]] = [[] for _ in terms]
+        for row, count in enumerate(counts):
+            for term, tf in count.items():
+                postings[term_ids[term]].append((row, tf))
+
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(plist) for plist in postings])
+        doc_dtype = np.min_scalar_type(max(len(ids) - 1, 0))
+        doc_ids = np.fromiter((row for plist in postings for row, _ in plist), dtype=doc_dtype, count=int(offsets[-1]))
+        tfs = np.fromiter(
+            (min(tf, np.iinfo(np.uint16).max) for plist in postings for _, tf in plist),
+            dtype=np.uint16,
+            count=int(offsets[-1]),
+        )
+        doc_lengths = np.array([sum(count.values()) for count in counts], dtype=np.uint32)
+        return cls(terms, offsets, doc_ids, tfs, doc_lengths, ids, categories)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, query: str, k: int = 4, category: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        Top-k chunks by BM25 score.
+
+        Returns:
+            (chunk id, score) pairs, best first; chunks sharing no term with the query are left out
+        """
+        term_ids = [self.term_ids[term] for term in set(tokenize(query)) if term in self.term_ids]
+        if not term_ids or k <= 0:
+            return []
+
+        scores = np.zeros(len(self.ids), dtype=np.float64)
+        for term_id in term_ids:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            rows = self.doc_ids[start:end]
+            tf = self.tfs[start:end].astype(np.float64)
+            # Each chunk appears once per term, so fancy-indexed += is safe
+            scores[rows] += self.idf[term_id] * tf * (self.k1 + 1) / (tf + self._length_norm[rows])
+
+        if category is not None:
+            scores[self.categories != category] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if not len(candidates):
+            return []
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.ids[row], float(scores[row])) for row in candidates]
+
+    def save(self, path: Path) -> None:
+        terms = sorted(self.term_ids, key=self.term_ids.get)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            terms=np.array(terms, dtype=str),
+            offsets=self.offsets,
+            doc_ids=self.doc_ids,
+            tfs=self.tfs,
+            doc_lengths=self.doc_lengths,
+            ids=np.array(self.ids, dtype=str),
+            categories=np.array(self.categories, dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["terms"].tolist(),
+                data["offsets"],
+                data["doc_ids"],
+                data["tfs"],
+                data["doc_lengths"],
+                data["ids"].tolist(),
+                data["categories"].tolist(),
+            )
+
+
+def build_bm25_index(
+    ids: Sequence[str],
+    documents: Sequence[str],
+    metadatas: Sequence[Dict],
+    path: Path = BM25_INDEX_PATH,
+) -> BM25Index:
+    """Build the index for the given chunks and write it to path"""
+    categories = [(metadata or {}).get("category", "general") for metadata in metadatas]
+    index = BM25Index.build(ids, documents, categories)
+    index.save(path)
+    return index
+
+
+# ---------------------------------------------------------------------------
+# Process-wide index (loaded once, on first use or at startup)
+# ---------------------------------------------------------------------------
+_index: Optional[BM25Index] = None
+_index_lock = threading.Lock()
+_load_attempted = False
+
+
+def get_bm25_index() -> Optional[BM25Index]:
+    """The loaded index, or None if the index file is missing or unreadable"""
+    global _index, _load_attempted
+    if _index is None and not _load_attempted:
+        with _index_lock:
+            if _index is None and not _load_attempted:
+                _load_attempted = True
+                try:
+                    _index = BM25Index.load(BM25_INDEX_PATH)
+                    logging.info(f"BM25 index loaded: {len(_index)} chunks, {len(_index.term_ids)} terms")
+                except FileNotFoundError:
+                    logging.warning(f"BM25 index not found at {BM25_INDEX_PATH}; run build_index.py")
+                except Exception as e:
+                    logging.error(f"Failed to load BM25 index: {e}", exc_info=True)
+    return _index
+
+
+def reset_bm25_index() -> None:
+    """Drop the loaded index (the next search reloads it, e.g. after a rebuild)"""
+    global _index, _load_attempted
+    with _index_lock:
+        _index = None
+        _load_attempted = False
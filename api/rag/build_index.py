@@ -1,11 +1,14 @@
+import argparse
 import chromadb
 from chromadb.config import Settings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 import os
 import sys
 import re
 import yaml
 import json
+import hashlib
 from datetime import date, datetime
 
 # Add parent directory to path
@@ -13,8 +16,24 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from dotenv import load_dotenv
 
+from rag.bm25 import BM25_INDEX_PATH, build_bm25_index
+from rag.chunker import chunk_markdown
+from rag.citations import CITATION_TABLE_PATH, compile_citations, save_citation_table
+from rag.numpy_index import NUMPY_INDEX_PATH, export_collection
+
 load_dotenv()
 
+# Content hash and chunk ids of every indexed file, next to the Chroma data
+MANIFEST_FILE = "index_manifest.json"
+# Bump when chunking or metadata layout changes; a mismatch forces a full rebuild
+INDEX_FORMAT_VERSION = 3
+# Name of the collection's embedding function (chromadb DefaultEmbeddingFunction)
+EMBEDDING_MODEL = os.getenv("QUERY_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBED_BATCH_SIZE = int(os.getenv("RAG_INDEX_EMBED_BATCH_SIZE", "64"))
+INDEX_WORKERS = int(os.getenv("RAG_INDEX_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Ids per collection.delete call
+WRITE_BATCH_SIZE = 500
+
 
 def make_json_serializable(obj):
     """Convert date/datetime objects to strings for JSON serialization"""
@@ -38,35 +57,175 @@ def extract_frontmatter(content: str) -> tuple[dict, str]:
         if len(parts) >= 3:
             try:
                 frontmatter = yaml.safe_load(parts[1]) or {}
-                body = parts[2].strip()
             except yaml.YAMLError:
-                # If YAML parsing fails, treat entire content as body
-                pass
+                # Unquoted colons in values ("name: NICE — Osteoarthritis: care") break YAML;
+                # read the simple key/value layout line by line instead of indexing the block as text
+                frontmatter = parse_simple_frontmatter(parts[1])
+            body = parts[2].strip()
     
     return frontmatter, body
 
 
-def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> list[str]:
-    """Split text into overlapping chunks"""
-    words = text.split()
-    chunks = []
+def parse_simple_frontmatter(text: str) -> dict:
+    """Lenient frontmatter parser: top-level `key: value` scalars and lists of `- key: value` mappings"""
+    frontmatter = {}
+    current_key = None
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        stripped = line.strip()
+        if not line[0].isspace() and ":" in line:
+            key, value = line.split(":", 1)
+            current_key = key.strip()
+            frontmatter[current_key] = value.strip() if value.strip() and value.strip() != "|" else []
+        elif current_key and isinstance(frontmatter.get(current_key), list):
+            if stripped.startswith("- "):
+                stripped = stripped[2:]
+                frontmatter[current_key].append({})
+            if ":" in stripped and frontmatter[current_key] and isinstance(frontmatter[current_key][-1], dict):
+                key, value = stripped.split(":", 1)
+                frontmatter[current_key][-1][key.strip()] = value.strip()
+    return frontmatter
+
+
+def load_markdown_chunks(md_file: Path, data_dir: Path) -> tuple[list[str], list[str], list[dict], list[dict]]:
+    """Chunk one markdown file; returns (ids, documents, metadatas, citations)"""
+    # Get relative path for topic/category
+    relative_path = md_file.relative_to(data_dir)
+    category = relative_path.parent.name if relative_path.parent != Path(".") else "general"
+    
+    with open(md_file, "r", encoding="utf-8") as f:
+        content = f.read()
+    
+    # Extract frontmatter if present
+    frontmatter, body = extract_frontmatter(content)
+    
+    # Extract metadata
+    title = frontmatter.get("title", md_file.stem.replace("_", " ").replace("-", " "))
+    topic = frontmatter.get("id", md_file.stem)
+    sources = frontmatter.get("sources", [])
     
-    for i in range(0, len(words), chunk_size - overlap):
-        chunk = " ".join(words[i:i + chunk_size])
-        if chunk:
-            chunks.append(chunk)
+    # Clean source/url pairs for the citation table (dates converted to strings first)
+    citations = compile_citations(make_json_serializable(sources) if isinstance(sources, list) else [], str(relative_path))
     
-    return chunks
+    ids = []
+    documents = []
+    metadatas = []
+    # Use POSIX relative path (without extension) to guarantee unique IDs across folders
+    relative_id = relative_path.with_suffix("").as_posix()
+    for idx, chunk in enumerate(chunk_markdown(body, title=str(title))):
+        documents.append(chunk.text)
+        # Citations live in the citation table keyed by "source", not in chunk metadata
+        metadata_dict = {
+            "source": str(relative_path),
+            "source_file": md_file.name,
+            "category": category,
+            "title": title,
+            "topic": topic,
+            "chunk_id": idx,
+            # Heading path of the chunk's section; chunks sharing section_id make up one section
+            "heading_path": chunk.heading_path,
+            "section_id": f"{relative_id}#s{chunk.section_index}",
+        }
+        metadatas.append(metadata_dict)
+        ids.append(f"{relative_id}#{idx}")
+    
+    return ids, documents, metadatas, citations
+
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file's bytes"""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def load_manifest(chroma_path: Path) -> dict:
+    """The manifest written by the last build, or an empty one"""
+    try:
+        return json.loads((chroma_path / MANIFEST_FILE).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_manifest(chroma_path: Path, manifest: dict) -> None:
+    """Write the manifest atomically (a crash mid-write leaves the old one)"""
+    path = chroma_path / MANIFEST_FILE
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=1, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+_worker_embedding_function = None
+
+
+def embed_documents(documents: list[str]) -> list[list[float]]:
+    """Embed one batch with the collection's default embedding function (loaded once per process)"""
+    global _worker_embedding_function
+    if _worker_embedding_function is None:
+        from chromadb.utils import embedding_functions
+        _worker_embedding_function = embedding_functions.DefaultEmbeddingFunction()
+    return [[float(value) for value in embedding] for embedding in _worker_embedding_function(list(documents))]
+
+
+def embed_in_batches(documents: list[str], batch_size: int = EMBED_BATCH_SIZE, workers: int = INDEX_WORKERS):
+    """
+    Yield (start, embeddings) per batch of `batch_size` documents, as batches finish.
+
+    With more than one worker the batches are embedded in a process pool; at
+    most two batches per worker are in flight, so memory stays bounded.
+    """
+    starts = list(range(0, len(documents), batch_size))
+    if workers <= 1 or len(starts) <= 1:
+        for start in starts:
+            yield start, embed_documents(documents[start:start + batch_size])
+        return
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(starts))) as pool:
+        pending = {}
+        next_batch = 0
+        while next_batch < len(starts) or pending:
+            while next_batch < len(starts) and len(pending) < 2 * workers:
+                start = starts[next_batch]
+                pending[pool.submit(embed_documents, documents[start:start + batch_size])] = start
+                next_batch += 1
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+
+
+def artifact_paths(chroma_path: Path | None) -> tuple[Path, Path, Path]:
+    """
+    (NumPy index directory, BM25 file, citation table) of a build target.
+    The default target writes the live artifacts the API loads; any other
+    target keeps its artifacts in its own vector_index directory.
+    """
+    if chroma_path is None:
+        return NUMPY_INDEX_PATH, BM25_INDEX_PATH, CITATION_TABLE_PATH
+    vector_index = chroma_path / "vector_index"
+    return vector_index, vector_index / "bm25.npz", vector_index / "citations.json"
 
 
-def build_index():
-    """Build vector index from markdown files (recursively scans subdirectories)"""
+def build_index(
+    full: bool = False,
+    data_dir: Path | None = None,
+    chroma_path: Path | None = None,
+    workers: int = INDEX_WORKERS,
+):
+    """
+    Build or update the vector index from markdown files (recursively scans subdirectories).
+    
+    Incremental by default: index_manifest.json records the content hash and
+    chunk ids of every indexed file, so only new or changed files are
+    re-chunked and re-embedded, and chunks of deleted or shortened files are
+    removed. A full rebuild runs with full=True (--full), without a manifest,
+    or when the index format or embedding model changed.
+    """
     print("Building RAG index...")
     
     # Get the correct path
     script_dir = Path(__file__).parent
-    chroma_path = script_dir / "chroma_db"
-    data_dir = script_dir / "data"
+    numpy_index_path, bm25_index_path, citation_table_path = artifact_paths(chroma_path)
+    chroma_path = chroma_path or script_dir / "chroma_db"
+    data_dir = data_dir or script_dir / "data"
     
     print(f"Data directory: {data_dir}")
     print(f"Chroma path: {chroma_path}")
@@ -77,82 +236,129 @@ def build_index():
         settings=Settings(anonymized_telemetry=False),
     )
     
-    # Create or get collection
-    try:
-        collection = chroma_client.delete_collection("medical_knowledge")
-        print("Deleted existing collection")
-    except:
-        pass
+    manifest = load_manifest(chroma_path)
+    settings = {"format": INDEX_FORMAT_VERSION, "model": EMBEDDING_MODEL}
+    if manifest.get("settings") != settings:
+        full = True
     
-    collection = chroma_client.create_collection(
+    if full:
+        try:
+            chroma_client.delete_collection("medical_knowledge")
+            print("Deleted existing collection")
+        except Exception:
+            pass
+    
+    collection = chroma_client.get_or_create_collection(
         name="medical_knowledge",
         metadata={"description": "Medical knowledge base"}
     )
+    indexed_files = {} if full or collection.count() == 0 else manifest.get("files", {})
     
-    # Read all markdown files recursively
-    documents = []
-    metadatas = []
-    ids = []
-    
-    md_files = list(data_dir.rglob("*.md"))
+    md_files = sorted(data_dir.rglob("*.md"))
     print(f"Found {len(md_files)} markdown files")
     
+    # Re-chunk only files whose content hash changed
+    files = {}
+    changed_files = 0
+    ids = []
+    documents = []
+    metadatas = []
     for md_file in md_files:
-        # Get relative path for topic/category
-        relative_path = md_file.relative_to(data_dir)
-        category = relative_path.parent.name if relative_path.parent != Path(".") else "general"
+        relative_path = md_file.relative_to(data_dir).as_posix()
+        digest = file_hash(md_file)
+        previous = indexed_files.get(relative_path)
+        if previous and previous.get("hash") == digest:
+            files[relative_path] = previous
+            continue
         
         print(f"Processing {relative_path}...")
-        
-        with open(md_file, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        # Extract frontmatter if present
-        frontmatter, body = extract_frontmatter(content)
-        
-        # Extract metadata
-        title = frontmatter.get("title", md_file.stem.replace("_", " ").replace("-", " "))
-        topic = frontmatter.get("id", md_file.stem)
-        sources = frontmatter.get("sources", [])
-        
-        # Convert sources to JSON-serializable format (convert dates to strings)
-        serializable_sources = make_json_serializable(sources) if sources else []
-        
-        # Chunk the content
-        chunks = chunk_text(body)
-        
-        for idx, chunk in enumerate(chunks):
-            documents.append(chunk)
-            # Prepare metadata - ChromaDB doesn't accept None values, so use empty JSON array string
-            metadata_dict = {
-                "source": str(relative_path),
-                "source_file": md_file.name,
-                "category": category,
-                "title": title,
-                "topic": topic,
-                "chunk_id": idx,
-            }
-            # Only add reference_sources if we have sources, otherwise use empty array string
-            if serializable_sources:
-                metadata_dict["reference_sources"] = json.dumps(serializable_sources)
-            else:
-                metadata_dict["reference_sources"] = "[]"  # Empty JSON array string instead of None
-            
-            metadatas.append(metadata_dict)
-            # Use POSIX relative path (without extension) to guarantee unique IDs across folders
-            relative_id = relative_path.with_suffix("").as_posix()
-            ids.append(f"{relative_id}#{idx}")
-    
-    # Add to collection
-    print(f"Adding {len(documents)} chunks to index...")
-    collection.add(
-        documents=documents,
-        metadatas=metadatas,
-        ids=ids
+        file_ids, file_documents, file_metadatas, file_citations = load_markdown_chunks(md_file, data_dir)
+        ids.extend(file_ids)
+        documents.extend(file_documents)
+        metadatas.extend(file_metadatas)
+        files[relative_path] = {
+            "hash": digest,
+            "ids": file_ids,
+            # Citation table key: the "source" field of the file's chunks
+            "source": str(md_file.relative_to(data_dir)),
+            "citations": file_citations,
+        }
+        changed_files += 1
+    
+    # Chunks of deleted files, and trailing chunks of files that got shorter
+    live_ids = {chunk_id for entry in files.values() for chunk_id in entry["ids"]}
+    stale_ids = [
+        chunk_id
+        for entry in indexed_files.values()
+        for chunk_id in entry.get("ids", [])
+        if chunk_id not in live_ids
+    ]
+    
+    if not ids and not stale_ids and (numpy_index_path / "embeddings.npy").exists() and citation_table_path.exists():
+        print(f"Index is up to date ({len(live_ids)} chunks from {len(md_files)} files)")
+        return
+    
+    if stale_ids:
+        print(f"Removing {len(stale_ids)} stale chunks...")
+        for start in range(0, len(stale_ids), WRITE_BATCH_SIZE):
+            collection.delete(ids=stale_ids[start:start + WRITE_BATCH_SIZE])
+    
+    # Embed in bounded batches and stream each batch into the collection as it finishes
+    if ids:
+        print(f"Embedding {len(documents)} chunks from {changed_files} changed files...")
+        for start, embeddings in embed_in_batches(documents, workers=workers):
+            end = start + len(embeddings)
+            collection.upsert(
+                ids=ids[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+                embeddings=embeddings,
+            )
+    
+    # The collection is updated: record what it now holds
+    write_manifest(chroma_path, {"settings": settings, "files": files})
+    
+    # Whole-collection artifacts are rewritten from the updated collection.
+    # Same embeddings as a memory-mapped matrix for RAG_BACKEND=numpy, read page by page
+    all_ids, all_documents, all_metadatas = export_collection(collection, numpy_index_path)
+    print(f"Exported {len(all_ids)} chunk embeddings to {numpy_index_path}")
+    
+    # Lexical index for RAG_RETRIEVAL_MODE=hybrid
+    bm25_index = build_bm25_index(all_ids, all_documents, all_metadatas, bm25_index_path)
+    print(f"BM25 index built: {len(bm25_index.term_ids)} terms -> {bm25_index_path}")
+    
+    # Citation table: document path -> clean source/url pairs, resolved by lookup at query time
+    cited = save_citation_table(
+        {entry["source"]: entry["citations"] for entry in files.values() if entry.get("ids")},
+        citation_table_path,
     )
+    print(f"Citation table written: {cited} documents -> {citation_table_path}")
+    
+    # Stamp the index with a content hash; answer caches keyed on it are invalidated by rebuilds
+    index_version = write_index_version(chroma_path, all_ids, all_documents)
     
-    print(f"Index built successfully with {len(documents)} chunks from {len(md_files)} files")
+    print(
+        f"Index updated: {len(documents)} chunks embedded, {len(stale_ids)} removed, "
+        f"{len(all_ids)} chunks from {len(md_files)} files (version {index_version})"
+    )
+
+
+def write_index_version(chroma_path: Path, ids: list[str], documents: list[str]) -> str:
+    """Write a content hash of the indexed chunks to chroma_db/index_version.txt"""
+    digest = hashlib.sha256()
+    for chunk_id, document in sorted(zip(ids, documents)):
+        digest.update(chunk_id.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(document.encode("utf-8"))
+        digest.update(b"\0")
+    version = digest.hexdigest()[:16]
+    (chroma_path / "index_version.txt").write_text(version + "\n", encoding="utf-8")
+    return version
 
 
 if __name__ == "__main__":
-    build_index()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Build or update the RAG index")
+    parser.add_argument("--full", action="store_true", help="re-embed every file instead of only changed ones")
+    parser.add_argument("--workers", type=int, default=INDEX_WORKERS, help="embedding processes")
+    args = parser.parse_args()
+    build_index(full=args.full, workers=args.workers)
\ No newline at end of file
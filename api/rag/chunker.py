@@ -0,0 +1,136 @@
+"""
+Structure-aware chunking for the markdown knowledge base.
+
+Every document is split along its markdown headings first, so a chunk never
+straddles "Red flags & when to escalate" and "Evidence-backed self-care".
+Sections longer than the token budget are packed from paragraphs, then lines,
+then sentences, without overlap; chunks of one section therefore concatenate
+back to the section, which is how retrieval expands a hit to its parent
+section on demand.
+
+Each chunk starts with its heading path ("Asthma Basics > Red flags & when to
+escalate") so the embedding and the LLM both see what the text is about.
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from .tokenizer import count_tokens
+
+# Tokens per chunk, heading line included. The default embedding model
+# (all-MiniLM-L6-v2) truncates its input at 256 word pieces.
+CHUNK_MAX_TOKENS = int(os.getenv("RAG_CHUNK_MAX_TOKENS", "200"))
+# Sections whose text is only links already carried in the frontmatter sources
+SKIPPED_SECTIONS = frozenset({"references", "sources"})
+HEADING_SEPARATOR = " > "
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+@dataclass
+class Chunk:
+    text: str              # heading line + section text
+    heading_path: str      # "Title > Section > Subsection"
+    section_index: int     # position of the section in the document
+
+
+def split_sections(body: str, title: str = "") -> List[Tuple[List[str], str]]:
+    """(heading path, section text) per markdown section, in document order"""
+    sections: List[Tuple[List[str], str]] = []
+    stack: List[Tuple[int, str]] = []
+    lines: List[str] = []
+
+    def flush() -> None:
+        text = "\n".join(lines).strip()
+        if text:
+            sections.append((([title] if title else []) + [heading for _, heading in stack], text))
+        lines.clear()
+
+    in_code = False
+    for line in body.splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        match = None if in_code else _HEADING_RE.match(line)
+        if match:
+            flush()
+            level = len(match.group(1))
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, match.group(2).strip()))
+        else:
+            lines.append(line.rstrip())
+    flush()
+    return sections
+
+
+def _pieces(text: str, budget: int) -> List[str]:
+    """Split text into pieces that fit the budget: paragraphs, then lines, sentences, words"""
+    if count_tokens(text) <= budget:
+        return [text]
+    for pattern in (r"\n\s*\n", r"\n", None):
+        parts = [part.strip() for part in (re.split(pattern, text) if pattern else _SENTENCE_RE.split(text))]
+        parts = [part for part in parts if part]
+        if len(parts) > 1:
+            return [piece for part in parts for piece in _pieces(part, budget)]
+    # A single over-long sentence: split on words
+    words = text.split()
+    pieces, current = [], []
+    for word in words:
+        if current and count_tokens(" ".join(current + [word])) > budget:
+            pieces.append(" ".join(current))
+            current = []
+        current.append(word)
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_markdown(body: str, title: str = "", max_tokens: int = CHUNK_MAX_TOKENS) -> List[Chunk]:
+    """
+    Chunk a markdown body (frontmatter removed) along its sections.
+
+    Args:
+        body: Markdown text
+        title: Document title, used as the root of every heading path
+        max_tokens: Token budget per chunk, heading line included
+
+    Returns:
+        Chunks in document order
+    """
+    chunks: List[Chunk] = []
+    for section_index, (path, text) in enumerate(split_sections(body, title)):
+        if len(path) > (1 if title else 0) and path[-1].lower() in SKIPPED_SECTIONS:
+            continue
+        heading_path = HEADING_SEPARATOR.join(path)
+        budget = max(max_tokens - count_tokens(heading_path) - 1, 16)
+
+        bodies: List[str] = []
+        current = ""
+        for piece in _pieces(text, budget):
+            candidate = f"{current}\n{piece}" if current else piece
+            if current and count_tokens(candidate) > budget:
+                bodies.append(current)
+                candidate = piece
+            current = candidate
+        if current:
+            bodies.append(current)
+
+        for section_body in bodies:
+            text = f"{heading_path}\n{section_body}" if heading_path else section_body
+            chunks.append(Chunk(text, heading_path, section_index))
+    return chunks
+
+
+def chunk_body(text: str, heading_path: str) -> str:
+    """A chunk's text without its heading line"""
+    prefix = f"{heading_path}\n" if heading_path else ""
+    return text[len(prefix):] if prefix and text.startswith(prefix) else text
+
+
+def join_section(chunk_texts: List[str], heading_path: str) -> str:
+    """Rebuild a section (heading line first) from the texts of its chunks, in order"""
+    bodies = "\n".join(chunk_body(text, heading_path) for text in chunk_texts)
+    return f"{heading_path}\n{bodies}" if heading_path else bodies
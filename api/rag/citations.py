@@ -0,0 +1,107 @@
+"""
+Precompiled citation table for the knowledge base.
+
+build_index.py turns the `sources` frontmatter of every document into clean
+{"source": name, "url": url} pairs once, and writes them to citations.json
+keyed by the document path (the `source` field of every chunk). Retrieval
+resolves a chunk's citations with one dict lookup instead of parsing the
+reference_sources JSON stored in chunk metadata, and chat responses store
+citations already normalized, so reading history does no citation work.
+
+Indexes built before the table existed still work: their chunks carry
+reference_sources metadata, which is compiled the same way on the fly.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .numpy_index import NUMPY_INDEX_PATH
+
+CITATION_TABLE_PATH = Path(os.getenv("RAG_CITATION_TABLE_PATH", str(NUMPY_INDEX_PATH / "citations.json")))
+
+Citation = Dict[str, str]
+
+
+def compile_citations(reference_sources: Optional[Iterable[Any]], source: str = "") -> List[Citation]:
+    """
+    Clean, de-duplicated citations of one document.
+
+    Args:
+        reference_sources: Frontmatter sources ({"name", "url", ...} dicts or plain URLs)
+        source: Document path; documents without any URL cite the file itself
+
+    Returns:
+        {"source": display name, "url": link} pairs
+    """
+    citations: List[Citation] = []
+    seen_urls = set()
+    for ref in reference_sources or []:
+        if isinstance(ref, dict):
+            url, name = ref.get("url") or "", ref.get("name") or ""
+        elif isinstance(ref, str):
+            url, name = ref, ""
+        else:
+            continue
+        url = str(url).strip()
+        if url and url not in seen_urls:
+            seen_urls.add(url)
+            citations.append({"source": str(name).strip() or source or url, "url": url})
+    if not citations and source and ".md" in source:
+        citations.append({"source": source, "url": f"file://{source}"})
+    return citations
+
+
+def merge_citations(results: Iterable[Dict[str, Any]]) -> List[Citation]:
+    """Citations of several retrieval results, de-duplicated by URL in result order"""
+    merged: List[Citation] = []
+    seen_urls = set()
+    for result in results:
+        for citation in result.get("citations") or []:
+            if citation["url"] not in seen_urls:
+                seen_urls.add(citation["url"])
+                merged.append(citation)
+    return merged
+
+
+def save_citation_table(table: Dict[str, List[Citation]], path: Path = CITATION_TABLE_PATH) -> int:
+    """Write the table (document path -> citations); returns the number of documents"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(table, ensure_ascii=False, sort_keys=True), encoding="utf-8")
+    return len(table)
+
+
+# ---------------------------------------------------------------------------
+# Process-wide table (loaded once, on first use)
+# ---------------------------------------------------------------------------
+_table: Optional[Dict[str, List[Citation]]] = None
+_table_lock = threading.Lock()
+_load_attempted = False
+
+
+def get_citation_table() -> Optional[Dict[str, List[Citation]]]:
+    """The loaded table, or None if citations.json is missing or unreadable"""
+    global _table, _load_attempted
+    if _table is None and not _load_attempted:
+        with _table_lock:
+            if _table is None and not _load_attempted:
+                _load_attempted = True
+                try:
+                    _table = json.loads(CITATION_TABLE_PATH.read_text(encoding="utf-8"))
+                    logging.info(f"Citation table loaded: {len(_table)} documents")
+                except FileNotFoundError:
+                    logging.warning(f"Citation table not found at {CITATION_TABLE_PATH}; run build_index.py")
+                except Exception as e:
+                    logging.error(f"Failed to load citation table: {e}", exc_info=True)
+    return _table
+
+
+def reset_citation_table() -> None:
+    """Drop the loaded table (the next lookup reloads it, e.g. after a rebuild)"""
+    global _table, _load_attempted
+    with _table_lock:
+        _table = None
+        _load_attempted = False
@@ -0,0 +1,299 @@
+"""
+Query embedding cache for retrieval.
+
+Chroma embeds query_texts with the collection's default embedding function on
+every query. Queries (and the history-enhanced follow-up queries built from
+them) repeat often, so their vectors are cached by model name + normalized
+text in two tiers:
+    L1: in-process LocalCache (no network, shared by all requests in this worker)
+    L2: Redis through CacheService (shared across workers and restarts)
+
+The model runs in a worker thread so embedding never blocks the event loop.
+Bump QUERY_EMBEDDING_MODEL if the collection's embedding function changes.
+"""
+
+import asyncio
+import base64
+import hashlib
+import logging
+import os
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..services.cache import cache_service
+from ..services.local_cache import LocalCache
+
+logger = logging.getLogger("health_assistant")
+
+# Name of the collection's embedding function (chromadb DefaultEmbeddingFunction)
+QUERY_EMBEDDING_MODEL = os.getenv("QUERY_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+QUERY_EMBEDDING_CACHE_ENABLED = os.getenv("ENABLE_QUERY_EMBEDDING_CACHE", "1").lower() == "1"
+# A 384-dim vector is ~2 KB packed, so the default holds roughly 8k queries
+QUERY_EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("QUERY_EMBEDDING_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+QUERY_EMBEDDING_CACHE_TTL_SECONDS = int(os.getenv("QUERY_EMBEDDING_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+_embedding_function = None
+_model_lock = Lock()
+
+
+def normalize_embedding_text(text: str) -> str:
+    """Lowercase and collapse whitespace (the default model is uncased)"""
+    return " ".join(text.lower().split())
+
+
+def _default_embedding_function():
+    global _embedding_function
+    if _embedding_function is None:
+        with _model_lock:
+            if _embedding_function is None:
+                from chromadb.utils import embedding_functions
+                _embedding_function = embedding_functions.DefaultEmbeddingFunction()
+    return _embedding_function
+
+
+def _embed_with_model(text: str) -> Optional[List[float]]:
+    embeddings = _default_embedding_function()([text])
+    return [float(value) for value in embeddings[0]] if embeddings else None
+
+
+def _embed_batch_with_model(texts: List[str]) -> List[Optional[List[float]]]:
+    embeddings = _default_embedding_function()(list(texts))
+    return [[float(value) for value in embedding] for embedding in embeddings]
+
+
+def _pack(vector: List[float]) -> str:
+    return base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+
+
+def _unpack(packed: str) -> List[float]:
+    return np.frombuffer(base64.b64decode(packed), dtype=np.float32).tolist()
+
+
+class QueryEmbeddingCache:
+    """Two-tier (LRU + Redis) cache of query embeddings with single-flight misses"""
+
+    def __init__(
+        self,
+        cache: Any = cache_service,
+        embed_fn=_embed_with_model,
+        batch_embed_fn=None,
+        model: str = QUERY_EMBEDDING_MODEL,
+        max_bytes: int = QUERY_EMBEDDING_CACHE_MAX_BYTES,
+        ttl: int = QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+        enabled: bool = QUERY_EMBEDDING_CACHE_ENABLED,
+    ) -> None:
+        self.cache = cache
+        self.embed_fn = embed_fn
+        # One model call for many texts; defaults to calling embed_fn per text
+        self.batch_embed_fn = batch_embed_fn
+        self.model = model
+        self.ttl = ttl
+        self.enabled = enabled
+        # Holds packed vectors, so hits return a fresh list and the byte bound is exact
+        self._local = LocalCache(max_bytes=max_bytes, enabled=enabled)
+        self.stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "errors": 0}
+
+    def make_key(self, normalized: str) -> str:
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return f"qemb:{self.model}:{digest}"
+
+    def _get_local(self, key: str) -> Optional[List[float]]:
+        packed = self._local.get(key)
+        return _unpack(packed) if packed is not None else None
+
+    def _set_local(self, key: str, vector: List[float]) -> None:
+        self._local.set(key, _pack(vector), self.ttl)
+
+    def _compute(self, normalized: str) -> Optional[List[float]]:
+        try:
+            return self.embed_fn(normalized)
+        except Exception as exc:
+            self.stats["errors"] += 1
+            logger.warning(f"Query embedding failed: {exc}")
+            return None
+
+    def _compute_many(self, normalized: List[str]) -> List[Optional[List[float]]]:
+        if self.batch_embed_fn is None:
+            return [self._compute(text) for text in normalized]
+        try:
+            vectors = self.batch_embed_fn(normalized)
+        except Exception as exc:
+            self.stats["errors"] += 1
+            logger.warning(f"Batch query embedding failed: {exc}")
+            return [None] * len(normalized)
+        return list(vectors) if len(vectors) == len(normalized) else [None] * len(normalized)
+
+    def embed_many_sync(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Embed several texts from a worker thread: L1 lookups, then one batched
+        model call for the misses (no Redis round-trip).
+
+        Returns:
+            One vector (or None) per input text, in order
+        """
+        normalized = [normalize_embedding_text(text or "") for text in texts]
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        for position, text in enumerate(normalized):
+            if not text:
+                continue
+            vector = self._get_local(self.make_key(text)) if self.enabled else None
+            if vector is not None:
+                self.stats["l1_hits"] += 1
+                vectors[position] = vector
+            else:
+                missing.setdefault(text, []).append(position)
+
+        if missing:
+            self.stats["misses"] += len(missing)
+            batch = list(missing)
+            for text, vector in zip(batch, self._compute_many(batch)):
+                if vector is None:
+                    continue
+                if self.enabled:
+                    self._set_local(self.make_key(text), vector)
+                for position in missing[text]:
+                    vectors[position] = vector
+        return vectors
+
+    async def embed_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Embeddings for several queries: L1, then one Redis MGET, then one
+        batched model call in a worker thread for whatever is still missing
+        (stored back with one pipelined write).
+        """
+        normalized = [normalize_embedding_text(text or "") for text in texts]
+        if not self.enabled:
+            return await asyncio.to_thread(self.embed_many_sync, texts)
+
+        keys = {text: self.make_key(text) for text in normalized if text}
+        found: Dict[str, List[float]] = {}
+        for text, key in keys.items():
+            vector = self._get_local(key)
+            if vector is not None:
+                self.stats["l1_hits"] += 1
+                found[text] = vector
+
+        remote = [text for text in keys if text not in found]
+        if remote:
+            try:
+                cached = await self.cache.get_many([keys[text] for text in remote])
+            except Exception as exc:
+                logger.debug(f"Query embedding L2 lookup failed: {exc}")
+                cached = {}
+            for text in remote:
+                entry = cached.get(keys[text])
+                if isinstance(entry, dict) and entry.get("v"):
+                    try:
+                        vector = _unpack(entry["v"])
+                    except (ValueError, TypeError):
+                        continue
+                    self.stats["l2_hits"] += 1
+                    self._set_local(keys[text], vector)
+                    found[text] = vector
+
+        missing = [text for text in keys if text not in found]
+        if missing:
+            self.stats["misses"] += len(missing)
+            computed = await asyncio.to_thread(self._compute_many, missing)
+            stores: Dict[str, Dict[str, str]] = {}
+            for text, vector in zip(missing, computed):
+                if vector is None:
+                    continue
+                found[text] = vector
+                self._set_local(keys[text], vector)
+                stores[keys[text]] = {"v": _pack(vector)}
+            if stores:
+                try:
+                    await self.cache.set_many(stores, ttl=self.ttl)
+                except Exception as exc:
+                    logger.debug(f"Query embedding L2 store failed: {exc}")
+        return [found.get(text) for text in normalized]
+
+    def embed_sync(self, text: str) -> Optional[List[float]]:
+        """Embed from a worker thread: L1 lookup, then the model (no Redis round-trip)"""
+        normalized = normalize_embedding_text(text or "")
+        if not normalized:
+            return None
+        if not self.enabled:
+            return self._compute(normalized)
+        key = self.make_key(normalized)
+        vector = self._get_local(key)
+        if vector is not None:
+            self.stats["l1_hits"] += 1
+            return vector
+        self.stats["misses"] += 1
+        vector = self._compute(normalized)
+        if vector is not None:
+            self._set_local(key, vector)
+        return vector
+
+    async def embed(self, text: str) -> Optional[List[float]]:
+        """
+        Embedding for a query: L1, then Redis, then the model in a worker thread.
+
+        Concurrent misses for the same text share one model call. Returns None
+        if the model is unavailable (callers fall back to query_texts).
+        """
+        normalized = normalize_embedding_text(text or "")
+        if not normalized:
+            return None
+        if not self.enabled:
+            return await asyncio.to_thread(self._compute, normalized)
+
+        key = self.make_key(normalized)
+        vector = self._get_local(key)
+        if vector is not None:
+            self.stats["l1_hits"] += 1
+            return vector
+
+        return await self._local.single_flight(key, lambda: self._load_or_compute(key, normalized))
+
+    async def _load_or_compute(self, key: str, normalized: str) -> Optional[List[float]]:
+        try:
+            cached = await self.cache.get_from_cache(key, fast_path=True)
+        except Exception as exc:
+            logger.debug(f"Query embedding L2 lookup failed: {exc}")
+            cached = None
+        if isinstance(cached, dict) and cached.get("v"):
+            try:
+                vector = _unpack(cached["v"])
+            except (ValueError, TypeError) as exc:
+                logger.debug(f"Query embedding L2 entry unreadable: {exc}")
+            else:
+                self.stats["l2_hits"] += 1
+                self._set_local(key, vector)
+                return vector
+
+        self.stats["misses"] += 1
+        vector = await asyncio.to_thread(self._compute, normalized)
+        if vector is None:
+            return None
+        self._set_local(key, vector)
+        try:
+            await self.cache.set_to_cache(key, {"v": _pack(vector)}, ttl=self.ttl, fast_path=True)
+        except Exception as exc:
+            logger.debug(f"Query embedding L2 store failed: {exc}")
+        return vector
+
+    def clear(self) -> None:
+        self._local.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        lookups = self.stats["l1_hits"] + self.stats["l2_hits"] + self.stats["misses"]
+        hits = self.stats["l1_hits"] + self.stats["l2_hits"]
+        local = self._local.get_statistics()
+        return {
+            **self.stats,
+            "model": self.model,
+            "entries": local["entries"],
+            "bytes": local["bytes"],
+            "coalesced": local["coalesced"],
+            "hit_rate_percent": round(hits / lookups * 100, 2) if lookups else 0,
+            "enabled": self.enabled,
+        }
+
+
+query_embedding_cache = QueryEmbeddingCache(batch_embed_fn=_embed_batch_with_model)
@@ -0,0 +1,264 @@
+"""
+In-memory NumPy vector index: a lightweight alternative to the Chroma backend.
+
+The knowledge base is a few hundred chunks, so exact search over every chunk
+is cheaper than an HNSW index: all chunk embeddings live in one contiguous
+float32 matrix (unit-normalized, memory-mapped from embeddings.npy) and a
+query is a single matrix-vector product followed by a partial sort. Chunk
+texts and metadata are stored next to it in chunks.json, in the same form as
+Chroma's metadata, so results format identically.
+
+Written by build_index.py (or `python -m api.rag.numpy_index` from an
+existing Chroma collection); selected with RAG_BACKEND=numpy.
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+NUMPY_INDEX_PATH = Path(os.getenv("RAG_NUMPY_INDEX_PATH", str(Path(__file__).parent / "vector_index")))
+EMBEDDINGS_FILE = "embeddings.npy"
+CHUNKS_FILE = "chunks.json"
+# Chunks per collection.get call when exporting (bounds the embeddings held in memory)
+EXPORT_PAGE_SIZE = int(os.getenv("RAG_EXPORT_PAGE_SIZE", "1000"))
+
+
+class NumpyVectorIndex:
+    """Exact cosine top-k over a (chunks x dim) float32 matrix"""
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+    ) -> None:
+        if embeddings.ndim != 2 or embeddings.shape[0] != len(ids):
+            raise ValueError(f"Embedding matrix shape {embeddings.shape} does not match {len(ids)} chunks")
+        self.embeddings = embeddings
+        self.ids = list(ids)
+        self.documents = list(documents)
+        self.metadatas = [dict(metadata or {}) for metadata in metadatas]
+        self._rows = {chunk_id: row for row, chunk_id in enumerate(self.ids)}
+        # Row numbers per category, for filtered searches
+        rows_by_category: Dict[str, List[int]] = {}
+        for row, metadata in enumerate(self.metadatas):
+            rows_by_category.setdefault(metadata.get("category", "general"), []).append(row)
+        self._category_rows = {category: np.array(rows) for category, rows in rows_by_category.items()}
+        # Rows of each markdown section, in chunk order (for expanding a hit to its section)
+        self._section_rows: Dict[str, List[int]] = {}
+        for row, metadata in enumerate(self.metadatas):
+            if metadata.get("section_id"):
+                self._section_rows.setdefault(metadata["section_id"], []).append(row)
+        for rows in self._section_rows.values():
+            rows.sort(key=lambda row: self.metadatas[row].get("chunk_id", 0))
+
+    @property
+    def dimension(self) -> int:
+        return int(self.embeddings.shape[1])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(
+        self,
+        query_embedding: Sequence[float],
+        k: int = 4,
+        category: Optional[str] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k chunks by cosine similarity.
+
+        Args:
+            query_embedding: Query vector (normalized here)
+            k: Number of results
+            category: Only search chunks whose metadata category matches
+
+        Returns:
+            (row, similarity) pairs, most similar first
+        """
+        return self.search_many([query_embedding], k=k, category=category)[0]
+
+    def search_many(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        k: int = 4,
+        category: Optional[str] = None,
+    ) -> List[List[Tuple[int, float]]]:
+        """Top-k for several queries with one matrix multiply (one result list per query)"""
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim != 2 or queries.shape[1] != self.dimension:
+            raise ValueError(f"Query shape {queries.shape} does not match index dimension {self.dimension}")
+        if k <= 0 or not len(self) or not len(queries):
+            return [[] for _ in range(len(queries))]
+
+        if category is None:
+            rows = None
+            matrix = self.embeddings
+        else:
+            rows = self._category_rows.get(category)
+            if rows is None or not len(rows):
+                return [[] for _ in range(len(queries))]
+            matrix = self.embeddings[rows]
+
+        norms = np.linalg.norm(queries, axis=1)
+        scores = matrix @ (queries / np.where(norms == 0, 1.0, norms)[:, None]).T
+        k = min(k, scores.shape[0])
+        results = []
+        for column, norm in enumerate(norms):
+            if not norm:
+                results.append([])
+                continue
+            column_scores = scores[:, column]
+            top = np.argpartition(-column_scores, k - 1)[:k] if k < len(column_scores) else np.arange(len(column_scores))
+            top = top[np.argsort(-column_scores[top], kind="stable")]
+            results.append([(int(rows[i]) if rows is not None else int(i), float(column_scores[i])) for i in top])
+        return results
+
+    def row_of(self, chunk_id: str) -> Optional[int]:
+        """Row of a chunk id, or None"""
+        return self._rows.get(chunk_id)
+
+    def section_rows(self, section_id: str) -> List[int]:
+        """Rows of the chunks of one section, in document order"""
+        return self._section_rows.get(section_id, [])
+
+    def get(self, row: int) -> Tuple[str, str, Dict[str, Any]]:
+        """(id, document, metadata) of a row"""
+        return self.ids[row], self.documents[row], self.metadatas[row]
+
+
+def save_index(
+    path: Path,
+    embeddings: Sequence[Sequence[float]],
+    ids: Sequence[str],
+    documents: Sequence[str],
+    metadatas: Sequence[Dict[str, Any]],
+) -> int:
+    """Write unit-normalized embeddings.npy and chunks.json; returns the number of chunks"""
+    matrix = _unit_rows(embeddings)
+    path.mkdir(parents=True, exist_ok=True)
+    np.save(path / EMBEDDINGS_FILE, matrix)
+    return _write_chunks(path, ids, documents, metadatas)
+
+
+def _unit_rows(embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.ndim != 2:
+        raise ValueError("Embeddings must be a 2-D array")
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(matrix / norms)
+
+
+def _write_chunks(
+    path: Path,
+    ids: Sequence[str],
+    documents: Sequence[str],
+    metadatas: Sequence[Dict[str, Any]],
+) -> int:
+    chunks = {"ids": list(ids), "documents": list(documents), "metadatas": [dict(m or {}) for m in metadatas]}
+    (path / CHUNKS_FILE).write_text(json.dumps(chunks, ensure_ascii=False), encoding="utf-8")
+    return len(chunks["ids"])
+
+
+def load_index(path: Path = NUMPY_INDEX_PATH, mmap: bool = True) -> NumpyVectorIndex:
+    """Load an index written by save_index (the matrix is memory-mapped read-only by default)"""
+    embeddings = np.load(path / EMBEDDINGS_FILE, mmap_mode="r" if mmap else None)
+    chunks = json.loads((path / CHUNKS_FILE).read_text(encoding="utf-8"))
+    return NumpyVectorIndex(embeddings, chunks["ids"], chunks["documents"], chunks["metadatas"])
+
+
+def export_collection(
+    collection: Any,
+    path: Path = NUMPY_INDEX_PATH,
+    page_size: int = EXPORT_PAGE_SIZE,
+) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+    """
+    Write the embeddings, documents and metadata of a Chroma collection as a
+    NumPy index. The collection is read page by page and each page's
+    embeddings go straight into the memory-mapped output file, so only one
+    page of embeddings is held in memory.
+
+    Returns:
+        (ids, documents, metadatas) of the exported chunks, in matrix row order
+    """
+    count = collection.count()
+    path.mkdir(parents=True, exist_ok=True)
+    ids: List[str] = []
+    documents: List[str] = []
+    metadatas: List[Dict[str, Any]] = []
+    matrix = None
+    for offset in range(0, count, page_size):
+        page = collection.get(limit=page_size, offset=offset, include=["embeddings", "documents", "metadatas"])
+        rows = _unit_rows(page["embeddings"])
+        if matrix is None:
+            matrix = np.lib.format.open_memmap(
+                path / EMBEDDINGS_FILE, mode="w+", dtype=np.float32, shape=(count, rows.shape[1])
+            )
+        matrix[len(ids):len(ids) + len(rows)] = rows
+        ids.extend(page["ids"])
+        documents.extend(page["documents"])
+        metadatas.extend(page["metadatas"])
+    if matrix is None:
+        np.save(path / EMBEDDINGS_FILE, np.zeros((0, 0), dtype=np.float32))
+    else:
+        matrix.flush()
+        del matrix
+    if len(ids) != count:
+        raise RuntimeError(f"Collection changed during export: expected {count} chunks, read {len(ids)}")
+    _write_chunks(path, ids, documents, metadatas)
+    return ids, documents, metadatas
+
+
+# ---------------------------------------------------------------------------
+# Process-wide index (loaded once, on first use or at startup)
+# ---------------------------------------------------------------------------
+_index: Optional[NumpyVectorIndex] = None
+_index_lock = threading.Lock()
+_load_attempted = False
+
+
+def get_numpy_index() -> Optional[NumpyVectorIndex]:
+    """The loaded index, or None if the index files are missing or unreadable"""
+    global _index, _load_attempted
+    if _index is None and not _load_attempted:
+        with _index_lock:
+            if _index is None and not _load_attempted:
+                _load_attempted = True
+                try:
+                    _index = load_index(NUMPY_INDEX_PATH)
+                    logging.info(f"NumPy vector index loaded: {len(_index)} chunks, dim {_index.dimension}")
+                except FileNotFoundError:
+                    logging.warning(f"NumPy vector index not found at {NUMPY_INDEX_PATH}; run build_index.py")
+                except Exception as e:
+                    logging.error(f"Failed to load NumPy vector index: {e}", exc_info=True)
+    return _index
+
+
+def numpy_index_location() -> str:
+    """Directory the process-wide index is loaded from"""
+    return str(NUMPY_INDEX_PATH)
+
+
+def reset_numpy_index() -> None:
+    """Drop the loaded index (the next search reloads it, e.g. after a rebuild)"""
+    global _index, _load_attempted
+    with _index_lock:
+        _index = None
+        _load_attempted = False
+
+
+if __name__ == "__main__":
+    import chromadb
+    from chromadb.config import Settings
+
+    chroma_path = Path(__file__).parent / "chroma_db"
+    client = chromadb.PersistentClient(path=str(chroma_path), settings=Settings(anonymized_telemetry=False))
+    exported_ids, _, _ = export_collection(client.get_collection("medical_knowledge"))
+    print(f"Exported {len(exported_ids)} chunks to {NUMPY_INDEX_PATH}")
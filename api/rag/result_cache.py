@@ -0,0 +1,154 @@
+"""
+In-process cache of formatted retrieval results.
+
+The same questions ("what to do for fever") are retrieved over and over, and
+each retrieval embeds the query, searches the index and parses chunk metadata
+(including, for older indexes, the reference_sources JSON) again. This cache stores the finished
+retrieve() result lists, keyed by normalized query, k, filters and backend,
+and bounded by an estimate of their size in bytes (LRU eviction).
+
+Each entry remembers the index version it was computed against. Entries older
+than RAG_RESULT_CACHE_TTL_SECONDS, or from an older index version, are stale:
+they are still served (up to RAG_RESULT_CACHE_STALE_SECONDS old) while one
+background refresh recomputes them (stale-while-revalidate), so a rebuild or
+an expiry never puts an index search back on the request path.
+"""
+
+import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+RESULT_CACHE_ENABLED = os.getenv("ENABLE_RAG_RESULT_CACHE", "1").lower() == "1"
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RAG_RESULT_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+RESULT_CACHE_TTL_SECONDS = int(os.getenv("RAG_RESULT_CACHE_TTL_SECONDS", str(3600)))
+RESULT_CACHE_STALE_SECONDS = int(os.getenv("RAG_RESULT_CACHE_STALE_SECONDS", str(24 * 3600)))
+
+# Rough per-result overhead of the dict and its short fields
+_RESULT_OVERHEAD_BYTES = 400
+
+Results = List[Dict[str, Any]]
+
+
+def estimate_size(results: Results) -> int:
+    """Approximate memory held by a result list"""
+    size = 64
+    for result in results:
+        size += _RESULT_OVERHEAD_BYTES + len(result.get("chunk") or "")
+        size += sum(len(c.get("source", "")) + len(c.get("url", "")) for c in result.get("citations") or [])
+    return size
+
+
+class RetrievalResultCache:
+    """Byte-bounded LRU of retrieve() results with stale-while-revalidate"""
+
+    def __init__(
+        self,
+        max_bytes: int = RESULT_CACHE_MAX_BYTES,
+        ttl: int = RESULT_CACHE_TTL_SECONDS,
+        stale_ttl: int = RESULT_CACHE_STALE_SECONDS,
+        enabled: bool = RESULT_CACHE_ENABLED,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.enabled = enabled
+        # key -> (results, index version, stored_at, size)
+        self._entries: "OrderedDict[str, Tuple[Results, str, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+        self._refreshing: Set[str] = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rag-revalidate")
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "revalidations": 0, "evictions": 0, "errors": 0}
+
+    def get(
+        self,
+        key: str,
+        version: str,
+        revalidate: Optional[Callable[[], Tuple[str, Results]]] = None,
+    ) -> Optional[Results]:
+        """
+        Cached results for key, or None on a miss.
+
+        A stale entry (expired, or computed against another index version) is
+        returned as well, and `revalidate` (returning the current index version
+        and fresh results) is scheduled in the background to replace it.
+        """
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or now - entry[2] > self.stale_ttl:
+                self.stats["misses"] += 1
+                return None
+            results, entry_version, stored_at, _ = entry
+            self._entries.move_to_end(key)
+            stale = entry_version != version or now - stored_at > self.ttl
+            self.stats["stale_hits" if stale else "hits"] += 1
+        if stale and revalidate is not None:
+            self._schedule_refresh(key, revalidate)
+        return [dict(result) for result in results]
+
+    def put(self, key: str, version: str, results: Results) -> None:
+        """Store results (empty lists are not cached: they usually mean the backend failed)"""
+        if not self.enabled or not results:
+            return
+        stored = [dict(result) for result in results]
+        size = estimate_size(stored)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[3]
+            self._entries[key] = (stored, version, time.monotonic(), size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[3]
+                self.stats["evictions"] += 1
+
+    def _schedule_refresh(self, key: str, revalidate: Callable[[], Tuple[str, Results]]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        self._executor.submit(self._refresh, key, revalidate)
+
+    def _refresh(self, key: str, revalidate: Callable[[], Tuple[str, Results]]) -> None:
+        try:
+            version, results = revalidate()
+            self.put(key, version, results)
+            self.stats["revalidations"] += 1
+        except Exception as e:
+            self.stats["errors"] += 1
+            logging.warning(f"Retrieval cache refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_statistics(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["stale_hits"] + self.stats["misses"]
+        hits = self.stats["hits"] + self.stats["stale_hits"]
+        with self._lock:
+            entries, size = len(self._entries), self._bytes
+        return {
+            **self.stats,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hit_rate_percent": round(hits / lookups * 100, 2) if lookups else 0,
+            "enabled": self.enabled,
+        }
+
+
+retrieval_cache = RetrievalResultCache()
@@ -1,8 +1,9 @@
 import logging
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence
 
 import chromadb
 from chromadb.config import Settings
@@ -14,11 +15,34 @@ logging.getLogger("chromadb.telemetry").setLevel(logging.CRITICAL)
 logging.getLogger("chromadb.telemetry.telemetry").setLevel(logging.CRITICAL)
 logging.getLogger("chromadb.telemetry.product").setLevel(logging.CRITICAL)
 
+from .embeddings import query_embedding_cache  # noqa: E402
+from .numpy_index import get_numpy_index, numpy_index_location  # noqa: E402
+from .bm25 import get_bm25_index  # noqa: E402
+from .chunker import join_section  # noqa: E402
+from .citations import compile_citations, get_citation_table  # noqa: E402
+from .result_cache import retrieval_cache  # noqa: E402
+
+# "chroma" (persistent HNSW collection) or "numpy" (exact search over rag/vector_index)
+RAG_BACKEND = os.getenv("RAG_BACKEND", "chroma").lower()
+# "dense" (vector search only) or "hybrid" (vector + BM25, fused with reciprocal rank fusion)
+RAG_RETRIEVAL_MODE = os.getenv("RAG_RETRIEVAL_MODE", "dense").lower()
+# Candidates taken from each ranking before fusion, and the RRF rank constant
+RAG_HYBRID_CANDIDATES = int(os.getenv("RAG_HYBRID_CANDIDATES", "10"))
+RAG_RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+
+# Runs the BM25 search while the dense search runs in the calling thread
+_lexical_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="bm25")
+
 # Cached ChromaDB client and collection for performance optimization
 _chroma_client = None
 _chroma_collection = None
 _chroma_initialized = False
 
+CHROMA_PATH = Path(__file__).parent / "chroma_db"
+# Written by build_index.py; changes whenever the indexed content changes
+INDEX_VERSION_FILE = CHROMA_PATH / "index_version.txt"
+_index_version_cache: Dict[str, object] = {"mtime": None, "version": "0"}
+
 
 def _initialize_chroma():
     """Initialize ChromaDB client and collection (cached for performance)"""
@@ -28,13 +52,9 @@ def _initialize_chroma():
         return _chroma_client, _chroma_collection
     
     try:
-        # Get the correct path
-        script_dir = Path(__file__).parent
-        chroma_path = script_dir / "chroma_db"
-        
         # Initialize Chroma client (only once)
         _chroma_client = chromadb.PersistentClient(
-            path=str(chroma_path),
+            path=str(CHROMA_PATH),
             settings=Settings(anonymized_telemetry=False),
         )
         
@@ -64,21 +84,360 @@ def _initialize_chroma():
 
 
 def initialize_chroma_client():
-    """Public function to pre-initialize ChromaDB on startup"""
+    """Public function to pre-initialize the configured vector backend on startup"""
+    if RAG_RETRIEVAL_MODE == "hybrid":
+        get_bm25_index()
+    if RAG_BACKEND == "numpy":
+        get_numpy_index()
+        return
     _initialize_chroma()
 
 
-def retrieve(query: str, k: int = 4) -> List[Dict[str, str]]:
+def get_index_version() -> str:
+    """
+    Version of the knowledge-base index, used to invalidate caches of answers
+    built from it. Reads the stamp written by build_index.py (re-read only when
+    the file changes); falls back to the Chroma database modification time.
+    """
+    candidates = [INDEX_VERSION_FILE, CHROMA_PATH / "chroma.sqlite3"]
+    for path in candidates:
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            continue
+        if _index_version_cache["mtime"] != (path, mtime):
+            if path == INDEX_VERSION_FILE:
+                version = path.read_text(encoding="utf-8").strip() or "0"
+            else:
+                version = f"m{int(mtime)}"
+            _index_version_cache.update({"mtime": (path, mtime), "version": version})
+        return str(_index_version_cache["version"])
+    return "0"
+
+
+def embed_query(text: str) -> Optional[List[float]]:
+    """
+    Embed text with the same embedding function the collection uses for queries.
+    Served from the in-process tier of the query embedding cache when possible.
+
+    Returns:
+        Embedding vector, or None if the embedding model is unavailable
+    """
+    return query_embedding_cache.embed_sync(text)
+
+
+def _format_result(chunk: str, chunk_id: str, metadata: Dict) -> Dict:
+    """Shape one stored chunk as a retrieve() result"""
+    source = metadata.get("source", metadata.get("source_file", "unknown"))
+    # Citations are precompiled per document; only older indexes need the metadata parsed
+    table = get_citation_table()
+    citations = table.get(source) if table is not None else None
+    if citations is None:
+        reference_sources = metadata.get("reference_sources")
+        if isinstance(reference_sources, str):
+            try:
+                reference_sources = json.loads(reference_sources)
+            except (json.JSONDecodeError, TypeError):
+                reference_sources = []
+        citations = compile_citations(reference_sources if isinstance(reference_sources, list) else [], source)
+
+    result = {
+        "chunk": chunk,
+        "id": chunk_id,
+        "source": source,
+        "source_file": metadata.get("source_file", "unknown"),
+        "category": metadata.get("category", "general"),
+        "title": metadata.get("title", metadata.get("topic", "unknown")),
+        "topic": metadata.get("topic", metadata.get("title", "unknown")),
+        "citations": citations,  # Clean {"source", "url"} pairs of the chunk's document
+    }
+    if metadata.get("section_id"):
+        # Structure-aware chunks: heading path for display, section id for expand_sections()
+        result["section"] = metadata.get("heading_path", "")
+        result["section_id"] = metadata["section_id"]
+    return result
+
+
+def _format_query_results(results: Dict, position: int = 0) -> List[Dict[str, str]]:
+    """Format the results of query number `position` of a collection.query call"""
+    retrieved = []
+    # Safely check if documents exist and is a list
+    documents_raw = results.get("documents")
+    if documents_raw and isinstance(documents_raw, list) and len(documents_raw) > position:
+        # Safely extract documents
+        documents = documents_raw[position] if isinstance(documents_raw[position], list) else []
+        
+        # Safely extract ids - ensure it's a list
+        ids_raw = results.get("ids", [])
+        if isinstance(ids_raw, list) and len(ids_raw) > position:
+            ids = ids_raw[position] if isinstance(ids_raw[position], list) else []
+        else:
+            ids = []
+        
+        # Safely extract metadatas - ensure it's a list
+        metadatas_raw = results.get("metadatas", [])
+        if isinstance(metadatas_raw, list) and len(metadatas_raw) > position:
+            metadatas = metadatas_raw[position] if isinstance(metadatas_raw[position], list) else []
+        else:
+            metadatas = []
+        
+        # Ensure all are lists before calculating min_length
+        if not isinstance(documents, list):
+            documents = []
+        if not isinstance(ids, list):
+            ids = []
+        if not isinstance(metadatas, list):
+            metadatas = []
+        
+        # Ensure all lists have the same length
+        lengths = [len(documents), len(ids), len(metadatas)]
+        min_length = min(lengths) if lengths else 0
+        
+        for i in range(min_length):
+            chunk = documents[i] if i < len(documents) else ""
+            chunk_id = ids[i] if i < len(ids) else f"unknown_{i}"
+            metadata = metadatas[i] if i < len(metadatas) and isinstance(metadatas[i], dict) else {}
+            
+            retrieved.append(_format_result(chunk, chunk_id, metadata))
+    
+    return retrieved
+
+
+def _retrieve_numpy(
+    query: str,
+    k: int,
+    query_embedding: Optional[Sequence[float]],
+    category: Optional[str],
+) -> List[Dict[str, str]]:
+    """Exact top-k over the in-memory NumPy index"""
+    index = get_numpy_index()
+    if index is None:
+        return []
+    if query_embedding is None:
+        query_embedding = embed_query(query)
+        if query_embedding is None:
+            return []
+    try:
+        hits = index.search(query_embedding, k=k, category=category)
+    except ValueError as e:
+        logging.error(f"NumPy index search failed: {e}")
+        return []
+    results = []
+    for row, _ in hits:
+        chunk_id, chunk, metadata = index.get(row)
+        results.append(_format_result(chunk, chunk_id, metadata))
+    return results
+
+
+def _fetch_chunks(chunk_ids: List[str]) -> Dict[str, Dict]:
+    """Formatted results for chunks looked up by id (BM25 hits missing from the dense ranking)"""
+    fetched = {}
+    if RAG_BACKEND == "numpy":
+        index = get_numpy_index()
+        for chunk_id in chunk_ids:
+            row = index.row_of(chunk_id) if index is not None else None
+            if row is not None:
+                _, chunk, metadata = index.get(row)
+                fetched[chunk_id] = _format_result(chunk, chunk_id, metadata)
+        return fetched
+
+    chroma_client, collection = _initialize_chroma()
+    if collection is None:
+        return fetched
+    try:
+        results = collection.get(ids=chunk_ids, include=["documents", "metadatas"])
+    except Exception as e:
+        logging.warning(f"Failed to fetch BM25 chunks from ChromaDB: {e}")
+        return fetched
+    for chunk_id, chunk, metadata in zip(results.get("ids") or [], results.get("documents") or [], results.get("metadatas") or []):
+        fetched[chunk_id] = _format_result(chunk or "", chunk_id, metadata if isinstance(metadata, dict) else {})
+    return fetched
+
+
+def _fetch_section_chunks(section_ids: List[str]) -> Dict[str, List[str]]:
+    """Chunk texts of each section, in document order"""
+    sections: Dict[str, List[str]] = {}
+    if RAG_BACKEND == "numpy":
+        index = get_numpy_index()
+        if index is None:
+            return sections
+        for section_id in section_ids:
+            rows = index.section_rows(section_id)
+            if rows:
+                sections[section_id] = [index.get(row)[1] for row in rows]
+        return sections
+
+    chroma_client, collection = _initialize_chroma()
+    if collection is None:
+        return sections
+    try:
+        results = collection.get(where={"section_id": {"$in": list(section_ids)}}, include=["documents", "metadatas"])
+    except Exception as e:
+        logging.warning(f"Failed to fetch section chunks from ChromaDB: {e}")
+        return sections
+    ordered: Dict[str, List] = {}
+    for chunk, metadata in zip(results.get("documents") or [], results.get("metadatas") or []):
+        if isinstance(metadata, dict) and metadata.get("section_id"):
+            ordered.setdefault(metadata["section_id"], []).append((metadata.get("chunk_id", 0), chunk or ""))
+    return {section_id: [chunk for _, chunk in sorted(chunks)] for section_id, chunks in ordered.items()}
+
+
+def expand_sections(results: List[Dict]) -> List[Dict]:
+    """
+    Replace each hit's chunk with its whole parent section (on demand, e.g.
+    when the answer needs the full "When to seek help" list). Hits from the
+    same section collapse into one; hits without section metadata are kept
+    as they are.
+    """
+    section_ids = list(dict.fromkeys(r["section_id"] for r in results if r.get("section_id")))
+    sections = _fetch_section_chunks(section_ids) if section_ids else {}
+    expanded = []
+    seen = set()
+    for result in results:
+        section_id = result.get("section_id")
+        if section_id in seen:
+            continue
+        if section_id in sections:
+            seen.add(section_id)
+            result = {**result, "chunk": join_section(sections[section_id], result.get("section", ""))}
+        expanded.append(result)
+    return expanded
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], rank_constant: int = RAG_RRF_K) -> List[str]:
+    """
+    Fuse rankings of chunk ids: each id scores sum(1 / (rank_constant + rank))
+    over the rankings it appears in (rank starting at 1). Ties keep the order
+    of first appearance, so the dense ranking wins ties.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking, start=1):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (rank_constant + rank)
+    return sorted(scores, key=lambda chunk_id: -scores[chunk_id])
+
+
+def _retrieve_hybrid(
+    query: str,
+    k: int,
+    query_embedding: Optional[Sequence[float]],
+    category: Optional[str],
+) -> List[Dict[str, str]]:
+    """Dense and BM25 searches run concurrently, fused with reciprocal rank fusion"""
+    bm25 = get_bm25_index()
+    if bm25 is None:
+        return _retrieve_dense(query, k, query_embedding, category)
+
+    candidates = max(k, RAG_HYBRID_CANDIDATES)
+    lexical_future = _lexical_executor.submit(bm25.search, query, candidates, category)
+    dense = _retrieve_dense(query, candidates, query_embedding, category)
+    try:
+        lexical = lexical_future.result()
+    except Exception as e:
+        logging.warning(f"BM25 search failed, using dense results only: {e}")
+        lexical = []
+
+    return _fuse_with_lexical(dense, lexical, k)
+
+
+def _fuse_with_lexical(dense: List[Dict], lexical: List, k: int) -> List[Dict[str, str]]:
+    """RRF of a dense result list and BM25 (id, score) hits; BM25-only chunks are fetched by id"""
+    fused = reciprocal_rank_fusion([[r["id"] for r in dense], [chunk_id for chunk_id, _ in lexical]])[:k]
+    by_id = {r["id"]: r for r in dense}
+    missing = [chunk_id for chunk_id in fused if chunk_id not in by_id]
+    if missing:
+        by_id.update(_fetch_chunks(missing))
+    return [by_id[chunk_id] for chunk_id in fused if chunk_id in by_id]
+
+
+def retrieve(
+    query: str,
+    k: int = 4,
+    query_embedding: Optional[Sequence[float]] = None,
+    category: Optional[str] = None,
+    mode: Optional[str] = None,
+    expand: bool = False,
+) -> List[Dict[str, str]]:
     """
     Retrieve relevant chunks from the vector database
     
+    Results are served from the in-process result cache when the same
+    normalized query was retrieved before (see rag/result_cache.py).
+    
     Args:
         query: Search query
         k: Number of results to return
+        query_embedding: Precomputed query vector (skips Chroma's re-embedding of query)
+        category: Only return chunks from this knowledge-base category
+        mode: "dense" or "hybrid" (defaults to RAG_RETRIEVAL_MODE)
+        expand: Return each hit's whole parent section instead of the chunk
         
     Returns:
         List of dictionaries with 'chunk' and 'id' keys
     """
+    mode = mode or RAG_RETRIEVAL_MODE
+    cached = get_cached_results(query, k, category, mode, expand)
+    if cached is not None:
+        return cached
+    version = get_index_version()
+    results = _retrieve_uncached(query, k, query_embedding, category, mode, expand)
+    retrieval_cache.put(_result_cache_key(query, k, category, mode, expand), version, results)
+    return results
+
+
+def _retrieve_uncached(
+    query: str,
+    k: int,
+    query_embedding: Optional[Sequence[float]],
+    category: Optional[str],
+    mode: str,
+    expand: bool,
+) -> List[Dict[str, str]]:
+    if mode == "hybrid":
+        results = _retrieve_hybrid(query, k, query_embedding, category)
+    else:
+        results = _retrieve_dense(query, k, query_embedding, category)
+    return expand_sections(results) if expand else results
+
+
+def _result_cache_key(query: str, k: int, category: Optional[str], mode: str, expand: bool) -> str:
+    backend = f"numpy:{numpy_index_location()}" if RAG_BACKEND == "numpy" else RAG_BACKEND
+    normalized = " ".join((query or "").lower().split())
+    return f"{backend}|{mode}|{k}|{category or ''}|{int(expand)}|{normalized}"
+
+
+def get_cached_results(
+    query: str,
+    k: int = 4,
+    category: Optional[str] = None,
+    mode: Optional[str] = None,
+    expand: bool = False,
+) -> Optional[List[Dict[str, str]]]:
+    """
+    Cached retrieve() results for this query, or None. Lets callers skip
+    embedding the query when the results are already cached; a stale entry is
+    returned and refreshed in the background.
+    """
+    mode = mode or RAG_RETRIEVAL_MODE
+
+    def revalidate():
+        version = get_index_version()
+        return version, _retrieve_uncached(query, k, None, category, mode, expand)
+
+    key = _result_cache_key(query, k, category, mode, expand)
+    return retrieval_cache.get(key, get_index_version(), revalidate)
+
+
+def _retrieve_dense(
+    query: str,
+    k: int,
+    query_embedding: Optional[Sequence[float]],
+    category: Optional[str],
+) -> List[Dict[str, str]]:
+    """Vector search on the configured backend"""
+    if RAG_BACKEND == "numpy":
+        return _retrieve_numpy(query, k, query_embedding, category)
+
     try:
         # Use cached client and collection (initialized on first call or startup)
         chroma_client, collection = _initialize_chroma()
@@ -89,10 +448,19 @@ def retrieve(query: str, k: int = 4) -> List[Dict[str, str]]:
         
         # Query the collection - handle internal ChromaDB errors
         try:
-            results = collection.query(
-                query_texts=[query],
-                n_results=k
-            )
+            filters = {"where": {"category": category}} if category else {}
+            if query_embedding is not None:
+                results = collection.query(
+                    query_embeddings=[list(query_embedding)],
+                    n_results=k,
+                    **filters
+                )
+            else:
+                results = collection.query(
+                    query_texts=[query],
+                    n_results=k,
+                    **filters
+                )
         except TypeError as te:
             # Handle ChromaDB internal corruption errors
             if "object of type 'int' has no len()" in str(te):
@@ -101,67 +469,7 @@ def retrieve(query: str, k: int = 4) -> List[Dict[str, str]]:
                 return []
             raise
         
-        # Format results
-        retrieved = []
-        # Safely check if documents exist and is a list
-        documents_raw = results.get("documents")
-        if documents_raw and isinstance(documents_raw, list) and len(documents_raw) > 0:
-            # Safely extract documents
-            documents = documents_raw[0] if isinstance(documents_raw[0], list) else []
-            
-            # Safely extract ids - ensure it's a list
-            ids_raw = results.get("ids", [])
-            if isinstance(ids_raw, list) and len(ids_raw) > 0:
-                ids = ids_raw[0] if isinstance(ids_raw[0], list) else []
-            else:
-                ids = []
-            
-            # Safely extract metadatas - ensure it's a list
-            metadatas_raw = results.get("metadatas", [])
-            if isinstance(metadatas_raw, list) and len(metadatas_raw) > 0:
-                metadatas = metadatas_raw[0] if isinstance(metadatas_raw[0], list) else []
-            else:
-                metadatas = []
-            
-            # Ensure all are lists before calculating min_length
-            if not isinstance(documents, list):
-                documents = []
-            if not isinstance(ids, list):
-                ids = []
-            if not isinstance(metadatas, list):
-                metadatas = []
-            
-            # Ensure all lists have the same length
-            lengths = [len(documents), len(ids), len(metadatas)]
-            min_length = min(lengths) if lengths else 0
-            
-            for i in range(min_length):
-                chunk = documents[i] if i < len(documents) else ""
-                chunk_id = ids[i] if i < len(ids) else f"unknown_{i}"
-                metadata = metadatas[i] if i < len(metadatas) and isinstance(metadatas[i], dict) else {}
-                
-                # Parse reference_sources from JSON string if present
-                reference_sources = metadata.get("reference_sources")
-                if isinstance(reference_sources, str):
-                    try:
-                        reference_sources = json.loads(reference_sources)
-                    except (json.JSONDecodeError, TypeError):
-                        reference_sources = []
-                elif reference_sources is None:
-                    reference_sources = []
-                
-                retrieved.append({
-                    "chunk": chunk,
-                    "id": chunk_id,
-                    "source": metadata.get("source", metadata.get("source_file", "unknown")),
-                    "source_file": metadata.get("source_file", "unknown"),
-                    "category": metadata.get("category", "general"),
-                    "title": metadata.get("title", metadata.get("topic", "unknown")),
-                    "topic": metadata.get("topic", metadata.get("title", "unknown")),
-                    "reference_sources": reference_sources,  # Store the actual reference links
-                })
-        
-        return retrieved
+        return _format_query_results(results)
     
     except TypeError as te:
         # Handle ChromaDB internal corruption errors (object of type 'int' has no len())
@@ -203,6 +511,151 @@ def retrieve(query: str, k: int = 4) -> List[Dict[str, str]]:
         return []
 
 
+def _dense_batch(
+    queries: List[str],
+    k: int,
+    query_embeddings: List[Optional[Sequence[float]]],
+    category: Optional[str],
+) -> List[List[Dict[str, str]]]:
+    """Vector search for several queries with one backend call"""
+    missing = [i for i, vector in enumerate(query_embeddings) if vector is None]
+    if missing:
+        computed = query_embedding_cache.embed_many_sync([queries[i] for i in missing])
+        for i, vector in zip(missing, computed):
+            query_embeddings[i] = vector
+
+    if RAG_BACKEND == "numpy":
+        index = get_numpy_index()
+        embedded = [i for i, vector in enumerate(query_embeddings) if vector is not None]
+        batched: List[List[Dict[str, str]]] = [[] for _ in queries]
+        if index is None or not embedded:
+            return batched
+        try:
+            hits = index.search_many([query_embeddings[i] for i in embedded], k=k, category=category)
+        except ValueError as e:
+            logging.error(f"NumPy index search failed: {e}")
+            return batched
+        for i, query_hits in zip(embedded, hits):
+            for row, _ in query_hits:
+                chunk_id, chunk, metadata = index.get(row)
+                batched[i].append(_format_result(chunk, chunk_id, metadata))
+        return batched
+
+    chroma_client, collection = _initialize_chroma()
+    if chroma_client is None or collection is None:
+        return [[] for _ in queries]
+    filters = {"where": {"category": category}} if category else {}
+    try:
+        if all(vector is not None for vector in query_embeddings):
+            results = collection.query(query_embeddings=[list(v) for v in query_embeddings], n_results=k, **filters)
+        else:
+            # Embedding model unavailable here: Chroma embeds all query texts in one batch
+            results = collection.query(query_texts=list(queries), n_results=k, **filters)
+    except Exception as e:
+        logging.error(f"Batched ChromaDB query failed: {e}")
+        return [[] for _ in queries]
+    return [_format_query_results(results, position) for position in range(len(queries))]
+
+
+def retrieve_batch(
+    queries: Sequence[str],
+    k: int = 4,
+    query_embeddings: Optional[Sequence[Optional[Sequence[float]]]] = None,
+    category: Optional[str] = None,
+    mode: Optional[str] = None,
+) -> List[List[Dict[str, str]]]:
+    """
+    Retrieve for several queries at once: missing query vectors are embedded
+    in one batch and the backend is searched with one call (a single
+    collection.query, or one matrix multiply for the NumPy backend).
+
+    Returns:
+        One retrieve()-style result list per query, in order
+    """
+    queries = list(queries)
+    if not queries:
+        return []
+    embeddings = list(query_embeddings) if query_embeddings is not None else [None] * len(queries)
+    if len(embeddings) != len(queries):
+        raise ValueError("query_embeddings must have one entry per query")
+
+    # Cached queries are answered from the result cache; only the rest are searched
+    mode = mode or RAG_RETRIEVAL_MODE
+    batched: List[Optional[List[Dict[str, str]]]] = [get_cached_results(q, k, category, mode) for q in queries]
+    missing = [i for i, results in enumerate(batched) if results is None]
+    if missing:
+        version = get_index_version()
+        searched = _search_batch([queries[i] for i in missing], k, [embeddings[i] for i in missing], category, mode)
+        for i, results in zip(missing, searched):
+            retrieval_cache.put(_result_cache_key(queries[i], k, category, mode, False), version, results)
+            batched[i] = results
+    return batched
+
+
+def _search_batch(
+    queries: List[str],
+    k: int,
+    embeddings: List[Optional[Sequence[float]]],
+    category: Optional[str],
+    mode: str,
+) -> List[List[Dict[str, str]]]:
+    bm25 = get_bm25_index() if mode == "hybrid" else None
+    if bm25 is None:
+        return _dense_batch(queries, k, embeddings, category)
+
+    candidates = max(k, RAG_HYBRID_CANDIDATES)
+    lexical_futures = [_lexical_executor.submit(bm25.search, query, candidates, category) for query in queries]
+    dense = _dense_batch(queries, candidates, embeddings, category)
+    fused = []
+    for dense_results, future in zip(dense, lexical_futures):
+        try:
+            lexical = future.result()
+        except Exception as e:
+            logging.warning(f"BM25 search failed, using dense results only: {e}")
+            lexical = []
+        fused.append(_fuse_with_lexical(dense_results, lexical, k))
+    return fused
+
+
+def retrieve_many(
+    queries: Sequence[str],
+    k: int = 4,
+    query_embeddings: Optional[Sequence[Optional[Sequence[float]]]] = None,
+    category: Optional[str] = None,
+    mode: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, str]]:
+    """
+    Search with several phrasings of one need (e.g. the raw text, the
+    history-enhanced query and each symptom) and merge the results.
+
+    Duplicate queries are searched once; per-query rankings (top k each) are
+    merged with reciprocal rank fusion, so chunks found by several queries
+    rank first, and each chunk appears once.
+
+    Returns:
+        Up to `limit` (default k) retrieve()-style results
+    """
+    unique: Dict[str, int] = {}
+    unique_queries: List[str] = []
+    unique_embeddings: List[Optional[Sequence[float]]] = []
+    for position, query in enumerate(queries):
+        key = " ".join((query or "").lower().split())
+        if not key or key in unique:
+            continue
+        unique[key] = len(unique_queries)
+        unique_queries.append(query)
+        unique_embeddings.append(query_embeddings[position] if query_embeddings is not None else None)
+
+    per_query = retrieve_batch(unique_queries, k=k, query_embeddings=unique_embeddings, category=category, mode=mode)
+    by_id: Dict[str, Dict] = {}
+    for results in per_query:
+        for result in results:
+            by_id.setdefault(result["id"], result)
+    fused = reciprocal_rank_fusion([[r["id"] for r in results] for results in per_query])
+    return [by_id[chunk_id] for chunk_id in fused[:limit or k]]
+
+
 def test_retrieval():
     """Test the retrieval function"""
     test_queries = [
@@ -0,0 +1,70 @@
+"""
+Local token counting for chunk and prompt budgets.
+
+Uses tiktoken (RAG_TOKENIZER_ENCODING, cl100k_base by default) when the
+encoding is available. tiktoken downloads encodings on first use, so offline
+hosts without a cached copy fall back to a word/punctuation estimate that is
+close to BPE counts for English text. Either way nothing leaves the process
+per call.
+"""
+
+import logging
+import os
+import re
+import threading
+from typing import Optional
+
+TOKENIZER_ENCODING = os.getenv("RAG_TOKENIZER_ENCODING", "cl100k_base")
+
+# Words, numbers and single punctuation marks: roughly one BPE token each
+_ESTIMATE_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_load_attempted = False
+
+
+def get_encoding():
+    """The tiktoken encoding, or None if tiktoken or the encoding file is unavailable"""
+    global _encoding, _load_attempted
+    if _encoding is None and not _load_attempted:
+        with _encoding_lock:
+            if _encoding is None and not _load_attempted:
+                _load_attempted = True
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+                except Exception as e:
+                    logging.warning(f"tiktoken encoding {TOKENIZER_ENCODING} unavailable, estimating token counts: {e}")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in text"""
+    if not text:
+        return 0
+    encoding = get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(_ESTIMATE_RE.findall(text))
+
+
+def truncate_to_tokens(text: str, budget: int, suffix: str = "") -> str:
+    """
+    Cut text to at most `budget` tokens (suffix included), on a word boundary
+    when estimating. Text within budget is returned unchanged.
+    """
+    if budget <= 0:
+        return ""
+    if count_tokens(text) <= budget:
+        return text
+    budget = max(budget - count_tokens(suffix), 0)
+    encoding = get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:budget]).rstrip() + suffix
+    end: Optional[int] = None
+    for position, match in enumerate(_ESTIMATE_RE.finditer(text)):
+        if position == budget:
+            end = match.start()
+            break
+    return (text[:end].rstrip() if end is not None else text) + suffix
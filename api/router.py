@@ -1,22 +1,47 @@
 """
 Intent router to determine if query should use Graph or Vector RAG
+
+Every rule is a combination of term groups evaluated over one scan of the
+shared phrase automaton (see phrase_matcher.py): "ordered" rules need a term
+from each group in that order on the same line (the old `a.*b` regexes),
+the others just need every group present. Evaluation is linear in the input
+length, and decisions are memoized per normalized query.
 """
 import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
+from .phrase_matcher import find_all, register_vocabulary
 
-# Patterns that indicate graph-suitable queries
-GRAPH_PATTERNS = [
-    r'\b(which|what|list|count|how many|any)\b.*\b(avoid|contraindication|should not|shouldn\'t|unsafe)\b',
-    r'\b(which|what|list|count|how many)\b.*\b(provider|hospital|doctor|clinic|specialist|helpline)\b',
-    r'\b(count|how many)\b.*\b(red flag|symptom|match|warning)\b',
-    r'\b(near|in|at)\b.*\b(mumbai|delhi|bangalore|bengaluru|gurgaon|gurugram|chennai|kolkata|pune|hyderabad|ahmedabad|city)\b',
-    r'\b(avoid|contraindicated)\b.*\b(if i|if you|for)\b',
-    r'\b(any|what)\b.*\b(red flag|warning signs|danger signs)\b',
-    r'\b(pregnan(t|cy)|fetal|baby)\b.*\b(red flag|danger|movement|kick count|warning)\b',
-    r'\b(mental health|suicidal|self harm|depression)\b.*\b(help|helpline|resources|emergency)\b',
-    r'\b(should i go to|when to go to)\b.*\b(hospital|emergency|casualty)\b',
-    r'\b(list|what)\b.*\b(safe|unsafe|avoid)\b.*\b(for|during)\b.*\b(pregnancy|diabetes|hypertension|kidney disease)\b',
-]
+CITY_NAMES = ["Mumbai", "Delhi", "Bangalore", "Bengaluru", "Gurgaon", "Gurugram", "Chennai", "Kolkata", "Pune", "Hyderabad", "Ahmedabad"]
+
+# Term groups for the graph-suitable query patterns
+ROUTE_TERMS = {
+    "list_question": {"which", "what", "list", "count", "how many", "any"},
+    "provider_question": {"which", "what", "list", "count", "how many"},
+    "count_question": {"count", "how many"},
+    "unsafe": {"avoid", "contraindication", "should not", "shouldn't", "unsafe"},
+    "care_provider": {"provider", "hospital", "doctor", "clinic", "specialist", "helpline"},
+    "red_flag_subject": {"red flag", "symptom", "match", "warning"},
+    "location_preposition": {"near", "in", "at"},
+    "city": {city.lower() for city in CITY_NAMES} | {"city"},
+    "avoid": {"avoid", "contraindicated"},
+    "applies_to": {"if i", "if you", "for"},
+    "any_what": {"any", "what"},
+    "warning_signs": {"red flag", "warning signs", "danger signs"},
+    "pregnancy_subject": {"pregnant", "pregnancy", "fetal", "baby"},
+    "pregnancy_warning": {"red flag", "danger", "movement", "kick count", "warning"},
+    "mental_subject": {"mental health", "suicidal", "self harm", "depression"},
+    "help": {"help", "helpline", "resources", "emergency"},
+    "go_to": {"should i go to", "when to go to"},
+    "care_place": {"hospital", "emergency", "casualty"},
+    "list_what": {"list", "what"},
+    "safety_word": {"safe", "unsafe", "avoid"},
+    "for_during": {"for", "during"},
+    "chronic_condition": {"pregnancy", "diabetes", "hypertension", "kidney disease"},
+    "connector": {"and", "with"},
+}
 
 # Known symptom terms that suggest graph query
 SYMPTOM_TERMS = {
@@ -36,6 +61,124 @@ CONDITION_TERMS = {
 PREGNANCY_TERMS = {"pregnancy", "pregnant", "fetal", "baby", "kick count", "labour", "labour", "contractions"}
 MENTAL_TERMS = {"suicide", "suicidal", "self harm", "hurt myself", "end my life", "mental health", "depression", "panic attack", "anxiety", "helpline"}
 RESOURCE_KEYWORDS = {"helpline", "emergency number", "hotline", "nearest hospital", "provider", "clinic", "doctor", "specialist"}
+PREGNANCY_TRIGGERS = {"red flag", "danger", "movement", "avoid", "safe", "warning", "kick"}
+SUPPORT_KEYWORDS = {"support", "help", "what to do"}
+GRAPH_KEYWORDS = {
+    "list", "count", "which", "any", "avoid", "contraindication",
+    "provider", "hospital", "doctors near", "how many red flags", "is it safe for",
+    "should i go to", "hotline", "helpline", "nearby clinic",
+}
+
+ROUTE_TERMS.update({
+    "symptoms": SYMPTOM_TERMS,
+    "conditions": CONDITION_TERMS,
+    "pregnancy": PREGNANCY_TERMS,
+    "pregnancy_triggers": PREGNANCY_TRIGGERS,
+    "mental": MENTAL_TERMS,
+    "resources": RESOURCE_KEYWORDS,
+    "mental_help": RESOURCE_KEYWORDS | SUPPORT_KEYWORDS,
+    "keywords": GRAPH_KEYWORDS,
+})
+for _name, _terms in ROUTE_TERMS.items():
+    register_vocabulary(f"router_{_name}", _terms)
+
+# Rules in evaluation order. "min_matches" distinct phrases are needed from the last group.
+ROUTE_RULES: List[Dict[str, Any]] = [
+    {"name": "avoid_question", "groups": ("list_question", "unsafe"), "ordered": True},
+    {"name": "provider_question", "groups": ("provider_question", "care_provider"), "ordered": True},
+    {"name": "red_flag_count", "groups": ("count_question", "red_flag_subject"), "ordered": True},
+    {"name": "city_lookup", "groups": ("location_preposition", "city"), "ordered": True},
+    {"name": "avoid_condition", "groups": ("avoid", "applies_to"), "ordered": True},
+    {"name": "warning_signs", "groups": ("any_what", "warning_signs"), "ordered": True},
+    {"name": "pregnancy_warning", "groups": ("pregnancy_subject", "pregnancy_warning"), "ordered": True},
+    {"name": "mental_health_help", "groups": ("mental_subject", "help"), "ordered": True},
+    {"name": "care_escalation", "groups": ("go_to", "care_place"), "ordered": True},
+    {
+        "name": "safe_for_condition",
+        "groups": ("list_what", "safety_word", "for_during", "chronic_condition"),
+        "ordered": True,
+    },
+    {"name": "multiple_symptoms", "groups": ("symptoms",), "min_matches": 2},
+    {"name": "pregnancy_trigger", "groups": ("pregnancy", "pregnancy_triggers")},
+    {"name": "pregnancy_resource", "groups": ("pregnancy", "resources")},
+    {"name": "mental_health_resource", "groups": ("mental", "mental_help")},
+    {"name": "multiple_conditions", "groups": ("connector", "conditions"), "min_matches": 2},
+    {"name": "graph_keyword", "groups": ("keywords",)},
+]
+
+_WHITESPACE_RE = re.compile(r"[^\S\n]+")
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase and collapse whitespace (line breaks are kept: ordered rules stay within a line)"""
+    return "\n".join(line.strip() for line in _WHITESPACE_RE.sub(" ", text.lower()).split("\n")).strip()
+
+
+def _ordered_evidence(groups: List[List[Tuple[int, int, int, str]]]) -> Optional[Tuple[str, ...]]:
+    """Earliest-ending term of each group in sequence, all on one line (or None)"""
+    for line in sorted({m[2] for m in groups[0]}):
+        evidence = []
+        position = 0
+        for group in groups:
+            candidates = [m for m in group if m[2] == line and m[0] >= position]
+            if not candidates:
+                break
+            start, end, _, phrase = min(candidates, key=lambda m: m[1])
+            evidence.append(phrase)
+            position = end
+        else:
+            return tuple(evidence)
+    return None
+
+
+def _evaluate_rule(rule: Dict[str, Any], matches: Dict[str, List[Tuple[int, int, int, str]]]) -> Optional[Tuple[str, ...]]:
+    groups = [matches.get(f"router_{name}", []) for name in rule["groups"]]
+    if not all(groups):
+        return None
+    min_matches = rule.get("min_matches", 1)
+    if len({m[3] for m in groups[-1]}) < min_matches:
+        return None
+    if rule.get("ordered"):
+        return _ordered_evidence(groups)
+    evidence = [group[0][3] for group in groups[:-1]]
+    evidence.extend(sorted({m[3] for m in groups[-1]}))
+    return tuple(evidence)
+
+
+@lru_cache(maxsize=2048)
+def _route_normalized(normalized: str) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    newlines = [index for index, ch in enumerate(normalized) if ch == "\n"]
+    matches: Dict[str, List[Tuple[int, int, int, str]]] = {}
+    for start, end, phrase, tags in find_all(normalized):
+        line = bisect_right(newlines, start)
+        for tag in tags:
+            matches.setdefault(tag, []).append((start, end, line, phrase))
+
+    fired = []
+    for rule in ROUTE_RULES:
+        evidence = _evaluate_rule(rule, matches)
+        if evidence is not None:
+            fired.append((rule["name"], evidence))
+    return tuple(fired)
+
+
+def route_query(text: str) -> Dict[str, Any]:
+    """
+    Evaluate every routing rule for a query
+
+    Args:
+        text: User query
+
+    Returns:
+        Dict with "use_graph", "rules" (names of the rules that fired, in rule
+        order) and "trace" (each fired rule with the terms that matched it)
+    """
+    fired = _route_normalized(normalize_query(text)) if text else ()
+    return {
+        "use_graph": bool(fired),
+        "rules": [name for name, _ in fired],
+        "trace": [{"rule": name, "matched": list(evidence)} for name, evidence in fired],
+    }
 
 
 def is_graph_intent(text: str) -> bool:
@@ -48,46 +191,7 @@ def is_graph_intent(text: str) -> bool:
     Returns:
         True if graph query is appropriate
     """
-    text_lower = text.lower()
-    
-    # Check for graph-specific regex patterns
-    for pattern in GRAPH_PATTERNS:
-        if re.search(pattern, text_lower):
-            return True
-    
-    # Check for multiple symptoms (suggests counting/listing or red-flag matching)
-    symptom_count = sum(1 for term in SYMPTOM_TERMS if term in text_lower)
-    if symptom_count >= 2:
-        return True
-    
-    # Pregnancy-specific combinations (red flags, movements, safe/avoid instructions)
-    if any(term in text_lower for term in PREGNANCY_TERMS):
-        if any(trigger in text_lower for trigger in ["red flag", "danger", "movement", "avoid", "safe", "warning", "kick"]):
-            return True
-        if any(keyword in text_lower for keyword in RESOURCE_KEYWORDS):
-            return True
-
-    # Mental health crisis phrases asking for help/resources
-    if any(term in text_lower for term in MENTAL_TERMS):
-        if any(keyword in text_lower for keyword in RESOURCE_KEYWORDS | {"support", "help", "what to do"}):
-            return True
-
-    # Queries combining multiple conditions (e.g., diabetes and hypertension)
-    if " and " in text_lower or " with " in text_lower:
-        mentioned_conditions = {term for term in CONDITION_TERMS if term in text_lower}
-        if len(mentioned_conditions) >= 2:
-            return True
-    
-    # Check for specific keywords
-    graph_keywords = [
-        "list", "count", "which", "any", "avoid", "contraindication",
-        "provider", "hospital", "doctors near", "how many red flags", "is it safe for",
-        "should i go to", "hotline", "helpline", "nearby clinic",
-    ]
-    if any(keyword in text_lower for keyword in graph_keywords):
-        return True
-    
-    return False
+    return route_query(text)["use_graph"]
 
 
 def extract_city(text: str) -> str:
@@ -100,10 +204,9 @@ def extract_city(text: str) -> str:
     Returns:
         City name or None
     """
-    cities = ["Mumbai", "Delhi", "Bangalore", "Bengaluru", "Gurgaon", "Gurugram", "Chennai", "Kolkata", "Pune", "Hyderabad", "Ahmedabad"]
     text_lower = text.lower()
     
-    for city in cities:
+    for city in CITY_NAMES:
         if city.lower() in text_lower:
             # Normalise spelling variants (Bangalore/Bengaluru etc.)
             if city.lower() in {"bengaluru"}:
@@ -1,7 +1,9 @@
 """
 Safety detection utilities for red flags, mental health crisis cues, and symptom extraction.
 """
-from typing import Dict, Iterable, List, Set
+from typing import Dict, List, Set
+
+from .phrase_matcher import match_all, register_vocabulary
 
 # Red flag keywords in English and Hindi (transliterated)
 RED_FLAGS: Set[str] = {
@@ -183,8 +185,20 @@ SYMPTOM_SYNONYMS: Dict[str, Set[str]] = {
 }
 
 
-def _match_phrases(text_lower: str, phrases: Iterable[str]) -> List[str]:
-    return sorted({phrase for phrase in phrases if phrase in text_lower})
+# Canonical symptom names for every synonym phrase
+SYMPTOM_CANONICALS: Dict[str, Set[str]] = {}
+for _canonical, _synonyms in SYMPTOM_SYNONYMS.items():
+    for _phrase in _synonyms:
+        SYMPTOM_CANONICALS.setdefault(_phrase.lower(), set()).add(_canonical)
+
+register_vocabulary("red_flags", RED_FLAGS)
+register_vocabulary("mental_health_crisis", MENTAL_HEALTH_CRISIS_TERMS)
+register_vocabulary("pregnancy_crisis", PREGNANCY_CRISIS_TERMS)
+register_vocabulary("symptoms", SYMPTOM_CANONICALS)
+
+
+def _match_phrases(text: str, vocabulary: str) -> List[str]:
+    return sorted(match_all(text).get(vocabulary, ()))
 
 
 def detect_red_flags(text: str, lang: str = "en") -> dict:
@@ -195,8 +209,7 @@ def detect_red_flags(text: str, lang: str = "en") -> dict:
         - red_flag: bool
         - matched: sorted list of matched phrases
     """
-    text_lower = text.lower()
-    matched_unique = _match_phrases(text_lower, RED_FLAGS)
+    matched_unique = _match_phrases(text, "red_flags")
     return {
         "red_flag": bool(matched_unique),
         "matched": matched_unique,
@@ -207,8 +220,7 @@ def detect_mental_health_crisis(text: str, lang: str = "en") -> dict:
     """
     Identify urgent mental health crisis cues requiring escalation.
     """
-    text_lower = text.lower()
-    matched = _match_phrases(text_lower, MENTAL_HEALTH_CRISIS_TERMS)
+    matched = _match_phrases(text, "mental_health_crisis")
     if lang == "hi":
         first_aid = MENTAL_HEALTH_FIRST_AID_HI
     else:
@@ -224,8 +236,7 @@ def detect_pregnancy_emergency(text: str) -> dict:
     """
     Highlight pregnancy-specific emergencies for tailored messaging.
     """
-    text_lower = text.lower()
-    matched = _match_phrases(text_lower, PREGNANCY_CRISIS_TERMS)
+    matched = _match_phrases(text, "pregnancy_crisis")
     return {
         "concern": bool(matched),
         "matched": matched,
@@ -236,13 +247,7 @@ def extract_symptoms(text: str) -> List[str]:
     """
     Extract canonical symptom names from free-text user messages.
     """
-    text_lower = text.lower()
     found: Set[str] = set()
-
-    for canonical, synonyms in SYMPTOM_SYNONYMS.items():
-        for phrase in synonyms:
-            if phrase in text_lower:
-                found.add(canonical)
-                break
-
+    for phrase in match_all(text).get("symptoms", ()):
+        found.update(SYMPTOM_CANONICALS[phrase])
     return sorted(found)
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+Cache codec benchmark: stored size and encode/decode CPU per cached value.
+
+Builds session-message payloads shaped like the /session/{id}/messages
+response (user questions, markdown answers, citations, metadata) from the
+knowledge base documents in rag/data, then compares the previous format
+(stdlib json, gzip + base64 above 1 KB) with every installed serializer /
+compressor combination of services/cache_codec.py.
+
+--wire upstash measures what the default Upstash deployment sends: its REST
+API only carries JSON strings, so frames travel as "~" + base64 text (4/3 of
+the frame size, plus the base64 step in encode/decode).
+
+Usage:
+    python scripts/bench_cache_codec.py
+    python scripts/bench_cache_codec.py --messages 20 --payloads 50 --repeat 200
+    python scripts/bench_cache_codec.py --wire upstash
+"""
+import argparse
+import base64
+import gzip
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path so "api" is importable as a package
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from api.rag.build_index import extract_frontmatter  # noqa: E402
+from api.services.cache_codec import COMPRESSORS, SERIALIZERS, CacheCodec, to_text  # noqa: E402
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "rag" / "data"
+LEGACY_THRESHOLD = 1024
+
+
+def _documents():
+    documents = []
+    for path in sorted(DATA_DIR.rglob("*.md")):
+        metadata, body = extract_frontmatter(path.read_text(encoding="utf-8"))
+        sources = metadata.get("sources") or []
+        documents.append((metadata.get("title") or path.stem, body.strip(), sources))
+    if not documents:
+        raise SystemExit(f"No markdown documents found in {DATA_DIR}")
+    return documents
+
+
+def _session_payload(documents, messages: int, rng: random.Random) -> list:
+    result = []
+    for i in range(messages):
+        title, body, sources = rng.choice(documents)
+        answer = body[: rng.randint(1500, 4000)]
+        base = {
+            "id": f"{rng.getrandbits(128):032x}",
+            "sessionId": "9b2f6c1e-3d4a-4f5b-8c7d-1e2f3a4b5c6d",
+            "createdAt": f"2025-01-{1 + i % 28:02d}T10:{i % 60:02d}:00+00:00",
+            "language": rng.choice(["en", "hi", "ta"]),
+            "route": rng.choice(["vector", "graph"]),
+            "safetyData": {"red_flag": False, "matched": []},
+            "facts": [],
+            "userFeedback": None,
+        }
+        result.append({**base, "role": "user", "messageText": f"What should I know about {title.lower()}?",
+                       "answer": None, "citations": [], "metadata": None})
+        result.append({
+            **base,
+            "role": "assistant",
+            "messageText": answer,
+            "answer": answer,
+            "citations": [
+                {"source": s.get("name", title) if isinstance(s, dict) else title,
+                 "url": s.get("url", "") if isinstance(s, dict) else str(s)}
+                for s in sources[:4]
+            ],
+            "metadata": {"timings": {"retrieval": 0.021, "answer_generation": 2.4, "total": 3.1},
+                         "prompt_tokens": rng.randint(900, 2400)},
+        })
+    return result
+
+
+def _legacy_encode(value) -> str:
+    data = json.dumps(value)
+    if len(data.encode("utf-8")) > LEGACY_THRESHOLD:
+        return base64.b64encode(gzip.compress(data.encode("utf-8"), compresslevel=6)).decode("utf-8")
+    return data
+
+
+def _legacy_decode(data: str):
+    if data.startswith("H4sI"):
+        data = gzip.decompress(base64.b64decode(data.encode())).decode("utf-8")
+    return json.loads(data)
+
+
+def _measure(encode, decode, payloads, repeat: int) -> dict:
+    encoded = [encode(payload) for payload in payloads]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for payload in payloads:
+            encode(payload)
+    encode_us = (time.perf_counter() - start) / (repeat * len(payloads)) * 1e6
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for data in encoded:
+            decode(data)
+    decode_us = (time.perf_counter() - start) / (repeat * len(payloads)) * 1e6
+    for payload, data in zip(payloads, encoded):
+        assert decode(data) == payload
+    return {
+        "bytes": statistics.mean(len(data) for data in encoded),
+        "encode_us": encode_us,
+        "decode_us": decode_us,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=10, help="Question/answer pairs per session payload")
+    parser.add_argument("--payloads", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument(
+        "--wire", choices=["redis", "upstash"], default="redis",
+        help="Value as sent to Redis (raw frame) or to the Upstash REST API (base64 text)",
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    documents = _documents()
+    payloads = [_session_payload(documents, args.messages, rng) for _ in range(args.payloads)]
+    raw = statistics.mean(len(json.dumps(p)) for p in payloads)
+    print(f"{len(payloads)} session payloads, {args.messages * 2} messages each, {raw / 1024:.1f} KB of JSON on average")
+    print(f"Wire format: {args.wire}\n")
+
+    rows = [("legacy json+gzip+b64", _measure(_legacy_encode, _legacy_decode, payloads, args.repeat))]
+    for serializer in sorted(SERIALIZERS):
+        for compression in sorted(COMPRESSORS):
+            codec = CacheCodec(serializer, compression, compress_threshold=LEGACY_THRESHOLD)
+            encode = codec.encode
+            if args.wire == "upstash":
+                encode = lambda value, codec=codec: to_text(codec.encode(value))  # noqa: E731
+            rows.append((f"{serializer}+{compression}", _measure(encode, codec.decode, payloads, args.repeat)))
+
+    baseline = rows[0][1]
+    print(f"{'codec':<22} {'stored KB':>10} {'size':>7} {'encode us':>10} {'decode us':>10} {'decode':>7}")
+    for name, result in rows:
+        print(
+            f"{name:<22} {result['bytes'] / 1024:>10.2f} {result['bytes'] / baseline['bytes']:>6.0%} "
+            f"{result['encode_us']:>10.1f} {result['decode_us']:>10.1f} "
+            f"{result['decode_us'] / baseline['decode_us']:>6.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
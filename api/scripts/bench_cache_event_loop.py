@@ -0,0 +1,159 @@
+"""
+Event-loop stall benchmark for CacheService.
+
+Runs concurrent cache get/set calls while a probe task ticks every millisecond
+on the same event loop, and reports how late the probe woke up (the time the
+loop was blocked) along with cache throughput.
+
+Modes:
+    blocking  the previous behaviour: the sync client called inside async methods
+    thread    sync client offloaded to worker threads (no async driver installed)
+    async     native asyncio client (redis.asyncio / Upstash REST on aiohttp)
+
+Usage:
+    python scripts/bench_cache_event_loop.py
+    python scripts/bench_cache_event_loop.py --rtt-ms 5 --ops 2000 --concurrency 64
+    REDIS_URI=redis://localhost:6379 python scripts/bench_cache_event_loop.py --real
+
+Without --real, Redis is simulated with a fixed round-trip time; no server is required.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path so "api" is importable as a package
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from api.services.cache import CacheService  # noqa: E402
+
+MODES = ("blocking", "thread", "async")
+
+
+class _SimulatedSyncRedis:
+    def __init__(self, rtt_s: float) -> None:
+        self.rtt_s = rtt_s
+        self.store = {}
+
+    def get(self, key):
+        time.sleep(self.rtt_s)
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        time.sleep(self.rtt_s)
+        self.store[key] = value
+        return True
+
+    def ping(self):
+        return True
+
+
+class _SimulatedAsyncRedis:
+    def __init__(self, rtt_s: float, store) -> None:
+        self.rtt_s = rtt_s
+        self.store = store
+
+    async def get(self, key):
+        await asyncio.sleep(self.rtt_s)
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        await asyncio.sleep(self.rtt_s)
+        self.store[key] = value
+        return True
+
+
+def _make_service(mode: str, rtt_s: float, real: bool) -> CacheService:
+    service = CacheService()
+    if real:
+        if not service.is_available():
+            raise SystemExit("--real needs REDIS_URI or UPSTASH_REDIS_REST_URL/TOKEN pointing at a live server")
+        if mode == "thread":
+            service._create_async_client = lambda: None
+    else:
+        service.cache_enabled = True
+        service.redis_client = _SimulatedSyncRedis(rtt_s)
+        service._backend = ("redis", "redis://simulated", {})
+        store = service.redis_client.store
+        service._create_async_client = (
+            (lambda: None) if mode == "thread" else (lambda: _SimulatedAsyncRedis(rtt_s, store))
+        )
+
+    if mode == "blocking":
+        async def blocking_execute(command, *args, **kwargs):
+            return getattr(service.redis_client, command)(*args, **kwargs)
+
+        service._execute = blocking_execute
+    return service
+
+
+async def _probe(stop: asyncio.Event, lateness: list, interval_s: float = 0.001) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval_s)
+        lateness.append(max(time.perf_counter() - start - interval_s, 0.0))
+
+
+async def _run(mode: str, ops: int, concurrency: int, rtt_s: float, real: bool) -> dict:
+    service = _make_service(mode, rtt_s, real)
+    payload = {"answer": "Rest, drink fluids and see a doctor if symptoms worsen. " * 20}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            key = f"bench:cache:{i % 100}"
+            if i % 4 == 0:
+                await service.set(key, payload, ttl=60)
+            else:
+                await service.get(key)
+
+    stop = asyncio.Event()
+    lateness: list = []
+    probe = asyncio.create_task(_probe(stop, lateness))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(ops)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    await service.close()
+
+    lateness_ms = sorted(value * 1000 for value in lateness) or [0.0]
+    return {
+        "mode": mode,
+        "ops_per_s": ops / elapsed,
+        "stall_total_ms": sum(lateness_ms),
+        "stall_p50_ms": statistics.median(lateness_ms),
+        "stall_p99_ms": lateness_ms[int(len(lateness_ms) * 0.99) - 1] if len(lateness_ms) > 1 else lateness_ms[0],
+        "stall_max_ms": lateness_ms[-1],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rtt-ms", type=float, default=2.0, help="Simulated Redis round-trip time")
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--real", action="store_true", help="Use the Redis configured in the environment")
+    args = parser.parse_args()
+
+    if not args.real:
+        # The simulated backend stands in for Redis; do not connect to a configured one
+        for name in ("REDIS_URI", "UPSTASH_REDIS_REST_URL", "UPSTASH_REDIS_URL", "REDIS_URL"):
+            os.environ.pop(name, None)
+
+    print(f"{'mode':<10} {'ops/s':>10} {'stall total':>12} {'p50':>8} {'p99':>8} {'max':>8}  (ms)")
+    for mode in args.modes.split(","):
+        result = asyncio.run(_run(mode, args.ops, args.concurrency, args.rtt_ms / 1000.0, args.real))
+        print(
+            f"{result['mode']:<10} {result['ops_per_s']:>10.0f} {result['stall_total_ms']:>12.1f} "
+            f"{result['stall_p50_ms']:>8.2f} {result['stall_p99_ms']:>8.2f} {result['stall_max_ms']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
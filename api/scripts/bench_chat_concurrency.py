@@ -0,0 +1,175 @@
+"""
+Load benchmark for the /chat pipeline.
+
+Drives the FastAPI app in-process (httpx ASGI transport) with simulated
+OpenAI and retrieval latency, and reports throughput, request latency and
+how responsive a cheap endpoint (/health) stays while chats are in flight.
+
+Usage:
+    python scripts/bench_chat_concurrency.py
+    python scripts/bench_chat_concurrency.py --llm-ms 400 --levels 1,8,32,64
+    python scripts/bench_chat_concurrency.py --blocking   # simulate the old sync client
+
+No network, database or API keys are required.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add project root to path so "api" is importable as a package
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+# The benchmark deliberately exceeds the per-IP request limit
+os.environ.setdefault("DISABLE_RATE_LIMIT", "1")
+
+import httpx  # noqa: E402
+
+from api import main as main_module  # noqa: E402
+from api.auth.middleware import require_auth  # noqa: E402
+
+
+def _completion(content: str) -> SimpleNamespace:
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class _FakeCompletions:
+    def __init__(self, latency_s: float, blocking: bool) -> None:
+        self.latency_s = latency_s
+        self.blocking = blocking
+
+    async def create(self, **kwargs):
+        if self.blocking:
+            # Simulates the previous behaviour: a sync HTTP call inside an async handler
+            time.sleep(self.latency_s)
+        else:
+            await asyncio.sleep(self.latency_s)
+        system_prompt = kwargs["messages"][0]["content"]
+        if "language detection" in system_prompt:
+            return _completion(json.dumps({"detected_language": "en"}))
+        return _completion("## Answer\n\nRest, drink fluids and see a doctor if symptoms worsen.")
+
+
+class _FakeAsyncOpenAI:
+    def __init__(self, latency_s: float, blocking: bool) -> None:
+        self.chat = SimpleNamespace(completions=_FakeCompletions(latency_s, blocking))
+
+
+def _install_fakes(llm_ms: float, retrieval_ms: float, blocking: bool) -> None:
+    fake_client = _FakeAsyncOpenAI(llm_ms / 1000.0, blocking)
+
+    def fake_retrieve(query: str, k: int = 4, **kwargs):
+        time.sleep(retrieval_ms / 1000.0)
+        return [
+            {
+                "chunk": "Fever is a temporary rise in body temperature.",
+                "id": f"general/fever.md#{i}",
+                "source": "general/fever.md",
+                "source_file": "fever.md",
+                "category": "general",
+                "title": "Fever",
+                "topic": "Fever",
+                "citations": [],
+            }
+            for i in range(k)
+        ]
+
+    main_module.get_async_openai_client = lambda: fake_client
+    main_module.retrieve = fake_retrieve
+    main_module.retrieve_many = lambda queries, k=4, query_embeddings=None: fake_retrieve(queries[0], k)
+    main_module.ensure_neo4j = lambda: False
+    main_module.app.dependency_overrides[require_auth] = lambda: {"user_id": None, "role": "user"}
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _run_level(client: httpx.AsyncClient, concurrency: int, requests_per_worker: int):
+    payload = {
+        "text": "I have had a fever since yesterday, what should I do?",
+        "lang": "en",
+        "profile": {"diabetes": False, "hypertension": False, "pregnancy": False},
+    }
+    chat_latencies = []
+    health_latencies = []
+    errors = 0
+    done = asyncio.Event()
+
+    async def worker():
+        nonlocal errors
+        for _ in range(requests_per_worker):
+            start = time.perf_counter()
+            response = await client.post("/chat", json=payload)
+            chat_latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+
+    async def health_probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/health")
+            health_latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.02)
+
+    probe = asyncio.create_task(health_probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe
+
+    total = concurrency * requests_per_worker
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "throughput_rps": total / elapsed if elapsed else 0.0,
+        "chat_p50_ms": statistics.median(chat_latencies) * 1000,
+        "chat_p95_ms": _percentile(chat_latencies, 95) * 1000,
+        "health_p95_ms": _percentile(health_latencies, 95) * 1000,
+        "health_max_ms": max(health_latencies or [0.0]) * 1000,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Chat pipeline concurrency benchmark")
+    parser.add_argument("--levels", default="1,8,32,64", help="Comma separated concurrency levels")
+    parser.add_argument("--requests-per-worker", type=int, default=3)
+    parser.add_argument("--llm-ms", type=float, default=300.0, help="Simulated latency per OpenAI call")
+    parser.add_argument("--retrieval-ms", type=float, default=40.0, help="Simulated blocking retrieval latency")
+    parser.add_argument("--blocking", action="store_true", help="Simulate a blocking (sync) OpenAI client")
+    args = parser.parse_args()
+
+    _install_fakes(args.llm_ms, args.retrieval_ms, args.blocking)
+    levels = [int(level) for level in args.levels.split(",") if level.strip()]
+
+    print("=" * 70)
+    print(f"Chat concurrency benchmark ({'blocking' if args.blocking else 'async'} LLM client)")
+    print(f"LLM latency: {args.llm_ms:.0f}ms/call, retrieval: {args.retrieval_ms:.0f}ms")
+    print("=" * 70)
+    print(f"{'conc':>5} {'reqs':>5} {'err':>4} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'/health p95':>12} {'/health max':>12}")
+
+    transport = httpx.ASGITransport(app=main_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        for level in levels:
+            result = await _run_level(client, level, args.requests_per_worker)
+            print(
+                f"{result['concurrency']:>5} {result['requests']:>5} {result['errors']:>4} "
+                f"{result['throughput_rps']:>8.2f} {result['chat_p50_ms']:>9.1f} {result['chat_p95_ms']:>9.1f} "
+                f"{result['health_p95_ms']:>12.1f} {result['health_max_ms']:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
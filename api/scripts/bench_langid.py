@@ -0,0 +1,100 @@
+"""
+Accuracy and latency report for the offline language identifier.
+
+Evaluates api/langid against the labeled samples in api/langid/eval.tsv and
+prints per-language accuracy, the confusion matrix, detection latency and how
+many inputs clear the confidence threshold (i.e. skip the remote LLM detector).
+
+Usage:
+    python scripts/bench_langid.py
+    python scripts/bench_langid.py --threshold 0.9 --repeat 200
+"""
+import argparse
+import statistics
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+# Add project root to path so "api" is importable as a package
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from api.langid.identifier import (  # noqa: E402
+    EVAL_PATH,
+    SUPPORTED_LANGUAGES,
+    LanguageIdentifier,
+    load_samples,
+)
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline language identifier benchmark")
+    parser.add_argument("--eval", default=str(EVAL_PATH), help="Labeled TSV file (label<TAB>text)")
+    parser.add_argument("--threshold", type=float, default=0.85, help="Confidence needed to skip remote detection")
+    parser.add_argument("--repeat", type=int, default=100, help="Timing repetitions per sample")
+    args = parser.parse_args()
+
+    train_start = time.perf_counter()
+    identifier = LanguageIdentifier.from_file()
+    train_ms = (time.perf_counter() - train_start) * 1000
+
+    samples = load_samples(Path(args.eval))
+    confusion = defaultdict(Counter)
+    confident = 0
+    confident_correct = 0
+    misses = []
+    for label, text in samples:
+        predicted, confidence = identifier.predict(text)
+        confusion[label][predicted] += 1
+        if confidence >= args.threshold:
+            confident += 1
+            confident_correct += predicted == label
+        if predicted != label:
+            misses.append((label, predicted, confidence, text))
+
+    latencies = []
+    for _ in range(args.repeat):
+        for _, text in samples:
+            start = time.perf_counter()
+            identifier.predict(text)
+            latencies.append(time.perf_counter() - start)
+
+    total = len(samples)
+    correct = sum(confusion[lang][lang] for lang in SUPPORTED_LANGUAGES)
+
+    print("=" * 70)
+    print(f"Offline language identifier ({total} samples, trained in {train_ms:.1f}ms)")
+    print("=" * 70)
+    print(f"{'lang':>5} {'samples':>8} {'accuracy':>9}")
+    for lang in SUPPORTED_LANGUAGES:
+        row_total = sum(confusion[lang].values())
+        accuracy = confusion[lang][lang] / row_total if row_total else 0.0
+        print(f"{lang:>5} {row_total:>8} {accuracy:>9.1%}")
+    print(f"{'all':>5} {total:>8} {correct / max(total, 1):>9.1%}")
+
+    print("\nConfusion matrix (rows = expected, columns = predicted)")
+    print("      " + "".join(f"{lang:>5}" for lang in SUPPORTED_LANGUAGES))
+    for lang in SUPPORTED_LANGUAGES:
+        print(f"{lang:>5} " + "".join(f"{confusion[lang][col]:>5}" for col in SUPPORTED_LANGUAGES))
+
+    print(f"\nConfidence >= {args.threshold:.2f}: {confident}/{total} ({confident / max(total, 1):.1%}) "
+          f"handled locally, {confident_correct}/{max(confident, 1)} of those correct")
+    print(f"Latency: p50 {statistics.median(latencies) * 1e6:.0f}us, "
+          f"p99 {_percentile(latencies, 99) * 1e6:.0f}us, max {max(latencies) * 1e6:.0f}us")
+
+    if misses:
+        print("\nMisclassified:")
+        for label, predicted, confidence, text in misses:
+            print(f"  {label} -> {predicted} ({confidence:.2f}): {text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Phrase matching benchmark: shared Aho–Corasick automaton vs. per-phrase loops.
+
+Replays the phrase scans one chat request performs (red flags, crisis and
+pregnancy terms, symptom synonyms, router terms and raw symptom phrases over
+the query plus the last four history messages) with the previous
+`phrase in text_lower` loops and with one automaton pass per message.
+Also lists the messages where whole-word matching changes the result.
+
+Usage:
+    python scripts/bench_phrase_matcher.py
+    python scripts/bench_phrase_matcher.py --repeat 2000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path so "api" is importable as a package
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from api import safety, router  # noqa: E402
+from api.main import RAW_SYMPTOM_PHRASES  # noqa: E402
+from api.phrase_matcher import shared_matcher  # noqa: E402
+
+MESSAGES = [
+    "I have chest pain and my left arm feels numb since this morning",
+    "mujhe 2 din se bukhar hai aur sir mein dard ho raha hai, kya karu?",
+    "My 3 year old has had loose motion and vomiting since yesterday, he is not passing urine much "
+    "and his lips look dry. We gave ORS but he keeps throwing it up. Should I take him to the hospital?",
+    "What should a diabetic with hypertension avoid when they catch a cold? Which medicines are unsafe?",
+    "I feel like life is not worth living anymore and I don't know who to talk to",
+    "Multiple benefits of ultimately consulting a doctor about persistent coughing and rashes",
+]
+
+LEGACY_VOCABULARIES = [
+    safety.RED_FLAGS,
+    safety.MENTAL_HEALTH_CRISIS_TERMS,
+    safety.PREGNANCY_CRISIS_TERMS,
+    router.SYMPTOM_TERMS,
+    router.CONDITION_TERMS,
+    router.PREGNANCY_TERMS,
+    router.MENTAL_TERMS,
+    router.RESOURCE_KEYWORDS,
+    router.GRAPH_KEYWORDS,
+    RAW_SYMPTOM_PHRASES,
+]
+
+
+def legacy_scan(text):
+    """The previous approach: one substring test per phrase per vocabulary"""
+    text_lower = text.lower()
+    found = [sorted({phrase for phrase in vocabulary if phrase in text_lower}) for vocabulary in LEGACY_VOCABULARIES]
+    canonicals = set()
+    for canonical, synonyms in safety.SYMPTOM_SYNONYMS.items():
+        for phrase in synonyms:
+            if phrase in text_lower:
+                canonicals.add(canonical)
+                break
+    return found, sorted(canonicals)
+
+
+def automaton_scan(matcher, text):
+    matches = matcher.match(text)
+    canonicals = set()
+    for phrase in matches.get("symptoms", ()):
+        canonicals.update(safety.SYMPTOM_CANONICALS[phrase])
+    return matches, sorted(canonicals)
+
+
+def _time(fn, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - start) / (repeat * len(texts)) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Phrase matcher benchmark")
+    parser.add_argument("--repeat", type=int, default=500, help="Repetitions per message")
+    args = parser.parse_args()
+
+    build_start = time.perf_counter()
+    matcher = shared_matcher()
+    build_ms = (time.perf_counter() - build_start) * 1000
+
+    legacy_us = _time(legacy_scan, MESSAGES, args.repeat)
+    automaton_us = _time(lambda text: automaton_scan(matcher, text), MESSAGES, args.repeat)
+    # A request scans the query and up to four history messages
+    per_request = 5
+
+    print("=" * 70)
+    print(f"Phrase matching ({matcher.phrase_count} phrases, automaton built in {build_ms:.1f}ms)")
+    print("=" * 70)
+    print(f"{'approach':<24} {'per message':>14} {'per request':>14}")
+    print(f"{'substring loops':<24} {legacy_us:>11.1f} us {legacy_us * per_request:>11.1f} us")
+    print(f"{'aho-corasick':<24} {automaton_us:>11.1f} us {automaton_us * per_request:>11.1f} us")
+    print(f"speedup: {legacy_us / automaton_us:.1f}x")
+
+    print("\nWhole-word matching differences (substring-only hits dropped):")
+    for text in MESSAGES:
+        _, legacy_symptoms = legacy_scan(text)
+        _, symptoms = automaton_scan(matcher, text)
+        if legacy_symptoms != symptoms:
+            print(f"  {text[:60]!r}")
+            print(f"    loops: {legacy_symptoms}  automaton: {symptoms}")
+
+
+if __name__ == "__main__":
+    main()
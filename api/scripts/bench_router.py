@@ -0,0 +1,137 @@
+"""
+Intent router benchmark: compiled rule engine vs. the previous regex router.
+
+Times both routers on typical queries and on adversarial inputs of growing
+length up to 5,000 characters (the maximum accepted by validate_chat_input),
+where the old `\\b(a|b)\\b.*\\b(c|d)\\b` patterns backtrack quadratically (the
+four-part pattern cubically: ~8s at 2,000 characters). The regex router is
+only timed up to --legacy-max characters. Also reports the queries on which
+the two routers disagree.
+
+Usage:
+    python scripts/bench_router.py
+    python scripts/bench_router.py --repeat 20 --legacy-max 1000
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path so "api" is importable as a package
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from api import router  # noqa: E402
+from api.phrase_matcher import _find_cached  # noqa: E402
+from api.router import _route_normalized, route_query  # noqa: E402
+
+MAX_CHARS = 5000
+
+LEGACY_PATTERNS = [
+    r'\b(which|what|list|count|how many|any)\b.*\b(avoid|contraindication|should not|shouldn\'t|unsafe)\b',
+    r'\b(which|what|list|count|how many)\b.*\b(provider|hospital|doctor|clinic|specialist|helpline)\b',
+    r'\b(count|how many)\b.*\b(red flag|symptom|match|warning)\b',
+    r'\b(near|in|at)\b.*\b(mumbai|delhi|bangalore|bengaluru|gurgaon|gurugram|chennai|kolkata|pune|hyderabad|ahmedabad|city)\b',
+    r'\b(avoid|contraindicated)\b.*\b(if i|if you|for)\b',
+    r'\b(any|what)\b.*\b(red flag|warning signs|danger signs)\b',
+    r'\b(pregnan(t|cy)|fetal|baby)\b.*\b(red flag|danger|movement|kick count|warning)\b',
+    r'\b(mental health|suicidal|self harm|depression)\b.*\b(help|helpline|resources|emergency)\b',
+    r'\b(should i go to|when to go to)\b.*\b(hospital|emergency|casualty)\b',
+    r'\b(list|what)\b.*\b(safe|unsafe|avoid)\b.*\b(for|during)\b.*\b(pregnancy|diabetes|hypertension|kidney disease)\b',
+]
+
+
+def legacy_is_graph_intent(text):
+    """The previous router: uncompiled regexes, then substring scans"""
+    text_lower = text.lower()
+    for pattern in LEGACY_PATTERNS:
+        if re.search(pattern, text_lower):
+            return True
+    if sum(1 for term in router.SYMPTOM_TERMS if term in text_lower) >= 2:
+        return True
+    if any(term in text_lower for term in router.PREGNANCY_TERMS):
+        if any(trigger in text_lower for trigger in router.PREGNANCY_TRIGGERS):
+            return True
+        if any(keyword in text_lower for keyword in router.RESOURCE_KEYWORDS):
+            return True
+    if any(term in text_lower for term in router.MENTAL_TERMS):
+        if any(keyword in text_lower for keyword in router.RESOURCE_KEYWORDS | router.SUPPORT_KEYWORDS):
+            return True
+    if " and " in text_lower or " with " in text_lower:
+        if len({term for term in router.CONDITION_TERMS if term in text_lower}) >= 2:
+            return True
+    return any(keyword in text_lower for keyword in router.GRAPH_KEYWORDS)
+
+
+TYPICAL = [
+    "I have a headache since morning",
+    "Which painkillers should I avoid with hypertension?",
+    "Hospitals near me in Mumbai",
+    "My baby is not moving as much, is that a danger sign?",
+    "I have fever and vomiting",
+    "How do I manage stress at work?",
+    "What foods are safe for pregnancy and diabetes?",
+    "I am feeling suicidal, where can I get help?",
+]
+
+LENGTHS = (1000, 2000, MAX_CHARS)
+
+ADVERSARIAL = {
+    # Many first-group terms and no second-group term: each start backtracks over the rest
+    "repeated_question_words": ("which what any " * 400)[:MAX_CHARS],
+    "repeated_prepositions": ("in at near " * 500)[:MAX_CHARS],
+    "pregnancy_without_warning": ("pregnant baby fetal " * 300)[:MAX_CHARS],
+    "four_part_prefix": ("list what safe for " * 300)[:MAX_CHARS],
+    "no_terms": ("lorem ipsum dolor " * 300)[:MAX_CHARS],
+}
+
+
+def _time(fn, text, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(text)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def _uncached_route(text):
+    _route_normalized.cache_clear()
+    _find_cached.cache_clear()
+    return route_query(text)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Intent router benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per adversarial input")
+    parser.add_argument("--legacy-max", type=int, default=2000, help="Longest input timed with the regex router")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"Intent router ({len(router.ROUTE_RULES)} rules) - adversarial inputs")
+    print("=" * 70)
+    print(f"{'input':<28} {'chars':>6} {'regex':>11} {'engine':>11} {'memoized':>11}")
+    for name, full_text in ADVERSARIAL.items():
+        for length in LENGTHS:
+            text = full_text[:length]
+            if length <= args.legacy_max:
+                legacy = f"{_time(legacy_is_graph_intent, text, 1):>8.2f} ms"
+            else:
+                legacy = f"{'skipped':>11}"
+            engine_ms = _time(_uncached_route, text, args.repeat)
+            route_query(text)
+            cached_ms = _time(route_query, text, args.repeat * 100)
+            print(f"{name:<28} {length:>6} {legacy} {engine_ms:>8.2f} ms {cached_ms:>8.3f} ms")
+
+    typical_repeat = args.repeat * 200
+    legacy_ms = sum(_time(legacy_is_graph_intent, text, typical_repeat) for text in TYPICAL) / len(TYPICAL)
+    engine_ms = sum(_time(_uncached_route, text, typical_repeat) for text in TYPICAL) / len(TYPICAL)
+    print(f"{'typical query (mean)':<28} {'':>6} {legacy_ms:>8.3f} ms {engine_ms:>8.3f} ms")
+
+    print("\nRouting decisions (legacy -> engine, rules fired):")
+    for text in TYPICAL:
+        decision = route_query(text)
+        marker = "" if decision["use_graph"] == legacy_is_graph_intent(text) else "  <-- differs"
+        print(f"  {legacy_is_graph_intent(text)!s:>5} -> {decision['use_graph']!s:<5} {text[:45]!r} {decision['rules']}{marker}")
+
+
+if __name__ == "__main__":
+    main()
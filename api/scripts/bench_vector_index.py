@@ -0,0 +1,138 @@
+"""
+Vector index benchmark: NumPy exact search vs. the Chroma HNSW collection.
+
+Builds both backends from the same embeddings and compares cold start (open
+the index and answer one query), per-query latency with and without a
+category filter, and recall@k of Chroma against the exact top-k. Uses the
+exported index in rag/vector_index when present (see build_index.py),
+otherwise a synthetic corpus of the knowledge base's size (clustered unit
+vectors, one cluster per category). Queries are perturbed chunk vectors, so
+no embedding model is needed.
+
+Usage:
+    python scripts/bench_vector_index.py
+    python scripts/bench_vector_index.py --chunks 2000 --queries 500 --k 4
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path so "api" is importable as a package
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import chromadb  # noqa: E402
+from chromadb.config import Settings  # noqa: E402
+
+from api.rag.numpy_index import NUMPY_INDEX_PATH, load_index, save_index  # noqa: E402
+
+DIMENSION = 384  # all-MiniLM-L6-v2
+CATEGORIES = 17
+
+
+def synthetic_corpus(chunks, seed=7):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(CATEGORIES, DIMENSION))
+    labels = rng.integers(0, CATEGORIES, size=chunks)
+    vectors = centers[labels] + rng.normal(scale=1.5, size=(chunks, DIMENSION))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"synthetic/{i}#0" for i in range(chunks)]
+    documents = [f"chunk {i}" for i in range(chunks)]
+    metadatas = [{"category": f"category_{label}", "source": f"synthetic/{i}.md"} for i, label in enumerate(labels)]
+    return vectors.astype(np.float32), ids, documents, metadatas
+
+
+def load_corpus(chunks):
+    if (NUMPY_INDEX_PATH / "embeddings.npy").exists():
+        index = load_index(NUMPY_INDEX_PATH, mmap=False)
+        return np.asarray(index.embeddings), index.ids, index.documents, index.metadatas, "exported knowledge base"
+    return (*synthetic_corpus(chunks), "synthetic")
+
+
+def make_queries(vectors, count, seed=11):
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(vectors), size=count)
+    queries = vectors[rows] + rng.normal(scale=0.05, size=(count, vectors.shape[1]))
+    return (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Vector index benchmark")
+    parser.add_argument("--chunks", type=int, default=600, help="Synthetic corpus size (ignored for an exported index)")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=4)
+    args = parser.parse_args()
+
+    vectors, ids, documents, metadatas, corpus = load_corpus(args.chunks)
+    queries = make_queries(vectors, args.queries)
+    categories = [metadatas[int(np.argmax(vectors @ q))].get("category", "general") for q in queries]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        client = chromadb.PersistentClient(path=str(workdir / "chroma"), settings=Settings(anonymized_telemetry=False))
+        collection = client.create_collection("bench_index")
+        for start in range(0, len(ids), 500):
+            end = start + 500
+            collection.add(
+                ids=ids[start:end],
+                embeddings=vectors[start:end].tolist(),
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+            )
+        save_index(workdir / "numpy", vectors, ids, documents, metadatas)
+        del client, collection
+
+        cold = time.perf_counter()
+        client = chromadb.PersistentClient(path=str(workdir / "chroma"), settings=Settings(anonymized_telemetry=False))
+        collection = client.get_collection("bench_index")
+        collection.query(query_embeddings=[queries[0].tolist()], n_results=args.k)
+        chroma_cold_ms = (time.perf_counter() - cold) * 1000
+
+        cold = time.perf_counter()
+        index = load_index(workdir / "numpy")
+        index.search(queries[0], k=args.k)
+        numpy_cold_ms = (time.perf_counter() - cold) * 1000
+
+        results = {}
+        for label, use_filter in (("unfiltered", False), ("category filter", True)):
+            chroma_ms, numpy_ms, recall = [], [], []
+            for query, category in zip(queries, categories):
+                where = {"where": {"category": category}} if use_filter else {}
+                start = time.perf_counter()
+                found = collection.query(query_embeddings=[query.tolist()], n_results=args.k, **where)["ids"][0]
+                chroma_ms.append((time.perf_counter() - start) * 1000)
+
+                start = time.perf_counter()
+                hits = index.search(query, k=args.k, category=category if use_filter else None)
+                numpy_ms.append((time.perf_counter() - start) * 1000)
+
+                exact = {index.ids[row] for row, _ in hits}
+                recall.append(len(exact & set(found)) / len(exact) if exact else 1.0)
+            results[label] = (chroma_ms, numpy_ms, recall)
+
+    print("=" * 70)
+    print(f"Vector index: {len(ids)} chunks x {vectors.shape[1]} dims ({corpus}), {args.queries} queries, k={args.k}")
+    print("=" * 70)
+    print(f"{'cold start (open + 1 query)':<30} chroma {chroma_cold_ms:>9.1f} ms   numpy {numpy_cold_ms:>9.1f} ms")
+    for label, (chroma_ms, numpy_ms, recall) in results.items():
+        print(f"\n{label}:")
+        print(f"  {'':<10} {'p50':>10} {'p95':>10} {'mean':>10}")
+        for name, values in (("chroma", chroma_ms), ("numpy", numpy_ms)):
+            print(
+                f"  {name:<10} {percentile(values, 0.5):>7.3f} ms {percentile(values, 0.95):>7.3f} ms "
+                f"{statistics.mean(values):>7.3f} ms"
+            )
+        print(f"  chroma recall@{args.k} vs exact: {statistics.mean(recall):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Semantic answer cache for repeated health questions (opt-in via ENABLE_ANSWER_CACHE).
+
+Entries are keyed by the normalized English query, the user's profile condition
+set, the detected language and the knowledge-base index version. Lookup first
+tries the exact key (in-process, then Redis through CacheService), then falls
+back to a nearest-neighbour search over query embeddings of answers cached in
+this worker, accepting a neighbour only above a cosine-similarity threshold.
+
+Rebuilding the index changes the index version, so every cached answer built
+from the old index is ignored without an explicit flush. Callers must bypass
+the cache for safety-sensitive queries (red flags, crisis, pregnancy) and for
+follow-up questions that depend on conversation history.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .cache import cache_service
+
+logger = logging.getLogger("health_assistant")
+
+ANSWER_CACHE_ENABLED = os.getenv("ENABLE_ANSWER_CACHE", "0").lower() == "1"
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", str(6 * 3600)))
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.92"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "2000"))
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return " ".join(_PUNCTUATION_RE.sub(" ", text.lower()).split())
+
+
+class AnswerCache:
+    """Exact-hash + embedding nearest-neighbour cache of complete chat responses"""
+
+    def __init__(
+        self,
+        cache: Any = cache_service,
+        embed: Optional[Callable[[str], Optional[Sequence[float]]]] = None,
+        ttl: int = ANSWER_CACHE_TTL_SECONDS,
+        similarity_threshold: float = ANSWER_CACHE_SIMILARITY,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        enabled: bool = ANSWER_CACHE_ENABLED,
+    ) -> None:
+        self.cache = cache
+        self.embed = embed
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.enabled = enabled
+        # key -> (payload, expires_at); bucket -> OrderedDict(key -> unit embedding)
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._vectors: Dict[str, "OrderedDict[str, np.ndarray]"] = {}
+        self._lock = Lock()
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "stores": 0, "bypassed": 0}
+
+    def make_bucket(self, language: str, conditions: Sequence[str], index_version: str) -> str:
+        """
+        Only answers with the same language, profile and index are
+        interchangeable; conditions holds every profile fact the answer prompt sees
+        """
+        profile_key = ",".join(sorted({condition.lower() for condition in conditions}))
+        return f"{index_version}:{language}:{profile_key}"
+
+    def make_key(self, query: str, bucket: str) -> str:
+        digest = hashlib.sha256(f"{bucket}|{normalize_query(query)}".encode("utf-8")).hexdigest()
+        return f"chat:response:v{getattr(self.cache, 'cache_version', '1')}:{digest}"
+
+    def record_bypass(self) -> None:
+        self.stats["bypassed"] += 1
+
+    async def lookup(
+        self,
+        query: str,
+        language: str,
+        conditions: Sequence[str],
+        index_version: str,
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[np.ndarray]]:
+        """
+        Find a cached response for the query.
+
+        Returns:
+            (hit, query_embedding). hit is {"payload", "match", "similarity"} or None.
+            The embedding (if computed) can be passed to store() to avoid re-embedding.
+        """
+        if not self.enabled or not query.strip():
+            return None, None
+        bucket = self.make_bucket(language, conditions, index_version)
+        key = self.make_key(query, bucket)
+
+        payload = await self._get_payload(key)
+        if payload is not None:
+            self.stats["exact_hits"] += 1
+            return {"payload": payload, "match": "exact", "similarity": 1.0}, None
+
+        embedding = await self._embed(query)
+        if embedding is not None:
+            neighbour_key, similarity = self._nearest(bucket, embedding)
+            if neighbour_key and similarity >= self.similarity_threshold:
+                payload = await self._get_payload(neighbour_key)
+                if payload is not None:
+                    self.stats["semantic_hits"] += 1
+                    return {"payload": payload, "match": "semantic", "similarity": similarity}, embedding
+
+        self.stats["misses"] += 1
+        return None, embedding
+
+    async def store(
+        self,
+        query: str,
+        language: str,
+        conditions: Sequence[str],
+        index_version: str,
+        payload: Dict[str, Any],
+        embedding: Optional[np.ndarray] = None,
+    ) -> None:
+        """Cache a complete response under its exact key and index its query embedding"""
+        if not self.enabled or not query.strip():
+            return
+        bucket = self.make_bucket(language, conditions, index_version)
+        key = self.make_key(query, bucket)
+        entry = {**payload, "_query": normalize_query(query), "_cached_at": time.time()}
+        self._set_local(key, entry)
+        if embedding is None:
+            embedding = await self._embed(query)
+        if embedding is not None:
+            self._add_vector(bucket, key, embedding)
+        self.stats["stores"] += 1
+        try:
+            await self.cache.set_to_cache(key, entry, ttl=self.ttl, fast_path=True)
+        except Exception as exc:
+            logger.debug(f"Answer cache L2 store failed: {exc}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._vectors.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.stats["exact_hits"] + self.stats["semantic_hits"] + self.stats["misses"]
+        hits = self.stats["exact_hits"] + self.stats["semantic_hits"]
+        return {
+            **self.stats,
+            "entries": size,
+            "similarity_threshold": self.similarity_threshold,
+            "hit_rate_percent": round(hits / lookups * 100, 2) if lookups else 0,
+            "enabled": self.enabled,
+        }
+
+    async def _embed(self, query: str) -> Optional[np.ndarray]:
+        if self.embed is None:
+            return None
+        try:
+            vector = await asyncio.to_thread(self.embed, normalize_query(query))
+        except Exception as exc:
+            logger.debug(f"Answer cache embedding failed: {exc}")
+            return None
+        if vector is None:
+            return None
+        array = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(array))
+        return array / norm if norm else None
+
+    async def _get_payload(self, key: str) -> Optional[Dict[str, Any]]:
+        payload = self._get_local(key)
+        if payload is not None:
+            return payload
+        try:
+            cached = await self.cache.get_from_cache(key, fast_path=True)
+        except Exception as exc:
+            logger.debug(f"Answer cache L2 lookup failed: {exc}")
+            return None
+        if isinstance(cached, dict) and cached.get("answer"):
+            self._set_local(key, cached)
+            return cached
+        return None
+
+    def _get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            payload, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                for vectors in self._vectors.values():
+                    vectors.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def _set_local(self, key: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (payload, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                for vectors in self._vectors.values():
+                    vectors.pop(evicted, None)
+
+    def _add_vector(self, bucket: str, key: str, embedding: np.ndarray) -> None:
+        with self._lock:
+            vectors = self._vectors.setdefault(bucket, OrderedDict())
+            vectors[key] = embedding
+            vectors.move_to_end(key)
+
+    def _nearest(self, bucket: str, embedding: np.ndarray) -> Tuple[Optional[str], float]:
+        with self._lock:
+            vectors = self._vectors.get(bucket)
+            if not vectors:
+                return None, 0.0
+            keys: List[str] = list(vectors.keys())
+            matrix = np.stack(list(vectors.values()))
+        similarities = matrix @ embedding
+        best = int(np.argmax(similarities))
+        return keys[best], float(similarities[best])
+
+
+# Global answer cache instance (embedding function is attached by main.py)
+answer_cache = AnswerCache()
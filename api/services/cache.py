@@ -1,22 +1,39 @@
 """
 3-Level Caching Service (Improved)
-L1: Browser Storage (HTTP Cache Headers)
+L1: In-process memory (byte-bounded, per-key TTL; see local_cache.py)
+    plus browser storage via HTTP cache headers
 L2: Redis Cache (Server-side with connection pooling)
 L3: Database (PostgreSQL)
+
+With Redis up, L1 keeps only hot keys (CACHE_L1_PREFIXES) for a short time,
+so they are served without a network hop; with Redis down, L1 keeps every key.
+Both tiers hold values as compact binary frames (cache_codec.py).
+
+Entries derived from one session or customer (every page size of a message
+list, say) are tagged: each records the generation of its tags when written,
+and bumping a tag's generation makes all of them stale in one write, without
+knowing their keys or scanning for them (see get_or_load / invalidate_tags).
+
+Requests talk to Redis through native asyncio clients (redis.asyncio with a
+connection pool, or the Upstash REST client on one keep-alive aiohttp
+session, with batches posted to its /pipeline endpoint), so a cache
+round-trip never blocks the event loop. The sync client
+is only used to test the connection at startup, and as a thread-offloaded
+fallback when no async driver is installed.
 """
 
 import hashlib
 import json
 import logging
 import os
-import gzip
-import base64
 import asyncio
+import copy
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
 from datetime import timedelta
 from collections import defaultdict
-from threading import Lock
+from functools import partial
+from threading import Lock, Thread
 import time
 
 # Load .env file to ensure REDIS_URI is available
@@ -55,8 +72,26 @@ except ImportError:
         ConnectionPool = None
         UpstashRedis = None
 
+# Native asyncio drivers
+try:
+    import aiohttp
+    from upstash_redis.asyncio import Redis as AsyncUpstashRedis
+except ImportError:
+    aiohttp = None
+    AsyncUpstashRedis = None
+try:
+    import redis.asyncio as async_redis
+except ImportError:
+    async_redis = None
+
+from .cache_codec import CacheCodec, CacheDecodeError, to_text
+from .local_cache import LocalCache
+
 logger = logging.getLogger("health_assistant")
 
+# Redis command names of client methods whose names differ (Upstash REST pipeline)
+_UPSTASH_COMMANDS = {"delete": "DEL"}
+
 
 class CacheService:
     """3-level caching service for chat responses (Improved)"""
@@ -65,10 +100,43 @@ class CacheService:
         self.redis_client: Optional[Any] = None
         self.connection_pool: Optional[Any] = None
         self.is_upstash: bool = False
+        # Backend settings for the async client: ("upstash", url, token) or ("redis", uri, connection kwargs)
+        self._backend: Optional[Tuple[str, str, Any]] = None
+        # Async client and the event loop it was created on (its connections belong to that loop)
+        self._async_client: Optional[Any] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Serializes async client creation per event loop (asyncio locks are bound to one loop)
+        self._async_client_lock: Optional[asyncio.Lock] = None
+        self._async_client_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        # aiohttp session for Upstash's /pipeline endpoint (same loop as the async client)
+        self._pipeline_session: Optional[Any] = None
         self.cache_enabled = os.getenv("ENABLE_CACHE", "1").lower() == "1"
         self.cache_ttl = int(os.getenv("CACHE_TTL_SECONDS", "3600"))  # Default 1 hour
         self.cache_version = os.getenv("CACHE_VERSION", "1")  # For cache invalidation on schema changes
         self.compress_threshold = int(os.getenv("CACHE_COMPRESS_THRESHOLD", "1024"))  # Compress if > 1KB
+        # Serializer/compressor (CACHE_SERIALIZER, CACHE_COMPRESSION; see cache_codec.py)
+        self.codec = CacheCodec(compress_threshold=self.compress_threshold)
+        
+        # L1: in-process tier in front of Redis
+        self.local = LocalCache()
+        self.l1_ttl = int(os.getenv("CACHE_L1_TTL_SECONDS", "30"))
+        self.l1_prefixes = tuple(
+            prefix.strip()
+            for prefix in os.getenv(
+                "CACHE_L1_PREFIXES", "conversation_history:,user_info:,ip_check:,session_hash:"
+            ).split(",")
+            if prefix.strip()
+        )
+        # Generation counters of tags; must outlive every tagged entry (tagged TTLs are capped to it)
+        self.tag_ttl = int(os.getenv("CACHE_TAG_TTL_SECONDS", str(7 * 24 * 3600)))
+        
+        # Reconnects while Redis is down: one at a time, backoff doubling from the delay to the max
+        self.reconnect_delay = float(os.getenv("CACHE_RECONNECT_DELAY_SECONDS", "5"))
+        self.reconnect_max_delay = float(os.getenv("CACHE_RECONNECT_MAX_DELAY_SECONDS", "300"))
+        self._reconnect_lock = Lock()
+        self._reconnecting = False
+        self._next_reconnect = 0.0
+        self._reconnect_backoff = self.reconnect_delay
         
         # Cache statistics
         self.stats = {
@@ -115,12 +183,12 @@ class CacheService:
                     upstash_token = upstash_token.strip('"\'')
                     
                     logger.debug(f"Initializing Upstash Redis with URL: {upstash_url[:30]}...")
-                    self.redis_client = UpstashRedis(url=upstash_url, token=upstash_token)
-                    self.is_upstash = True
+                    client = UpstashRedis(url=upstash_url, token=upstash_token)
                     
                     # Test connection
                     logger.debug("Testing Upstash Redis connection...")
-                    if self._test_connection_with_retry():
+                    if self._test_connection_with_retry(client=client, is_upstash=True):
+                        self._use_connection(client, None, ("upstash", upstash_url, upstash_token))
                         logger.info("Upstash Redis cache (L2) initialized successfully")
                         return
                     else:
@@ -143,7 +211,7 @@ class CacheService:
             
             # Configure connection pool for better performance
             connection_kwargs = {
-                "decode_responses": True,
+                "decode_responses": False,  # values are binary frames
                 "socket_connect_timeout": 10,
                 "socket_timeout": 10,
                 "retry_on_timeout": True,
@@ -155,19 +223,20 @@ class CacheService:
                 # SSL/TLS connection
                 connection_kwargs["ssl_cert_reqs"] = None
                 connection_kwargs["ssl_check_hostname"] = False
+            backend = ("redis", redis_uri, connection_kwargs)
             
             try:
                 logger.debug("Attempting to create Redis connection pool...")
-                self.connection_pool = RedisConnectionPool.from_url(redis_uri, **connection_kwargs)
+                connection_pool = RedisConnectionPool.from_url(redis_uri, **connection_kwargs)
                 logger.debug("Connection pool created successfully")
             except Exception as pool_error:
                 # Fallback: try without connection pool
                 logger.warning(f"Connection pool failed, trying direct connection: {pool_error}")
-                self.redis_client = redis.from_url(redis_uri, **connection_kwargs)
-                self.is_upstash = False
+                client = redis.from_url(redis_uri, **connection_kwargs)
                 # Test connection
                 logger.debug("Testing direct Redis connection...")
-                if self._test_connection_with_retry():
+                if self._test_connection_with_retry(client=client, is_upstash=False):
+                    self._use_connection(client, None, backend)
                     logger.info("Redis cache (L2) initialized successfully (direct connection)")
                     return
                 else:
@@ -176,12 +245,12 @@ class CacheService:
             # Create Redis client from connection pool
             logger.debug("Creating Redis client from connection pool...")
             from redis import Redis as StandardRedis
-            self.redis_client = StandardRedis(connection_pool=self.connection_pool)
-            self.is_upstash = False
+            client = StandardRedis(connection_pool=connection_pool)
             
             # Test connection with retry
             logger.debug("Testing Redis connection from pool...")
-            if self._test_connection_with_retry():
+            if self._test_connection_with_retry(client=client, is_upstash=False):
+                self._use_connection(client, connection_pool, backend)
                 logger.info("Redis cache (L2) initialized successfully with connection pooling")
             else:
                 raise Exception("Connection pool test failed")
@@ -195,16 +264,169 @@ class CacheService:
                 logger.info("Tip: Check your REDIS_URI format or install upstash-redis: pip install upstash-redis")
             self.redis_client = None
             self.connection_pool = None
+            self._backend = None
     
-    def _test_connection_with_retry(self, max_retries: int = 3):
-        """Test Redis connection with retry logic"""
+    def _use_connection(self, client: Any, connection_pool: Optional[Any], backend: Tuple[str, str, Any]) -> None:
+        """
+        Switch to a tested connection. Connection attempts only touch shared
+        state here, so requests never see a client that is still being tested.
+        A new connection gets a new async client on next use.
+        """
+        self.is_upstash = backend[0] == "upstash"
+        self.connection_pool = connection_pool
+        self._backend = backend
+        self._async_client = None
+        self._async_loop = None
+        self.redis_client = client
+    
+    def _create_async_client(self) -> Optional[Any]:
+        """Native asyncio client for the configured backend (None if no async driver is installed)"""
+        if self._backend is None:
+            return None
+        kind, target, options = self._backend
+        if kind == "upstash":
+            return AsyncUpstashRedis(url=target, token=options) if AsyncUpstashRedis else None
+        if async_redis is None:
+            return None
+        return async_redis.Redis(connection_pool=async_redis.ConnectionPool.from_url(target, **options))
+    
+    async def _get_async_client(self) -> Optional[Any]:
+        """
+        The async client of the running event loop (created on first use in
+        each loop). Creation awaits, so it runs under a per-loop lock: concurrent
+        first requests share one client instead of each opening (and leaking)
+        their own sessions.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_loop is not loop:
+            if self._async_client_lock_loop is not loop:
+                self._async_client_lock, self._async_client_lock_loop = asyncio.Lock(), loop
+            async with self._async_client_lock:
+                if self._async_loop is not loop:
+                    client = self._create_async_client()
+                    if client is not None and self._backend[0] == "upstash":
+                        # Keep one aiohttp session open instead of connecting for every command
+                        await client.__aenter__()
+                        self._pipeline_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+                    self._async_client, self._async_loop = client, loop
+        return self._async_client
+    
+    async def _execute(self, command: str, *args: Any, **kwargs: Any) -> Any:
+        """Run a Redis command without blocking the event loop"""
+        client = await self._get_async_client()
+        if client is not None:
+            return await getattr(client, command)(*args, **kwargs)
+        # No async driver installed: run the sync client in a worker thread
+        return await asyncio.to_thread(getattr(self.redis_client, command), *args, **kwargs)
+    
+    async def _pipeline(self, commands: Sequence[Tuple[Any, ...]]) -> List[Any]:
+        """
+        Run several (command, *args) tuples in one round-trip and return their
+        results in order. Not a transaction: commands may interleave with others.
+        """
+        client = await self._get_async_client()
+        if client is None:
+            return await asyncio.to_thread(self._sync_pipeline, commands)
+        if self._backend[0] == "redis":
+            pipe = client.pipeline(transaction=False)
+            for command, *args in commands:
+                getattr(pipe, command)(*args)
+            return await pipe.execute()
+        return await self._upstash_pipeline(commands)
+    
+    async def _upstash_pipeline(self, commands: Sequence[Tuple[Any, ...]]) -> List[Any]:
+        """
+        POST the commands to Upstash's REST /pipeline endpoint: one HTTP request
+        for the batch, commands run in order (the pinned upstash-redis client
+        has no pipeline API and would send one request per command).
+        """
+        _, url, token = self._backend
+        body = [
+            [_UPSTASH_COMMANDS.get(command, command.upper()), *(arg if isinstance(arg, str) else str(arg) for arg in args)]
+            for command, *args in commands
+        ]
+        async with self._pipeline_session.post(
+            f"{url.rstrip('/')}/pipeline", headers={"Authorization": f"Bearer {token}"}, json=body
+        ) as response:
+            response.raise_for_status()
+            replies = await response.json()
+        for reply in replies:
+            if reply.get("error"):
+                raise RuntimeError(f"Upstash pipeline error: {reply['error']}")
+        return [reply.get("result") for reply in replies]
+    
+    def _sync_pipeline(self, commands: Sequence[Tuple[Any, ...]]) -> List[Any]:
+        if self.is_upstash or not hasattr(self.redis_client, "pipeline"):
+            return [getattr(self.redis_client, command)(*args) for command, *args in commands]
+        pipe = self.redis_client.pipeline(transaction=False)
+        for command, *args in commands:
+            getattr(pipe, command)(*args)
+        return pipe.execute()
+    
+    async def _reset_async_client(self) -> None:
+        """Close and drop the async client, so the next command reconnects"""
+        client, loop = self._async_client, self._async_loop
+        session, self._pipeline_session = self._pipeline_session, None
+        self._async_client, self._async_loop = None, None
+        if client is None or loop is not asyncio.get_running_loop():
+            return
+        try:
+            if session is not None:
+                await session.close()
+            if hasattr(client, "connection_pool"):
+                await client.aclose()
+                await client.connection_pool.disconnect()
+            else:
+                await client.close()
+        except Exception as e:
+            logger.debug(f"Error closing async Redis client: {e}")
+    
+    async def close(self) -> None:
+        """Close async Redis connections (application shutdown)"""
+        await self._reset_async_client()
+    
+    async def _ensure_connection(self) -> None:
+        """
+        Start a reconnect if Redis is not initialized. Requests never wait for
+        it: the attempt (blocking, up to three tries with timeouts) runs in a
+        background thread, one at a time, and attempts are spaced by a backoff
+        that doubles after each failure; meanwhile L1 is the only tier.
+        Live connections are not pinged per request: the redis pool
+        health-checks its sockets and Upstash REST is stateless HTTP.
+        """
+        if self.redis_client is not None or not (REDIS_AVAILABLE and self.cache_enabled):
+            return
+        with self._reconnect_lock:
+            if self._reconnecting or time.monotonic() < self._next_reconnect:
+                return
+            self._reconnecting = True
+        Thread(target=self._reconnect, name="cache-reconnect", daemon=True).start()
+    
+    def _reconnect(self) -> None:
+        try:
+            self.ensure_redis_connection()
+        finally:
+            with self._reconnect_lock:
+                if self.redis_client is None:
+                    self._next_reconnect = time.monotonic() + self._reconnect_backoff
+                    self._reconnect_backoff = min(self._reconnect_backoff * 2, self.reconnect_max_delay)
+                else:
+                    self._reconnect_backoff = self.reconnect_delay
+                self._reconnecting = False
+    
+    def _test_connection_with_retry(
+        self, max_retries: int = 3, client: Optional[Any] = None, is_upstash: Optional[bool] = None
+    ):
+        """Test Redis connection with retry logic (a new client, or the current one by default)"""
+        client = client or self.redis_client
+        is_upstash = self.is_upstash if is_upstash is None else is_upstash
         for attempt in range(max_retries):
             try:
-                if self.is_upstash:
+                if is_upstash:
                     # Upstash Redis - test with a simple set/get operation
                     test_key = f"__test_conn_{int(time.time())}__"
-                    self.redis_client.set(test_key, "test", ex=1)  # Set with 1 second expiry
-                    result = self.redis_client.get(test_key)
+                    client.set(test_key, "test", ex=1)  # Set with 1 second expiry
+                    result = client.get(test_key)
                     if result == "test":
                         logger.debug("Upstash Redis connection test successful")
                         return True
@@ -212,11 +434,11 @@ class CacheService:
                         raise Exception(f"Upstash Redis test failed: expected 'test', got '{result}'")
                 else:
                     # Standard redis uses ping()
-                    if asyncio.iscoroutinefunction(self.redis_client.ping):
+                    if asyncio.iscoroutinefunction(client.ping):
                         # This shouldn't happen in sync context, but handle it
                         logger.warning("Async redis client in sync context")
                     else:
-                        self.redis_client.ping()
+                        client.ping()
                     return True
             except Exception as e:
                 if attempt < max_retries - 1:
@@ -272,24 +494,9 @@ class CacheService:
         # Include cache version for schema changes
         return f"chat:response:v{self.cache_version}:{key_hash}"
     
-    def _decompress_data(self, data: str) -> str:
-        """Decompress gzipped data"""
-        try:
-            compressed_bytes = base64.b64decode(data.encode())
-            decompressed = gzip.decompress(compressed_bytes)
-            return decompressed.decode('utf-8')
-        except Exception:
-            # If decompression fails, assume it's not compressed
-            return data
-    
-    def _compress_data(self, data: str) -> Tuple[str, bool]:
-        """Compress data if it exceeds threshold"""
-        data_bytes = data.encode('utf-8')
-        if len(data_bytes) > self.compress_threshold:
-            compressed = gzip.compress(data_bytes, compresslevel=6)
-            compressed_b64 = base64.b64encode(compressed).decode('utf-8')
-            return compressed_b64, True
-        return data, False
+    def _to_wire(self, frame: bytes) -> Union[bytes, str]:
+        """Redis stores frames as bytes; the Upstash REST API carries JSON, so frames travel as text"""
+        return to_text(frame) if self.is_upstash else frame
     
     async def get(self, cache_key: str) -> Optional[Any]:
         """
@@ -310,10 +517,11 @@ class CacheService:
         fast_path: bool = False  # Fast path for critical endpoints like IP check
     ) -> Optional[Dict[str, Any]]:
         """
-        Get cached response from L2 (Upstash Redis) with retry logic
-        L1 (browser) is handled by HTTP headers
+        Get cached response from L1 (process memory), then L2 (Redis) with retry logic
         L3 (Database) is handled separately in main.py
         
+        Concurrent misses for the same key share one Redis read (single-flight).
+        
         Args:
             cache_key: Cache key string
             retry_count: Number of retries on failure (default 1 for speed)
@@ -322,123 +530,320 @@ class CacheService:
         Returns:
             Cached response dict or None
         """
-        # Fast path: skip connection check and retries for maximum speed
+        # L1: in-process memory, no network hop
+        cached_data = self.local.get(cache_key)
+        if cached_data is not None:
+            self._record_stat("hits", "L1")
+            return self.codec.decode(cached_data)
+        
+        if not fast_path:
+            # Normal path: with connection check
+            await self._ensure_connection()
+        if not self.redis_client:
+            return None
+        
+        cached_data = await self.local.single_flight(
+            cache_key, partial(self._get_from_redis, cache_key, retry_count, fast_path)
+        )
+        if cached_data is None:
+            return None
+        try:
+            return self.codec.decode(cached_data)
+        except CacheDecodeError as e:
+            logger.warning(f"Failed to decode cached data: {e}")
+            # Invalid cache entry, delete it
+            await self.delete(cache_key)
+            return None
+    
+    async def _get_from_redis(self, cache_key: str, retry_count: int, fast_path: bool) -> Optional[Union[bytes, str]]:
+        """Encoded value from L2, copied into L1 for hot keys"""
+        # Fast path: skip retries for maximum speed
         if fast_path:
-            if not self.redis_client:
-                return None
             try:
-                # For Upstash Redis (synchronous), run in thread pool to avoid blocking
-                # For standard Redis, check if async
-                if self.is_upstash:
-                    # Upstash is synchronous - run in thread to avoid blocking event loop
-                    import concurrent.futures
-                    loop = asyncio.get_event_loop()
-                    cached_data = await loop.run_in_executor(
-                        None, 
-                        lambda: self.redis_client.get(cache_key)
-                    )
-                else:
-                    # Standard redis - check if async
-                    if asyncio.iscoroutinefunction(self.redis_client.get):
-                        cached_data = await self.redis_client.get(cache_key)
-                    else:
-                        # Synchronous standard redis - run in thread
-                        import concurrent.futures
-                        loop = asyncio.get_event_loop()
-                        cached_data = await loop.run_in_executor(
-                            None,
-                            lambda: self.redis_client.get(cache_key)
-                        )
-                
-                if cached_data:
-                    if cached_data.startswith('H4sI'):
-                        cached_data = self._decompress_data(cached_data)
-                    response_data = json.loads(cached_data)
-                    self._record_stat("hits", "L2")
-                    return response_data
-                else:
-                    self._record_stat("misses", "L2")
-                    return None
+                cached_data = await self._execute("get", cache_key)
             except Exception:
                 # Fast path: fail silently, return None
                 return None
+            return self._finish_redis_read(cache_key, cached_data)
         
-        # Normal path: with connection check and retries
-        # Ensure Redis connection is active
-        self.ensure_redis_connection()
-        
-        # Try L2: Upstash Redis or standard Redis
-        if self.redis_client:
-            for attempt in range(retry_count):
-                try:
-                    # Upstash Redis is synchronous, standard redis might be async
-                    if self.is_upstash:
-                        cached_data = self.redis_client.get(cache_key)
-                    else:
-                        # Standard redis - check if async
-                        if asyncio.iscoroutinefunction(self.redis_client.get):
-                            cached_data = await self.redis_client.get(cache_key)
-                        else:
-                            cached_data = self.redis_client.get(cache_key)
-                    
-                    if cached_data:
-                        # Check if data is compressed (starts with base64 gzip header)
-                        if cached_data.startswith('H4sI'):  # gzip magic bytes in base64
-                            cached_data = self._decompress_data(cached_data)
-                        
-                        response_data = json.loads(cached_data)
-                        self._record_stat("hits", "L2")
-                        logger.debug(f"Cache HIT (L2 Redis): {cache_key[:20]}...")
-                        return response_data
-                    else:
-                        self._record_stat("misses", "L2")
-                        return None
-                        
-                except Exception as e:
-                    # Check if it's a Redis-specific error
-                    error_type = type(e).__name__
-                    if "Connection" in error_type or "ConnectionError" in str(type(e)):
-                        self._record_stat("errors", "L2-Connection")
-                        if attempt < retry_count - 1:
-                            # Try to reconnect
-                            try:
-                                self._test_connection_with_retry()
-                            except:
-                                pass
-                            await asyncio.sleep(0.1 * (attempt + 1))
-                            continue
-                        logger.warning(f"Redis connection error: {e}")
-                    elif "Timeout" in error_type or "TimeoutError" in str(type(e)):
-                        self._record_stat("errors", "L2-Timeout")
-                        if attempt < retry_count - 1:
-                            await asyncio.sleep(0.1 * (attempt + 1))
-                            continue
-                        logger.warning(f"Redis timeout error: {e}")
-                    elif isinstance(e, json.JSONDecodeError):
-                        logger.warning(f"Failed to decode cached data: {e}")
-                        # Invalid cache entry, delete it
-                        try:
-                            if self.is_upstash:
-                                self.redis_client.delete(cache_key)
-                            else:
-                                if asyncio.iscoroutinefunction(self.redis_client.delete):
-                                    await self.redis_client.delete(cache_key)
-                                else:
-                                    self.redis_client.delete(cache_key)
-                        except:
-                            pass
-                        return None
-                    else:
-                        self._record_stat("errors", "L2-Other")
-                        logger.warning(f"Redis get error: {e}")
-                        if attempt < retry_count - 1:
-                            await asyncio.sleep(0.1 * (attempt + 1))
-                            continue
+        for attempt in range(retry_count):
+            try:
+                cached_data = await self._execute("get", cache_key)
+                return self._finish_redis_read(cache_key, cached_data)
+            except Exception as e:
+                # Check if it's a Redis-specific error
+                error_type = type(e).__name__
+                if "Connection" in error_type or "ConnectionError" in str(type(e)):
+                    self._record_stat("errors", "L2-Connection")
+                    if attempt < retry_count - 1:
+                        # Reconnect on the next attempt
+                        await self._reset_async_client()
+                        await asyncio.sleep(0.1 * (attempt + 1))
+                        continue
+                    logger.warning(f"Redis connection error: {e}")
+                elif "Timeout" in error_type or "TimeoutError" in str(type(e)):
+                    self._record_stat("errors", "L2-Timeout")
+                    if attempt < retry_count - 1:
+                        await asyncio.sleep(0.1 * (attempt + 1))
+                        continue
+                    logger.warning(f"Redis timeout error: {e}")
+                else:
+                    self._record_stat("errors", "L2-Other")
+                    logger.warning(f"Redis get error: {e}")
+                    if attempt < retry_count - 1:
+                        await asyncio.sleep(0.1 * (attempt + 1))
+                        continue
         
         # L3: Database (handled separately in main.py)
         # This function only handles L2
         return None
     
+    def _finish_redis_read(
+        self, cache_key: str, cached_data: Optional[Union[bytes, str]]
+    ) -> Optional[Union[bytes, str]]:
+        if not cached_data:
+            self._record_stat("misses", "L2")
+            return None
+        self._record_stat("hits", "L2")
+        logger.debug(f"Cache HIT (L2 Redis): {cache_key[:20]}...")
+        self.local.set(cache_key, cached_data, self._local_ttl(cache_key, self.l1_ttl))
+        return cached_data
+    
+    async def get_many(self, cache_keys: Sequence[str]) -> Dict[str, Any]:
+        """
+        Values of several keys in one round-trip: L1 first, the rest with a
+        single MGET. Keys that are missing or undecodable are left out.
+        """
+        found: Dict[str, Any] = {}
+        remote: List[str] = []
+        for cache_key in dict.fromkeys(cache_keys):
+            cached_data = self.local.get(cache_key)
+            if cached_data is not None:
+                self._record_stat("hits", "L1")
+                found[cache_key] = self.codec.decode(cached_data)
+            else:
+                remote.append(cache_key)
+        if not remote:
+            return found
+        
+        await self._ensure_connection()
+        if not self.redis_client:
+            return found
+        try:
+            values = await self._execute("mget", *remote)
+        except Exception as e:
+            self._record_stat("errors", "L2-Other")
+            logger.warning(f"Redis get error: {e}")
+            return found
+        
+        invalid = []
+        for cache_key, cached_data in zip(remote, values):
+            cached_data = self._finish_redis_read(cache_key, cached_data)
+            if cached_data is None:
+                continue
+            try:
+                found[cache_key] = self.codec.decode(cached_data)
+            except CacheDecodeError as e:
+                logger.warning(f"Failed to decode cached data: {e}")
+                invalid.append(cache_key)
+        if invalid:
+            await self.delete_many(invalid)
+        return found
+    
+    async def set_many(self, items: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """
+        Store several values with one TTL in one round-trip (pipelined SETEX:
+        MSET cannot set expiries).
+        
+        Returns:
+            True if every value was stored (in Redis, or in L1 without Redis)
+        """
+        ttl = ttl or self.cache_ttl
+        frames: Dict[str, bytes] = {}
+        for cache_key, value in items.items():
+            try:
+                frames[cache_key] = self.codec.encode(value)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Cache value for {cache_key[:20]}... is not serializable: {e}")
+        if not frames:
+            return not items
+        
+        await self._ensure_connection()
+        stored_locally = [
+            self.local.set(cache_key, frame, self._local_ttl(cache_key, ttl)) for cache_key, frame in frames.items()
+        ]
+        if not self.redis_client:
+            return all(stored_locally) and len(frames) == len(items)
+        try:
+            await self._pipeline(
+                [("setex", cache_key, ttl, self._to_wire(frame)) for cache_key, frame in frames.items()]
+            )
+            logger.debug(f"Cache SET (L2 Redis): {len(frames)} keys (TTL: {ttl}s)")
+            return len(frames) == len(items)
+        except Exception as e:
+            self._record_stat("errors", "L2-Other")
+            logger.warning(f"Redis set error: {e}")
+            return False
+    
+    def _local_ttl(self, cache_key: str, ttl: int) -> int:
+        """
+        L1 lifetime of a key. Without Redis, L1 is the only tier and keeps every
+        key for its full TTL. With Redis, only hot keys are kept, for at most
+        CACHE_L1_TTL_SECONDS, so writes from other workers show up quickly.
+        """
+        if not self.redis_client:
+            return ttl
+        if cache_key.startswith(self.l1_prefixes):
+            return min(ttl, self.l1_ttl)
+        return 0
+    
+    def set_local(self, cache_key: str, value: Any, ttl: Optional[int] = None) -> bool:
+        """Store in L1 only (synchronous: visible immediately, e.g. before a background Redis write)"""
+        return self.local.set(cache_key, self.codec.encode(value), self._local_ttl(cache_key, ttl or self.cache_ttl))
+    
+    async def get_or_load(
+        self,
+        cache_key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        tags: Sequence[str] = (),
+    ) -> Any:
+        """
+        Cached value for key, or the result of loader() (stored unless None).
+        Concurrent misses for one key run the loader once.
+        
+        With tags, the entry is only valid until one of the tags is bumped by
+        invalidate_tags(). The tag generations are read with the entry (one
+        round-trip), before the loader runs, so a bump that races the load
+        leaves the new entry already stale rather than caching old data.
+        """
+        if tags:
+            cached, generations = await self._get_tagged(cache_key, tags)
+        else:
+            cached, generations = await self.get_from_cache(cache_key), None
+        if cached is not None:
+            return cached
+        
+        async def load() -> Any:
+            value = await loader()
+            if value is None:
+                return None
+            if not tags:
+                await self.set_to_cache(cache_key, value, ttl=ttl)
+            elif generations is not None:
+                await self._set_tagged(cache_key, value, tags, generations, ttl or self.cache_ttl)
+            return value
+        
+        value = await self.local.single_flight(f"load:{cache_key}", load)
+        # Each caller gets its own copy, as from a cache read
+        return copy.deepcopy(value)
+    
+    @staticmethod
+    def _tag_key(tag: str) -> str:
+        return f"tag:{tag}"
+    
+    def _local_generation(self, tag_key: str) -> int:
+        """Generation of a tag when L1 is the only tier"""
+        generation = self.local.get(tag_key)
+        if generation is None:
+            # Start from a fresh value, so entries written before the counter
+            # was evicted from L1 can never match it again
+            generation = str(time.time_ns())
+            self.local.set(tag_key, generation, self.tag_ttl)
+        return int(generation)
+    
+    async def _get_tagged(
+        self, cache_key: str, tags: Sequence[str]
+    ) -> Tuple[Optional[Any], Optional[List[int]]]:
+        """
+        (value, current tag generations). value is None on a miss or when the
+        entry was written under older generations; generations is None if they
+        could not be read, in which case nothing should be stored.
+        """
+        await self._ensure_connection()
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        if self.redis_client:
+            try:
+                cached_data, *counters = await self._execute("mget", cache_key, *tag_keys)
+            except Exception as e:
+                self._record_stat("errors", "L2-Other")
+                logger.warning(f"Redis get error: {e}")
+                return None, None
+            generations = [int(counter) if counter else 0 for counter in counters]
+            level = "L2"
+        else:
+            generations = [self._local_generation(tag_key) for tag_key in tag_keys]
+            cached_data = self.local.get(cache_key)
+            level = "L1"
+        
+        if cached_data:
+            try:
+                written_under, value = self.codec.decode(cached_data)
+            except (CacheDecodeError, TypeError, ValueError) as e:
+                logger.warning(f"Failed to decode cached data: {e}")
+            else:
+                if written_under == generations:
+                    self._record_stat("hits", level)
+                    return value, generations
+        self._record_stat("misses", level)
+        return None, generations
+    
+    async def _set_tagged(
+        self, cache_key: str, value: Any, tags: Sequence[str], generations: List[int], ttl: int
+    ) -> bool:
+        # A tagged entry must expire before its tag counters can: its TTL is
+        # capped to theirs, and their TTLs are refreshed in the same round-trip
+        ttl = min(ttl, self.tag_ttl)
+        try:
+            frame = self.codec.encode([generations, value])
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Cache value for {cache_key[:20]}... is not serializable: {e}")
+            return False
+        if not self.redis_client:
+            return self.local.set(cache_key, frame, ttl)
+        commands: List[Tuple[Any, ...]] = [("setex", cache_key, ttl, self._to_wire(frame))]
+        commands += [("expire", self._tag_key(tag), self.tag_ttl) for tag in tags]
+        try:
+            await self._pipeline(commands)
+            return True
+        except Exception as e:
+            self._record_stat("errors", "L2-Other")
+            logger.warning(f"Redis set error: {e}")
+            return False
+    
+    async def invalidate_tags(self, tags: Sequence[str], delete_keys: Sequence[str] = ()) -> bool:
+        """
+        Make every entry stored with any of the tags stale, and delete
+        delete_keys, in one pipelined round-trip.
+        
+        Returns:
+            True if the invalidation reached the cache (always, without Redis)
+        """
+        await self._ensure_connection()
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        for key in delete_keys:
+            self.local.delete(key)
+        if not self.redis_client:
+            for tag_key in tag_keys:
+                self.local.set(tag_key, str(time.time_ns()), self.tag_ttl)
+            return True
+        
+        commands: List[Tuple[Any, ...]] = []
+        for tag_key in tag_keys:
+            # A missing counter is seeded from the clock rather than starting at 1,
+            # so a counter that expired never repeats a generation an entry was written under
+            commands += [("setnx", tag_key, time.time_ns()), ("incr", tag_key), ("expire", tag_key, self.tag_ttl)]
+        if delete_keys:
+            commands.append(("delete", *delete_keys))
+        if not commands:
+            return True
+        try:
+            await self._pipeline(commands)
+            return True
+        except Exception as e:
+            logger.warning(f"Cache tag invalidation error: {e}")
+            return False
+    
     async def set_to_cache(
         self,
         cache_key: str,
@@ -448,8 +853,7 @@ class CacheService:
         fast_path: bool = False  # Fast path for critical writes
     ) -> bool:
         """
-        Store response in L2 (Upstash Redis) cache with compression
-        L1 (browser) is handled by HTTP headers
+        Store response in L1 (process memory) and L2 (Redis) with compression
         L3 (database) is handled separately in main.py
         
         Args:
@@ -459,69 +863,38 @@ class CacheService:
             retry_count: Number of retries on failure
             
         Returns:
-            True if successful, False otherwise
+            True if successful (in Redis, or in L1 when Redis is unavailable), False otherwise
         """
-        # Fast path: skip connection check for maximum speed
+        ttl = ttl or self.cache_ttl
+        try:
+            frame = self.codec.encode(response_data)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Cache value for {cache_key[:20]}... is not serializable: {e}")
+            return False
+        
+        stored_locally = self.local.set(cache_key, frame, self._local_ttl(cache_key, ttl))
+        if not fast_path:
+            # Normal path: with connection check
+            await self._ensure_connection()
+        if not self.redis_client:
+            return stored_locally
+        
+        wire_data = self._to_wire(frame)
+        
+        # Fast path: no retries for maximum speed
         if fast_path:
-            if not self.redis_client:
-                return False
             try:
-                serialized = json.dumps(response_data)
-                compressed_data, _ = self._compress_data(serialized)
-                ttl = ttl or self.cache_ttl
-                
-                if self.is_upstash:
-                    self.redis_client.setex(cache_key, ttl, compressed_data)
-                else:
-                    if asyncio.iscoroutinefunction(self.redis_client.setex):
-                        await self.redis_client.setex(cache_key, ttl, compressed_data)
-                    elif hasattr(self.redis_client, 'setex'):
-                        self.redis_client.setex(cache_key, ttl, compressed_data)
-                    else:
-                        if asyncio.iscoroutinefunction(self.redis_client.set):
-                            await self.redis_client.set(cache_key, compressed_data, ex=ttl)
-                        else:
-                            self.redis_client.set(cache_key, compressed_data, ex=ttl)
+                await self._execute("setex", cache_key, ttl, wire_data)
                 return True
             except Exception:
                 # Fast path: fail silently
                 return False
         
-        # Normal path: with connection check
-        # Ensure Redis connection is active
-        self.ensure_redis_connection()
-        
-        if not self.redis_client:
-            return False
-        
-        ttl = ttl or self.cache_ttl
-        
         for attempt in range(retry_count):
             try:
-                serialized = json.dumps(response_data)
-                
-                # Compress if data is large
-                compressed_data, is_compressed = self._compress_data(serialized)
+                await self._execute("setex", cache_key, ttl, wire_data)
                 
-                # Store with compression flag in metadata (optional)
-                # Upstash Redis uses setex, standard redis might use set with ex parameter
-                if self.is_upstash:
-                    self.redis_client.setex(cache_key, ttl, compressed_data)
-                else:
-                    # Standard redis
-                    if asyncio.iscoroutinefunction(self.redis_client.setex):
-                        await self.redis_client.setex(cache_key, ttl, compressed_data)
-                    elif hasattr(self.redis_client, 'setex'):
-                        self.redis_client.setex(cache_key, ttl, compressed_data)
-                    else:
-                        # Fallback to set with ex parameter
-                        if asyncio.iscoroutinefunction(self.redis_client.set):
-                            await self.redis_client.set(cache_key, compressed_data, ex=ttl)
-                        else:
-                            self.redis_client.set(cache_key, compressed_data, ex=ttl)
-                
-                compression_info = f" (compressed)" if is_compressed else ""
-                logger.debug(f"Cache SET (L2 Redis): {cache_key[:20]}... (TTL: {ttl}s{compression_info})")
+                logger.debug(f"Cache SET (L2 Redis): {cache_key[:20]}... (TTL: {ttl}s, {len(frame)} bytes)")
                 return True
                 
             except Exception as e:
@@ -529,10 +902,7 @@ class CacheService:
                 if "Connection" in error_type or "ConnectionError" in str(type(e)):
                     self._record_stat("errors", "L2-Connection")
                     if attempt < retry_count - 1:
-                        try:
-                            self._test_connection_with_retry()
-                        except:
-                            pass
+                        await self._reset_async_client()
                         await asyncio.sleep(0.1 * (attempt + 1))
                         continue
                     logger.warning(f"Redis connection error: {e}")
@@ -621,6 +991,7 @@ class CacheService:
                 "hit_rate_percent": round(hit_rate, 2),
                 "cache_enabled": self.cache_enabled,
                 "redis_available": self.is_available(),
+                "l1": self.local.get_statistics(),
             }
     
     def reset_statistics(self):
@@ -645,25 +1016,35 @@ class CacheService:
         Returns:
             True if deleted, False otherwise
         """
+        deleted_locally = self.local.delete(cache_key)
         if not self.redis_client:
-            return False
+            return deleted_locally
         
         try:
-            if self.is_upstash:
-                # Upstash Redis uses delete method
-                result = self.redis_client.delete(cache_key)
-                return result > 0
-            else:
-                # Standard redis
-                if asyncio.iscoroutinefunction(self.redis_client.delete):
-                    result = await self.redis_client.delete(cache_key)
-                else:
-                    result = self.redis_client.delete(cache_key)
-                return result > 0 if result else False
+            result = await self._execute("delete", cache_key)
+            return deleted_locally or (result > 0 if result else False)
         except Exception as e:
             logger.warning(f"Cache delete error: {e}")
             return False
     
+    async def delete_many(self, cache_keys: Sequence[str]) -> int:
+        """
+        Delete several keys with one DEL
+        
+        Returns:
+            Number of keys deleted
+        """
+        cache_keys = list(dict.fromkeys(cache_keys))
+        deleted_locally = sum(self.local.delete(cache_key) for cache_key in cache_keys)
+        if not cache_keys or not self.redis_client:
+            return deleted_locally
+        try:
+            deleted = await self._execute("delete", *cache_keys)
+            return max(deleted or 0, deleted_locally)
+        except Exception as e:
+            logger.warning(f"Cache delete error: {e}")
+            return deleted_locally
+    
     async def invalidate_cache(
         self,
         pattern: Optional[str] = None,
@@ -679,40 +1060,33 @@ class CacheService:
         Returns:
             Number of keys deleted
         """
-        if not self.redis_client:
+        if cache_key:
+            # Delete specific key
+            deleted = await self.delete(cache_key)
+            return 1 if deleted else 0
+        if not pattern:
             return 0
         
+        local_deleted = self.local.delete_matching(pattern)
+        if not self.redis_client:
+            return local_deleted
+        
         try:
-            if cache_key:
-                # Delete specific key
-                deleted = await self.delete(cache_key)
-                return 1 if deleted else 0
-            elif pattern:
-                # Delete keys matching pattern (use SCAN for large datasets)
-                deleted_count = 0
-                cursor = 0
-                while True:
-                    if self.is_upstash:
-                        # Upstash Redis scan
-                        cursor, keys = self.redis_client.scan(cursor, match=pattern, count=100)
-                    else:
-                        # Standard redis scan
-                        if asyncio.iscoroutinefunction(self.redis_client.scan):
-                            cursor, keys = await self.redis_client.scan(cursor, match=pattern, count=100)
-                        else:
-                            cursor, keys = self.redis_client.scan(cursor, match=pattern, count=100)
-                    
-                    if keys:
-                        for key in keys:
-                            if await self.delete(key):
-                                deleted_count += 1
-                    if cursor == 0:
-                        break
-                return deleted_count
-            return 0
+            # Ad-hoc patterns (admin endpoint) only: application data is
+            # invalidated through tags. One DEL per SCAN page.
+            deleted_count = 0
+            cursor = 0
+            while True:
+                cursor, keys = await self._execute("scan", cursor, match=pattern, count=100)
+                
+                if keys:
+                    deleted_count += await self.delete_many(keys)
+                if cursor == 0:
+                    break
+            return max(deleted_count, local_deleted)
         except Exception as e:
             logger.warning(f"Cache invalidation error: {e}")
-            return 0
+            return local_deleted
     
     async def invalidate_all_cache(self) -> int:
         """Invalidate all chat response cache entries"""
@@ -726,6 +1100,7 @@ class CacheService:
             "version": self.cache_version,
             "redis_available": self.is_available(),
             "compress_threshold": self.compress_threshold,
+            "codec": self.codec.describe(),
         }
         
         if self.redis_client and self.connection_pool:
@@ -754,6 +1129,8 @@ class CacheService:
                 try:
                     self._init_redis()
                     if self.redis_client:
+                        # Keys written while L1 was the only tier may be stale in Redis terms
+                        self.local.clear()
                         logger.info("Redis connection established successfully")
                     else:
                         logger.warning("Redis initialization completed but client is still None")
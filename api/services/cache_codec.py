@@ -0,0 +1,207 @@
+"""
+Serialization and compression of cached values.
+
+Every value is stored as a frame: one header byte, then the payload.
+
+    header = 0b10SSSCCC    S: serializer id, C: compressor id
+
+Headers are 0x80-0xBF, which can never be the first byte of UTF-8 text. So
+values written before frames existed (JSON text, or base64 gzip starting with
+"H4sI") are still recognised and decoded.
+
+Serializers: orjson (default when installed), msgpack, stdlib json.
+Compressors: zstd (default when installed), lz4, zlib. Payloads under the
+compression threshold are stored uncompressed. Optional libraries that are
+missing are skipped; the decoder handles any frame whose library is installed.
+
+Redis stores frames as raw bytes. The Upstash REST API carries JSON, so
+frames go over it as "~" + base64 text (see to_text/from_text).
+"""
+
+import base64
+import gzip
+import json
+import logging
+import os
+import threading
+import zlib
+from typing import Any, Callable, Dict, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+logger = logging.getLogger("health_assistant")
+
+_FRAME_FLAG = 0x80
+_TEXT_PREFIX = "~"
+
+
+class CacheDecodeError(ValueError):
+    """A cached value could not be decoded (corrupt, or written by an unavailable codec)"""
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+# zstd (de)compression contexts are reused, but are not thread-safe: one per thread
+_zstd_contexts = threading.local()
+
+
+def _zstd(kind: str) -> Any:
+    context = getattr(_zstd_contexts, kind, None)
+    if context is None:
+        context = zstandard.ZstdCompressor(level=3) if kind == "compressor" else zstandard.ZstdDecompressor()
+        setattr(_zstd_contexts, kind, context)
+    return context
+
+
+# name -> (id, dumps, loads); ids are part of the stored format and never change
+SERIALIZERS: Dict[str, Tuple[int, Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    "json": (0, _json_dumps, json.loads),
+}
+if orjson is not None:
+    SERIALIZERS["orjson"] = (1, _orjson_dumps, orjson.loads)
+if msgpack is not None:
+    SERIALIZERS["msgpack"] = (2, lambda value: msgpack.packb(value, use_bin_type=True), _msgpack_loads)
+
+COMPRESSORS: Dict[str, Tuple[int, Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "none": (0, lambda data: data, lambda data: data),
+    "zlib": (1, lambda data: zlib.compress(data, 6), zlib.decompress),
+}
+if zstandard is not None:
+    COMPRESSORS["zstd"] = (
+        2,
+        lambda data: _zstd("compressor").compress(data),
+        lambda data: _zstd("decompressor").decompress(data),
+    )
+if lz4_frame is not None:
+    COMPRESSORS["lz4"] = (3, lz4_frame.compress, lz4_frame.decompress)
+
+_SERIALIZERS_BY_ID = {entry[0]: entry for entry in SERIALIZERS.values()}
+_COMPRESSORS_BY_ID = {entry[0]: entry for entry in COMPRESSORS.values()}
+
+
+def _default_serializer() -> str:
+    return "orjson" if "orjson" in SERIALIZERS else "json"
+
+
+def _default_compression() -> str:
+    return next(name for name in ("zstd", "lz4", "zlib") if name in COMPRESSORS)
+
+
+CACHE_SERIALIZER = os.getenv("CACHE_SERIALIZER", "").lower() or _default_serializer()
+CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "").lower() or _default_compression()
+
+
+class CacheCodec:
+    """Encodes values to framed bytes and decodes frames (and legacy text values)"""
+
+    def __init__(
+        self,
+        serializer: str = CACHE_SERIALIZER,
+        compression: str = CACHE_COMPRESSION,
+        compress_threshold: int = 1024,
+    ) -> None:
+        if serializer not in SERIALIZERS:
+            logger.warning(f"Cache serializer {serializer!r} unavailable, using {_default_serializer()}")
+            serializer = _default_serializer()
+        if compression not in COMPRESSORS:
+            logger.warning(f"Cache compression {compression!r} unavailable, using {_default_compression()}")
+            compression = _default_compression()
+        self.serializer = serializer
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+
+    def encode(self, value: Any) -> bytes:
+        """Frame for value; compressed when the serialized payload exceeds the threshold"""
+        serializer_id, dumps, _ = SERIALIZERS[self.serializer]
+        try:
+            payload = dumps(value)
+        except TypeError:
+            if self.serializer == "json":
+                raise
+            # e.g. integers beyond 64 bits for orjson: stdlib json handles them
+            serializer_id, payload = SERIALIZERS["json"][0], _json_dumps(value)
+
+        compressor_id = 0
+        if len(payload) > self.compress_threshold and self.compression != "none":
+            compressor_id, compress, _ = COMPRESSORS[self.compression]
+            compressed = compress(payload)
+            if len(compressed) < len(payload):
+                payload = compressed
+            else:
+                compressor_id = 0
+        return bytes((_FRAME_FLAG | serializer_id << 3 | compressor_id,)) + payload
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        """Value of a frame, its text form, or a legacy JSON / base64 gzip value"""
+        try:
+            if isinstance(data, str):
+                if data.startswith(_TEXT_PREFIX):
+                    data = from_text(data)
+                else:
+                    return _decode_legacy(data)
+            if not data or data[0] & 0xC0 != _FRAME_FLAG:
+                return _decode_legacy(data.decode("utf-8"))
+            header = data[0]
+            serializer = _SERIALIZERS_BY_ID.get(header >> 3 & 0x07)
+            compressor = _COMPRESSORS_BY_ID.get(header & 0x07)
+            if serializer is None or compressor is None:
+                raise CacheDecodeError(f"no codec installed for cache header 0x{header:02x}")
+            return serializer[2](compressor[2](data[1:]))
+        except CacheDecodeError:
+            raise
+        except Exception as e:
+            raise CacheDecodeError(str(e)) from e
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "serializer": self.serializer,
+            "compression": self.compression,
+            "compress_threshold": self.compress_threshold,
+            "available_serializers": sorted(SERIALIZERS),
+            "available_compression": sorted(COMPRESSORS),
+        }
+
+
+def to_text(frame: bytes) -> str:
+    """Text form of a frame, for transports that only carry strings"""
+    return _TEXT_PREFIX + base64.b64encode(frame).decode("ascii")
+
+
+def from_text(text: str) -> bytes:
+    return base64.b64decode(text[len(_TEXT_PREFIX):])
+
+
+def _decode_legacy(text: str) -> Any:
+    """Values written before frames: JSON text, or base64 gzip of it ("H4sI" prefix)"""
+    if text.startswith("H4sI"):
+        try:
+            text = gzip.decompress(base64.b64decode(text)).decode("utf-8")
+        except Exception:
+            # Not compressed after all
+            pass
+    return json.loads(text)
@@ -0,0 +1,160 @@
+"""
+In-process L1 cache tier for CacheService.
+
+Holds encoded values (the frames CacheService writes to Redis), so a hit
+decodes to a fresh object like a Redis read would, and the stored size is the
+exact byte count the bound is enforced against. Keys are spread over shards,
+each with its own lock and LRU order, so concurrent requests rarely contend.
+
+Concurrent misses for one key are coalesced (single-flight): the first caller
+runs the fetch as a task, later callers await the same task. A caller that
+times out or is cancelled does not cancel the fetch for the others.
+"""
+
+import asyncio
+import fnmatch
+import os
+import time
+import zlib
+from collections import OrderedDict
+from functools import partial
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+L1_ENABLED = os.getenv("CACHE_L1_ENABLED", "1").lower() == "1"
+L1_MAX_BYTES = int(os.getenv("CACHE_L1_MAX_BYTES", str(32 * 1024 * 1024)))
+L1_SHARDS = int(os.getenv("CACHE_L1_SHARDS", "16"))
+
+# Per-entry bookkeeping (key, tuple, OrderedDict slot)
+_ENTRY_OVERHEAD_BYTES = 200
+
+Encoded = Union[bytes, str]
+
+
+class _Shard:
+    __slots__ = ("entries", "lock", "bytes")
+
+    def __init__(self) -> None:
+        # key -> (encoded value, expires_at, size)
+        self.entries: "OrderedDict[str, Tuple[Encoded, float, int]]" = OrderedDict()
+        self.lock = Lock()
+        self.bytes = 0
+
+
+class LocalCache:
+    """Byte-bounded, sharded LRU with per-key TTLs and single-flight fetches"""
+
+    def __init__(
+        self,
+        max_bytes: int = L1_MAX_BYTES,
+        shards: int = L1_SHARDS,
+        enabled: bool = L1_ENABLED,
+    ) -> None:
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self._shards = [_Shard() for _ in range(max(shards, 1))]
+        self._shard_max_bytes = max_bytes // len(self._shards)
+        self._inflight: Dict[str, "asyncio.Task[Any]"] = {}
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "coalesced": 0}
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+
+    def get(self, key: str) -> Optional[Encoded]:
+        """Encoded value for key, or None if absent or expired"""
+        if not self.enabled:
+            return None
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if entry[1] <= time.monotonic():
+                del shard.entries[key]
+                shard.bytes -= entry[2]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            shard.entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[0]
+
+    def set(self, key: str, value: Encoded, ttl: float) -> bool:
+        """Store an encoded value for ttl seconds; False if disabled or larger than a shard"""
+        if not self.enabled or ttl <= 0:
+            return False
+        size = len(key) + len(value) + _ENTRY_OVERHEAD_BYTES
+        if size > self._shard_max_bytes:
+            return False
+        shard = self._shard(key)
+        with shard.lock:
+            previous = shard.entries.pop(key, None)
+            if previous is not None:
+                shard.bytes -= previous[2]
+            shard.entries[key] = (value, time.monotonic() + ttl, size)
+            shard.bytes += size
+            while shard.bytes > self._shard_max_bytes:
+                _, evicted = shard.entries.popitem(last=False)
+                shard.bytes -= evicted[2]
+                self.stats["evictions"] += 1
+        return True
+
+    def delete(self, key: str) -> bool:
+        shard = self._shard(key)
+        with shard.lock:
+            entry = shard.entries.pop(key, None)
+            if entry is not None:
+                shard.bytes -= entry[2]
+        return entry is not None
+
+    def delete_matching(self, pattern: str) -> int:
+        """Delete keys matching a Redis-style glob pattern"""
+        deleted = 0
+        for shard in self._shards:
+            with shard.lock:
+                for key in [k for k in shard.entries if fnmatch.fnmatchcase(k, pattern)]:
+                    shard.bytes -= shard.entries.pop(key)[2]
+                    deleted += 1
+        return deleted
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+                shard.bytes = 0
+
+    async def single_flight(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fetch() once for all concurrent callers with the same key"""
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is not None and not task.done() and task.get_loop() is loop:
+            self.stats["coalesced"] += 1
+        else:
+            task = loop.create_task(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._flight_done, key))
+        return await asyncio.shield(task)
+
+    def _flight_done(self, key: str, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved when every caller has gone away
+            task.exception()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        entries: List[int] = []
+        size = 0
+        for shard in self._shards:
+            with shard.lock:
+                entries.append(len(shard.entries))
+                size += shard.bytes
+        return {
+            **self.stats,
+            "entries": sum(entries),
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "shards": len(self._shards),
+            "enabled": self.enabled,
+        }
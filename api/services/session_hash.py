@@ -6,13 +6,16 @@ import hashlib
 import base64
 import os
 import logging
-from typing import Optional
+from typing import Any, Dict, Optional, Sequence
 
 logger = logging.getLogger("health_assistant")
 
 # Secret key for hashing (should be in environment variable)
 SESSION_HASH_SECRET = os.getenv("SESSION_HASH_SECRET", "healthcare-chatbot-session-hash-v1")
 
+# Hash mappings are cached for 30 days
+SESSION_HASH_TTL = 30 * 24 * 60 * 60
+
 
 def hash_session_id(session_id: str) -> str:
     """
@@ -51,7 +54,17 @@ def is_hashed_session_id(session_id: str) -> bool:
     return not session_id.count('-') == 4 and len(session_id) <= 16
 
 
-async def resolve_session_id(hashed_id: str, db_service, customer_id: Optional[str] = None) -> Optional[str]:
+def session_cache_hash(session_id: str) -> str:
+    """Hashed form of a session ID that may already be hashed"""
+    return session_id if is_hashed_session_id(session_id) else hash_session_id(session_id)
+
+
+async def resolve_session_id(
+    hashed_id: str,
+    db_service,
+    customer_id: Optional[str] = None,
+    cached: Optional[Dict[str, Any]] = None,
+) -> Optional[str]:
     """
     Resolve a hashed session ID to the real session ID
     Uses cache first, then database lookup if needed (for old sessions)
@@ -60,6 +73,8 @@ async def resolve_session_id(hashed_id: str, db_service, customer_id: Optional[s
         hashed_id: The hashed session ID from URL
         db_service: Database service instance
         customer_id: Optional customer ID for fallback lookup (for old sessions)
+        cached: Cache values the caller already read, including the hash mapping
+            (no cache read of its own then)
     
     Returns:
         Real session ID or None if not found
@@ -67,9 +82,12 @@ async def resolve_session_id(hashed_id: str, db_service, customer_id: Optional[s
     from .cache import cache_service
     
     # Try cache first
-    if cache_service.is_available():
+    cache_key = f"session_hash:{hashed_id}"
+    if cached is not None:
+        if cached.get(cache_key):
+            return cached[cache_key]
+    elif cache_service.is_available():
         try:
-            cache_key = f"session_hash:{hashed_id}"
             real_session_id = await cache_service.get(cache_key)
             if real_session_id:
                 return real_session_id
@@ -87,16 +105,19 @@ async def resolve_session_id(hashed_id: str, db_service, customer_id: Optional[s
             # Get all sessions for the customer
             sessions = await db_service.get_customer_sessions(customer_id, limit=1000)
             
-            # Hash each session ID and compare
-            for session in sessions:
-                real_session_id = session.get("id")
-                if real_session_id:
-                    computed_hash = hash_session_id(real_session_id)
-                    if computed_hash == hashed_id:
-                        # Found it! Store in cache for future use
-                        logger.info(f"Found matching session for hash {hashed_id}: {real_session_id}")
-                        await store_session_hash_mapping(real_session_id, hashed_id)
-                        return real_session_id
+            # Hash each session ID and compare; cache the mappings of all of
+            # them in one round-trip, so other old sessions resolve from cache
+            mappings = {
+                f"session_hash:{hash_session_id(session['id'])}": session["id"]
+                for session in sessions
+                if session.get("id")
+            }
+            real_session_id = mappings.get(f"session_hash:{hashed_id}")
+            if mappings:
+                await cache_service.set_many(mappings, ttl=SESSION_HASH_TTL)
+            if real_session_id:
+                logger.info(f"Found matching session for hash {hashed_id}: {real_session_id}")
+                return real_session_id
             
             logger.warning(f"No matching session found for hash: {hashed_id}")
         except Exception as e:
@@ -127,10 +148,30 @@ async def store_session_hash_mapping(session_id: str, hashed_id: Optional[str] =
     if cache_service.is_available():
         try:
             cache_key = f"session_hash:{hashed_id}"
-            await cache_service.set(cache_key, session_id, ttl=30 * 24 * 60 * 60)  # 30 days
+            await cache_service.set(cache_key, session_id, ttl=SESSION_HASH_TTL)
             logger.debug(f"Stored session hash mapping: {hashed_id} -> {session_id}")
         except Exception as e:
             logger.warning(f"Error storing session hash mapping: {e}")
     
     return hashed_id
 
+
+async def ensure_session_hash_mapping(session_id: str, prefetch: Sequence[str] = ()) -> Dict[str, Any]:
+    """
+    Store the hash mapping of a session unless it is already cached, reading
+    other keys of the request in the same round-trip
+    
+    Args:
+        session_id: The real session ID
+        prefetch: Cache keys to read along with the mapping (e.g. conversation history)
+    
+    Returns:
+        Cached values of the prefetch keys that were found
+    """
+    from .cache import cache_service
+    
+    cache_key = f"session_hash:{hash_session_id(session_id)}"
+    cached = await cache_service.get_many([cache_key, *prefetch])
+    if cached.pop(cache_key, None) != session_id:
+        await store_session_hash_mapping(session_id)
+    return cached
@@ -0,0 +1,181 @@
+"""
+Translation memory for the chat pipeline.
+
+Stores LLM translations keyed by source-text hash, source/target language and
+prompt version, so fixed strings (disclaimer, pregnancy guidance, first-aid
+steps, fallback messages) and frequently repeated user phrasings are only
+translated once. Two tiers:
+    L1: in-process LocalCache (no network, shared by all requests in this worker)
+    L2: Redis through CacheService (shared across workers and restarts)
+
+Bump TRANSLATION_PROMPT_VERSION in pipeline_prompts.py whenever a translation
+prompt changes so stale translations are not served.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from .cache import cache_service
+from .local_cache import LocalCache
+
+try:
+    from ..pipeline_prompts import TRANSLATION_PROMPT_VERSION
+except ImportError:
+    from pipeline_prompts import TRANSLATION_PROMPT_VERSION
+
+logger = logging.getLogger("health_assistant")
+
+TRANSLATION_MEMORY_ENABLED = os.getenv("ENABLE_TRANSLATION_MEMORY", "1").lower() == "1"
+TRANSLATION_MEMORY_MAX_BYTES = int(os.getenv("TRANSLATION_MEMORY_MAX_BYTES", str(8 * 1024 * 1024)))
+TRANSLATION_MEMORY_TTL_SECONDS = int(os.getenv("TRANSLATION_MEMORY_TTL_SECONDS", str(30 * 24 * 3600)))
+# Long generated answers are rarely repeated verbatim; keep them out of both tiers
+TRANSLATION_MEMORY_MAX_CHARS = int(os.getenv("TRANSLATION_MEMORY_MAX_CHARS", "4000"))
+
+
+def normalize_source_text(text: str) -> str:
+    """Collapse whitespace so trivially different phrasings share an entry"""
+    return " ".join(text.split())
+
+
+class TranslationMemory:
+    """Two-tier (LRU + Redis) cache of translations with single-flight misses"""
+
+    def __init__(
+        self,
+        cache: Any = cache_service,
+        max_bytes: int = TRANSLATION_MEMORY_MAX_BYTES,
+        ttl: int = TRANSLATION_MEMORY_TTL_SECONDS,
+        prompt_version: str = TRANSLATION_PROMPT_VERSION,
+        enabled: bool = TRANSLATION_MEMORY_ENABLED,
+    ) -> None:
+        self.cache = cache
+        self.ttl = ttl
+        self.prompt_version = prompt_version
+        self.enabled = enabled
+        self._local = LocalCache(max_bytes=max_bytes, enabled=enabled)
+        self.stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "stores": 0}
+
+    def make_key(self, text: str, source_lang: str, target_lang: str) -> str:
+        digest = hashlib.sha256(normalize_source_text(text).encode("utf-8")).hexdigest()
+        return f"tm:v{self.prompt_version}:{source_lang}:{target_lang}:{digest}"
+
+    async def get(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        """Look up a stored translation (L1, then Redis)"""
+        if not self.enabled or not text:
+            return None
+        key = self.make_key(text, source_lang, target_lang)
+        value = self._local.get(key)
+        if value is not None:
+            self.stats["l1_hits"] += 1
+            return value
+
+        try:
+            cached = await self.cache.get_from_cache(key, fast_path=True)
+        except Exception as exc:
+            logger.debug(f"Translation memory L2 lookup failed: {exc}")
+            cached = None
+        if isinstance(cached, dict) and cached.get("text"):
+            self.stats["l2_hits"] += 1
+            self._local.set(key, cached["text"], self.ttl)
+            return cached["text"]
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, text: str, source_lang: str, target_lang: str, translation: str) -> None:
+        """Store a translation in both tiers (texts over TRANSLATION_MEMORY_MAX_CHARS are not stored)"""
+        if not self.enabled or not text or not translation or len(text) > TRANSLATION_MEMORY_MAX_CHARS:
+            return
+        key = self.make_key(text, source_lang, target_lang)
+        self._local.set(key, translation, self.ttl)
+        self.stats["stores"] += 1
+        try:
+            await self.cache.set_to_cache(key, {"text": translation}, ttl=self.ttl, fast_path=True)
+        except Exception as exc:
+            logger.debug(f"Translation memory L2 store failed: {exc}")
+
+    async def translate(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        translate_fn: Callable[[], Awaitable[str]],
+    ) -> str:
+        """
+        Return a stored translation or call translate_fn and remember its result.
+
+        Concurrent misses for the same key share one translate_fn call (an
+        exception from it reaches every waiter). The translation functions
+        return the source text on failure; such results are returned but never
+        stored.
+        """
+        if not self.enabled or not text or not text.strip() or source_lang == target_lang:
+            return await translate_fn()
+
+        cached = await self.get(text, source_lang, target_lang)
+        if cached is not None:
+            return cached
+
+        async def fetch() -> str:
+            translation = await translate_fn()
+            if translation and normalize_source_text(translation) != normalize_source_text(text):
+                await self.set(text, source_lang, target_lang, translation)
+            return translation
+
+        return await self._local.single_flight(self.make_key(text, source_lang, target_lang), fetch)
+
+    async def prewarm(
+        self,
+        texts: Iterable[str],
+        target_languages: Iterable[str],
+        translate_fn: Callable[[str, str], Awaitable[str]],
+        source_lang: str = "en",
+        concurrency: int = 4,
+    ) -> int:
+        """
+        Translate every text into every target language unless already stored.
+
+        Returns:
+            Number of translations that had to be fetched from the LLM
+        """
+        targets = [lang for lang in target_languages if lang != source_lang]
+        semaphore = asyncio.Semaphore(concurrency)
+        fetched = 0
+
+        async def warm(text: str, target_lang: str) -> None:
+            async def fetch() -> str:
+                nonlocal fetched
+                fetched += 1
+                async with semaphore:
+                    return await translate_fn(text, target_lang)
+
+            await self.translate(text, source_lang, target_lang, fetch)
+
+        jobs = [warm(text, lang) for text in texts for lang in targets]
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Translation memory pre-warm failed for one entry: {result}")
+        return fetched
+
+    def get_statistics(self) -> Dict[str, Any]:
+        local = self._local.get_statistics()
+        lookups = self.stats["l1_hits"] + self.stats["l2_hits"] + self.stats["misses"]
+        hits = self.stats["l1_hits"] + self.stats["l2_hits"]
+        return {
+            **self.stats,
+            "entries": local["entries"],
+            "bytes": local["bytes"],
+            "max_bytes": local["max_bytes"],
+            "coalesced": local["coalesced"],
+            "prompt_version": self.prompt_version,
+            "hit_rate_percent": round(hits / lookups * 100, 2) if lookups else 0,
+            "enabled": self.enabled,
+        }
+
+
+# Global translation memory instance
+translation_memory = TranslationMemory()
@@ -0,0 +1,130 @@
+from pathlib import Path
+import asyncio
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api import main  # noqa: E402
+from api.models import Profile  # noqa: E402
+from api.services.answer_cache import AnswerCache, normalize_query  # noqa: E402
+
+
+class FakeCache:
+    """Dict-backed stand-in for CacheService's Redis tier"""
+
+    cache_version = "1"
+
+    def __init__(self):
+        self.store = {}
+
+    async def get_from_cache(self, key, fast_path=False):
+        return self.store.get(key)
+
+    async def set_to_cache(self, key, value, ttl=None, fast_path=False):
+        self.store[key] = value
+        return True
+
+
+def keyword_embed(text):
+    """Bag-of-keywords embedding: similar questions share most dimensions"""
+    vocabulary = ["fever", "headache", "what", "do", "cough", "cold", "should", "i"]
+    words = text.split()
+    return [float(words.count(term)) for term in vocabulary]
+
+
+PAYLOAD = {"answer": "Rest and drink fluids.", "route": "vector", "facts": [], "citations": []}
+
+
+def test_exact_hit_ignores_case_and_punctuation():
+    cache = AnswerCache(cache=FakeCache(), enabled=True)
+
+    async def scenario():
+        await cache.store("Fever and headache, what to do?", "en", [], "v1", PAYLOAD)
+        return await cache.lookup("fever and headache what to do", "en", [], "v1")
+
+    hit, _ = asyncio.run(scenario())
+    assert hit["match"] == "exact"
+    assert hit["payload"]["answer"] == PAYLOAD["answer"]
+    assert normalize_query("  Fever,  HEADACHE? ") == "fever headache"
+
+
+def test_semantic_hit_above_threshold_only():
+    cache = AnswerCache(cache=FakeCache(), embed=keyword_embed, similarity_threshold=0.85, enabled=True)
+
+    async def scenario():
+        await cache.store("fever headache what do", "en", [], "v1", PAYLOAD)
+        near, _ = await cache.lookup("fever headache what do i", "en", [], "v1")
+        far, _ = await cache.lookup("cough cold", "en", [], "v1")
+        return near, far
+
+    near, far = asyncio.run(scenario())
+    assert near["match"] == "semantic" and near["similarity"] >= 0.85
+    assert far is None
+
+
+def test_language_profile_and_index_version_are_isolated():
+    cache = AnswerCache(cache=FakeCache(), embed=keyword_embed, enabled=True)
+
+    async def scenario():
+        await cache.store("fever headache", "en", ["Diabetes"], "v1", PAYLOAD)
+        return [
+            (await cache.lookup("fever headache", "en", ["diabetes"], "v1"))[0],
+            (await cache.lookup("fever headache", "ta", ["Diabetes"], "v1"))[0],
+            (await cache.lookup("fever headache", "en", [], "v1"))[0],
+            (await cache.lookup("fever headache", "en", ["Diabetes"], "v2"))[0],
+        ]
+
+    same, other_lang, other_profile, rebuilt_index = asyncio.run(scenario())
+    assert same is not None
+    assert other_lang is None and other_profile is None and rebuilt_index is None
+
+
+def test_safety_sensitive_queries_bypass_cache():
+    calm = {"red_flag": False}
+    no_crisis = {"crisis": False}
+    no_pregnancy = {"concern": False}
+    profile = Profile()
+
+    assert main._answer_cache_bypass_reason(calm, no_crisis, no_pregnancy, profile, []) is None
+    assert main._answer_cache_bypass_reason({"red_flag": True}, no_crisis, no_pregnancy, profile, []) == "red_flag"
+    assert main._answer_cache_bypass_reason(calm, {"crisis": True}, no_pregnancy, profile, []) == "mental_health_crisis"
+    assert main._answer_cache_bypass_reason(calm, no_crisis, no_pregnancy, Profile(pregnancy=True), []) == "pregnancy"
+    history = [{"role": "user", "content": "I have chest pain"}]
+    assert main._answer_cache_bypass_reason(calm, no_crisis, no_pregnancy, profile, history) == "conversation_history"
+
+
+def test_expired_entries_drop_their_vectors():
+    backing = FakeCache()
+    cache = AnswerCache(cache=backing, embed=keyword_embed, ttl=0, enabled=True)
+
+    async def scenario():
+        await cache.store("fever headache", "en", [], "v1", PAYLOAD)
+        backing.store.clear()  # expired in Redis too
+        return await cache.lookup("fever headache", "en", [], "v1")
+
+    hit, _ = asyncio.run(scenario())
+    assert hit is None
+    assert not cache._entries
+    assert not any(cache._vectors.values())
+
+
+def test_profiles_differing_in_sex_or_age_do_not_share_answers():
+    cache = AnswerCache(cache=FakeCache(), embed=keyword_embed, enabled=True)
+    female = main._answer_cache_profile(Profile(age=30, sex="female"), "fever headache")
+    male = main._answer_cache_profile(Profile(age=30, sex="male"), "fever headache")
+    older = main._answer_cache_profile(Profile(age=31, sex="female"), "fever headache")
+
+    async def scenario():
+        await cache.store("fever headache", "en", female, "v1", PAYLOAD)
+        return [
+            (await cache.lookup("fever headache", "en", female, "v1"))[0],
+            (await cache.lookup("fever headache", "en", male, "v1"))[0],
+            (await cache.lookup("fever headache what", "en", male, "v1"))[0],
+            (await cache.lookup("fever headache", "en", older, "v1"))[0],
+        ]
+
+    same, other_sex, similar_other_sex, other_age = asyncio.run(scenario())
+    assert same is not None
+    assert other_sex is None and similar_other_sex is None and other_age is None
@@ -0,0 +1,75 @@
+from pathlib import Path
+import base64
+import gzip
+import json
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.services.cache_codec import (  # noqa: E402
+    COMPRESSORS,
+    SERIALIZERS,
+    CacheCodec,
+    CacheDecodeError,
+    from_text,
+    to_text,
+)
+
+MESSAGES = [
+    {
+        "id": f"m{i}",
+        "role": "assistant",
+        "answer": "## Understanding your concern\n\nRest, drink fluids and see a doctor if it lasts. " * 10,
+        "citations": [{"source": "Fever", "url": "https://example.org/fever"}],
+        "metadata": {"timings": {"total": 1.25}, "language": "hi"},
+        "userFeedback": None,
+    }
+    for i in range(5)
+]
+
+
+@pytest.mark.parametrize("serializer", sorted(SERIALIZERS))
+@pytest.mark.parametrize("compression", sorted(COMPRESSORS))
+def test_every_available_codec_round_trips(serializer, compression):
+    codec = CacheCodec(serializer, compression, compress_threshold=256)
+
+    frame = codec.encode(MESSAGES)
+    small = codec.encode({"is_known": True})
+
+    assert 0x80 <= frame[0] <= 0xBF
+    assert codec.decode(frame) == MESSAGES
+    assert codec.decode(small) == {"is_known": True}
+    assert small[0] & 0x07 == 0  # under the threshold: not compressed
+    if compression != "none":
+        assert len(frame) < len(json.dumps(MESSAGES)) / 2
+    # Any codec decodes frames written by any other installed codec
+    assert CacheCodec("json", "none").decode(frame) == MESSAGES
+
+
+def test_legacy_and_text_values_still_decode():
+    codec = CacheCodec()
+    legacy_json = json.dumps(MESSAGES)
+    legacy_gzip = base64.b64encode(gzip.compress(legacy_json.encode())).decode()
+
+    assert codec.decode(legacy_json) == MESSAGES
+    assert codec.decode(legacy_json.encode()) == MESSAGES
+    assert codec.decode(legacy_gzip) == MESSAGES
+    assert codec.decode(legacy_gzip.encode()) == MESSAGES
+
+    text = to_text(codec.encode(MESSAGES))
+    assert text.startswith("~") and from_text(text)[0] & 0x80
+    assert codec.decode(text) == MESSAGES
+
+
+def test_unavailable_codecs_fall_back_and_corrupt_values_raise():
+    codec = CacheCodec("no-such-serializer", "no-such-compression")
+    assert codec.serializer in SERIALIZERS and codec.compression in COMPRESSORS
+
+    with pytest.raises(CacheDecodeError):
+        codec.decode(bytes([0xBF]) + b"garbage")
+    with pytest.raises(CacheDecodeError):
+        codec.decode("{not json")
@@ -0,0 +1,497 @@
+from pathlib import Path
+import asyncio
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.services import cache as cache_module  # noqa: E402
+from api.services.cache import CacheService  # noqa: E402
+
+
+class FakeSyncRedis:
+    """Blocking client stand-in that records which thread each command ran on"""
+
+    def __init__(self):
+        self.store = {}
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.threads.append(threading.get_ident())
+        self.store[key] = value
+        return True
+
+    def delete(self, *keys):
+        return sum(self.store.pop(key, None) is not None for key in keys)
+
+    def ping(self):
+        return True
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, command):
+        return lambda *args: self.commands.append((command, args))
+
+    async def execute(self):
+        self.client.round_trips += 1
+        return [getattr(self.client, f"_{command}")(*args) for command, args in self.commands]
+
+
+class FakeAsyncRedis:
+    def __init__(self, store):
+        self.store = store
+        self.loop = asyncio.get_running_loop()
+        self.round_trips = 0
+
+    async def get(self, key):
+        assert asyncio.get_running_loop() is self.loop
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+        return True
+
+    async def delete(self, *keys):
+        self.round_trips += 1
+        return self._delete(*keys)
+
+    async def mget(self, *keys):
+        self.round_trips += 1
+        return [self.store.get(key) for key in keys]
+
+    def _setex(self, key, ttl, value):
+        self.store[key] = value
+        return True
+
+    def _setnx(self, key, value):
+        if key in self.store:
+            return False
+        self.store[key] = str(value).encode()
+        return True
+
+    def _incr(self, key):
+        self.store[key] = str(int(self.store.get(key) or 0) + 1).encode()
+        return int(self.store[key])
+
+    def _expire(self, key, ttl):
+        return key in self.store
+
+    def _delete(self, *keys):
+        return sum(self.store.pop(key, None) is not None for key in keys)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def scan(self, cursor, match=None, count=None):
+        prefix = (match or "*").rstrip("*")
+        return 0, [key for key in self.store if key.startswith(prefix)]
+
+
+def make_service(monkeypatch, async_driver=True):
+    service = CacheService()
+    service.cache_enabled = True
+    service.redis_client = FakeSyncRedis()
+    service._backend = ("redis", "redis://fake", {})
+    store = {}
+    created = []
+
+    def create_async_client():
+        if not async_driver:
+            return None
+        client = FakeAsyncRedis(store)
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(service, "_create_async_client", create_async_client)
+    return service, store, created
+
+
+def test_commands_use_the_async_client_of_the_running_loop(monkeypatch):
+    service, store, created = make_service(monkeypatch)
+    payload = {"answer": "Rest and drink fluids. " * 100}
+
+    async def scenario():
+        assert await service.set("chat:response:v1:a", payload, ttl=60)
+        return await service.get("chat:response:v1:a"), await service.get_from_cache("missing", fast_path=True)
+
+    hit, miss = asyncio.run(scenario())
+    assert hit == payload and miss is None
+    assert store["chat:response:v1:a"][0] & 0x07  # binary frame, compressed above the threshold
+    assert service.redis_client.threads == []  # the blocking client was never called
+
+    # A new event loop gets its own client (connections cannot cross loops)
+    async def second_loop():
+        deleted = await service.delete("chat:response:v1:a")
+        return deleted, await service.invalidate_cache("chat:response:*")
+
+    assert asyncio.run(second_loop()) == (True, 0)
+    assert len(created) == 2
+
+
+def test_sync_client_runs_off_the_event_loop_without_async_driver(monkeypatch):
+    service, _, _ = make_service(monkeypatch, async_driver=False)
+
+    async def scenario():
+        await service.set("k", {"a": 1})
+        return await service.get("k"), threading.get_ident()
+
+    value, loop_thread = asyncio.run(scenario())
+    assert value == {"a": 1}
+    assert len(service.redis_client.threads) == 2
+    assert loop_thread not in service.redis_client.threads
+
+
+def test_hot_keys_are_served_from_l1_without_a_redis_read(monkeypatch):
+    service, store, _ = make_service(monkeypatch)
+    reads = []
+
+    async def scenario():
+        client = await service._get_async_client()
+        original_get = client.get
+
+        async def counting_get(key):
+            reads.append(key)
+            return await original_get(key)
+
+        client.get = counting_get
+        await service.set("conversation_history:s1", [{"role": "user", "content": "hi"}], ttl=120)
+        await service.set("sessions:c1:20", [1, 2], ttl=120)
+        first = await service.get("conversation_history:s1")
+        first.append("mutated by caller")
+        return await service.get("conversation_history:s1"), await service.get("sessions:c1:20")
+
+    history, sessions = asyncio.run(scenario())
+    assert history == [{"role": "user", "content": "hi"}]
+    assert sessions == [1, 2]
+    assert reads == ["sessions:c1:20"]  # only the non-hot key went to Redis
+
+    asyncio.run(service.invalidate_cache(pattern="conversation_history:*"))
+    assert service.local.get("conversation_history:s1") is None
+
+
+def test_l1_is_the_only_tier_without_redis():
+    service = CacheService()
+    service.redis_client = None
+    service.cache_enabled = False  # no reconnect attempts
+
+    async def scenario():
+        assert await service.set("customer:c1", {"id": "c1"}, ttl=60)
+        return await service.get("customer:c1"), await service.delete("customer:c1"), await service.get("customer:c1")
+
+    assert asyncio.run(scenario()) == ({"id": "c1"}, True, None)
+
+
+def test_concurrent_misses_share_one_fetch(monkeypatch):
+    service, store, _ = make_service(monkeypatch)
+    store["user_info:u1"] = '{"id": "u1"}'
+    redis_reads = []
+    loads = []
+
+    async def scenario():
+        client = await service._get_async_client()
+
+        async def slow_get(key):
+            redis_reads.append(key)
+            await asyncio.sleep(0.01)
+            return store.get(key)
+
+        async def loader():
+            loads.append(1)
+            await asyncio.sleep(0.01)
+            return {"id": "u2", "email": "a@b.c"}
+
+        client.get = slow_get
+        users = await asyncio.gather(*(service.get("user_info:u1") for _ in range(10)))
+        loaded = await asyncio.gather(*(service.get_or_load("user_info:u2", loader, ttl=300) for _ in range(10)))
+        return users, loaded
+
+    users, loaded = asyncio.run(scenario())
+    assert users == [{"id": "u1"}] * 10
+    assert redis_reads.count("user_info:u1") == 1
+    assert loaded == [{"id": "u2", "email": "a@b.c"}] * 10 and loaded[0] is not loaded[1]
+    assert loads == [1]
+
+
+def test_local_cache_bounds_bytes_and_expires_entries(monkeypatch):
+    from api.services import local_cache
+
+    now = [1000.0]
+    monkeypatch.setattr(local_cache.time, "monotonic", lambda: now[0])
+    cache = local_cache.LocalCache(max_bytes=4000, shards=1, enabled=True)
+
+    for i in range(10):
+        assert cache.set(f"k{i}", "x" * 500, ttl=10)
+    assert cache.get_statistics()["bytes"] <= 4000
+    assert cache.get("k0") is None and cache.get("k9") == "x" * 500
+    assert not cache.set("huge", "x" * 5000, ttl=10)
+
+    cache.set("short", "v", ttl=1)
+    now[0] += 2
+    assert cache.get("short") is None and cache.get("k9") == "x" * 500
+    now[0] += 10
+    assert cache.get("k9") is None
+
+
+def test_tag_bump_invalidates_every_variant_in_one_round_trip(monkeypatch):
+    service, store, created = make_service(monkeypatch)
+    loads = []
+
+    def loader(limit):
+        async def load():
+            loads.append(limit)
+            return [f"message {i}" for i in range(limit)]
+        return load
+
+    async def read_all():
+        return [
+            await service.get_or_load(f"session_messages:s1:{limit}", loader(limit), ttl=300, tags=["session:s1"])
+            for limit in (10, 50, 100)
+        ]
+
+    async def scenario():
+        first = await read_all()
+        client = created[-1]
+        before = client.round_trips
+        cached = await read_all()
+        assert client.round_trips - before == 3  # entry and generation in one MGET per read
+        before = client.round_trips
+        assert await service.invalidate_tags(["session:s1", "customer:c1"], delete_keys=["conversation_history:s1"])
+        invalidation_round_trips = client.round_trips - before
+        assert int(store["tag:session:s1"]) > 1  # seeded from the clock, not counted from 0
+        return first, cached, invalidation_round_trips, await read_all()
+
+    store["conversation_history:s1"] = b"[]"
+    first, cached, invalidation_round_trips, after = asyncio.run(scenario())
+    assert first == cached == after
+    assert loads == [10, 50, 100, 10, 50, 100]  # loaded, served from cache, reloaded after the bump
+    assert invalidation_round_trips == 1
+    assert "conversation_history:s1" not in store
+
+
+def test_an_expired_tag_counter_never_revalidates_old_entries(monkeypatch):
+    service, store, created = make_service(monkeypatch)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return {"id": "s1", "version": len(loads)}
+
+    async def scenario():
+        await service.invalidate_tags(["session:s1"])
+        await service.get_or_load("session_full:s1", load, tags=["session:s1"])
+        stale_entry = store["session_full:s1"]
+        await service.invalidate_tags(["session:s1"])
+        # The counter expires while an entry written under it is still stored
+        del store["tag:session:s1"]
+        store["session_full:s1"] = stale_entry
+        await service.invalidate_tags(["session:s1"])
+        return await service.get_or_load("session_full:s1", load, tags=["session:s1"])
+
+    assert asyncio.run(scenario()) == {"id": "s1", "version": 2}
+    assert len(loads) == 2
+
+
+def test_tags_without_redis_use_local_generations():
+    service = CacheService()
+    service.redis_client = None
+    service.cache_enabled = False
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return {"id": "s1"}
+
+    async def scenario():
+        for _ in range(2):
+            await service.get_or_load("session_full:s1", load, tags=["session:s1"])
+        await service.invalidate_tags(["session:s1"])
+        await service.get_or_load("session_full:s1", load, tags=["session:s1"])
+        # An evicted counter starts from a fresh generation: old entries never match it
+        service.local.delete("tag:session:s1")
+        return await service.get_or_load("session_full:s1", load, tags=["session:s1"])
+
+    assert asyncio.run(scenario()) == {"id": "s1"}
+    assert len(loads) == 3
+
+
+def test_multi_key_operations_take_one_round_trip(monkeypatch):
+    service, store, created = make_service(monkeypatch)
+    history = [{"role": "user", "content": "hi"}]
+
+    async def scenario():
+        client = await service._get_async_client()
+        assert await service.set_many(
+            {"conversation_history:s1": history, "sessions:c1:20": [1], "customer:c1": {"id": "c1"}}, ttl=60
+        )
+        after_set = client.round_trips
+        service.local.clear()
+        found = await service.get_many(["conversation_history:s1", "sessions:c1:20", "missing", "sessions:c1:20"])
+        after_get = client.round_trips
+        # The hot key was copied into L1 by the MGET: no round-trip needed
+        again = await service.get_many(["conversation_history:s1"])
+        after_cached_get = client.round_trips
+        deleted = await service.delete_many(["sessions:c1:20", "customer:c1", "missing"])
+        return found, again, deleted, (after_set, after_get, after_cached_get, client.round_trips)
+
+    found, again, deleted, round_trips = asyncio.run(scenario())
+    assert found == {"conversation_history:s1": history, "sessions:c1:20": [1]}
+    assert again == {"conversation_history:s1": history}
+    assert deleted == 2 and set(store) == {"conversation_history:s1"}
+    assert round_trips == (1, 2, 2, 3)
+
+
+class FakeUpstashSession:
+    """aiohttp session stand-in for the Upstash REST /pipeline endpoint"""
+
+    def __init__(self, timeout=None):
+        self.requests = []
+        self.closed = False
+
+    def post(self, url, headers, json):
+        self.requests.append((url, headers, json))
+        replies = [{"result": "OK"} if command[0] != "INCR" else {"result": 1} for command in json]
+        session = self
+
+        class Response:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            def raise_for_status(self):
+                pass
+
+            async def json(self):
+                return replies
+
+        assert not session.closed
+        return Response()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeUpstashClient:
+    async def __aenter__(self):
+        return self
+
+    async def close(self):
+        pass
+
+
+def test_upstash_batches_are_one_pipeline_request(monkeypatch):
+    service = CacheService()
+    service.cache_enabled = True
+    service.redis_client = FakeSyncRedis()
+    service.is_upstash = True
+    service._backend = ("upstash", "https://example.upstash.io/", "token")
+    sessions = []
+
+    def create_session(timeout=None):
+        sessions.append(FakeUpstashSession(timeout))
+        return sessions[-1]
+
+    monkeypatch.setattr(service, "_create_async_client", FakeUpstashClient)
+    monkeypatch.setattr(
+        cache_module, "aiohttp", SimpleNamespace(ClientSession=create_session, ClientTimeout=lambda total: total)
+    )
+
+    async def scenario():
+        assert await service.invalidate_tags(["session:s1"], delete_keys=["conversation_history:s1"])
+        await service.close()
+
+    asyncio.run(scenario())
+    (url, headers, body), = sessions[0].requests
+    assert url == "https://example.upstash.io/pipeline"
+    assert headers == {"Authorization": "Bearer token"}
+    assert [command[0] for command in body] == ["SETNX", "INCR", "EXPIRE", "DEL"]
+    assert all(isinstance(arg, str) for command in body for arg in command)
+    assert sessions[0].closed
+
+
+def test_concurrent_first_requests_share_one_upstash_client(monkeypatch):
+    service = CacheService()
+    service.cache_enabled = True
+    service.redis_client = FakeSyncRedis()
+    service.is_upstash = True
+    service._backend = ("upstash", "https://example.upstash.io/", "token")
+    clients, sessions = [], []
+
+    class SlowUpstashClient(FakeUpstashClient):
+        async def __aenter__(self):
+            await asyncio.sleep(0.01)
+            return self
+
+    def create_client():
+        clients.append(SlowUpstashClient())
+        return clients[-1]
+
+    def create_session(timeout=None):
+        sessions.append(FakeUpstashSession(timeout))
+        return sessions[-1]
+
+    monkeypatch.setattr(service, "_create_async_client", create_client)
+    monkeypatch.setattr(
+        cache_module, "aiohttp", SimpleNamespace(ClientSession=create_session, ClientTimeout=lambda total: total)
+    )
+
+    async def scenario():
+        used = await asyncio.gather(*(service._get_async_client() for _ in range(5)))
+        await service.close()
+        return used
+
+    used = asyncio.run(scenario())
+    assert len(clients) == 1 and len(sessions) == 1
+    assert all(client is clients[0] for client in used)
+    assert sessions[0].closed
+
+
+def test_reconnects_are_single_flight_backed_off_and_never_awaited(monkeypatch):
+    service = CacheService()
+    service.cache_enabled = True
+    service.redis_client = None
+    service.reconnect_delay = service._reconnect_backoff = 5
+    attempts = []
+    release = threading.Event()
+
+    def failing_reconnect():
+        attempts.append(threading.get_ident())
+        release.wait(5)
+
+    monkeypatch.setattr(service, "ensure_redis_connection", failing_reconnect)
+
+    async def scenario():
+        started = time.perf_counter()
+        await asyncio.gather(*(service._ensure_connection() for _ in range(20)))
+        # L1 still takes writes while the attempt is running
+        assert await service.set_to_cache("user_info:u1", {"id": "u1"})
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(scenario())
+    assert elapsed < 1 and len(attempts) == 1
+    release.set()
+    while service._reconnecting:
+        time.sleep(0.01)
+
+    # Within the backoff no new attempt starts; after it, one does and the backoff doubles
+    asyncio.run(service._ensure_connection())
+    assert len(attempts) == 1 and service._reconnect_backoff == 10
+    service._next_reconnect = 0
+    asyncio.run(service._ensure_connection())
+    while service._reconnecting:
+        time.sleep(0.01)
+    assert len(attempts) == 2 and service._reconnect_backoff == 20
+    assert service.local.get("user_info:u1") is not None
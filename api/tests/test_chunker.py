@@ -0,0 +1,94 @@
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag import numpy_index, retriever  # noqa: E402
+from api.rag.build_index import extract_frontmatter  # noqa: E402
+from api.rag.chunker import chunk_markdown, join_section  # noqa: E402
+from api.rag.numpy_index import save_index  # noqa: E402
+from api.rag.tokenizer import count_tokens  # noqa: E402
+
+DOCUMENT = """## Overview
+
+Fever is a temporary rise in body temperature.
+
+## When to seek help
+
+- Fever above 39.4°C that does not come down
+- Stiff neck, confusion or a rash that does not fade
+
+### Children
+
+Any fever in a baby under 3 months needs a doctor.
+
+## Self-care
+
+""" + "\n\n".join(f"Step {i}: rest, drink plenty of fluids and check your temperature again later." for i in range(12)) + """
+
+## References
+
+1. [WHO](https://www.who.int)
+"""
+
+
+def test_chunks_follow_sections_and_carry_heading_paths():
+    chunks = chunk_markdown(DOCUMENT, title="Fever")
+
+    paths = [chunk.heading_path for chunk in chunks]
+    assert paths[:3] == ["Fever > Overview", "Fever > When to seek help", "Fever > When to seek help > Children"]
+    assert chunks[1].text == (
+        "Fever > When to seek help\n"
+        "- Fever above 39.4°C that does not come down\n"
+        "- Stiff neck, confusion or a rash that does not fade"
+    )
+    assert "Self-care" in paths[-1]
+    assert not any("References" in path for path in paths)
+
+
+def test_long_sections_split_within_token_budget_and_rejoin():
+    chunks = chunk_markdown(DOCUMENT, title="Fever", max_tokens=60)
+    self_care = [chunk for chunk in chunks if chunk.heading_path == "Fever > Self-care"]
+
+    assert len(self_care) > 1
+    assert all(count_tokens(chunk.text) <= 60 for chunk in chunks)
+    section = join_section([chunk.text for chunk in self_care], "Fever > Self-care")
+    assert section.count("Step ") == 12
+
+
+def test_frontmatter_with_unquoted_colons_is_not_indexed_as_text():
+    content = "---\nid: fever\ntitle: Fever\nsources:\n  - name: NICE — Fever: assessment\n    url: https://example.org\n---\n## Overview\nText"
+
+    frontmatter, body = extract_frontmatter(content)
+
+    assert frontmatter["title"] == "Fever"
+    assert frontmatter["sources"] == [{"name": "NICE — Fever: assessment", "url": "https://example.org"}]
+    assert body == "## Overview\nText"
+
+
+def test_retrieve_can_expand_hits_to_their_section(tmp_path, monkeypatch):
+    chunks = [chunk for chunk in chunk_markdown(DOCUMENT, title="Fever", max_tokens=60)]
+    ids = [f"general/fever#{i}" for i in range(len(chunks))]
+    metadatas = [
+        {"source": "general/fever.md", "chunk_id": i, "heading_path": chunk.heading_path,
+         "section_id": f"general/fever#s{chunk.section_index}", "reference_sources": "[]"}
+        for i, chunk in enumerate(chunks)
+    ]
+    # The last chunk (end of Self-care) is the best match
+    embeddings = [[1.0, 0.0] if i == len(chunks) - 1 else [0.0, 1.0] for i in range(len(chunks))]
+    save_index(tmp_path, embeddings, ids, [chunk.text for chunk in chunks], metadatas)
+    monkeypatch.setattr(retriever, "RAG_BACKEND", "numpy")
+    monkeypatch.setattr(numpy_index, "NUMPY_INDEX_PATH", tmp_path)
+    numpy_index.reset_numpy_index()
+    try:
+        plain = retriever.retrieve("fluids", k=1, query_embedding=[1.0, 0.0])
+        expanded = retriever.retrieve("fluids", k=1, query_embedding=[1.0, 0.0], expand=True)
+    finally:
+        numpy_index.reset_numpy_index()
+
+    assert plain[0]["section"] == "Fever > Self-care"
+    assert plain[0]["chunk"].count("Step ") < 12
+    assert expanded[0]["chunk"].startswith("Fever > Self-care\nStep 0:")
+    assert expanded[0]["chunk"].count("Step ") == 12
@@ -0,0 +1,51 @@
+from pathlib import Path
+import json
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag import citations, retriever  # noqa: E402
+from api.rag.citations import compile_citations, merge_citations, save_citation_table  # noqa: E402
+
+SOURCES = [
+    {"name": "NHS – Asthma", "url": "https://www.nhs.uk/conditions/asthma/", "accessed": "2025-11-10"},
+    {"name": "NHS – Asthma (duplicate)", "url": "https://www.nhs.uk/conditions/asthma/"},
+    {"name": "No link"},
+    "https://www.who.int/asthma",
+]
+
+
+def test_compile_citations_keeps_clean_unique_pairs():
+    assert compile_citations(SOURCES, "Respiratory/asthma.md") == [
+        {"source": "NHS – Asthma", "url": "https://www.nhs.uk/conditions/asthma/"},
+        {"source": "Respiratory/asthma.md", "url": "https://www.who.int/asthma"},
+    ]
+    assert compile_citations([], "Skin/rash.md") == [{"source": "Skin/rash.md", "url": "file://Skin/rash.md"}]
+
+
+def test_merge_citations_dedupes_urls_across_results():
+    shared = {"source": "NHS", "url": "https://nhs.uk"}
+    results = [{"citations": [shared]}, {"citations": [shared, {"source": "WHO", "url": "https://who.int"}]}, {}]
+
+    assert merge_citations(results) == [shared, {"source": "WHO", "url": "https://who.int"}]
+
+
+def test_results_resolve_citations_from_the_table_without_parsing_metadata(tmp_path, monkeypatch):
+    table_path = tmp_path / "citations.json"
+    save_citation_table({"Respiratory/asthma.md": compile_citations(SOURCES[:1])}, table_path)
+    monkeypatch.setattr(citations, "CITATION_TABLE_PATH", table_path)
+    citations.reset_citation_table()
+    try:
+        assert citations.get_citation_table() is not None
+        # Loaded once; resolving a hit must not json.loads its metadata
+        monkeypatch.setattr(retriever, "json", None)
+        result = retriever._format_result(
+            "Asthma guidance", "Respiratory/asthma#0",
+            {"source": "Respiratory/asthma.md", "reference_sources": json.dumps(SOURCES)},
+        )
+    finally:
+        citations.reset_citation_table()
+
+    assert result["citations"] == [{"source": "NHS – Asthma", "url": "https://www.nhs.uk/conditions/asthma/"}]
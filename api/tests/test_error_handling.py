@@ -59,6 +59,7 @@ def client(monkeypatch):
 
     monkeypatch.setattr(main_module, "translate_text", fake_translate)
     monkeypatch.setattr(main_module, "retrieve", lambda query, k=4: [])
+    monkeypatch.setattr(main_module, "retrieve_many", lambda queries, k=4, query_embeddings=None: [])
     monkeypatch.setattr(main_module, "get_openai_client", lambda: DummyOpenAI())
     monkeypatch.setattr(main_module, "get_openrouter_client", lambda: None)
 
@@ -108,20 +109,19 @@ def test_stt_rejects_invalid_file_type(client):
 def test_chat_fallback_when_openai_unavailable(client, monkeypatch):
     from api import main as main_module
 
+    fever_guidance = [
+        {
+            "chunk": "General fever guidance.",
+            "id": "guidance#0",
+            "source": "test.md",
+            "topic": "fever",
+            "category": "general",
+        }
+    ]
     monkeypatch.setattr(main_module, "get_openai_client", lambda: None)
-    monkeypatch.setattr(
-        main_module,
-        "retrieve",
-        lambda query, k=4: [
-            {
-                "chunk": "General fever guidance.",
-                "id": "guidance#0",
-                "source": "test.md",
-                "topic": "fever",
-                "category": "general",
-            }
-        ],
-    )
+    monkeypatch.setattr(main_module, "retrieve", lambda query, k=4: fever_guidance)
+    # "fever" is also extracted as a symptom, so the multi-query path runs
+    monkeypatch.setattr(main_module, "retrieve_many", lambda queries, k=4, query_embeddings=None: fever_guidance)
 
     payload = {
         "text": "Tell me about fever",
@@ -0,0 +1,108 @@
+from pathlib import Path
+import asyncio
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api import main  # noqa: E402
+from api.graph import cypher  # noqa: E402
+from api.graph.async_client import AsyncNeo4jClient  # noqa: E402
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def data(self):
+        return self.rows
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute_read(self, work):
+        self.driver.transactions += 1
+        return await work(self)
+
+    async def run(self, query, params):
+        self.driver.queries.append((query, params))
+        return FakeResult(self.driver.rows)
+
+
+class FakeDriver:
+    """Records every query sent through managed read transactions"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+        self.transactions = 0
+
+    def session(self, **kwargs):
+        return FakeSession(self)
+
+
+def test_all_facts_are_fetched_in_one_round_trip(monkeypatch):
+    driver = FakeDriver([{
+        "red_flags": [{"symptom": "Chest pain", "conditions": ["Heart attack"]}],
+        "contraindications": [{"avoid": "Ibuprofen", "because": ["Hypertension"]}],
+        "safe_actions": [{"safeAction": "Rest"}],
+        "providers": [{"provider": "AIIMS", "mode": "Emergency", "phone": "108"}],
+        "related_symptoms": [
+            {"original_symptom": "Chest pain", "related_symptom": "Left arm pain", "shared_conditions": ["Angina"]},
+            {"original_symptom": "chest pain", "related_symptom": "left arm pain", "shared_conditions": ["Heart attack"]},
+            {"original_symptom": "Chest pain", "related_symptom": "Nausea", "shared_conditions": ["Heart attack"]},
+        ],
+    }])
+    client = AsyncNeo4jClient()
+    client.driver, client._is_connected = driver, True
+    monkeypatch.setattr(cypher, "async_neo4j_client", client)
+
+    facts = asyncio.run(cypher.fetch_graph_facts(
+        ["Chest pain"], ["Hypertension"], "Delhi", ["chest pain", "left arm pain"]
+    ))
+
+    assert driver.transactions == 1 and len(driver.queries) == 1
+    query, params = driver.queries[0]
+    assert query.count("CALL {") == 5
+    assert params["symptoms"] == ["chest pain"]
+    assert params["relatedSymptoms"] == ["chest pain", "left arm pain"]
+    # Both relationship types (and mixed pairs) come from one pattern, merged per symptom pair
+    assert facts["related_symptoms"][0] == {
+        "original_symptom": "Chest pain",
+        "related_symptom": "Left arm pain",
+        "shared_conditions": ["Angina", "Heart attack"],
+    }
+    assert len(facts["related_symptoms"]) == 2
+
+
+def test_query_only_includes_requested_facts():
+    query, params = cypher.build_graph_facts_query(symptoms=["fever"])
+    assert query.count("CALL {") == 1 and "RETURN red_flags" in query
+    assert cypher.build_graph_facts_query() == (None, {})
+
+
+def test_graph_facts_fall_back_to_snapshot(monkeypatch):
+    async def available():
+        return True
+
+    async def raise_error(*args, **kwargs):
+        raise RuntimeError("neo4j down")
+
+    monkeypatch.setattr(main, "GRAPH_BACKEND", "neo4j")
+    monkeypatch.setattr(main, "ensure_neo4j_async", available)
+    monkeypatch.setattr(main, "neo4j_fetch_graph_facts", raise_error)
+
+    facts = asyncio.run(main.graph_get_facts(["chest pain"], ["Diabetes"], "Mumbai", ["chest pain"]))
+
+    assert facts["red_flags"] and facts["providers"]
+    assert set(facts["safe_actions"]) == {"Diabetes"}
+    assert facts["related_symptoms"][0]["original_symptom"] == "Chest pain"
@@ -0,0 +1,65 @@
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.graph import fallback  # noqa: E402
+from api.graph.snapshot import GraphSnapshot, load_snapshot  # noqa: E402
+
+TRIPLES = [
+    ("Chest pain", "IS_RED_FLAG_FOR", "Heart attack", "Symptom", "Condition"),
+    ("Chest pain", "IS_ASSOCIATED_WITH", "Angina", "Symptom", "Condition"),
+    ("Left arm pain", "IS_ASSOCIATED_WITH", "Heart attack", "Symptom", "Condition"),
+    ("Left arm pain", "IS_RED_FLAG_FOR", "Angina", "Symptom", "Condition"),
+    ("Nausea", "IS_ASSOCIATED_WITH", "Heart attack", "Symptom", "Condition"),
+    ("Decongestants", "AVOID_IN", "Hypertension", "Action", "Condition"),
+    ("Hypertension", "RECOMMENDED_FOR", "DASH diet", "Condition", "Action"),
+    ("Paracetamol", "SAFE_FOR", "Hypertension", "Action", "Condition"),
+    ("AIIMS", "LOCATED_IN", "New Delhi", "Provider", "Location"),
+]
+
+
+def test_snapshot_answers_graph_queries():
+    snapshot = GraphSnapshot(TRIPLES)
+
+    assert snapshot.get_red_flags(["CHEST PAIN", "cough"]) == [
+        {"symptom": "Chest pain", "conditions": ["Heart attack"]}
+    ]
+    assert snapshot.get_contraindications(["Hypertension"]) == [
+        {"avoid": "Decongestants", "because": ["Hypertension"]}
+    ]
+    assert snapshot.get_safe_actions(["Hypertension"]) == [
+        {"safeAction": "DASH diet"}, {"safeAction": "Paracetamol"}
+    ]
+    # Provider lookups accept the spellings returned by router.extract_city
+    assert snapshot.get_providers_in_city("Delhi") == [{"provider": "AIIMS", "mode": None, "phone": None}]
+
+
+def test_related_symptoms_combine_all_relationship_types():
+    related = GraphSnapshot(TRIPLES).get_related_symptoms(["chest pain"])
+
+    assert related[0] == {
+        "original_symptom": "Chest pain",
+        "related_symptom": "Left arm pain",
+        "shared_conditions": ["Angina", "Heart attack"],
+    }
+    assert [r["related_symptom"] for r in related] == ["Left arm pain", "Nausea"]
+
+
+def test_version_tracks_content_not_order():
+    assert GraphSnapshot(TRIPLES).version == GraphSnapshot(reversed(TRIPLES)).version
+    assert GraphSnapshot(TRIPLES).version != GraphSnapshot(TRIPLES[:-1]).version
+
+
+def test_seed_files_back_the_fallback():
+    snapshot = load_snapshot("csv")
+
+    assert snapshot.triples
+    assert fallback.get_red_flags(["chest pain"])[0]["symptom"] == "Chest pain"
+    assert any(r["related_symptom"] == "Left arm pain" for r in fallback.get_related_symptoms(["Chest pain"]))
+    # Emergency answers carry provider phone numbers
+    assert {"provider": "Apollo Hospitals", "mode": "Emergency", "phone": "1860-500-1066"} in (
+        fallback.get_providers_in_city("Mumbai")
+    )
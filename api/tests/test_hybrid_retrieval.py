@@ -0,0 +1,74 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag import bm25, numpy_index, retriever  # noqa: E402
+from api.rag.bm25 import BM25Index, build_bm25_index  # noqa: E402
+from api.rag.numpy_index import save_index  # noqa: E402
+
+IDS = ["gi/vomiting#0", "gi/diarrhoea#0", "pregnancy/movements#0"]
+DOCUMENTS = [
+    "Vomiting in adults: sip ORS, rest, and see a doctor if ulti continues for more than a day.",
+    "Loose motion and diarrhoea: drink ORS after every loose stool. Loose motion with blood needs a doctor.",
+    "Fetal movements: do a daily kick count after 28 weeks and report reduced movements.",
+]
+METADATAS = [
+    {"category": "Gastrointestinal", "source": "gi/vomiting.md"},
+    {"category": "Gastrointestinal", "source": "gi/diarrhoea.md"},
+    {"category": "Pregnancy", "source": "pregnancy/movements.md"},
+]
+
+
+def test_bm25_ranks_exact_terms_and_filters_by_category():
+    index = BM25Index.build(IDS, DOCUMENTS, [m["category"] for m in METADATAS])
+
+    assert index.search("ulti")[0][0] == "gi/vomiting#0"
+    assert [chunk_id for chunk_id, _ in index.search("loose motion", k=1)] == ["gi/diarrhoea#0"]
+    assert index.search("kick count", category="Gastrointestinal") == []
+    assert index.search("the and of") == []
+
+
+def test_bm25_index_round_trips_with_compact_postings(tmp_path):
+    path = tmp_path / "bm25.npz"
+    built = build_bm25_index(IDS, DOCUMENTS, METADATAS, path)
+    loaded = BM25Index.load(path)
+
+    assert loaded.doc_ids.dtype == np.uint8
+    assert loaded.tfs.dtype == np.uint16
+    assert loaded.search("ors doctor") == built.search("ors doctor")
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = retriever.reciprocal_rank_fusion([["a", "b", "c"], ["c", "b", "d"]])
+
+    assert fused[:2] == ["c", "b"]
+    assert set(fused) == {"a", "b", "c", "d"}
+
+
+def test_hybrid_mode_adds_lexical_hits_missing_from_dense(tmp_path, monkeypatch):
+    # Dense ranking prefers the vomiting chunk; only BM25 finds the kick count chunk
+    save_index(tmp_path, [[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]], IDS, DOCUMENTS, METADATAS)
+    build_bm25_index(IDS, DOCUMENTS, METADATAS, tmp_path / "bm25.npz")
+    monkeypatch.setattr(retriever, "RAG_BACKEND", "numpy")
+    monkeypatch.setattr(retriever, "RAG_HYBRID_CANDIDATES", 2)
+    monkeypatch.setattr(numpy_index, "NUMPY_INDEX_PATH", tmp_path)
+    monkeypatch.setattr(bm25, "BM25_INDEX_PATH", tmp_path / "bm25.npz")
+    numpy_index.reset_numpy_index()
+    bm25.reset_bm25_index()
+    try:
+        dense = retriever.retrieve("kick count", k=2, query_embedding=[1.0, 0.0], mode="dense")
+        hybrid = retriever.retrieve("kick count", k=2, query_embedding=[1.0, 0.0], mode="hybrid")
+    finally:
+        numpy_index.reset_numpy_index()
+        bm25.reset_bm25_index()
+
+    assert [r["id"] for r in dense] == ["gi/vomiting#0", "gi/diarrhoea#0"]
+    # Both top-ranked once: the tie goes to the dense ranking
+    assert [r["id"] for r in hybrid] == ["gi/vomiting#0", "pregnancy/movements#0"]
+    assert hybrid[1]["chunk"] == DOCUMENTS[2]
+    assert set(hybrid[1]) == set(dense[0])
@@ -0,0 +1,129 @@
+from pathlib import Path
+import json
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+import numpy as np  # noqa: E402
+
+from api.rag import build_index as builder  # noqa: E402
+from api.rag.numpy_index import export_collection, load_index  # noqa: E402
+
+
+def write_doc(data_dir, relative, body):
+    path = data_dir / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"---\ntitle: {path.stem}\n---\n{body}\n", encoding="utf-8")
+
+
+def setup_build(tmp_path, monkeypatch):
+    embedded = []
+
+    def fake_embed(documents):
+        embedded.extend(documents)
+        return [[float(len(document)), 1.0, 0.0] for document in documents]
+
+    monkeypatch.setattr(builder, "embed_documents", fake_embed)
+    # The live artifacts the API loads; a build into another target must leave them alone
+    monkeypatch.setattr(builder, "NUMPY_INDEX_PATH", tmp_path / "live")
+    monkeypatch.setattr(builder, "BM25_INDEX_PATH", tmp_path / "live" / "bm25.npz")
+    monkeypatch.setattr(builder, "CITATION_TABLE_PATH", tmp_path / "live" / "citations.json")
+    data_dir = tmp_path / "data"
+    write_doc(data_dir, "Respiratory/cough.md", "Cough guidance " * 3)
+    write_doc(data_dir, "Skin/rash.md", "Rash guidance " * 3)
+    write_doc(data_dir, "Skin/itch.md", "Itch guidance " * 3)
+
+    def build(**kwargs):
+        builder.build_index(data_dir=data_dir, chroma_path=tmp_path / "chroma", workers=1, **kwargs)
+
+    return data_dir, embedded, build
+
+
+def indexed_ids(tmp_path):
+    chunks = json.loads((tmp_path / "chroma" / "vector_index" / "chunks.json").read_text(encoding="utf-8"))
+    return sorted(chunks["ids"])
+
+
+def test_rebuild_only_embeds_changed_files_and_drops_stale_chunks(tmp_path, monkeypatch):
+    data_dir, embedded, build = setup_build(tmp_path, monkeypatch)
+    build()
+    assert len(embedded) == 3
+    first_version = (tmp_path / "chroma" / "index_version.txt").read_text()
+
+    embedded.clear()
+    write_doc(data_dir, "Skin/rash.md", "Rash guidance, updated")
+    (data_dir / "Skin" / "itch.md").unlink()
+    build()
+
+    assert embedded == ["rash\nRash guidance, updated"]
+    assert indexed_ids(tmp_path) == ["Respiratory/cough#0", "Skin/rash#0"]
+    assert (tmp_path / "chroma" / "index_version.txt").read_text() != first_version
+    table = json.loads((tmp_path / "chroma" / "vector_index" / "citations.json").read_text(encoding="utf-8"))
+    assert sorted(table) == [str(Path("Respiratory/cough.md")), str(Path("Skin/rash.md"))]
+    assert (tmp_path / "chroma" / "vector_index" / "bm25.npz").exists()
+    assert not (tmp_path / "live").exists()
+
+    embedded.clear()
+    build()
+    assert embedded == []
+
+
+def test_full_rebuild_and_format_change_re_embed_everything(tmp_path, monkeypatch):
+    _, embedded, build = setup_build(tmp_path, monkeypatch)
+    build()
+
+    embedded.clear()
+    build(full=True)
+    assert len(embedded) == 3
+
+    embedded.clear()
+    monkeypatch.setattr(builder, "INDEX_FORMAT_VERSION", builder.INDEX_FORMAT_VERSION + 1)
+    build()
+    assert len(embedded) == 3
+    assert indexed_ids(tmp_path) == ["Respiratory/cough#0", "Skin/itch#0", "Skin/rash#0"]
+
+
+def test_embed_in_batches_covers_every_document_once(monkeypatch):
+    documents = [f"doc {i}" for i in range(7)]
+    monkeypatch.setattr(builder, "embed_documents", lambda batch: [[float(doc.split()[1])] for doc in batch])
+
+    batches = sorted(builder.embed_in_batches(documents, batch_size=3, workers=1))
+
+    assert [start for start, _ in batches] == [0, 3, 6]
+    assert [vector[0] for _, vectors in batches for vector in vectors] == list(range(7))
+
+
+class PagedCollection:
+    """Chroma collection stand-in that records the page sizes it is read with"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.limits = []
+
+    def count(self):
+        return len(self.rows)
+
+    def get(self, limit, offset, include):
+        self.limits.append(limit)
+        page = self.rows[offset:offset + limit]
+        return {
+            "ids": [row[0] for row in page],
+            "documents": [f"doc {row[0]}" for row in page],
+            "metadatas": [{"category": "general"} for _ in page],
+            "embeddings": [row[1] for row in page],
+        }
+
+
+def test_export_collection_reads_pages_into_one_normalized_matrix(tmp_path):
+    collection = PagedCollection([(f"c{i}", [float(i + 1), 0.0]) for i in range(5)])
+
+    ids, documents, _ = export_collection(collection, tmp_path, page_size=2)
+
+    assert collection.limits == [2, 2, 2]
+    assert ids == ["c0", "c1", "c2", "c3", "c4"]
+    assert documents[4] == "doc c4"
+    index = load_index(tmp_path)
+    assert index.embeddings.shape == (5, 2)
+    assert np.allclose(index.embeddings[:, 0], 1.0)
@@ -0,0 +1,45 @@
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.langid.identifier import EVAL_PATH, identify_language, load_samples  # noqa: E402
+
+
+def test_native_script_is_settled_from_unicode_blocks():
+    assert identify_language("मुझे बुखार है")[0] == "hi"
+    assert identify_language("எனக்கு காய்ச்சல்")[0] == "ta"
+    assert identify_language("నాకు జ్వరం ఉంది")[0] == "te"
+    assert identify_language("ನನಗೆ ಜ್ವರ ಇದೆ")[0] == "kn"
+    lang, confidence = identify_language("എനിക്ക് പനി ഉണ്ട്")
+    assert lang == "ml" and confidence >= 0.9
+
+
+def test_romanized_and_code_mixed_text():
+    assert identify_language("enakku thalai valikuthu")[0] == "ta"
+    assert identify_language("naaku jwaram undi")[0] == "te"
+    assert identify_language("mujhe fever hai since morning")[0] == "hi"
+    lang, confidence = identify_language("I have had chest pain since last night")
+    assert lang == "en" and confidence >= 0.85
+
+
+def test_empty_text_has_no_confidence():
+    assert identify_language("   ") == ("en", 0.0)
+
+
+def test_eval_set_accuracy_and_confident_predictions():
+    samples = load_samples(EVAL_PATH)
+    predictions = [(label, *identify_language(text)) for label, text in samples]
+    accuracy = sum(label == predicted for label, predicted, _ in predictions) / len(predictions)
+    assert accuracy >= 0.95
+    # Anything confident enough to skip the remote detector must be right
+    assert all(label == predicted for label, predicted, confidence in predictions if confidence >= 0.85)
+
+
+def test_short_romanized_inputs_are_never_confident():
+    for text in ("hi", "hi doctor", "fever", "pet dard", "bukhar"):
+        assert identify_language(text)[1] < 0.85
+    # Native script stays settled however short
+    assert identify_language("बुखार")[1] >= 0.9
@@ -0,0 +1,103 @@
+from pathlib import Path
+import sys
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag import numpy_index, retriever  # noqa: E402
+from api.rag.numpy_index import load_index, save_index  # noqa: E402
+
+METADATAS = [
+    {"source": "Respiratory/cough.md", "source_file": "cough.md", "category": "Respiratory", "title": "Cough",
+     "topic": "cough", "chunk_id": 0, "reference_sources": '["https://example.org/cough"]'},
+    {"source": "Respiratory/asthma.md", "source_file": "asthma.md", "category": "Respiratory", "title": "Asthma",
+     "topic": "asthma", "chunk_id": 0, "reference_sources": "[]"},
+    {"source": "Skin/rash.md", "source_file": "rash.md", "category": "Skin", "title": "Rash",
+     "topic": "rash", "chunk_id": 0, "reference_sources": "[]"},
+]
+
+
+def write_index(path):
+    embeddings = [[3.0, 0.0, 0.0], [0.6, 0.8, 0.0], [0.0, 0.0, 2.0]]
+    ids = ["Respiratory/cough#0", "Respiratory/asthma#0", "Skin/rash#0"]
+    documents = ["Cough guidance", "Asthma guidance", "Rash guidance"]
+    save_index(path, embeddings, ids, documents, METADATAS)
+
+
+def test_search_returns_exact_top_k_by_cosine(tmp_path):
+    write_index(tmp_path)
+    index = load_index(tmp_path)
+
+    assert isinstance(index.embeddings, np.memmap)
+    hits = index.search([1.0, 0.1, 0.0], k=2)
+    assert [index.ids[row] for row, _ in hits] == ["Respiratory/cough#0", "Respiratory/asthma#0"]
+    assert hits[0][1] > hits[1][1]
+    assert len(index.search([1.0, 0.0, 0.0], k=10)) == 3
+
+
+def test_category_filter_only_searches_matching_chunks(tmp_path):
+    write_index(tmp_path)
+    index = load_index(tmp_path)
+
+    hits = index.search([1.0, 0.0, 0.0], k=2, category="Skin")
+    assert [index.ids[row] for row, _ in hits] == ["Skin/rash#0"]
+    assert index.search([1.0, 0.0, 0.0], k=2, category="Neurology") == []
+
+
+def test_numpy_backend_returns_retrieve_result_shape(tmp_path, monkeypatch):
+    write_index(tmp_path)
+    monkeypatch.setattr(retriever, "RAG_BACKEND", "numpy")
+    monkeypatch.setattr(numpy_index, "NUMPY_INDEX_PATH", tmp_path)
+    numpy_index.reset_numpy_index()
+    try:
+        results = retriever.retrieve("cough", k=1, query_embedding=[1.0, 0.0, 0.0])
+    finally:
+        numpy_index.reset_numpy_index()
+
+    assert results == [{
+        "chunk": "Cough guidance",
+        "id": "Respiratory/cough#0",
+        "source": "Respiratory/cough.md",
+        "source_file": "cough.md",
+        "category": "Respiratory",
+        "title": "Cough",
+        "topic": "cough",
+        "citations": [{"source": "Respiratory/cough.md", "url": "https://example.org/cough"}],
+    }]
+
+
+def test_search_many_matches_single_query_search(tmp_path):
+    write_index(tmp_path)
+    index = load_index(tmp_path)
+    queries = [[1.0, 0.1, 0.0], [0.0, 0.0, 1.0], [0.0, 0.0, 0.0]]
+
+    batched = index.search_many(queries, k=2)
+
+    assert batched[0] == index.search(queries[0], k=2)
+    assert batched[1] == index.search(queries[1], k=2)
+    assert batched[2] == []
+    assert index.search_many(queries[:1], k=2, category="Skin") == [index.search(queries[0], k=2, category="Skin")]
+
+
+def test_retrieve_many_merges_and_dedupes_across_queries(tmp_path, monkeypatch):
+    write_index(tmp_path)
+    monkeypatch.setattr(retriever, "RAG_BACKEND", "numpy")
+    monkeypatch.setattr(numpy_index, "NUMPY_INDEX_PATH", tmp_path)
+    numpy_index.reset_numpy_index()
+    try:
+        results = retriever.retrieve_many(
+            ["cough", "Cough ", "wheeze", "rash"],
+            k=2,
+            query_embeddings=[[1.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.6, 0.8, 0.0], [0.0, 0.1, 1.0]],
+            limit=3,
+        )
+    finally:
+        numpy_index.reset_numpy_index()
+
+    ids = [r["id"] for r in results]
+    # Found by both the cough and wheeze queries, so it ranks first
+    assert ids[0] == "Respiratory/asthma#0"
+    assert sorted(ids) == ["Respiratory/asthma#0", "Respiratory/cough#0", "Skin/rash#0"]
@@ -0,0 +1,47 @@
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api import main  # noqa: E402
+from api.phrase_matcher import PhraseMatcher, match_all  # noqa: E402
+from api.safety import detect_red_flags, extract_symptoms  # noqa: E402
+
+
+def test_overlapping_phrases_are_all_reported():
+    matcher = PhraseMatcher({"flags": {"chest pain", "unconscious with chest pain", "pain"}})
+
+    found = matcher.match("Found him UNCONSCIOUS with chest pain")
+
+    assert found["flags"] == {"chest pain", "unconscious with chest pain", "pain"}
+    assert [m[:3] for m in matcher.find("chest pain")] == [(0, 10, "chest pain"), (6, 10, "pain")]
+
+
+def test_matches_respect_word_boundaries_and_inflections():
+    matcher = PhraseMatcher({"symptoms": {"fits", "ulti", "seizure", "cough"}})
+
+    assert matcher.match("multiple benefits of exercise") == {}
+    assert matcher.match("two seizures and coughing")["symptoms"] == {"seizure", "cough"}
+    assert matcher.match("ulti ho rahi hai")["symptoms"] == {"ulti"}
+
+
+def test_shared_vocabularies_come_from_one_scan():
+    text = "I have chest pain and fever, my left arm pain started after"
+    found = match_all(text)
+
+    assert "chest pain" in found["red_flags"]
+    assert {"chest pain", "fever"} <= found["router_symptoms"]
+    assert match_all(text) is found
+    assert detect_red_flags(text)["red_flag"]
+    assert extract_symptoms(text) == ["chest pain"]
+    assert main._extract_raw_symptom_phrases(text) == ["chest pain", "left arm pain", "arm pain", "fever"]
+
+
+def test_numbers_followed_by_units_keep_red_flag_recall():
+    # Flagged by the substring checks before the word-boundary rule
+    for text, phrase in (("my sugar 300mg/dl", "sugar 300"), ("sugar 400mg", "sugar 400")):
+        result = detect_red_flags(text)
+        assert result["red_flag"], text
+        assert phrase in match_all(text)["red_flags"]
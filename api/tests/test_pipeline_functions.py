@@ -0,0 +1,100 @@
+from pathlib import Path
+from types import SimpleNamespace
+import asyncio
+import json
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.pipeline_functions import (  # noqa: E402
+    detect_and_translate_to_english_async,
+    generate_final_answer_async,
+    speculative_detect_and_translate,
+)
+
+
+class FakeAsyncClient:
+    """Minimal stand-in for AsyncOpenAI that records calls and returns canned content"""
+
+    def __init__(self, content: str, delay: float = 0.0):
+        self.calls = []
+        self.cancelled = False
+        self._content = content
+        self._delay = delay
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        self.calls.append(kwargs)
+        try:
+            await asyncio.sleep(self._delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self._content))])
+
+
+def test_combined_call_returns_language_and_translation():
+    client = FakeAsyncClient(json.dumps({"detected_language": "ta", "english_text": "I have a headache"}))
+    lang, english = asyncio.run(detect_and_translate_to_english_async(client, "gpt-4o-mini", "thala valikuthu"))
+    assert (lang, english) == ("ta", "I have a headache")
+    assert len(client.calls) == 1
+    assert client.calls[0]["response_format"] == {"type": "json_object"}
+
+
+def test_confident_local_english_cancels_remote_call():
+    client = FakeAsyncClient(json.dumps({"detected_language": "en", "english_text": "x"}), delay=5)
+    result = asyncio.run(
+        speculative_detect_and_translate(client, "gpt-4o-mini", "I have a fever", lambda text: ("en", 0.99))
+    )
+    assert result == ("en", "I have a fever", "local")
+    assert client.cancelled or not client.calls
+
+
+def test_confident_local_label_wins_over_remote_label():
+    client = FakeAsyncClient(json.dumps({"detected_language": "te", "english_text": "My stomach hurts"}))
+    result = asyncio.run(
+        speculative_detect_and_translate(client, "gpt-4o-mini", "vayaru vedana", lambda text: ("ml", 0.95))
+    )
+    assert result == ("ml", "My stomach hurts", "local+remote")
+
+
+def test_unsure_local_detector_defers_to_remote():
+    client = FakeAsyncClient(json.dumps({"detected_language": "kn", "english_text": "What happened?"}))
+    result = asyncio.run(
+        speculative_detect_and_translate(client, "gpt-4o-mini", "yenu aagide", lambda text: (None, 0.0))
+    )
+    assert result == ("kn", "What happened?", "remote")
+
+
+def test_remote_english_wins_over_a_confident_local_guess():
+    # The local identifier labels short English greetings as Hindi
+    for text in ("hi", "hi doctor"):
+        client = FakeAsyncClient(json.dumps({"detected_language": "en", "english_text": text}))
+        result = asyncio.run(
+            speculative_detect_and_translate(client, "gpt-4o-mini", text, lambda text: ("hi", 0.99))
+        )
+        assert result == ("en", text, "remote")
+        assert len(client.calls) == 1  # no extra translation call
+
+
+class FailingAsyncClient:
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **kwargs):
+        raise RuntimeError("upstream unavailable")
+
+
+def test_failed_generation_is_flagged_explicitly():
+    ok = FakeAsyncClient(" Rest and drink fluids. ")
+    answer, failed = asyncio.run(
+        generate_final_answer_async(ok, "gpt-4o-mini", "fever", "", [], None, retry_count=1)
+    )
+    assert (answer, failed) == ("Rest and drink fluids.", False)
+
+    answer, failed = asyncio.run(
+        generate_final_answer_async(FailingAsyncClient(), "gpt-4o-mini", "fever", "", [], None, retry_count=1)
+    )
+    assert failed and answer
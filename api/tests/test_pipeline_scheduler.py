@@ -0,0 +1,101 @@
+from pathlib import Path
+import asyncio
+import sys
+import time
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.pipeline_scheduler import StageScheduler  # noqa: E402
+
+
+def test_independent_stages_run_concurrently():
+    async def scenario():
+        scheduler = StageScheduler()
+
+        async def slow(value):
+            await asyncio.sleep(0.2)
+            return value
+
+        def blocking(value):
+            time.sleep(0.2)
+            return value
+
+        scheduler.add("a", lambda: slow("a"))
+        scheduler.add("b", lambda: slow("b"))
+        scheduler.add("c", lambda: blocking("c"))
+
+        start = time.perf_counter()
+        results = await scheduler.run()
+        return results, time.perf_counter() - start, scheduler.timings
+
+    results, elapsed, timings = asyncio.run(scenario())
+    assert results == {"a": "a", "b": "b", "c": "c"}
+    # Slowest branch, not the sum of all three
+    assert elapsed < 0.5
+    assert set(timings) == {"a", "b", "c"}
+
+
+def test_dependencies_receive_results_in_order():
+    async def scenario():
+        scheduler = StageScheduler()
+
+        async def rag():
+            return ["chunk"]
+
+        async def facts(rag_results, red_flags):
+            return {"chunks": rag_results, "red_flags": red_flags}
+
+        scheduler.add("rag", rag)
+        scheduler.add("red_flags", lambda: ["chest pain"])
+        scheduler.add("facts", facts, deps=("rag", "red_flags"))
+        return await scheduler.result("facts")
+
+    assert asyncio.run(scenario()) == {"chunks": ["chunk"], "red_flags": ["chest pain"]}
+
+
+def test_timeout_and_failure_fall_back_to_default():
+    async def scenario():
+        scheduler = StageScheduler(default_timeout=0.05)
+
+        async def hangs():
+            await asyncio.sleep(5)
+
+        async def fails():
+            raise RuntimeError("neo4j down")
+
+        async def downstream(value):
+            return value
+
+        scheduler.add("graph", hangs, default=[])
+        scheduler.add("providers", fails, default=[])
+        scheduler.add("summary", downstream, deps=("providers",), default="none")
+        results = await scheduler.run()
+        return results, scheduler.errors
+
+    results, errors = asyncio.run(scenario())
+    assert results == {"graph": [], "providers": [], "summary": "none"}
+    assert errors["graph"] == "timeout"
+    assert "neo4j down" in errors["providers"]
+    assert errors["summary"].startswith("dependency failed")
+
+
+def test_unregistered_stage_returns_default():
+    async def scenario():
+        scheduler = StageScheduler()
+        scheduler.add("retrieval", lambda: [1, 2])
+        scheduler.start()
+        return await scheduler.gather("retrieval", "providers")
+
+    assert asyncio.run(scenario()) == [[1, 2], None]
+
+
+def test_unknown_dependency_is_rejected():
+    scheduler = StageScheduler()
+    try:
+        scheduler.add("facts", lambda x: x, deps=("missing",))
+    except ValueError as exc:
+        assert "missing" in str(exc)
+    else:
+        raise AssertionError("expected ValueError for unknown dependency")
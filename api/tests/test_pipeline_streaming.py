@@ -0,0 +1,129 @@
+from pathlib import Path
+import asyncio
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.pipeline_streaming import MarkdownSegmenter, stream_with_pipelined_translation  # noqa: E402
+
+ANSWER = (
+    "## Fever care\n\n"
+    "Rest and drink plenty of fluids, e.g. water or ORS. Take paracetamol if the fever is above 38.5 C. "
+    "See a doctor if it lasts more than 3 days.\n\n"
+    "- Sponge with lukewarm water\n"
+    "1. Monitor your temperature\n"
+)
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_segments_follow_markdown_blocks_and_sentences():
+    segmenter = MarkdownSegmenter(min_chars=40)
+    segments = []
+    for chunk in _chunks(ANSWER, 7):
+        segments.extend(segmenter.feed(chunk))
+    segments.extend(segmenter.flush())
+
+    assert "".join(segments) == ANSWER
+    assert segments[0] == "## Fever care\n\n"
+    # "e.g. " is inside the minimum segment length, so the sentence stays whole
+    assert segments[1] == "Rest and drink plenty of fluids, e.g. water or ORS. "
+    assert "- Sponge with lukewarm water\n" in segments
+
+
+def test_translated_segments_stream_in_order_before_generation_ends():
+    async def scenario():
+        async def generate():
+            for chunk in _chunks(ANSWER, 10):
+                await asyncio.sleep(0.01)
+                yield chunk
+
+        async def translate(text):
+            # Earlier segments take longer, so completion order differs from answer order
+            await asyncio.sleep(0.05 if text.startswith("##") else 0.01)
+            return text.upper()
+
+        events = []
+        async for kind, content in stream_with_pipelined_translation(generate(), translate):
+            events.append((kind, content))
+        return events
+
+    events = asyncio.run(scenario())
+    translated = [content for kind, content in events if kind == "translated"]
+    sources = [content for kind, content in events if kind == "source"]
+    assert "".join(sources) == ANSWER
+    assert "".join(translated) == ANSWER.upper()
+    first_translated = next(i for i, (kind, _) in enumerate(events) if kind == "translated")
+    last_source = max(i for i, (kind, _) in enumerate(events) if kind == "source")
+    assert first_translated < last_source
+
+
+def test_failed_segment_keeps_english_text():
+    async def scenario():
+        async def generate():
+            yield "First sentence here.\n"
+            yield "Second sentence here.\n"
+
+        async def translate(text):
+            if text.startswith("Second"):
+                raise RuntimeError("rate limited")
+            return "ONE"
+
+        return [content async for kind, content in stream_with_pipelined_translation(generate(), translate)
+                if kind == "translated"]
+
+    assert asyncio.run(scenario()) == ["ONE\n", "Second sentence here.\n"]
+
+
+def test_disconnected_stream_cancels_running_stages(monkeypatch):
+    from api import main
+    from api.models import ChatRequest, Profile
+
+    disclaimer = {}
+
+    async def detect(text, client, model, timings):
+        return "hi", text, "local"
+
+    async def retrieve(*args, **kwargs):
+        return []
+
+    async def graph_facts(**kwargs):
+        return {}
+
+    async def generate(**kwargs):
+        yield "Rest and drink fluids."
+
+    async def slow_translation(client, model, text, target_language):
+        disclaimer["started"] = True
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            disclaimer["cancelled"] = True
+            raise
+        return text
+
+    monkeypatch.setattr(main, "_detect_and_translate_input", detect)
+    monkeypatch.setattr(main, "get_async_openai_client", lambda: object())
+    monkeypatch.setattr(main, "_chat_model_openai", "gpt-4o-mini")
+    monkeypatch.setattr(main, "STREAM_TRANSLATION_MODE", "buffered")
+    monkeypatch.setattr(main, "_retrieve_many_stage", retrieve)
+    monkeypatch.setattr(main, "graph_get_facts", graph_facts)
+    monkeypatch.setattr(main, "generate_final_answer_stream", generate)
+    monkeypatch.setattr(main, "_translate_to_user_language", slow_translation)
+
+    async def scenario():
+        stream = main.process_chat_request_stream(ChatRequest(text="I have a fever", profile=Profile()))
+        first = await stream.__anext__()
+        # The client disconnects while the disclaimer translation is still running
+        await stream.aclose()
+        await asyncio.sleep(0.05)
+        # Checked before asyncio.run cancels leftover tasks itself
+        return first, disclaimer.get("cancelled")
+
+    first, cancelled = asyncio.run(scenario())
+    assert "Rest and drink fluids." in first
+    assert disclaimer.get("started") and cancelled
@@ -0,0 +1,65 @@
+from pathlib import Path
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.pipeline_functions import _build_answer_messages  # noqa: E402
+from api.prompt_budget import compress_history, dedupe_chunks, pack_context  # noqa: E402
+from api.rag.tokenizer import count_tokens  # noqa: E402
+
+FEVER = "Fever > Self-care\nRest, drink plenty of fluids and check your temperature every few hours."
+COUGH = "Cough > Overview\nMost coughs clear up within three weeks without any treatment at all."
+LONG = "Asthma > Triggers\n" + " ".join(f"Trigger {i} is dust, smoke or cold air." for i in range(80))
+
+
+def test_overlapping_chunks_are_deduplicated_in_rank_order():
+    section = FEVER + "\nSee a doctor if the fever lasts more than three days."
+
+    assert dedupe_chunks([FEVER, COUGH, FEVER]) == [FEVER, COUGH]
+    # An expanded section replaces the chunk it contains, at that chunk's rank
+    assert dedupe_chunks([FEVER, COUGH, section]) == [section, COUGH]
+
+
+def test_context_is_packed_within_budget_and_last_chunk_truncated():
+    context, report = pack_context([FEVER, COUGH, LONG], budget=120, reserved=20)
+
+    assert context.startswith(FEVER + "\n\n" + COUGH + "\n\nAsthma > Triggers")
+    assert context.endswith(" …")
+    assert count_tokens(context) <= 100
+    assert report["prompt_tokens_context"] == count_tokens(context) + 20
+    assert report["context_chunks"] == 3
+
+    # Too little room left for a useful fragment: the chunk is dropped instead
+    context, report = pack_context([FEVER, COUGH, LONG], budget=60)
+    assert context == FEVER + "\n\n" + COUGH
+    assert report["context_chunks_dropped"] == 1
+
+
+def test_history_keeps_recent_turns_and_summarizes_older_ones():
+    history = []
+    for turn in range(6):
+        history.append({"role": "user", "content": f"Question {turn} about my headache?"})
+        history.append({"role": "assistant", "content": f"## Answer {turn}\nDrink water and rest. " + "More detail. " * 200})
+
+    messages, report = compress_history(history, budget=400, keep_recent=2)
+
+    assert messages[0]["role"] == "system"
+    assert "User: Question 0 about my headache?" in messages[0]["content"]
+    assert "Assistant: Answer 4" in messages[0]["content"]
+    assert [m["content"] for m in messages[1:2]] == ["Question 5 about my headache?"]
+    assert messages[2]["content"].endswith(" …")
+    assert report["prompt_tokens_history"] <= 400
+    assert report["history_messages_summarized"] == 10
+
+
+def test_answer_messages_report_prompt_tokens():
+    timings = {}
+    history = [{"role": "user", "content": "I have a cough"}, {"role": "assistant", "content": "Rest and fluids."}]
+
+    messages = _build_answer_messages("Is it serious?", COUGH, [], None, history, timings)
+
+    assert messages[1:3] == history
+    assert timings["prompt_tokens_history"] > 0
+    assert timings["prompt_tokens"] > timings["prompt_tokens_history"] + count_tokens(COUGH)
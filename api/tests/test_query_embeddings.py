@@ -0,0 +1,171 @@
+from pathlib import Path
+import asyncio
+import sys
+import threading
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag import retriever  # noqa: E402
+from api.rag.embeddings import QueryEmbeddingCache  # noqa: E402
+
+
+class FakeCache:
+    """Dict-backed stand-in for CacheService's Redis tier"""
+
+    def __init__(self):
+        self.store = {}
+        self.round_trips = 0
+
+    async def get_from_cache(self, key, fast_path=False):
+        self.round_trips += 1
+        return self.store.get(key)
+
+    async def set_to_cache(self, key, value, ttl=None, fast_path=False):
+        self.round_trips += 1
+        self.store[key] = value
+        return True
+
+    async def get_many(self, keys):
+        self.round_trips += 1
+        return {key: self.store[key] for key in keys if key in self.store}
+
+    async def set_many(self, items, ttl=None):
+        self.round_trips += 1
+        self.store.update(items)
+        return True
+
+
+def make_embedder(calls, threads=None):
+    def embed(text):
+        calls.append(text)
+        if threads is not None:
+            threads.append(threading.current_thread())
+        return [0.5, 0.25, float(len(text))]
+
+    return embed
+
+
+def test_repeated_query_is_embedded_once_and_runs_off_the_loop():
+    calls, threads = [], []
+    cache = QueryEmbeddingCache(cache=FakeCache(), embed_fn=make_embedder(calls, threads), enabled=True)
+
+    async def scenario():
+        first = await cache.embed("Fever and  headache")
+        second = await cache.embed("fever and headache ")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second == [0.5, 0.25, 18.0]
+    assert calls == ["fever and headache"]
+    assert threads[0] is not threading.main_thread()
+    assert cache.stats["l1_hits"] == 1
+
+
+def test_redis_tier_is_shared_and_keyed_by_model():
+    shared = FakeCache()
+    calls = []
+    asyncio.run(QueryEmbeddingCache(cache=shared, embed_fn=make_embedder(calls), enabled=True).embed("chest pain"))
+
+    other_worker = QueryEmbeddingCache(cache=shared, embed_fn=make_embedder(calls), enabled=True)
+    assert asyncio.run(other_worker.embed("chest pain")) == [0.5, 0.25, 10.0]
+    assert other_worker.stats["l2_hits"] == 1
+
+    other_model = QueryEmbeddingCache(cache=shared, embed_fn=make_embedder(calls), model="other", enabled=True)
+    asyncio.run(other_model.embed("chest pain"))
+    assert len(calls) == 2
+
+
+def test_concurrent_misses_share_one_model_call():
+    calls = []
+    cache = QueryEmbeddingCache(cache=FakeCache(), embed_fn=make_embedder(calls), enabled=True)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.embed("cough") for _ in range(5)))
+
+    assert len(set(map(tuple, asyncio.run(scenario())))) == 1
+    assert len(calls) == 1
+
+
+def test_embedding_failure_returns_none_and_is_not_cached():
+    def broken(text):
+        raise RuntimeError("model unavailable")
+
+    cache = QueryEmbeddingCache(cache=FakeCache(), embed_fn=broken, enabled=True)
+
+    assert asyncio.run(cache.embed("rash")) is None
+    assert cache.get_statistics()["entries"] == 0
+    assert cache.stats["errors"] == 1
+
+
+def test_retrieve_queries_with_precomputed_vector(monkeypatch):
+    queries = []
+
+    class FakeCollection:
+        def query(self, **kwargs):
+            queries.append(kwargs)
+            return {"documents": [["Rest and fluids."]], "ids": [["fever#0"]], "metadatas": [[{"source": "fever.md"}]]}
+
+    monkeypatch.setattr(retriever, "_initialize_chroma", lambda: (object(), FakeCollection()))
+    retriever.retrieval_cache.clear()
+
+    results = retriever.retrieve("fever", k=1, query_embedding=[0.1, 0.2])
+
+    assert results[0]["id"] == "fever#0"
+    assert queries == [{"query_embeddings": [[0.1, 0.2]], "n_results": 1}]
+
+
+def test_embed_many_batches_misses_into_one_model_call():
+    calls, batches = [], []
+    embed = make_embedder(calls)
+
+    def embed_batch(texts):
+        batches.append(list(texts))
+        return [embed(text) for text in texts]
+
+    cache = QueryEmbeddingCache(cache=FakeCache(), embed_fn=embed, batch_embed_fn=embed_batch, enabled=True)
+    asyncio.run(cache.embed("cough"))
+
+    vectors = asyncio.run(cache.embed_many(["Cough", "chest pain", "chest  pain", ""]))
+
+    assert vectors == [[0.5, 0.25, 5.0], [0.5, 0.25, 10.0], [0.5, 0.25, 10.0], None]
+    assert batches == [["chest pain"]]
+
+
+def test_embed_many_reads_and_writes_redis_in_one_round_trip_each():
+    shared = FakeCache()
+    calls = []
+    texts = ["fever", "cough", "rash", "chest pain"]
+    asyncio.run(QueryEmbeddingCache(cache=shared, embed_fn=make_embedder(calls), enabled=True).embed_many(texts[:2]))
+    assert shared.round_trips == 2
+
+    other_worker = QueryEmbeddingCache(cache=shared, embed_fn=make_embedder(calls), enabled=True)
+    shared.round_trips = 0
+    vectors = asyncio.run(other_worker.embed_many(texts))
+
+    assert vectors[0] == [0.5, 0.25, 5.0] and vectors[3] == [0.5, 0.25, 10.0]
+    assert other_worker.stats["l2_hits"] == 2
+    assert calls == ["fever", "cough", "rash", "chest pain"]
+    assert shared.round_trips == 2
+
+
+def test_retrieve_batch_sends_one_chroma_query(monkeypatch):
+    queries = []
+
+    class FakeCollection:
+        def query(self, **kwargs):
+            queries.append(kwargs)
+            return {
+                "documents": [["Rest and fluids."], ["Rest and fluids."]],
+                "ids": [["fever#0"], ["fever#0"]],
+                "metadatas": [[{"source": "fever.md"}], [{"source": "fever.md"}]],
+            }
+
+    monkeypatch.setattr(retriever, "_initialize_chroma", lambda: (object(), FakeCollection()))
+    retriever.retrieval_cache.clear()
+
+    results = retriever.retrieve_many(["fever", "high temperature"], k=1, query_embeddings=[[0.1, 0.2], [0.3, 0.4]])
+
+    assert [r["id"] for r in results] == ["fever#0"]
+    assert queries == [{"query_embeddings": [[0.1, 0.2], [0.3, 0.4]], "n_results": 1}]
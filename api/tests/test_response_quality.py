@@ -37,6 +37,7 @@ def stub_external_dependencies(monkeypatch):
     monkeypatch.setattr("api.main.translate_text", fake_translate)
     monkeypatch.setattr("api.main.detect_language", fake_detect_language)
     monkeypatch.setattr("api.main.retrieve", fake_retrieve)
+    monkeypatch.setattr("api.main.retrieve_many", lambda queries, k=4, query_embeddings=None: fake_retrieve(queries[0], k))
     monkeypatch.setattr("api.main.is_graph_intent", lambda _: False)
     monkeypatch.setattr("api.main.get_openai_client", lambda: None)
     monkeypatch.setattr("api.main.get_openrouter_client", lambda: None)
@@ -0,0 +1,75 @@
+from pathlib import Path
+import sys
+import time
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.rag import retriever  # noqa: E402
+from api.rag.result_cache import RetrievalResultCache, estimate_size  # noqa: E402
+
+
+def result(chunk_id, chunk="Rest and fluids."):
+    return {"chunk": chunk, "id": chunk_id, "citations": [{"source": "fever.md", "url": "https://example.org"}]}
+
+
+def test_repeated_retrieval_skips_the_backend_and_metadata_parsing(monkeypatch):
+    queries = []
+
+    class FakeCollection:
+        def query(self, **kwargs):
+            queries.append(kwargs)
+            return {
+                "documents": [["Rest and fluids."]],
+                "ids": [["fever#0"]],
+                "metadatas": [[{"source": "fever.md", "reference_sources": '["https://example.org"]'}]],
+            }
+
+    monkeypatch.setattr(retriever, "_initialize_chroma", lambda: (object(), FakeCollection()))
+    monkeypatch.setattr(retriever, "retrieval_cache", RetrievalResultCache())
+
+    first = retriever.retrieve("What to do for fever?", k=1, query_embedding=[0.1, 0.2])
+    first[0]["chunk"] = "mutated by caller"
+    second = retriever.retrieve("what to do  for FEVER?", k=1)
+
+    assert len(queries) == 1
+    assert second[0]["chunk"] == "Rest and fluids."
+    assert second[0]["citations"] == [{"source": "fever.md", "url": "https://example.org"}]
+    assert retriever.get_cached_results("what to do for fever?", k=2) is None
+    stats = retriever.retrieval_cache.get_statistics()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_stale_entries_are_served_while_one_refresh_runs():
+    cache = RetrievalResultCache(ttl=60, stale_ttl=3600)
+    cache.put("fever", "v1", [result("fever#0")])
+    refreshes = []
+
+    def revalidate():
+        refreshes.append(1)
+        time.sleep(0.05)
+        return "v2", [result("fever#1")]
+
+    assert cache.get("fever", "v2", revalidate)[0]["id"] == "fever#0"
+    assert cache.get("fever", "v2", revalidate)[0]["id"] == "fever#0"
+    cache._executor.shutdown(wait=True)
+
+    assert refreshes == [1]
+    assert cache.get("fever", "v2")[0]["id"] == "fever#1"
+    assert cache.stats["stale_hits"] == 2
+    assert cache.stats["hits"] == 1
+
+
+def test_memory_is_bounded_by_bytes_and_empty_results_are_not_cached():
+    entry = [result("a#0", "x" * 1000)]
+    cache = RetrievalResultCache(max_bytes=estimate_size(entry) * 2)
+    for key in ("a", "b", "c"):
+        cache.put(key, "v1", entry)
+    cache.put("empty", "v1", [])
+
+    assert cache.get("a", "v1") is None
+    assert cache.get("c", "v1") is not None
+    assert cache.get("empty", "v1") is None
+    assert cache.get_statistics()["entries"] == 2
+    assert cache.stats["evictions"] == 1
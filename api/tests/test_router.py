@@ -0,0 +1,63 @@
+from pathlib import Path
+import sys
+import time
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.router import _route_normalized, is_graph_intent, route_query  # noqa: E402
+
+
+def test_typical_queries_keep_their_routes():
+    assert is_graph_intent("Which painkillers should I avoid with hypertension?")
+    assert is_graph_intent("Hospitals near me in Mumbai")
+    assert is_graph_intent("I have fever and vomiting")
+    assert is_graph_intent("I am feeling suicidal, where can I get help?")
+    assert not is_graph_intent("I have a headache since morning")
+    assert not is_graph_intent("How do I manage stress at work?")
+    assert not is_graph_intent("")
+
+
+def test_ordered_rules_report_the_matching_terms():
+    decision = route_query("What foods are safe for pregnancy?")
+
+    assert decision["use_graph"] is True
+    assert decision["rules"][0] == "safe_for_condition"
+    assert decision["trace"][0] == {"rule": "safe_for_condition", "matched": ["what", "safe", "for", "pregnancy"]}
+
+
+def test_ordered_rules_need_terms_in_order_on_one_line():
+    # Wrong order: "mumbai" before the preposition
+    assert "city_lookup" not in route_query("mumbai hospital timings near")["rules"]
+    assert "city_lookup" in route_query("timings near Mumbai")["rules"]
+    # Split across lines
+    assert "city_lookup" not in route_query("timings near\nMumbai")["rules"]
+
+
+def test_terms_match_whole_words_only():
+    # "in" inside "pain" / "mumbai" inside "mumbaikar" do not count
+    assert route_query("pain mumbaikar")["rules"] == []
+
+
+def test_decisions_are_memoized_per_normalized_query():
+    _route_normalized.cache_clear()
+
+    route_query("Hospitals near me in Mumbai")
+    route_query("  hospitals   NEAR me in mumbai ")
+
+    info = _route_normalized.cache_info()
+    assert info.misses == 1
+    assert info.hits == 1
+
+
+def test_adversarial_input_routes_in_linear_time():
+    text = ("list what safe for " * 300)[:5000]
+    _route_normalized.cache_clear()
+
+    start = time.perf_counter()
+    decision = route_query(text)
+    elapsed = time.perf_counter() - start
+
+    assert decision["use_graph"] is True
+    assert elapsed < 0.5
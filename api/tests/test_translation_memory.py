@@ -0,0 +1,107 @@
+from pathlib import Path
+import asyncio
+import sys
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from api.services.translation_memory import TranslationMemory  # noqa: E402
+
+
+class FakeCache:
+    """Dict-backed stand-in for CacheService's Redis tier"""
+
+    def __init__(self):
+        self.store = {}
+
+    async def get_from_cache(self, key, fast_path=False):
+        return self.store.get(key)
+
+    async def set_to_cache(self, key, value, ttl=None, fast_path=False):
+        self.store[key] = value
+        return True
+
+
+def make_translator(calls, result="அறிவிப்பு", delay=0.0):
+    async def translate():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return result
+
+    return translate
+
+
+def test_second_lookup_is_served_from_memory():
+    memory = TranslationMemory(cache=FakeCache(), enabled=True)
+    calls = []
+
+    async def scenario():
+        first = await memory.translate("Disclaimer", "en", "ta", make_translator(calls))
+        second = await memory.translate("Disclaimer", "en", "ta", make_translator(calls))
+        return first, second
+
+    assert asyncio.run(scenario()) == ("அறிவிப்பு", "அறிவிப்பு")
+    assert len(calls) == 1
+    assert memory.stats["l1_hits"] == 1
+
+
+def test_redis_tier_is_shared_between_workers():
+    cache = FakeCache()
+    calls = []
+    asyncio.run(TranslationMemory(cache=cache, enabled=True).translate("Rest well", "en", "hi", make_translator(calls)))
+    other_worker = TranslationMemory(cache=cache, enabled=True)
+    assert asyncio.run(other_worker.get("Rest well", "en", "hi")) == "அறிவிப்பு"
+    assert other_worker.stats["l2_hits"] == 1
+
+
+def test_key_includes_languages_and_prompt_version():
+    v1 = TranslationMemory(cache=FakeCache(), prompt_version="1", enabled=True)
+    v2 = TranslationMemory(cache=FakeCache(), prompt_version="2", enabled=True)
+    assert v1.make_key("Hello", "en", "ta") != v1.make_key("Hello", "en", "hi")
+    assert v1.make_key("Hello", "en", "ta") != v2.make_key("Hello", "en", "ta")
+    assert v1.make_key("Hello  world", "en", "ta") == v1.make_key("Hello world", "en", "ta")
+
+
+def test_failed_translation_is_not_stored():
+    memory = TranslationMemory(cache=FakeCache(), enabled=True)
+    calls = []
+    # translate_to_user_language_async returns the English text when the LLM fails
+    asyncio.run(memory.translate("Call 108", "en", "kn", make_translator(calls, result="Call 108")))
+    asyncio.run(memory.translate("Call 108", "en", "kn", make_translator(calls, result="Call 108")))
+    assert len(calls) == 2
+
+
+def test_long_texts_are_kept_out_of_both_tiers(monkeypatch):
+    from api.services import translation_memory
+
+    monkeypatch.setattr(translation_memory, "TRANSLATION_MEMORY_MAX_CHARS", 20)
+    cache = FakeCache()
+    memory = TranslationMemory(cache=cache, enabled=True)
+    calls = []
+    answer = "Rest and drink plenty of fluids."
+    for _ in range(2):
+        asyncio.run(memory.translate(answer, "en", "ta", make_translator(calls)))
+    assert len(calls) == 2
+    assert memory.get_statistics()["entries"] == 0 and not cache.store
+
+
+def test_concurrent_misses_share_one_call_and_prewarm_skips_known():
+    memory = TranslationMemory(cache=FakeCache(), enabled=True)
+    calls = []
+
+    async def scenario():
+        await asyncio.gather(*(
+            memory.translate("Stay hydrated", "en", "ml", make_translator(calls, delay=0.05)) for _ in range(5)
+        ))
+
+        async def translate(text, lang):
+            calls.append(1)
+            return f"{lang}:{text}"
+
+        return await memory.prewarm(["Stay hydrated", "See a doctor"], ["en", "ml", "te"], translate)
+
+    fetched = asyncio.run(scenario())
+    # One shared call, then 3 of the 4 pre-warm pairs (ml "Stay hydrated" was already known)
+    assert fetched == 3
+    assert len(calls) == 4
@@ -19,7 +19,7 @@ def client(monkeypatch):
     def fake_transcribe(audio_bytes: bytes, language_hint=None):
         return "stub transcript"
 
-    def fake_process_chat_request(request):
+    async def fake_process_chat_request(request, conversation_history=None):
         from api.models import ChatResponse, Safety, MentalHealthSafety, PregnancySafety
 
         safety = Safety(